@@ -0,0 +1,218 @@
+"""Keep blocking work off the event loop, and measure when it is not.
+
+Some async tools still need synchronous calls: ``git show`` and ``rg`` via
+``subprocess``, large directory walks, streaming file reads. Run on the event
+loop, a single slow call freezes every other connection on the worker,
+including SSE streams. ``run_blocking`` dispatches such calls to a shared,
+bounded thread pool and records queue and run times.
+
+``LoopLagMonitor`` samples how late the loop wakes up from a short sleep; the
+oversleep is time the loop spent blocked, so regressions show up in
+``event_loop_stats()`` even when their cause is elsewhere.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from . import config
+from .config import BASE_LOGGER
+
+LOGGER = BASE_LOGGER.getChild("blocking")
+
+T = TypeVar("T")
+
+
+class BlockingExecutor:
+    """Bounded thread pool with queue/run-time accounting."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.inline = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.queue_seconds_total = 0.0
+        self.max_queue_seconds = 0.0
+        self.run_seconds_total = 0.0
+        self.max_run_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="mcp-blocking",
+                    )
+        return self._executor
+
+    def _record(self, queued: float, ran: float, *, failed: bool) -> None:
+        with self._lock:
+            self.queue_seconds_total += queued
+            self.max_queue_seconds = max(self.max_queue_seconds, queued)
+            self.run_seconds_total += ran
+            self.max_run_seconds = max(self.max_run_seconds, ran)
+            if failed:
+                self.failed += 1
+
+    async def run(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not on asyncio (e.g. trio in tests): nothing to hand off to.
+            self.inline += 1
+            return fn(*args, **kwargs)
+
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        submitted_at = time.monotonic()
+
+        def _timed() -> T:
+            started = time.monotonic()
+            failed = True
+            try:
+                result = call()
+                failed = False
+                return result
+            finally:
+                self._record(
+                    started - submitted_at, time.monotonic() - started, failed=failed
+                )
+
+        self.submitted += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await loop.run_in_executor(self._get_executor(), _timed)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "submitted": self.submitted,
+                "inline": self.inline,
+                "failed": self.failed,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "queue_seconds_total": round(self.queue_seconds_total, 6),
+                "max_queue_seconds": round(self.max_queue_seconds, 6),
+                "run_seconds_total": round(self.run_seconds_total, 6),
+                "max_run_seconds": round(self.max_run_seconds, 6),
+            }
+
+
+class LoopLagMonitor:
+    """Measure event-loop blocking as oversleep of a periodic probe."""
+
+    def __init__(self, interval_seconds: float, stall_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.stall_seconds = stall_seconds
+        self._task: asyncio.Task | None = None
+        self.samples = 0
+        self.stalls = 0
+        self.blocked_seconds_total = 0.0
+        self.max_lag_seconds = 0.0
+        self.last_stall_at: float | None = None
+        self.recent_stalls: deque[float] = deque(maxlen=10)
+
+    def record(self, lag: float) -> None:
+        lag = max(0.0, lag)
+        self.samples += 1
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+        if lag >= self.stall_seconds:
+            self.stalls += 1
+            self.blocked_seconds_total += lag
+            self.last_stall_at = time.time()
+            self.recent_stalls.append(round(lag, 4))
+
+    async def _probe(self) -> None:
+        interval = self.interval_seconds
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(interval)
+            self.record(time.monotonic() - started - interval)
+
+    def start(self) -> asyncio.Task | None:
+        """Start probing on the running asyncio loop (idempotent)."""
+
+        if self.interval_seconds <= 0:
+            return None
+        if self._task is not None and not self._task.done():
+            return self._task
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+        return self._task
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval_seconds,
+            "stall_seconds": self.stall_seconds,
+            "samples": self.samples,
+            "stalls": self.stalls,
+            "blocked_seconds_total": round(self.blocked_seconds_total, 6),
+            "max_lag_seconds": round(self.max_lag_seconds, 6),
+            "last_stall_at": self.last_stall_at,
+            "recent_stalls_seconds": list(self.recent_stalls),
+        }
+
+
+BLOCKING_EXECUTOR = BlockingExecutor(config.BLOCKING_EXECUTOR_WORKERS)
+LOOP_LAG_MONITOR = LoopLagMonitor(
+    config.LOOP_LAG_INTERVAL_SECONDS, config.LOOP_LAG_STALL_SECONDS
+)
+
+
+async def run_blocking(fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run ``fn(*args, **kwargs)`` on the shared blocking executor."""
+
+    return await BLOCKING_EXECUTOR.run(fn, *args, **kwargs)
+
+
+def parallel_width() -> int:
+    """Executor threads one request may occupy at once (half the pool)."""
+
+    return max(1, BLOCKING_EXECUTOR.max_workers // 2)
+
+
+async def run_blocking_map(
+    fn: Callable[..., T], items: list[Any], /, **kwargs: Any
+) -> list[T]:
+    """Run ``fn(item, **kwargs)`` for each item concurrently on the executor.
+
+    Results keep the order of ``items``. Off asyncio the calls run inline,
+    one after another. Callers bound ``len(items)``, e.g. by batching to
+    ``parallel_width()``.
+    """
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return [fn(item, **kwargs) for item in items]
+    return list(
+        await asyncio.gather(*(run_blocking(fn, item, **kwargs) for item in items))
+    )
+
+
+def event_loop_stats() -> dict[str, Any]:
+    return {
+        "executor": BLOCKING_EXECUTOR.stats(),
+        "loop_lag": LOOP_LAG_MONITOR.stats(),
+    }
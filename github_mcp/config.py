@@ -424,10 +424,95 @@ HTTPX_MAX_CONNECTIONS = int(os.environ.get("HTTPX_MAX_CONNECTIONS", 300))
 HTTPX_MAX_KEEPALIVE = int(os.environ.get("HTTPX_MAX_KEEPALIVE", 200))
 
 MAX_CONCURRENCY = int(os.environ.get("MAX_CONCURRENCY", 200))
+# Outbound slots are pooled per upstream host and request class; API calls use
+# MAX_CONCURRENCY, large downloads and arbitrary fetch_url targets get their own
+# smaller pools so they cannot starve metadata reads.
+OUTBOUND_DOWNLOAD_CONCURRENCY = int(os.environ.get("OUTBOUND_DOWNLOAD_CONCURRENCY", 8))
+OUTBOUND_EXTERNAL_CONCURRENCY = int(os.environ.get("OUTBOUND_EXTERNAL_CONCURRENCY", 16))
 FETCH_FILES_CONCURRENCY = int(os.environ.get("FETCH_FILES_CONCURRENCY", "200"))
-# File cache eviction caps. Set to 0 (or negative) to disable eviction.
-FILE_CACHE_MAX_ENTRIES = int(os.environ.get("FILE_CACHE_MAX_ENTRIES", "0"))
-FILE_CACHE_MAX_BYTES = int(os.environ.get("FILE_CACHE_MAX_BYTES", "0"))
+# fetch_files backend: "rest" (one Contents call per file), "graphql" (batched
+# blob reads), or "auto" (GraphQL once at least FETCH_FILES_GRAPHQL_MIN_FILES
+# files need fetching). GraphQL queries are chunked by alias count and bytes.
+FETCH_FILES_BACKEND = (
+    os.environ.get("FETCH_FILES_BACKEND", "auto").strip().lower() or "auto"
+)
+FETCH_FILES_GRAPHQL_MIN_FILES = int(
+    os.environ.get("FETCH_FILES_GRAPHQL_MIN_FILES", "3")
+)
+FETCH_FILES_GRAPHQL_BATCH_SIZE = int(
+    os.environ.get("FETCH_FILES_GRAPHQL_BATCH_SIZE", "50")
+)
+FETCH_FILES_GRAPHQL_MAX_BYTES = int(
+    os.environ.get("FETCH_FILES_GRAPHQL_MAX_BYTES", str(4 * 1024 * 1024))
+)
+# Worker threads for blocking calls (git show, rg, file walks) made from async
+# tools, so they never run on the event loop.
+BLOCKING_EXECUTOR_WORKERS = int(
+    os.environ.get("BLOCKING_EXECUTOR_WORKERS", str(min(32, (os.cpu_count() or 1) + 4)))
+)
+# Event-loop lag sampling: a probe sleeps INTERVAL seconds and any oversleep is
+# time the loop was blocked; lags of at least STALL_SECONDS count as stalls.
+# An interval <= 0 disables the probe.
+LOOP_LAG_INTERVAL_SECONDS = float(os.environ.get("LOOP_LAG_INTERVAL_SECONDS", "0.5"))
+LOOP_LAG_STALL_SECONDS = float(os.environ.get("LOOP_LAG_STALL_SECONDS", "0.1"))
+
+
+def _available_memory_bytes() -> int | None:
+    """Best-effort memory limit: the cgroup limit if set, else physical RAM."""
+
+    for path in (
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                raw = fh.read().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "no limit" as a huge page-aligned number.
+        if raw.isdigit() and int(raw) < (1 << 60):
+            return int(raw)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _default_file_cache_max_bytes() -> int:
+    # 1/16 of the memory available to the process, clamped to 32-512 MiB.
+    available = _available_memory_bytes()
+    if not available:
+        return 256 * 1024 * 1024
+    return max(32 * 1024 * 1024, min(512 * 1024 * 1024, available // 16))
+
+
+# File cache eviction caps. Set to 0 (or negative) to disable eviction. The
+# byte cap covers every representation an entry retains (bytes, text, base64).
+FILE_CACHE_MAX_ENTRIES = int(os.environ.get("FILE_CACHE_MAX_ENTRIES", "5000"))
+FILE_CACHE_MAX_BYTES = int(
+    os.environ.get("FILE_CACHE_MAX_BYTES", str(_default_file_cache_max_bytes()))
+)
+# Entries at least this large are only admitted when they are accessed more
+# often than the entries they would evict (TinyLFU). 0 admits everything.
+FILE_CACHE_ADMISSION_MIN_BYTES = int(
+    os.environ.get("FILE_CACHE_ADMISSION_MIN_BYTES", str(256 * 1024))
+)
+# Keep only decoded bytes in memory and derive text/base64 on read.
+FILE_CACHE_COMPACT_ENTRIES = _env_flag("FILE_CACHE_COMPACT_ENTRIES", "false")
+# Optional persistent L2 for the file cache (survives restarts and is shared by
+# workers on the same host). Set the byte cap to 0 to disable eviction.
+FILE_CACHE_DISK_ENABLED = _env_flag("FILE_CACHE_DISK_ENABLED", "false")
+FILE_CACHE_DISK_DIR = os.path.abspath(
+    os.path.expanduser(
+        os.environ.get("FILE_CACHE_DISK_DIR", "").strip()
+        or os.path.join(WORKSPACE_BASE_DIR, ".cache", "file-cache")
+    )
+)
+FILE_CACHE_DISK_MAX_BYTES = int(
+    os.environ.get("FILE_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))
+)
+# Parsed git trees cached by tree SHA, capped by the total number of entries.
+TREE_CACHE_MAX_ENTRIES = int(os.environ.get("TREE_CACHE_MAX_ENTRIES", "300000"))
 
 # Workspace / command timeouts.
 # Semantics: 0 (or negative) disables timeouts.
@@ -473,6 +558,43 @@ GITHUB_SEARCH_MIN_INTERVAL_SECONDS = float(
     os.environ.get("GITHUB_SEARCH_MIN_INTERVAL_SECONDS", "0")
 )
 
+# Proactive pacing against GitHub's X-RateLimit-* budget. Once a bucket's
+# remaining budget drops below the fraction, requests are spread over the time
+# left in the window. Background work (e.g. polling) starts pacing at twice the
+# fraction and may not spend the reserve kept for interactive tool calls.
+GITHUB_RATE_BUDGET_ENABLED = _env_flag("GITHUB_RATE_BUDGET_ENABLED", "true")
+GITHUB_RATE_BUDGET_PACE_BELOW_FRACTION = float(
+    os.environ.get("GITHUB_RATE_BUDGET_PACE_BELOW_FRACTION", "0.2")
+)
+GITHUB_RATE_BUDGET_INTERACTIVE_RESERVE_FRACTION = float(
+    os.environ.get("GITHUB_RATE_BUDGET_INTERACTIVE_RESERVE_FRACTION", "0.1")
+)
+GITHUB_RATE_BUDGET_MAX_WAIT_SECONDS = float(
+    os.environ.get("GITHUB_RATE_BUDGET_MAX_WAIT_SECONDS", "30")
+)
+
+# Share one upstream call between concurrent identical GET/HEAD requests.
+GITHUB_REQUEST_COALESCING_ENABLED = _env_flag(
+    "GITHUB_REQUEST_COALESCING_ENABLED", "true"
+)
+
+# Conditional-request (ETag / Last-Modified) cache for GitHub GET requests.
+# Opt-in; 304 replies do not count against GitHub's primary rate limit.
+# Set the caps to 0 (or negative) to disable eviction by that dimension.
+GITHUB_RESPONSE_CACHE_ENABLED = _env_flag("GITHUB_RESPONSE_CACHE_ENABLED", "false")
+GITHUB_RESPONSE_CACHE_MAX_ENTRIES = int(
+    os.environ.get("GITHUB_RESPONSE_CACHE_MAX_ENTRIES", "2000")
+)
+GITHUB_RESPONSE_CACHE_MAX_BYTES = int(
+    os.environ.get("GITHUB_RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+
+# How long a branch/tag -> commit SHA resolution is reused (seconds). Entries
+# are also dropped as soon as this server writes to the repository. 0 disables.
+GITHUB_REF_CACHE_TTL_SECONDS = float(
+    os.environ.get("GITHUB_REF_CACHE_TTL_SECONDS", "10")
+)
+
 # Logging controls
 # ------------------------------------------------------------------------------
 # These settings only affect provider logs (Render / stdout). They do not change
@@ -625,6 +747,114 @@ WORKSPACE_APPLY_DIFF_TIMEOUT_SECONDS = int(
     os.environ.get("MCP_WORKSPACE_APPLY_DIFF_TIMEOUT_SECONDS", "0")
 )
 
+# Ref mirrors of the same repo borrow objects from one shared bare store
+# (<base>/<owner>__<repo>/.objects.git) instead of each holding a full clone.
+WORKSPACE_SHARED_OBJECTS = _env_flag("MCP_WORKSPACE_SHARED_OBJECTS", "false")
+
+# Clone strategy for new ref mirrors of large repos: a partial-clone filter
+# (e.g. "blob:none", blobs are fetched lazily), a shallow depth, and a
+# comma-separated list of sparse-checkout cone directories. Workspace tools
+# widen the cone when a path outside it is requested.
+WORKSPACE_CLONE_FILTER = os.environ.get("MCP_WORKSPACE_CLONE_FILTER", "").strip()
+WORKSPACE_CLONE_DEPTH = int(os.environ.get("MCP_WORKSPACE_CLONE_DEPTH", "0"))
+WORKSPACE_SPARSE_PATHS = tuple(
+    part.strip().strip("/")
+    for part in os.environ.get("MCP_WORKSPACE_SPARSE_PATHS", "").split(",")
+    if part.strip().strip("/")
+)
+
+# Workspace tools reuse a mirror fetched within this many seconds without
+# touching the network; older mirrors first check whether the branch moved
+# upstream (ref cache or git ls-remote) before fetching. 0 disables the window.
+WORKSPACE_REFRESH_STALE_SECONDS = float(
+    os.environ.get("MCP_WORKSPACE_REFRESH_STALE_SECONDS", "30")
+)
+
+
+# Disk budget for repo mirrors (and shared object stores) under
+# WORKSPACE_BASE_DIR. Past it, least recently used mirrors without local work
+# are deleted; mirrors used within MIN_IDLE_SECONDS are never evicted. 0 (the
+# default) disables eviction.
+WORKSPACE_POOL_MAX_BYTES = int(os.environ.get("MCP_WORKSPACE_POOL_MAX_BYTES", "0"))
+WORKSPACE_POOL_MIN_IDLE_SECONDS = float(
+    os.environ.get("MCP_WORKSPACE_POOL_MIN_IDLE_SECONDS", "300")
+)
+# Mirrors to create at startup: comma-separated owner/repo[@ref] entries, plus
+# the controller repo's default branch when PREWARM_CONTROLLER is set.
+WORKSPACE_PREWARM = tuple(
+    part.strip()
+    for part in os.environ.get("MCP_WORKSPACE_PREWARM", "").split(",")
+    if part.strip()
+)
+WORKSPACE_PREWARM_CONTROLLER = _env_flag("MCP_WORKSPACE_PREWARM_CONTROLLER", "false")
+# Per-mirror reader/writer locks: reads share a mirror, mutations and
+# refreshes get it exclusively.
+WORKSPACE_LOCKS = _env_flag("MCP_WORKSPACE_LOCKS", "false")
+# Output kept in memory for user-facing commands (terminal_command and the
+# suites built on it): the first HEAD_BYTES and last TAIL_BYTES of each stream.
+# With SPILL the full stream is also written to disk and readable by handle
+# for SPILL_TTL_SECONDS; at most SPILL_MAX_BYTES per stream (0 = no cap).
+WORKSPACE_OUTPUT_HEAD_BYTES = int(
+    os.environ.get("MCP_WORKSPACE_OUTPUT_HEAD_BYTES", str(256 * 1024))
+)
+WORKSPACE_OUTPUT_TAIL_BYTES = int(
+    os.environ.get("MCP_WORKSPACE_OUTPUT_TAIL_BYTES", str(256 * 1024))
+)
+WORKSPACE_OUTPUT_SPILL = _env_flag("MCP_WORKSPACE_OUTPUT_SPILL", "true")
+WORKSPACE_OUTPUT_SPILL_TTL_SECONDS = float(
+    os.environ.get("MCP_WORKSPACE_OUTPUT_SPILL_TTL_SECONDS", "3600")
+)
+WORKSPACE_OUTPUT_SPILL_MAX_BYTES = int(
+    os.environ.get("MCP_WORKSPACE_OUTPUT_SPILL_MAX_BYTES", str(64 * 1024 * 1024))
+)
+# Live output streaming (MCP progress notifications / chunked POST
+# /tools/<name>?stream=true): chunks buffered before the command is paused,
+# and the idle interval after which a heartbeat is sent.
+WORKSPACE_STREAM_MAX_PENDING_CHUNKS = int(
+    os.environ.get("MCP_WORKSPACE_STREAM_MAX_PENDING_CHUNKS", "16")
+)
+WORKSPACE_STREAM_HEARTBEAT_SECONDS = float(
+    os.environ.get("MCP_WORKSPACE_STREAM_HEARTBEAT_SECONDS", "15")
+)
+# Warm shells: keep up to MAX long-lived shells (one per workspace and env)
+# so short commands skip the shell spawn and env/PATH setup. Idle shells are
+# closed after IDLE_SECONDS.
+WORKSPACE_WARM_SHELL = _env_flag("MCP_WORKSPACE_WARM_SHELL", "false")
+WORKSPACE_WARM_SHELL_MAX = int(os.environ.get("MCP_WORKSPACE_WARM_SHELL_MAX", "8"))
+WORKSPACE_WARM_SHELL_IDLE_SECONDS = float(
+    os.environ.get("MCP_WORKSPACE_WARM_SHELL_IDLE_SECONDS", "300")
+)
+# Trigram signatures that let workspace text search skip files that cannot
+# match; files up to MAX_FILE_BYTES are indexed, for up to MAX_REPOS mirrors
+# kept in memory (each is also saved under the mirror's .git directory). A
+# search spends at most BUILD_SECONDS adding files to the index.
+WORKSPACE_SEARCH_INDEX = _env_flag("MCP_WORKSPACE_SEARCH_INDEX", "false")
+WORKSPACE_SEARCH_INDEX_MAX_FILE_BYTES = int(
+    os.environ.get("MCP_WORKSPACE_SEARCH_INDEX_MAX_FILE_BYTES", str(1024 * 1024))
+)
+WORKSPACE_SEARCH_INDEX_MAX_REPOS = int(
+    os.environ.get("MCP_WORKSPACE_SEARCH_INDEX_MAX_REPOS", "8")
+)
+WORKSPACE_SEARCH_INDEX_BUILD_SECONDS = float(
+    os.environ.get("MCP_WORKSPACE_SEARCH_INDEX_BUILD_SECONDS", "1")
+)
+# Line-start offsets for files of at least MIN_BYTES, so excerpt/section
+# reads seek to start_line instead of reading the prefix; CACHE_BYTES bounds
+# the offsets kept in memory (8 bytes per line).
+WORKSPACE_LINE_INDEX = _env_flag("MCP_WORKSPACE_LINE_INDEX", "false")
+WORKSPACE_LINE_INDEX_MIN_BYTES = int(
+    os.environ.get("MCP_WORKSPACE_LINE_INDEX_MIN_BYTES", str(256 * 1024))
+)
+WORKSPACE_LINE_INDEX_CACHE_BYTES = int(
+    os.environ.get("MCP_WORKSPACE_LINE_INDEX_CACHE_BYTES", str(64 * 1024 * 1024))
+)
+# scan_workspace_tree metadata (binary flag, hashes, line counts) cached per
+# file by (size, mtime_ns, inode), for up to MAX_REPOS mirrors.
+WORKSPACE_SCAN_MANIFEST = _env_flag("MCP_WORKSPACE_SCAN_MANIFEST", "false")
+WORKSPACE_SCAN_MANIFEST_MAX_REPOS = int(
+    os.environ.get("MCP_WORKSPACE_SCAN_MANIFEST_MAX_REPOS", "8")
+)
+
 ADAPTIV_MCP_GIT_IDENTITY_ENV_VARS = (
     "ADAPTIV_MCP_GIT_AUTHOR_NAME",
     "ADAPTIV_MCP_GIT_AUTHOR_EMAIL",
@@ -1152,8 +1382,18 @@ RENDER_RATE_LIMIT_RETRY_BASE_DELAY_SECONDS = float(
 
 __all__ = [
     "BASE_LOGGER",
+    "BLOCKING_EXECUTOR_WORKERS",
     "ERRORS_LOGGER",
     "FETCH_FILES_CONCURRENCY",
+    "FETCH_FILES_BACKEND",
+    "FETCH_FILES_GRAPHQL_BATCH_SIZE",
+    "FETCH_FILES_GRAPHQL_MAX_BYTES",
+    "FETCH_FILES_GRAPHQL_MIN_FILES",
+    "FILE_CACHE_ADMISSION_MIN_BYTES",
+    "FILE_CACHE_COMPACT_ENTRIES",
+    "FILE_CACHE_DISK_DIR",
+    "FILE_CACHE_DISK_ENABLED",
+    "FILE_CACHE_DISK_MAX_BYTES",
     "FILE_CACHE_MAX_BYTES",
     "FILE_CACHE_MAX_ENTRIES",
     "GIT_AUTHOR_EMAIL",
@@ -1179,7 +1419,11 @@ __all__ = [
     "LOG_TOOL_CALL_STARTS",
     "LOG_HTTP_REQUESTS",
     "LOG_INLINE_CONTEXT",
+    "LOOP_LAG_INTERVAL_SECONDS",
+    "LOOP_LAG_STALL_SECONDS",
     "MAX_CONCURRENCY",
+    "OUTBOUND_DOWNLOAD_CONCURRENCY",
+    "OUTBOUND_EXTERNAL_CONCURRENCY",
     "RENDER_API_BASE",
     "RENDER_RATE_LIMIT_RETRY_BASE_DELAY_SECONDS",
     "RENDER_RATE_LIMIT_RETRY_MAX_ATTEMPTS",
@@ -1187,6 +1431,7 @@ __all__ = [
     "RENDER_TOKEN_ENV_VARS",
     "SERVER_GIT_COMMIT",
     "SERVER_START_TIME",
+    "TREE_CACHE_MAX_ENTRIES",
     "WORKSPACE_BASE_DIR",
     "git_identity_warnings",
     "format_log_context",
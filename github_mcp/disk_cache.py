@@ -0,0 +1,289 @@
+"""Persistent, content-addressed L2 tier for the file cache.
+
+Bodies are stored once per git blob SHA under ``<root>/blobs/<aa>/<sha>`` and a
+small SQLite index maps ``full_name|ref|path`` keys to blobs. The layout is
+safe to share between several server processes (e.g. multiple uvicorn
+workers):
+
+- blob files are written to a temporary name and atomically renamed, so two
+  workers writing the same blob simply race to produce identical files;
+- the index uses SQLite's own file locking (WAL mode) for concurrent access;
+- readers treat a missing blob file as a miss and drop the stale pointer.
+
+Reads map the blob file with ``mmap`` and hand out a read-only ``memoryview``
+so large bodies are served from the page cache instead of being copied onto
+the Python heap.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any
+
+from . import config
+
+# Avoid turning every read into an index write; access times only need to be
+# precise enough to drive LRU eviction.
+_ACCESS_TOUCH_INTERVAL_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pointers (
+    key TEXT PRIMARY KEY,
+    blob_sha TEXT NOT NULL,
+    meta TEXT NOT NULL,
+    cached_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pointers_blob_sha ON pointers (blob_sha);
+CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access);
+"""
+
+
+class DiskBlobCache:
+    """SQLite-indexed, content-addressed blob store with an LRU byte cap."""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._conn_pid: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Storage helpers
+    # ------------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared across forked workers.
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+            conn = sqlite3.connect(
+                os.path.join(self.root, "index.sqlite3"),
+                timeout=30,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._conn_pid = pid
+        return self._conn
+
+    def _blob_path(self, blob_sha: str) -> str:
+        return os.path.join(self.root, "blobs", blob_sha[:2], blob_sha)
+
+    def _write_blob_file(self, blob_sha: str, data: Any) -> None:
+        path = self._blob_path(blob_sha)
+        if os.path.exists(path):
+            return
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _map_blob(self, blob_sha: str) -> memoryview | None:
+        try:
+            with open(self._blob_path(blob_sha), "rb") as fh:
+                if os.fstat(fh.fileno()).st_size == 0:
+                    return memoryview(b"")
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        return memoryview(mapped)
+
+    def _drop_blob(self, conn: sqlite3.Connection, blob_sha: str) -> None:
+        conn.execute("DELETE FROM pointers WHERE blob_sha = ?", (blob_sha,))
+        conn.execute("DELETE FROM blobs WHERE sha = ?", (blob_sha,))
+        try:
+            os.unlink(self._blob_path(blob_sha))
+        except OSError:
+            pass
+
+    def _evict_if_needed(self, conn: sqlite3.Connection) -> None:
+        if self.max_bytes <= 0:
+            return
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT sha, size FROM blobs ORDER BY last_access ASC"
+        ).fetchall()
+        for blob_sha, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._drop_blob(conn, blob_sha)
+            total -= size
+            self.evictions += 1
+
+    def _touch(
+        self, conn: sqlite3.Connection, blob_sha: str, last_access: float
+    ) -> None:
+        now = time.time()
+        if now - last_access >= _ACCESS_TOUCH_INTERVAL_SECONDS:
+            conn.execute(
+                "UPDATE blobs SET last_access = ? WHERE sha = ?", (now, blob_sha)
+            )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def put(
+        self,
+        key: str,
+        *,
+        blob_sha: str,
+        data: Any,
+        meta: Mapping[str, Any],
+    ) -> bool:
+        """Persist ``data`` under ``blob_sha`` and point ``key`` at it."""
+
+        size = memoryview(data).nbytes
+        if self.max_bytes > 0 and size > self.max_bytes:
+            return False
+        with self._lock:
+            conn = self._connection()
+            self._write_blob_file(blob_sha, data)
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO blobs (sha, size, last_access) VALUES (?, ?, ?) "
+                    "ON CONFLICT(sha) DO UPDATE SET last_access = excluded.last_access",
+                    (blob_sha, size, now),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO pointers (key, blob_sha, meta, cached_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, blob_sha, json.dumps(dict(meta), default=str), now),
+                )
+                self._evict_if_needed(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self.writes += 1
+        return True
+
+    def get(self, key: str) -> tuple[dict[str, Any], memoryview] | None:
+        """Return ``(meta, body)`` for ``key`` or None on a miss."""
+
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT p.blob_sha, p.meta, p.cached_at, b.last_access "
+                "FROM pointers p JOIN blobs b ON b.sha = p.blob_sha WHERE p.key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            blob_sha, meta_raw, cached_at, last_access = row
+            body = self._map_blob(blob_sha)
+            if body is None:
+                # Another worker evicted the file; forget the stale pointer.
+                self._drop_blob(conn, blob_sha)
+                self.misses += 1
+                return None
+            self._touch(conn, blob_sha, last_access)
+            self.hits += 1
+        meta = json.loads(meta_raw)
+        meta["blob_sha"] = blob_sha
+        meta["cached_at"] = cached_at
+        return meta, body
+
+    def get_blob(self, blob_sha: str) -> memoryview | None:
+        """Return the body for ``blob_sha`` or None when it is not stored."""
+
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT last_access FROM blobs WHERE sha = ?", (blob_sha,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            body = self._map_blob(blob_sha)
+            if body is None:
+                self._drop_blob(conn, blob_sha)
+                self.misses += 1
+                return None
+            self._touch(conn, blob_sha, row[0])
+            self.hits += 1
+        return body
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            shas = [row[0] for row in conn.execute("SELECT sha FROM blobs")]
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for blob_sha in shas:
+                    self._drop_blob(conn, blob_sha)
+                conn.execute("DELETE FROM pointers")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            conn = self._connection()
+            blobs, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+            (pointers,) = conn.execute("SELECT COUNT(*) FROM pointers").fetchone()
+        return {
+            "root": self.root,
+            "entries": pointers,
+            "blobs": blobs,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+
+_DISK_CACHE: DiskBlobCache | None = None
+
+
+def get_disk_cache() -> DiskBlobCache | None:
+    """Return the process-wide disk tier, or None when it is disabled."""
+
+    global _DISK_CACHE
+    if not config.FILE_CACHE_DISK_ENABLED:
+        return None
+    if _DISK_CACHE is None:
+        _DISK_CACHE = DiskBlobCache(
+            root=config.FILE_CACHE_DISK_DIR,
+            max_bytes=config.FILE_CACHE_DISK_MAX_BYTES,
+        )
+    return _DISK_CACHE
@@ -3,54 +3,320 @@
 The cache is intentionally lightweight: it keeps decoded file payloads in
 memory for the lifetime of the process so callers can rehydrate context
 without re-fetching from GitHub on every tool call. Entries are evicted using
-an LRU eviction strategy when the cache exceeds configured entry or byte caps.
+an LRU eviction strategy when the cache exceeds configured entry or byte caps,
+and a frequency-based admission filter keeps large one-off files out.
+
+Entries are keyed by ``full_name|ref|path`` but file bodies live in a second,
+content-addressed tier keyed by the git blob SHA. Path entries only point at a
+blob, so the same content cached under several commits or branches is stored
+once, and callers that already know a blob SHA (for example from a tree
+listing) can reuse the body without another fetch.
+
+Behind the memory tier sits an optional disk tier (``disk_cache``). Async
+callers use the ``*_async`` variants, which keep the memory tier on the event
+loop and run every disk-tier query, write and mmap on the blocking executor.
 """
 
 from __future__ import annotations
 
+import base64
+import hashlib
+import sqlite3
+import sys
 import time
 from collections import OrderedDict
 from collections.abc import Iterable, Mapping
+from typing import Any
 
 from . import config
+from .blocking import run_blocking
+from .disk_cache import get_disk_cache
+
+
+def git_blob_sha(data: bytes | bytearray) -> str:
+    """Return the git blob SHA-1 for ``data`` (matches GitHub's blob ``sha``)."""
+
+    digest = hashlib.sha1(usedforsecurity=False)
+    digest.update(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def _retained_bytes(value: Mapping[str, Any], shared: Iterable[Any] = ()) -> int:
+    """Approximate heap bytes held by the body representations in ``value``.
+
+    Counts ``decoded_bytes``, ``text`` and base64 ``content`` (including the
+    copy echoed in the raw Contents API ``json``). Objects in ``shared`` and
+    repeated references to the same object are counted once.
+    """
+
+    seen = {id(obj) for obj in shared}
+    json_blob = value.get("json")
+    candidates = (
+        value.get("decoded_bytes"),
+        value.get("text"),
+        value.get("content"),
+        json_blob.get("content") if isinstance(json_blob, Mapping) else None,
+    )
+    total = 0
+    for obj in candidates:
+        if not isinstance(obj, (bytes, bytearray, str)) or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+    return total
+
+
+def _compact(value: dict) -> dict:
+    """Drop representations that can be derived from ``decoded_bytes``."""
+
+    if not isinstance(value.get("decoded_bytes"), (bytes, bytearray)):
+        return value
+    compacted = {**value, "text": None, "content": None}
+    json_blob = value.get("json")
+    if isinstance(json_blob, Mapping) and "content" in json_blob:
+        compacted["json"] = {k: v for k, v in json_blob.items() if k != "content"}
+    return compacted
+
+
+def _expand(value: dict) -> dict:
+    """Rebuild the text/base64 views of a compacted entry."""
+
+    decoded_bytes = value.get("decoded_bytes")
+    if not isinstance(decoded_bytes, (bytes, bytearray)):
+        return value
+    try:
+        text: str | None = decoded_bytes.decode("utf-8")
+    except UnicodeDecodeError:
+        text = None
+    expanded = {**value, "text": text}
+    if value.get("encoding") == "base64":
+        expanded["content"] = base64.b64encode(decoded_bytes).decode("ascii")
+    return expanded
+
+
+class FrequencySketch:
+    """Count-min sketch of recent access frequencies (TinyLFU).
+
+    Counters saturate at 15 and are all halved once ``sample_size`` increments
+    have been recorded, so popularity decays and one-off bursts age out.
+    """
+
+    _DEPTH = 4
+    _MAX_COUNT = 15
+    # Odd 64-bit multipliers, one per row, so rows index independently.
+    _SEEDS = (
+        0x9E3779B97F4A7C15,
+        0xC2B2AE3D27D4EB4F,
+        0x165667B19E3779F9,
+        0xD6E8FEB86659FD93,
+    )
+    _MASK64 = (1 << 64) - 1
+
+    def __init__(self, width: int):
+        width = 1 << max(6, (max(width, 1) - 1).bit_length())
+        self._shift = 64 - (width.bit_length() - 1)
+        self._tables = [bytearray(width) for _ in range(self._DEPTH)]
+        self.sample_size = 10 * width
+        self._additions = 0
+
+    def _indexes(self, key: str) -> list[int]:
+        h = hash(key) & self._MASK64
+        return [((h * seed) & self._MASK64) >> self._shift for seed in self._SEEDS]
+
+    def increment(self, key: str) -> None:
+        for table, index in zip(self._tables, self._indexes(key), strict=True):
+            if table[index] < self._MAX_COUNT:
+                table[index] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._tables = [bytearray(c >> 1 for c in t) for t in self._tables]
+            self._additions //= 2
+
+    def estimate(self, key: str) -> int:
+        return min(
+            table[index]
+            for table, index in zip(self._tables, self._indexes(key), strict=True)
+        )
 
+    def clear(self) -> None:
+        self._tables = [bytearray(len(t)) for t in self._tables]
+        self._additions = 0
 
-class FileCache:
-    """Simple LRU cache for GitHub file payloads."""
 
-    def __init__(self, max_entries: int, max_bytes: int):
+class FileCache:
+    """Simple LRU cache for GitHub file payloads.
+
+    Values carrying a ``blob_sha`` share a single body per blob: the first
+    entry registers its ``decoded_bytes``/``text`` objects with the blob tier
+    and later entries for the same blob are rewired to those objects, so the
+    duplicate copies can be garbage collected.
+
+    The byte cap applies to retained memory (see ``_retained_bytes``), not the
+    nominal file size. Candidates of at least ``admission_min_bytes`` must be
+    accessed more often than the entries they would evict, which keeps large,
+    one-off reads from flushing the working set. With ``compact`` only
+    ``decoded_bytes`` is kept and the text/base64 views are rebuilt on read.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        *,
+        admission_min_bytes: int = 0,
+        compact: bool = False,
+    ):
         self.max_entries = max_entries
         self.max_bytes = max_bytes
+        self.admission_min_bytes = admission_min_bytes
+        self.compact = compact
         self._cache: OrderedDict[str, dict] = OrderedDict()
+        self._costs: dict[str, int] = {}
+        self._blobs: dict[str, dict[str, Any]] = {}
+        self._sketch = FrequencySketch(max_entries if max_entries > 0 else 4096)
         self._current_bytes = 0
+        self._unique_bytes = 0
+        self._logical_bytes = 0
+        self.dedupe_hits = 0
+        self.dedupe_bytes_saved = 0
+        self.admission_rejections = 0
+
+    def _release(self, key: str, value: dict) -> None:
+        size_bytes = value.get("size_bytes", 0)
+        self._logical_bytes -= size_bytes
+        self._current_bytes -= self._costs.pop(key, 0)
+        blob_sha = value.get("blob_sha")
+        blob = self._blobs.get(blob_sha) if blob_sha else None
+        if blob is None:
+            self._unique_bytes -= size_bytes
+            return
+        blob["refs"] -= 1
+        if blob["refs"] <= 0:
+            del self._blobs[blob_sha]
+            self._current_bytes -= blob["retained_bytes"]
+            self._unique_bytes -= blob["size_bytes"]
+
+    def _attach(self, key: str, value: dict) -> None:
+        size_bytes = value.get("size_bytes", 0)
+        self._logical_bytes += size_bytes
+        blob_sha = value.get("blob_sha")
+        if not blob_sha:
+            cost = _retained_bytes(value) or size_bytes
+            self._unique_bytes += size_bytes
+        else:
+            blob = self._blobs.get(blob_sha)
+            if blob is None:
+                blob = {
+                    "decoded_bytes": value.get("decoded_bytes"),
+                    "text": value.get("text"),
+                    "size_bytes": size_bytes,
+                    "refs": 0,
+                }
+                blob["retained_bytes"] = _retained_bytes(blob)
+                self._blobs[blob_sha] = blob
+                self._current_bytes += blob["retained_bytes"]
+                self._unique_bytes += size_bytes
+            else:
+                value["decoded_bytes"] = blob["decoded_bytes"]
+                if blob.get("text") is not None:
+                    value["text"] = blob["text"]
+                self.dedupe_hits += 1
+                self.dedupe_bytes_saved += blob["size_bytes"]
+            blob["refs"] += 1
+            cost = _retained_bytes(value, (blob["decoded_bytes"], blob["text"]))
+        self._costs[key] = cost
+        self._current_bytes += cost
+
+    def _victim_cost(self, key: str) -> int:
+        cost = self._costs.get(key, 0)
+        blob_sha = self._cache[key].get("blob_sha")
+        blob = self._blobs.get(blob_sha) if blob_sha else None
+        if blob is not None and blob["refs"] == 1:
+            cost += blob["retained_bytes"]
+        return cost
+
+    def _admit(self, key: str, value: dict) -> bool:
+        blob_sha = value.get("blob_sha")
+        if blob_sha and blob_sha in self._blobs:
+            # The body is already resident; only a pointer is added.
+            return True
+        cost = _retained_bytes(value) or value.get("size_bytes", 0)
+        if self.max_bytes > 0 and cost > self.max_bytes:
+            return False
+        if self.admission_min_bytes <= 0 or cost < self.admission_min_bytes:
+            return True
+
+        bytes_needed = 0
+        if self.max_bytes > 0:
+            bytes_needed = self._current_bytes + cost - self.max_bytes
+        entries_needed = 0
+        if self.max_entries > 0:
+            entries_needed = len(self._cache) + 1 - self.max_entries
+        candidate_freq = self._sketch.estimate(key)
+        for victim in self._cache:
+            if bytes_needed <= 0 and entries_needed <= 0:
+                break
+            if victim == key:
+                continue
+            if self._sketch.estimate(victim) >= candidate_freq:
+                return False
+            bytes_needed -= self._victim_cost(victim)
+            entries_needed -= 1
+        return True
 
     def _evict_if_needed(self) -> None:
         while self.max_entries > 0 and len(self._cache) > self.max_entries:
-            _, evicted = self._cache.popitem(last=False)
-            self._current_bytes -= evicted.get("size_bytes", 0)
+            evicted_key, evicted = self._cache.popitem(last=False)
+            self._release(evicted_key, evicted)
 
         while self.max_bytes > 0 and self._current_bytes > self.max_bytes:
-            _, evicted = self._cache.popitem(last=False)
-            self._current_bytes -= evicted.get("size_bytes", 0)
+            if not self._cache:
+                break
+            evicted_key, evicted = self._cache.popitem(last=False)
+            self._release(evicted_key, evicted)
+
+    def put(self, key: str, value: dict) -> bool:
+        """Insert ``value`` keyed by ``key`` and evict if over caps.
 
-    def put(self, key: str, value: dict) -> None:
-        """Insert ``value`` keyed by ``key`` and evict if over caps."""
+        Returns False when the admission policy rejects the entry.
+        """
+
+        self._sketch.increment(key)
+        if self.compact:
+            value = _compact(value)
+        if not self._admit(key, value):
+            self.admission_rejections += 1
+            return False
 
         if key in self._cache:
             existing = self._cache.pop(key)
-            self._current_bytes -= existing.get("size_bytes", 0)
+            self._release(key, existing)
 
         self._cache[key] = value
         self._cache.move_to_end(key)
-        self._current_bytes += value.get("size_bytes", 0)
+        self._attach(key, value)
         self._evict_if_needed()
+        return True
 
     def get(self, key: str) -> dict | None:
+        self._sketch.increment(key)
         item = self._cache.get(key)
         if item is None:
             return None
         self._cache.move_to_end(key)
-        return item
+        return _expand(item) if self.compact else item
+
+    def blob_count(self) -> int:
+        return len(self._blobs)
+
+    def get_blob(self, blob_sha: str) -> dict[str, Any] | None:
+        """Return the shared body for ``blob_sha`` without touching LRU order."""
+
+        blob = self._blobs.get(blob_sha)
+        if blob is None or blob.get("text") is not None or not self.compact:
+            return blob
+        return _expand(blob)
 
     def bulk_get(self, keys: Iterable[str]) -> dict[str, dict]:
         results: dict[str, dict] = {}
@@ -62,20 +328,41 @@ class FileCache:
 
     def clear(self) -> None:
         self._cache.clear()
+        self._costs.clear()
+        self._blobs.clear()
+        self._sketch.clear()
         self._current_bytes = 0
-
-    def stats(self) -> dict[str, int]:
+        self._unique_bytes = 0
+        self._logical_bytes = 0
+        self.dedupe_hits = 0
+        self.dedupe_bytes_saved = 0
+        self.admission_rejections = 0
+
+    def stats(self) -> dict[str, Any]:
+        blob_refs = sum(blob["refs"] for blob in self._blobs.values())
         return {
             "entries": len(self._cache),
             "bytes": self._current_bytes,
             "max_entries": self.max_entries,
             "max_bytes": self.max_bytes,
+            "unique_bytes": self._unique_bytes,
+            "compact": self.compact,
+            "admission_min_bytes": self.admission_min_bytes,
+            "admission_rejections": self.admission_rejections,
+            "blobs": len(self._blobs),
+            "logical_bytes": self._logical_bytes,
+            "bytes_saved": max(0, self._logical_bytes - self._unique_bytes),
+            "dedupe_ratio": (blob_refs / len(self._blobs)) if self._blobs else 1.0,
+            "dedupe_hits": self.dedupe_hits,
+            "dedupe_bytes_saved_total": self.dedupe_bytes_saved,
         }
 
 
 FILE_CACHE = FileCache(
     max_entries=config.FILE_CACHE_MAX_ENTRIES,
     max_bytes=config.FILE_CACHE_MAX_BYTES,
+    admission_min_bytes=config.FILE_CACHE_ADMISSION_MIN_BYTES,
+    compact=config.FILE_CACHE_COMPACT_ENTRIES,
 )
 
 
@@ -83,17 +370,142 @@ def cache_key(full_name: str, ref: str, path: str) -> str:
     return "|".join([full_name, ref, path])
 
 
-def cache_payload(
-    *,
-    full_name: str,
-    ref: str,
-    path: str,
-    decoded: dict,
-) -> dict:
+# Contents API fields worth persisting alongside a blob. The raw response also
+# carries the base64 body, which the disk tier already stores as a blob file.
+_PERSISTED_JSON_FIELDS = (
+    "name",
+    "path",
+    "sha",
+    "size",
+    "type",
+    "url",
+    "html_url",
+    "git_url",
+    "download_url",
+)
+_PERSISTED_ENTRY_FIELDS = (
+    "full_name",
+    "ref",
+    "path",
+    "sha",
+    "size",
+    "requested_ref",
+    "resolved_ref",
+)
+
+
+def _persist_entry(key: str, entry: dict) -> None:
+    disk = get_disk_cache()
+    blob_sha = entry.get("blob_sha")
+    body = entry.get("decoded_bytes")
+    if disk is None or not blob_sha or body is None:
+        return
+    meta: dict[str, Any] = {
+        name: entry.get(name) for name in _PERSISTED_ENTRY_FIELDS if name in entry
+    }
+    json_blob = entry.get("json")
+    if isinstance(json_blob, Mapping):
+        meta["json"] = {
+            name: json_blob.get(name)
+            for name in _PERSISTED_JSON_FIELDS
+            if name in json_blob
+        }
+    try:
+        disk.put(key, blob_sha=blob_sha, data=body, meta=meta)
+    except (OSError, sqlite3.Error):
+        # The disk tier is an optimization; never fail a read because of it.
+        return
+
+
+def _promotable(size_bytes: int) -> bool:
+    """Whether a disk hit of ``size_bytes`` should be copied into memory.
+
+    Bodies over the memory tier's byte cap, or at its admission threshold,
+    stay on disk and are served from the map instead.
+    """
+
+    if FILE_CACHE.max_bytes > 0 and size_bytes > FILE_CACHE.max_bytes:
+        return False
+    floor = FILE_CACHE.admission_min_bytes
+    return floor <= 0 or size_bytes < floor
+
+
+def _utf8_text(data: bytes | memoryview) -> str | None:
+    try:
+        return str(data, "utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def _body_from_view(
+    view: memoryview, *, promote: bool
+) -> tuple[bytes | memoryview, str | None]:
+    """Return a mapped blob's body, and its text when it is promoted.
+
+    Bodies headed for the memory tier are copied out and decoded once and the
+    map is released. Otherwise the view itself is returned undecoded and keeps
+    the map open; ``serializable_entry`` decodes it when a response needs it.
+    """
+
+    if not promote:
+        return view, None
+    body = view.tobytes()
+    view.release()
+    return body, _utf8_text(body)
+
+
+def _read_disk_entry(key: str) -> tuple[dict, bool] | None:
+    """Read ``key`` from the disk tier (blocking): the entry and ``promote``."""
+
+    disk = get_disk_cache()
+    if disk is None:
+        return None
+    try:
+        found = disk.get(key)
+    except sqlite3.Error:
+        return None
+    if found is None:
+        return None
+    meta, view = found
+    promote = _promotable(view.nbytes)
+    decoded_bytes, text = _body_from_view(view, promote=promote)
+    entry = {
+        "content": None,
+        "encoding": None,
+        **meta,
+        "text": text,
+        "decoded_bytes": decoded_bytes,
+        "size_bytes": len(decoded_bytes),
+        "cache_tier": "disk",
+    }
+    entry.setdefault("json", {"sha": meta.get("sha"), "size": len(decoded_bytes)})
+    return entry, promote
+
+
+def _read_disk_entries(keys: list[str]) -> list[tuple[dict, bool] | None]:
+    return [_read_disk_entry(key) for key in keys]
+
+
+def _adopt_disk_entry(key: str, found: tuple[dict, bool] | None) -> dict | None:
+    if found is None:
+        return None
+    entry, promote = found
+    if promote:
+        FILE_CACHE.put(key, entry)
+    return entry
+
+
+def _load_from_disk(key: str) -> dict | None:
+    return _adopt_disk_entry(key, _read_disk_entry(key))
+
+
+def _store_payload(*, full_name: str, ref: str, path: str, decoded: dict) -> dict:
     size_bytes = 0
+    blob_sha = None
     decoded_bytes = decoded.get("decoded_bytes")
     if isinstance(decoded_bytes, (bytes, bytearray)):
         size_bytes = len(decoded_bytes)
+        blob_sha = git_blob_sha(decoded_bytes)
 
     json_blob = decoded.get("json")
     sha = decoded.get("sha")
@@ -108,24 +520,249 @@ def cache_payload(
         "path": path,
         "size_bytes": size_bytes,
         "sha": sha,
+        "blob_sha": blob_sha,
     }
     FILE_CACHE.put(cache_key(full_name, ref, path), entry)
     return entry
 
 
+def cache_payload(
+    *,
+    full_name: str,
+    ref: str,
+    path: str,
+    decoded: dict,
+) -> dict:
+    entry = _store_payload(full_name=full_name, ref=ref, path=path, decoded=decoded)
+    _persist_entry(cache_key(full_name, ref, path), entry)
+    return entry
+
+
+async def cache_payload_async(
+    *,
+    full_name: str,
+    ref: str,
+    path: str,
+    decoded: dict,
+) -> dict:
+    """``cache_payload`` with the disk write on the blocking executor."""
+
+    entry = _store_payload(full_name=full_name, ref=ref, path=path, decoded=decoded)
+    await _persist_entry_async(cache_key(full_name, ref, path), entry)
+    return entry
+
+
+async def _persist_entry_async(key: str, entry: dict) -> None:
+    if get_disk_cache() is not None:
+        await run_blocking(_persist_entry, key, entry)
+
+
+def _disk_blob_body(blob_sha: str) -> dict[str, Any] | None:
+    disk = get_disk_cache()
+    if disk is None:
+        return None
+    try:
+        view = disk.get_blob(blob_sha)
+    except sqlite3.Error:
+        return None
+    if view is None:
+        return None
+    decoded_bytes, text = _body_from_view(view, promote=_promotable(view.nbytes))
+    return {
+        "decoded_bytes": decoded_bytes,
+        "text": text,
+        "size_bytes": len(decoded_bytes),
+    }
+
+
+def _blob_body(blob_sha: str) -> dict[str, Any] | None:
+    blob = FILE_CACHE.get_blob(blob_sha)
+    if blob is not None:
+        return blob
+    return _disk_blob_body(blob_sha)
+
+
+def cache_blob_reference(
+    *,
+    full_name: str,
+    ref: str,
+    path: str,
+    blob_sha: str,
+    extra: Mapping[str, Any] | None = None,
+) -> dict | None:
+    """Cache ``path`` at ``ref`` from an already-stored blob, without a fetch.
+
+    Returns None when the blob is not cached. ``blob_sha`` typically comes from
+    a git tree listing, which reports the same SHA that the blob tier uses.
+    """
+
+    blob = _blob_body(blob_sha)
+    if blob is None:
+        return None
+    entry = _store_blob_reference(
+        full_name=full_name,
+        ref=ref,
+        path=path,
+        blob_sha=blob_sha,
+        blob=blob,
+        extra=extra,
+    )
+    _persist_entry(cache_key(full_name, ref, path), entry)
+    return entry
+
+
+async def cache_blob_reference_async(
+    *,
+    full_name: str,
+    ref: str,
+    path: str,
+    blob_sha: str,
+    extra: Mapping[str, Any] | None = None,
+) -> dict | None:
+    """``cache_blob_reference`` with disk-tier reads and writes off the loop."""
+
+    blob = FILE_CACHE.get_blob(blob_sha)
+    if blob is None and get_disk_cache() is not None:
+        blob = await run_blocking(_disk_blob_body, blob_sha)
+    if blob is None:
+        return None
+    entry = _store_blob_reference(
+        full_name=full_name,
+        ref=ref,
+        path=path,
+        blob_sha=blob_sha,
+        blob=blob,
+        extra=extra,
+    )
+    await _persist_entry_async(cache_key(full_name, ref, path), entry)
+    return entry
+
+
+def _store_blob_reference(
+    *,
+    full_name: str,
+    ref: str,
+    path: str,
+    blob_sha: str,
+    blob: Mapping[str, Any],
+    extra: Mapping[str, Any] | None,
+) -> dict:
+    size_bytes = blob["size_bytes"]
+    decoded = {
+        "json": {"type": "file", "path": path, "sha": blob_sha, "size": size_bytes},
+        "content": None,
+        "encoding": None,
+        "sha": blob_sha,
+        "text": blob.get("text"),
+        "decoded_bytes": blob["decoded_bytes"],
+        "size": size_bytes,
+        **(extra or {}),
+    }
+    entry = {
+        **decoded,
+        "cached_at": time.time(),
+        "full_name": full_name,
+        "ref": ref,
+        "path": path,
+        "size_bytes": size_bytes,
+        "blob_sha": blob_sha,
+    }
+    if not isinstance(entry["decoded_bytes"], memoryview):
+        FILE_CACHE.put(cache_key(full_name, ref, path), entry)
+    return entry
+
+
 def get_cached(full_name: str, ref: str, path: str) -> dict | None:
-    return FILE_CACHE.get(cache_key(full_name, ref, path))
+    key = cache_key(full_name, ref, path)
+    entry = FILE_CACHE.get(key)
+    if entry is None:
+        entry = _load_from_disk(key)
+    return entry
 
 
 def bulk_get_cached(full_name: str, ref: str, paths: Iterable[str]) -> dict[str, dict]:
     reverse_lookup = {cache_key(full_name, ref, path): path for path in paths}
     entries = FILE_CACHE.bulk_get(reverse_lookup.keys())
+    for key in reverse_lookup:
+        if key not in entries:
+            loaded = _load_from_disk(key)
+            if loaded is not None:
+                entries[key] = loaded
+    return {reverse_lookup[k]: v for k, v in entries.items()}
+
+
+async def bulk_get_cached_async(
+    full_name: str, ref: str, paths: Iterable[str]
+) -> dict[str, dict]:
+    """``bulk_get_cached`` with memory-tier misses read from disk off the loop."""
+
+    reverse_lookup = {cache_key(full_name, ref, path): path for path in paths}
+    entries = FILE_CACHE.bulk_get(reverse_lookup.keys())
+    missing = [key for key in reverse_lookup if key not in entries]
+    if missing and get_disk_cache() is not None:
+        loaded = await run_blocking(_read_disk_entries, missing)
+        for key, found in zip(missing, loaded, strict=True):
+            entry = _adopt_disk_entry(key, found)
+            if entry is not None:
+                entries[key] = entry
     return {reverse_lookup[k]: v for k, v in entries.items()}
 
 
+def serializable_entry(entry: dict) -> dict:
+    """Return ``entry`` without a map-backed body, for tool responses.
+
+    Entries served from the disk tier without promotion carry
+    ``decoded_bytes`` as a memoryview over the mapped blob and no ``text``.
+    Text bodies are decoded from the map and the view is dropped; binary ones
+    are copied.
+    """
+
+    body = entry.get("decoded_bytes")
+    if not isinstance(body, memoryview):
+        return entry
+    text = entry.get("text")
+    if text is None:
+        text = _utf8_text(body)
+    return {
+        **entry,
+        "text": text,
+        "decoded_bytes": None if text is not None else body.tobytes(),
+    }
+
+
+def has_cached_blobs() -> bool:
+    return FILE_CACHE.blob_count() > 0 or get_disk_cache() is not None
+
+
 def clear_cache() -> None:
     FILE_CACHE.clear()
+    disk = get_disk_cache()
+    if disk is not None:
+        disk.clear()
+
+
+def _disk_stats() -> dict[str, Any] | None:
+    disk = get_disk_cache()
+    if disk is None:
+        return None
+    try:
+        return disk.stats()
+    except sqlite3.Error as exc:
+        return {"error": str(exc)}
+
+
+def cache_stats() -> dict[str, Any]:
+    stats = FILE_CACHE.stats()
+    disk_stats = _disk_stats()
+    if disk_stats is not None:
+        stats["disk"] = disk_stats
+    return stats
+
 
+async def cache_stats_async() -> dict[str, Any]:
+    """``cache_stats`` with the disk tier's SQLite counts read off the loop."""
 
-def cache_stats() -> dict[str, int]:
-    return FILE_CACHE.stats()
+    stats = FILE_CACHE.stats()
+    if get_disk_cache() is not None:
+        stats["disk"] = await run_blocking(_disk_stats)
+    return stats
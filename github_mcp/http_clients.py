@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import copy
 import importlib.util
 import os
 import sys
@@ -118,6 +119,7 @@ from .config import (  # noqa: E402
     GITHUB_RATE_LIMIT_RETRY_BASE_DELAY_SECONDS,
     GITHUB_RATE_LIMIT_RETRY_MAX_ATTEMPTS,
     GITHUB_RATE_LIMIT_RETRY_MAX_WAIT_SECONDS,
+    GITHUB_REQUEST_COALESCING_ENABLED,
     GITHUB_REQUEST_TIMEOUT_SECONDS,
     GITHUB_SEARCH_MIN_INTERVAL_SECONDS,
     GITHUB_TOKEN_ENV_VARS,
@@ -126,17 +128,34 @@ from .config import (  # noqa: E402
     HTTPX_TIMEOUT,
     LOG_GITHUB_HTTP,
     LOG_GITHUB_HTTP_BODIES,
-    MAX_CONCURRENCY,
     summarize_request_context,
 )
 from .exceptions import GitHubAPIError, GitHubAuthError, GitHubRateLimitError  # noqa: E402
+from .outbound_limiter import (  # noqa: E402
+    REQUEST_CLASS_API,
+    FairLimiter,
+    get_limiter,
+    host_for_url,
+)
+from .rate_budget import record_rate_limit_headers, wait_for_budget  # noqa: E402
+from .ref_cache import invalidate_ref_cache, repo_from_api_path  # noqa: E402
+from .response_cache import (  # noqa: E402
+    RESPONSE_CACHE,
+    response_cache_enabled,
+    response_cache_key,
+)
 
-_loop_semaphores: weakref.WeakKeyDictionary[
-    asyncio.AbstractEventLoop, asyncio.Semaphore
-] = weakref.WeakKeyDictionary()
 _search_rate_limit_states: weakref.WeakKeyDictionary[
     asyncio.AbstractEventLoop, dict[str, Any]
 ] = weakref.WeakKeyDictionary()
+_inflight_requests: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, dict[str, Any]]
+] = weakref.WeakKeyDictionary()
+_COALESCING_STATS: dict[str, int] = {
+    "leaders": 0,
+    "followers": 0,
+    "abandoned": 0,
+}
 _http_client_github: httpx.AsyncClient | None = None
 _http_client_github_loop: asyncio.AbstractEventLoop | None = None
 _http_client_github_token: str | None = None
@@ -217,26 +236,24 @@ def _get_optional_github_token() -> str | None:
 # ---------------------------------------------------------------------------
 
 
-def _get_concurrency_semaphore() -> asyncio.Semaphore:
-    """Return a per-event-loop semaphore to cap concurrent outbound requests.
+def _get_outbound_limiter(
+    target: str | None = None, request_class: str = REQUEST_CLASS_API
+) -> FairLimiter:
+    """Return the outbound concurrency pool for ``target`` and ``request_class``.
 
-    Asyncio synchronization primitives are bound to the event loop that created
-    them. In connector environments the loop can be restarted or swapped after
-    an idle period, so we lazily create (and cache) a semaphore for whichever
-    loop is active when the helper is called instead of keeping a single global
-    instance. Weak references allow semaphores for old loops to be garbage
-    collected automatically.
+    ``target`` is a URL or host name and defaults to the GitHub API host. Pools
+    are created lazily per event loop (see ``outbound_limiter.get_limiter``),
+    so a restarted or swapped loop gets fresh primitives.
     """
 
-    loop = active_event_loop()
+    host = host_for_url(target) if target and "/" in target else target
+    return get_limiter(host or host_for_url(GITHUB_API_BASE), request_class)
 
-    semaphore = _loop_semaphores.get(loop)
-    loop_hint = getattr(semaphore, "_loop", None) if semaphore is not None else None
-    if semaphore is None or (loop_hint is not None and loop_hint is not loop):
-        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
-        _loop_semaphores[loop] = semaphore
 
-    return semaphore
+def _get_concurrency_semaphore() -> FairLimiter:
+    """Return the pool that caps concurrent GitHub API requests on this loop."""
+
+    return _get_outbound_limiter()
 
 
 def _parse_rate_limit_delay_seconds(resp: httpx.Response) -> float | None:
@@ -441,14 +458,55 @@ async def _send_request(
 ) -> httpx.Response:
     if path.lstrip("/").startswith("search/"):
         await _throttle_search_requests()
+    await wait_for_budget(path)
     async with _get_concurrency_semaphore():
-        return await client.request(
+        resp = await client.request(
             method,
             path,
             params=params,
             json=json_body,
             headers=headers,
         )
+    record_rate_limit_headers(path, getattr(resp, "headers", None))
+    return resp
+
+
+def _response_size_bytes(resp: httpx.Response) -> int:
+    content = getattr(resp, "content", None)
+    if isinstance(content, (bytes, bytearray)):
+        return len(content)
+    text = getattr(resp, "text", "")
+    return len(text.encode("utf-8", errors="replace")) if isinstance(text, str) else 0
+
+
+def _response_cache_key_for(
+    method: str,
+    path: str,
+    *,
+    params: dict[str, Any] | None,
+    headers: dict[str, str] | None,
+) -> str | None:
+    """Return the conditional-cache key for cacheable requests, else None.
+
+    Only GET requests are cached, and callers that manage their own
+    validators (If-None-Match / If-Modified-Since) bypass the cache.
+    """
+
+    if not response_cache_enabled():
+        return None
+    if (method or "").upper() != "GET":
+        return None
+    if headers and any(
+        k.lower() in ("if-none-match", "if-modified-since") for k in headers
+    ):
+        return None
+    return response_cache_key(
+        method,
+        path,
+        params=params,
+        headers=headers,
+        token=_get_optional_github_token(),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -487,6 +545,111 @@ def _allow_rate_limit_retries(
     return False
 
 
+# ---------------------------------------------------------------------------
+# Single-flight coalescing
+# ---------------------------------------------------------------------------
+
+_COALESCABLE_GITHUB_METHODS = {"GET", "HEAD"}
+
+
+def _coalescing_key_for(
+    method: str,
+    path: str,
+    *,
+    params: dict[str, Any] | None,
+    headers: dict[str, str] | None,
+    json_body: dict[str, Any] | None,
+    expect_json: bool,
+    client_factory: Callable[[], Any] | None,
+) -> str | None:
+    """Return the single-flight key for idempotent requests, else None."""
+
+    if not GITHUB_REQUEST_COALESCING_ENABLED:
+        return None
+    if (method or "").upper() not in _COALESCABLE_GITHUB_METHODS:
+        return None
+    if json_body is not None:
+        return None
+    key = response_cache_key(
+        method,
+        path,
+        params=params,
+        headers=headers,
+        token=_get_optional_github_token(),
+    )
+    # Requests routed through different client factories (tests, alternate
+    # credentials) must never share a result.
+    factory_id = id(client_factory) if client_factory is not None else 0
+    return f"{key}|json={int(bool(expect_json))}|factory={factory_id}"
+
+
+def _get_inflight_requests() -> dict[str, dict[str, Any]]:
+    loop = active_event_loop()
+    inflight = _inflight_requests.get(loop)
+    if inflight is None:
+        inflight = {}
+        _inflight_requests[loop] = inflight
+    return inflight
+
+
+async def _coalesced_request(key: str, start: Callable[[], Any]) -> dict[str, Any]:
+    """Share one upstream call between concurrent identical requests.
+
+    The upstream call runs in its own task so a waiter that is cancelled (for
+    example a disconnected client) never cancels the shared request for the
+    remaining waiters. The task is only cancelled once every waiter is gone.
+    When more than one waiter joined, each receives a private deep copy so
+    callers can mutate their payload freely.
+    """
+
+    inflight = _get_inflight_requests()
+    entry = inflight.get(key)
+    if entry is None:
+        task = asyncio.ensure_future(start())
+        entry = {"task": task, "waiters": 0, "joined": 0}
+        inflight[key] = entry
+
+        def _forget(_task: asyncio.Future, *, _entry: dict[str, Any] = entry) -> None:
+            if inflight.get(key) is _entry:
+                inflight.pop(key, None)
+
+        task.add_done_callback(_forget)
+        _COALESCING_STATS["leaders"] += 1
+    else:
+        _COALESCING_STATS["followers"] += 1
+
+    task = entry["task"]
+    entry["waiters"] += 1
+    entry["joined"] += 1
+    try:
+        result = await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if task.done() or entry["waiters"] > 1:
+            raise
+        # Last waiter left: stop the upstream call and make sure new callers
+        # start a fresh request instead of joining a cancelled one.
+        if inflight.get(key) is entry:
+            inflight.pop(key, None)
+        task.cancel()
+        _COALESCING_STATS["abandoned"] += 1
+        raise
+    finally:
+        entry["waiters"] -= 1
+
+    if entry["joined"] > 1:
+        return copy.deepcopy(result)
+    return result
+
+
+def coalescing_stats() -> dict[str, Any]:
+    inflight = _inflight_requests.get(active_event_loop()) or {}
+    return {
+        "enabled": bool(GITHUB_REQUEST_COALESCING_ENABLED),
+        "in_flight": len(inflight),
+        **_COALESCING_STATS,
+    }
+
+
 async def _github_request(
     method: str,
     path: str,
@@ -498,13 +661,68 @@ async def _github_request(
     client_factory: callable | None = None,
     allow_retries: bool | None = None,
 ) -> dict[str, Any]:
-    """Async GitHub request wrapper with structured errors."""
+    """Async GitHub request wrapper with structured errors.
+
+    Concurrent identical idempotent requests are coalesced into a single
+    upstream call (see ``_coalesced_request``).
+    """
+
+    def _start() -> Any:
+        return _perform_github_request(
+            method,
+            path,
+            params=params,
+            json_body=json_body,
+            headers=headers,
+            expect_json=expect_json,
+            client_factory=client_factory,
+            allow_retries=allow_retries,
+        )
+
+    key = _coalescing_key_for(
+        method,
+        path,
+        params=params,
+        headers=headers,
+        json_body=json_body,
+        expect_json=expect_json,
+        client_factory=client_factory,
+    )
+    if key is None:
+        return await _start()
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # Coalescing needs an asyncio loop to host the shared task.
+        return await _start()
+    return await _coalesced_request(key, _start)
+
+
+async def _perform_github_request(
+    method: str,
+    path: str,
+    *,
+    params: dict[str, Any] | None = None,
+    json_body: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+    expect_json: bool = True,
+    client_factory: callable | None = None,
+    allow_retries: bool | None = None,
+) -> dict[str, Any]:
+    """Issue one logical GitHub request (including retries)."""
     client_factory = client_factory or _github_client_instance
     retry_enabled = _allow_rate_limit_retries(method, path, allow_retries=allow_retries)
 
     attempt = 0
     max_attempts = max(0, GITHUB_RATE_LIMIT_RETRY_MAX_ATTEMPTS) if retry_enabled else 0
 
+    cache_key = _response_cache_key_for(method, path, params=params, headers=headers)
+    request_headers = headers
+    if cache_key is not None:
+        validators = RESPONSE_CACHE.conditional_headers(cache_key)
+        if validators:
+            request_headers = {**(headers or {}), **validators}
+
     while True:
         started = time.perf_counter()
         try:
@@ -519,7 +737,7 @@ async def _github_request(
                 path=path,
                 params=params,
                 json_body=json_body,
-                headers=headers,
+                headers=request_headers,
             )
         except asyncio.CancelledError:
             raise
@@ -592,6 +810,18 @@ async def _github_request(
                 extra=payload,
             )
 
+        if cache_key is not None and resp.status_code == 304:
+            cached_payload = RESPONSE_CACHE.replay(cache_key)
+            if cached_payload is not None:
+                if expect_json:
+                    cached_payload["json"] = cached_payload.get("json") or {}
+                return cached_payload
+            if request_headers is not headers:
+                # The entry was evicted after its validators were sent; a
+                # 304 has no body to return, so ask again unconditionally.
+                request_headers = headers
+                continue
+
         message = body.get("message", "") if isinstance(body, dict) else ""
         message_lower = message.lower() if isinstance(message, str) else ""
         if _is_rate_limit_response(
@@ -644,7 +874,21 @@ async def _github_request(
                 response_payload=payload,
             )
 
+        if str(method).upper() not in _COALESCABLE_GITHUB_METHODS:
+            # A successful write may have moved a branch; stop trusting cached
+            # ref -> SHA resolutions for this repository.
+            written_repo = repo_from_api_path(path)
+            if written_repo:
+                invalidate_ref_cache(written_repo)
+
         result = _build_response_payload(resp, body=body)
+        if cache_key is not None and 200 <= resp.status_code < 300:
+            RESPONSE_CACHE.store(
+                cache_key,
+                payload=result,
+                response_headers=getattr(resp, "headers", None),
+                size_bytes=_response_size_bytes(resp),
+            )
         if expect_json:
             result["json"] = body if body is not None else {}
         return result
@@ -652,6 +896,7 @@ async def _github_request(
 
 __all__ = [
     "_get_concurrency_semaphore",
+    "_get_outbound_limiter",
     "_external_client_instance",
     "_get_github_token",
     "_github_client_instance",
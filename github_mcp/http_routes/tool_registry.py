@@ -12,7 +12,7 @@ from dataclasses import dataclass
 from typing import Any
 
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 from github_mcp.path_utils import normalize_base_path as _normalize_base_path
 from github_mcp.path_utils import request_base_path as _request_base_path
@@ -23,6 +23,7 @@ from github_mcp.mcp_server.suggestions import (
     augment_structured_error_for_bad_args,
     build_unknown_tool_payload,
 )
+from github_mcp.output_stream import OutputStream, stream_output_to
 from github_mcp.server import _find_registered_tool
 
 try:
@@ -1014,6 +1015,71 @@ async def _invoke_tool(
     return _llm_safe_json_response(request, payload, status_code, headers=headers)
 
 
+def _wants_stream(request: Request) -> bool:
+    flag = _parse_bool(request.query_params.get("stream"))
+    if flag is not None:
+        return flag
+    accept = (request.headers.get("accept") or "").lower()
+    return "application/x-ndjson" in accept
+
+
+async def _stream_tool(
+    request: Request,
+    tool_name: str,
+    args: dict[str, Any],
+    *,
+    max_attempts: int | None = None,
+) -> Response:
+    """Invoke a tool and stream its command output as NDJSON.
+
+    Each line is an event: ``output`` (``stream``/``text``) and ``heartbeat``
+    while the tool runs, then a single ``result`` line carrying the payload and
+    the status code and headers the non-streaming endpoint would have returned
+    (including its hosted-client status shaping).
+    """
+
+    stream = OutputStream()
+
+    async def _run() -> tuple[Any, int, dict[str, str]]:
+        try:
+            async with stream_output_to(stream):
+                return await _execute_tool(tool_name, args, max_attempts=max_attempts)
+        finally:
+            stream.close()
+
+    task = asyncio.create_task(_run())
+
+    async def _body():
+        try:
+            async for event in stream.events():
+                yield json.dumps(event) + "\n"
+            payload, status_code, headers = await task
+            status_code, headers = _llm_safe_status(request, status_code, headers)
+            yield (
+                json.dumps(
+                    {
+                        "type": "result",
+                        "status_code": status_code,
+                        "headers": headers,
+                        "result": payload,
+                        "stream": stream.stats(),
+                    },
+                    default=str,
+                )
+                + "\n"
+            )
+        finally:
+            # Client disconnects cancel the tool like a non-streaming request.
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        _body(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 def _llm_safe_json_response(
     request: Request,
     payload: Any,
@@ -1028,12 +1094,20 @@ def _llm_safe_json_response(
     errors into 200s and preserve the original status code in a header.
     """
 
+    status_code, headers = _llm_safe_status(request, status_code, headers)
+    return JSONResponse(payload, status_code=status_code, headers=headers)
+
+
+def _llm_safe_status(
+    request: Request, status_code: int, headers: dict[str, str] | None
+) -> tuple[int, dict[str, str] | None]:
+    """Map a tool status to what hosted clients should see (see above)."""
+
     if int(status_code) >= 400 and _is_openai_client(request):
         safe_headers = dict(headers or {})
         safe_headers.setdefault("X-Tool-Original-Status", str(int(status_code)))
-        return JSONResponse(payload, status_code=200, headers=safe_headers)
-
-    return JSONResponse(payload, status_code=int(status_code), headers=headers)
+        return 200, safe_headers
+    return int(status_code), headers
 
 
 def build_tool_registry_endpoint() -> Callable[[Request], Response]:
@@ -1145,6 +1219,10 @@ def build_tool_invoke_endpoint() -> Callable[[Request], Response]:
             except Exception:
                 payload = {}
         args = _normalize_payload(payload)
+        if _wants_stream(request):
+            return await _stream_tool(
+                request, tool_name, args, max_attempts=max_attempts
+            )
         return await _invoke_tool(request, tool_name, args, max_attempts=max_attempts)
 
     return _endpoint
@@ -0,0 +1,162 @@
+"""Line-start offsets that let large workspace files be read from any line.
+
+``read_workspace_file_excerpt`` and ``read_workspace_file_sections`` used to
+iterate a file from line 1 to reach ``start_line``, so paging through a
+large log or generated file re-read the whole prefix on every page. A
+``LineIndex`` records the byte offset of every line start in an
+``array('Q')``. It is built once per file from an mmap and cached against
+``(size, mtime_ns)``. Readers then seek straight to the requested line.
+
+Line boundaries match Python's universal-newline text mode (``\\n``,
+``\\r\\n`` and a lone ``\\r``), so line numbers agree with the unindexed
+path. Only files of at least ``WORKSPACE_LINE_INDEX_MIN_BYTES`` are indexed,
+and the cache is bounded by ``WORKSPACE_LINE_INDEX_CACHE_BYTES`` of offsets.
+"""
+
+from __future__ import annotations
+
+import io
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, TextIO
+
+from . import config
+
+_NEWLINE = re.compile(rb"\n")
+_UNIVERSAL_NEWLINE = re.compile(rb"\r\n?|\n")
+
+
+class LineIndex:
+    """Byte offset of the start of each line of one file version."""
+
+    __slots__ = ("mtime_ns", "size", "starts")
+
+    def __init__(self, size: int, mtime_ns: int, starts: array):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.starts = starts
+
+    @classmethod
+    def build(cls, abs_path: str) -> LineIndex:
+        with open(abs_path, "rb") as fh:
+            st = os.fstat(fh.fileno())
+            starts = array("Q")
+            if st.st_size:
+                starts.append(0)
+                with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    pattern = _UNIVERSAL_NEWLINE if mm.find(b"\r") >= 0 else _NEWLINE
+                    starts.extend(m.end() for m in pattern.finditer(mm))
+                if starts[-1] >= st.st_size:
+                    starts.pop()
+        return cls(st.st_size, st.st_mtime_ns, starts)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.starts)
+
+    def offset_of(self, line: int) -> int:
+        """Byte offset where 1-based ``line`` starts (file size past EOF)."""
+
+        if line <= len(self.starts):
+            return self.starts[line - 1]
+        return self.size
+
+
+class LineIndexCache:
+    """LRU of line indexes, bounded by the total size of their offsets."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self._indexes: OrderedDict[str, LineIndex] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, abs_path: str, st: os.stat_result) -> LineIndex | None:
+        """Return a current index for ``abs_path``, building it if needed."""
+
+        if (
+            not config.WORKSPACE_LINE_INDEX
+            or st.st_size < config.WORKSPACE_LINE_INDEX_MIN_BYTES
+        ):
+            return None
+        key = os.path.realpath(abs_path)
+        with self._lock:
+            index = self._indexes.get(key)
+            if (
+                index is not None
+                and index.size == st.st_size
+                and index.mtime_ns == st.st_mtime_ns
+            ):
+                self._indexes.move_to_end(key)
+                self.hits += 1
+                return index
+
+        index = LineIndex.build(abs_path)
+        nbytes = index.starts.itemsize * len(index.starts)
+        with self._lock:
+            self.builds += 1
+            old = self._indexes.pop(key, None)
+            if old is not None:
+                self._bytes -= old.starts.itemsize * len(old.starts)
+            if nbytes <= self.max_bytes:
+                self._indexes[key] = index
+                self._bytes += nbytes
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._indexes.popitem(last=False)
+                    self._bytes -= evicted.starts.itemsize * len(evicted.starts)
+        return index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": bool(config.WORKSPACE_LINE_INDEX),
+                "files": len(self._indexes),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "builds": self.builds,
+            }
+
+
+LINE_INDEXES = LineIndexCache(config.WORKSPACE_LINE_INDEX_CACHE_BYTES)
+
+
+def open_text_at_line(abs_path: str, start_line: int) -> tuple[TextIO, int]:
+    """Open ``abs_path`` as UTF-8 text, positioned at ``start_line`` if indexed.
+
+    Returns ``(text_file, first_line)``, where ``first_line`` is the line
+    number of the first line the file yields: ``start_line`` when the file
+    is indexed, otherwise 1. Reads from line 1 never build an index.
+    """
+
+    index = None
+    if start_line > 1:
+        index = LINE_INDEXES.get(abs_path, os.stat(abs_path))
+    if index is None:
+        return open(abs_path, encoding="utf-8", errors="replace"), 1
+
+    fh = open(abs_path, "rb")  # noqa: SIM115 - closed by the returned wrapper
+    try:
+        fh.seek(index.offset_of(start_line))
+        return (
+            io.TextIOWrapper(fh, encoding="utf-8", errors="replace", newline=None),
+            start_line,
+        )
+    except BaseException:
+        fh.close()
+        raise
+
+
+def line_index_stats() -> dict[str, Any]:
+    return LINE_INDEXES.stats()
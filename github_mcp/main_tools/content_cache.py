@@ -4,11 +4,25 @@ import asyncio
 import sys
 from typing import Any
 
-from github_mcp.config import FETCH_FILES_CONCURRENCY
+from github_mcp.config import (
+    FETCH_FILES_BACKEND,
+    FETCH_FILES_CONCURRENCY,
+    FETCH_FILES_GRAPHQL_MIN_FILES,
+)
 from github_mcp.exceptions import GitHubAPIError
-from github_mcp.file_cache import bulk_get_cached, cache_payload, cache_stats
+from github_mcp.file_cache import (
+    bulk_get_cached_async,
+    cache_blob_reference_async,
+    cache_payload_async,
+    cache_stats_async,
+    has_cached_blobs,
+    serializable_entry,
+)
 from github_mcp.github_content import _decode_github_content as _decode_default
+from github_mcp.main_tools.graphql_files import fetch_blobs_graphql
+from github_mcp.ref_cache import REF_CACHE, is_commit_sha
 from github_mcp.server import _github_request, _structured_tool_error
+from github_mcp.tree_cache import TREE_CACHE, TreeIndex, tree_cache_key
 from github_mcp.utils import _effective_ref_for_repo, _normalize_repo_path_for_repo
 
 
@@ -20,44 +34,50 @@ async def _resolve_ref_snapshot(full_name: str, ref: str | None) -> dict[str, An
     after the branch advances. To avoid that, we resolve to the current commit
     SHA and cache against that immutable identifier.
 
+    Full commit SHAs are returned as-is without a request. Other refs are
+    resolved with the ``application/vnd.github.sha`` media type (a bare SHA
+    instead of the full commit payload with file diffs) and the result is
+    reused for ``GITHUB_REF_CACHE_TTL_SECONDS``. A commit SHA is a valid
+    tree-ish, so ``tree_sha`` is left unset and callers list trees by commit.
+
     This helper is best-effort: on failure it falls back to the requested ref.
     """
 
     requested_ref = _effective_ref_for_repo(full_name, ref)
+    snapshot = {
+        "requested_ref": requested_ref,
+        "resolved_ref": requested_ref,
+        "tree_sha": None,
+    }
+    if is_commit_sha(requested_ref):
+        return snapshot
+    cached = REF_CACHE.get(full_name, requested_ref)
+    if cached is not None:
+        return {**snapshot, "resolved_ref": cached}
+
     try:
-        commit_resp = await _github_request(
+        resp = await _github_request(
             "GET",
             f"/repos/{full_name}/commits/{requested_ref}",
+            headers={"Accept": "application/vnd.github.sha"},
+            expect_json=False,
         )
-        payload = commit_resp.get("json") or {}
-        resolved_ref = payload.get("sha")
-        if not isinstance(resolved_ref, str) or not resolved_ref:
-            resolved_ref = requested_ref
-        commit_obj = payload.get("commit") if isinstance(payload, dict) else None
-        tree_sha = None
-        if isinstance(commit_obj, dict):
-            tree = commit_obj.get("tree")
-            if isinstance(tree, dict) and isinstance(tree.get("sha"), str):
-                tree_sha = tree.get("sha")
-        return {
-            "requested_ref": requested_ref,
-            "resolved_ref": resolved_ref,
-            "tree_sha": tree_sha,
-        }
     except Exception:
-        return {
-            "requested_ref": requested_ref,
-            "resolved_ref": requested_ref,
-            "tree_sha": None,
-        }
+        return snapshot
+    resolved_ref = resp.get("text")
+    if not isinstance(resolved_ref, str) or not is_commit_sha(resolved_ref.strip()):
+        return snapshot
+    resolved_ref = resolved_ref.strip()
+    REF_CACHE.put(full_name, requested_ref, resolved_ref)
+    return {**snapshot, "resolved_ref": resolved_ref}
 
 
-def _cache_file_result(
+async def _cache_file_result(
     *, full_name: str, path: str, ref: str, decoded: dict[str, Any]
 ) -> dict[str, Any]:
     normalized_path = _normalize_repo_path_for_repo(full_name, path)
     effective_ref = _effective_ref_for_repo(full_name, ref)
-    return cache_payload(
+    return await cache_payload_async(
         full_name=full_name,
         ref=effective_ref,
         path=normalized_path,
@@ -77,45 +97,177 @@ async def _decode(full_name: str, path: str, ref: str | None) -> dict[str, Any]:
     return await fn(full_name, path, ref)
 
 
+async def _load_tree_index(
+    full_name: str, tree_ref: str, *, recursive: bool, cacheable: bool
+) -> TreeIndex:
+    """Return the indexed tree listing for ``tree_ref``.
+
+    Only listings addressed by a tree or commit SHA are cached: those are
+    immutable, while a branch name or unresolved ref can move between calls.
+    """
+
+    key = tree_cache_key(full_name, tree_ref, recursive=recursive)
+    if cacheable:
+        cached = TREE_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    data = await _github_request(
+        "GET",
+        f"/repos/{full_name}/git/trees/{tree_ref}",
+        params={"recursive": 1 if recursive else 0},
+    )
+    payload = data.get("json") or {}
+    tree = payload.get("tree") if isinstance(payload, dict) else None
+    if not isinstance(tree, list):
+        raise GitHubAPIError("Unexpected tree response from GitHub")
+
+    index = TreeIndex(
+        tree,
+        sha=payload.get("sha") if isinstance(payload.get("sha"), str) else None,
+        truncated=bool(payload.get("truncated")),
+        normalize_path=lambda p: _normalize_repo_path_for_repo(full_name, p),
+    )
+    if cacheable:
+        TREE_CACHE.put(key, index)
+    return index
+
+
+async def _tree_index_for(full_name: str, tree_sha: str) -> TreeIndex | None:
+    """Return the recursive tree index for ``tree_sha`` (None on failure)."""
+
+    try:
+        return await _load_tree_index(
+            full_name, tree_sha, recursive=True, cacheable=True
+        )
+    except Exception:
+        return None
+
+
 async def fetch_files(
-    full_name: str, paths: list[str], ref: str = "main"
+    full_name: str,
+    paths: list[str],
+    ref: str = "main",
+    backend: str | None = None,
 ) -> dict[str, Any]:
-    """Fetch multiple files concurrently with per-file error isolation."""
+    """Fetch multiple files concurrently with per-file error isolation.
+
+    When blobs are already cached, the tree listing for the resolved commit is
+    used to map paths to blob SHAs so unchanged files (e.g. after a branch
+    advance) are served from the blob tier instead of being fetched again.
+
+    Remaining files are read in batched GraphQL queries when ``backend`` is
+    "graphql" (or "auto" with enough files), sized from the same tree listing;
+    anything GraphQL cannot return verbatim is read with one REST Contents
+    call per file.
+    """
 
     snapshot = await _resolve_ref_snapshot(full_name, ref)
     requested_ref = snapshot["requested_ref"]
     resolved_ref = snapshot["resolved_ref"]
+    backend = (backend or FETCH_FILES_BACKEND).strip().lower()
+    if backend not in {"auto", "graphql", "rest"}:
+        raise ValueError("backend must be 'auto', 'graphql', or 'rest'")
+
+    # A tree listing costs one request (and is cached per commit), so only
+    # load it when it can replace several per-file content reads or when
+    # GraphQL batches need blob sizes to stay under their byte budget.
+    use_graphql = backend == "graphql" or (
+        backend == "auto" and len(set(paths)) >= FETCH_FILES_GRAPHQL_MIN_FILES
+    )
+    tree_index: TreeIndex | None = None
+    tree_sha = snapshot.get("tree_sha")
+    if not tree_sha and is_commit_sha(resolved_ref):
+        tree_sha = resolved_ref
+    if tree_sha and len(paths) > 1 and (use_graphql or has_cached_blobs()):
+        tree_index = await _tree_index_for(full_name, tree_sha)
+    blob_shas = tree_index.blob_shas() if tree_index is not None else {}
 
     results: dict[str, Any] = {}
-    sem = asyncio.Semaphore(FETCH_FILES_CONCURRENCY)
+    dedupe = {"files": len(paths), "served_from_blob_cache": 0, "bytes_saved": 0}
+    refs_extra = {"requested_ref": requested_ref, "resolved_ref": resolved_ref}
 
-    async def _fetch_single(p: str) -> None:
+    # Normalized path -> the caller's spellings of it.
+    pending: dict[str, list[str]] = {}
+    for p in paths:
         normalized_path = _normalize_repo_path_for_repo(full_name, p)
+        blob_sha = blob_shas.get(normalized_path)
+        if blob_sha:
+            reused = await cache_blob_reference_async(
+                full_name=full_name,
+                ref=_effective_ref_for_repo(full_name, resolved_ref),
+                path=normalized_path,
+                blob_sha=blob_sha,
+                extra=refs_extra,
+            )
+            if reused is not None:
+                results[p] = serializable_entry(reused)
+                dedupe["served_from_blob_cache"] += 1
+                dedupe["bytes_saved"] += reused.get("size_bytes", 0)
+                continue
+        pending.setdefault(normalized_path, []).append(p)
+
+    transport = {"backend": "rest", "graphql_requests": 0, "graphql_files": 0}
+    rest_paths = list(pending)
+    if backend == "graphql" or (
+        backend == "auto" and len(pending) >= FETCH_FILES_GRAPHQL_MIN_FILES
+    ):
+        decoded_by_path, rest_paths, gql_stats = await fetch_blobs_graphql(
+            full_name,
+            resolved_ref,
+            list(pending),
+            request=_github_request,
+            sizes=tree_index.blob_sizes() if tree_index is not None else None,
+        )
+        transport.update(
+            backend="graphql",
+            graphql_requests=gql_stats["requests"],
+            graphql_files=gql_stats["files"],
+        )
+        for normalized_path, decoded in decoded_by_path.items():
+            cached = await _cache_file_result(
+                full_name=full_name,
+                path=normalized_path,
+                ref=resolved_ref,
+                decoded={**decoded, **refs_extra},
+            )
+            for p in pending[normalized_path]:
+                results[p] = cached
+    transport["rest_files"] = len(rest_paths)
+
+    sem = asyncio.Semaphore(FETCH_FILES_CONCURRENCY)
+
+    async def _fetch_single(normalized_path: str) -> None:
         async with sem:
             try:
                 decoded = await _decode(full_name, normalized_path, resolved_ref)
                 if isinstance(decoded, dict):
-                    decoded = {
-                        **decoded,
-                        "requested_ref": requested_ref,
-                        "resolved_ref": resolved_ref,
-                    }
-                cached = _cache_file_result(
+                    decoded = {**decoded, **refs_extra}
+                cached = await _cache_file_result(
                     full_name=full_name,
                     path=normalized_path,
                     ref=resolved_ref,
                     decoded=decoded,
                 )
-                results[p] = cached
+                for p in pending[normalized_path]:
+                    results[p] = cached
             except Exception as e:
-                results[p] = _structured_tool_error(
-                    e,
-                    context="fetch_files",
-                    path=p,
-                )
-
-    await asyncio.gather(*[_fetch_single(p) for p in paths])
-    return {"ref": requested_ref, "resolved_ref": resolved_ref, "files": results}
+                for p in pending[normalized_path]:
+                    results[p] = _structured_tool_error(
+                        e,
+                        context="fetch_files",
+                        path=p,
+                    )
+
+    await asyncio.gather(*[_fetch_single(p) for p in rest_paths])
+    return {
+        "ref": requested_ref,
+        "resolved_ref": resolved_ref,
+        "files": results,
+        "dedupe": dedupe,
+        "transport": transport,
+        "cache": await cache_stats_async(),
+    }
 
 
 async def get_cached_files(
@@ -127,7 +279,12 @@ async def get_cached_files(
     effective_ref = snapshot["requested_ref"]
     resolved_ref = snapshot["resolved_ref"]
     normalized_paths = [_normalize_repo_path_for_repo(full_name, p) for p in paths]
-    cached = bulk_get_cached(full_name, resolved_ref, normalized_paths)
+    cached = {
+        path: serializable_entry(entry)
+        for path, entry in (
+            await bulk_get_cached_async(full_name, resolved_ref, normalized_paths)
+        ).items()
+    }
     missing = [p for p in normalized_paths if p not in cached]
 
     return {
@@ -136,7 +293,7 @@ async def get_cached_files(
         "resolved_ref": resolved_ref,
         "files": cached,
         "missing": missing,
-        "cache": cache_stats(),
+        "cache": await cache_stats_async(),
     }
 
 
@@ -156,14 +313,16 @@ async def cache_files(
 
     cached_existing: dict[str, Any] = {}
     if not refresh:
-        cached_existing = bulk_get_cached(full_name, resolved_ref, normalized_paths)
+        cached_existing = await bulk_get_cached_async(
+            full_name, resolved_ref, normalized_paths
+        )
 
     sem = asyncio.Semaphore(FETCH_FILES_CONCURRENCY)
 
     async def _cache_single(p: str) -> None:
         async with sem:
             if not refresh and p in cached_existing:
-                results[p] = {**cached_existing[p], "cached": True}
+                results[p] = {**serializable_entry(cached_existing[p]), "cached": True}
                 return
 
             decoded = await _decode(full_name, p, resolved_ref)
@@ -173,7 +332,7 @@ async def cache_files(
                     "requested_ref": effective_ref,
                     "resolved_ref": resolved_ref,
                 }
-            cached = cache_payload(
+            cached = await cache_payload_async(
                 full_name=full_name,
                 ref=resolved_ref,
                 path=p,
@@ -188,7 +347,7 @@ async def cache_files(
         "ref": effective_ref,
         "resolved_ref": resolved_ref,
         "files": results,
-        "cache": cache_stats(),
+        "cache": await cache_stats_async(),
     }
 
 
@@ -200,25 +359,13 @@ async def list_repository_tree(
     max_entries: int | None = None,
     include_blobs: bool = True,
     include_trees: bool = True,
+    cursor: str | None = None,
 ) -> dict[str, Any]:
-    """List files and folders in a repository tree with optional filtering."""
-
-    snapshot = await _resolve_ref_snapshot(full_name, ref)
-    requested_ref = snapshot["requested_ref"]
-    resolved_ref = snapshot["resolved_ref"]
-
-    params = {"recursive": 1 if recursive else 0}
-    tree_ref = snapshot.get("tree_sha") or resolved_ref
-    data = await _github_request(
-        "GET",
-        f"/repos/{full_name}/git/trees/{tree_ref}",
-        params=params,
-    )
+    """List files and folders in a repository tree with optional filtering.
 
-    payload = data.get("json") or {}
-    tree = payload.get("tree")
-    if not isinstance(tree, list):
-        raise GitHubAPIError("Unexpected tree response from GitHub")
+    Entries are returned in path order. When more than ``max_entries`` match,
+    ``next_cursor`` is set; pass it back as ``cursor`` to continue.
+    """
 
     allowed_types = set()
     if include_blobs:
@@ -233,6 +380,19 @@ async def list_repository_tree(
             "message": "Both blobs and trees were excluded; nothing to return.",
         }
 
+    snapshot = await _resolve_ref_snapshot(full_name, ref)
+    requested_ref = snapshot["requested_ref"]
+    resolved_ref = snapshot["resolved_ref"]
+
+    tree_sha = snapshot.get("tree_sha")
+    tree_ref = tree_sha or resolved_ref
+    index = await _load_tree_index(
+        full_name,
+        tree_ref,
+        recursive=recursive,
+        cacheable=bool(tree_sha) or is_commit_sha(tree_ref),
+    )
+
     normalized_prefix = None
     if isinstance(path_prefix, str):
         candidate = path_prefix.strip().replace("\\", "/")
@@ -242,37 +402,27 @@ async def list_repository_tree(
         else:
             normalized_prefix = candidate.lstrip("/")
 
-    filtered_entries: list[dict[str, Any]] = []
-    for entry in tree:
-        if not isinstance(entry, dict):
-            continue
-        entry_type = entry.get("type")
-        if entry_type not in allowed_types:
-            continue
-        path = entry.get("path")
-        if not isinstance(path, str):
-            continue
-        if normalized_prefix and not path.startswith(normalized_prefix):
-            continue
-
-        normalized_path = _normalize_repo_path_for_repo(full_name, path)
-
-        filtered_entries.append(
-            {
-                "path": normalized_path,
-                "type": entry_type,
-                "mode": entry.get("mode"),
-                "size": entry.get("size"),
-                "sha": entry.get("sha"),
-            }
-        )
+    entries, next_cursor = index.select(
+        prefix=normalized_prefix,
+        types=allowed_types,
+        start_after=cursor,
+        limit=max_entries,
+    )
 
-    return {
+    result: dict[str, Any] = {
         "ref": requested_ref,
         "resolved_ref": resolved_ref,
-        "tree_sha": payload.get("sha") or snapshot.get("tree_sha") or tree_ref,
-        "entry_count": len(filtered_entries),
-        "truncated": False,
+        "tree_sha": index.sha or tree_sha or tree_ref,
+        "entry_count": len(entries),
+        "total_entries": index.count(prefix=normalized_prefix, types=allowed_types),
+        "truncated": index.truncated,
         "max_entries": max_entries,
-        "entries": filtered_entries,
+        "next_cursor": next_cursor,
+        "entries": entries,
     }
+    if index.truncated:
+        result["message"] = (
+            "GitHub truncated this tree listing because it is too large; "
+            "list subdirectories with recursive=False to see every entry."
+        )
+    return result
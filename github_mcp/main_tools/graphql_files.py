@@ -0,0 +1,201 @@
+"""Batch file reads through a single GitHub GraphQL query.
+
+The REST Contents API costs one request per file. GraphQL can read many blobs
+at once with aliased ``object(expression: "<rev>:<path>")`` fields, so a batch
+of files becomes a handful of requests. Blobs GraphQL cannot return verbatim
+(binary, truncated, or not valid UTF-8) are reported back to the caller so
+they can be read over REST instead.
+
+Decoded blobs carry the same Contents API payload a REST read returns, so the
+response shape does not depend on which backend served a file.
+"""
+
+from __future__ import annotations
+
+import base64
+import posixpath
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from typing import Any
+from urllib.parse import quote, urlsplit
+
+from github_mcp.config import (
+    ADAPTIV_MCP_INCLUDE_BASE64_CONTENT,
+    FETCH_FILES_GRAPHQL_BATCH_SIZE,
+    FETCH_FILES_GRAPHQL_MAX_BYTES,
+    GITHUB_API_BASE,
+)
+from github_mcp.file_cache import git_blob_sha
+
+GitHubRequest = Callable[..., Awaitable[dict[str, Any]]]
+
+_BLOB_FIELDS = "... on Blob { oid byteSize isBinary isTruncated text }"
+
+
+def _build_query(count: int) -> str:
+    variables = "".join(f", $e{i}: String!" for i in range(count))
+    fields = " ".join(
+        f"f{i}: object(expression: $e{i}) {{ {_BLOB_FIELDS} }}" for i in range(count)
+    )
+    return (
+        f"query($owner: String!, $name: String!{variables}) "
+        f"{{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+    )
+
+
+def chunk_paths(
+    paths: Sequence[str],
+    sizes: Mapping[str, int] | None = None,
+    *,
+    max_files: int = FETCH_FILES_GRAPHQL_BATCH_SIZE,
+    max_bytes: int = FETCH_FILES_GRAPHQL_MAX_BYTES,
+) -> tuple[list[list[str]], list[str]]:
+    """Split ``paths`` into query-sized chunks.
+
+    Chunks hold at most ``max_files`` aliases and, where sizes are known, at
+    most ``max_bytes`` of blob content. Paths known to exceed ``max_bytes``
+    on their own are returned separately for REST.
+    """
+
+    sizes = sizes or {}
+    chunks: list[list[str]] = []
+    oversized: list[str] = []
+    current: list[str] = []
+    current_bytes = 0
+    for path in paths:
+        size = sizes.get(path) or 0
+        if max_bytes > 0 and size > max_bytes:
+            oversized.append(path)
+            continue
+        if current and (
+            len(current) >= max(1, max_files)
+            or (max_bytes > 0 and current_bytes + size > max_bytes)
+        ):
+            chunks.append(current)
+            current, current_bytes = [], 0
+        current.append(path)
+        current_bytes += size
+    if current:
+        chunks.append(current)
+    return chunks, oversized
+
+
+def _web_bases() -> tuple[str, str]:
+    """``(html_base, raw_base)`` for the configured API host."""
+
+    api = urlsplit(GITHUB_API_BASE)
+    if api.hostname == "api.github.com":
+        return "https://github.com", "https://raw.githubusercontent.com"
+    # GitHub Enterprise Server serves the API under <host>/api/v3.
+    html_base = f"{api.scheme}://{api.netloc}"
+    return html_base, html_base
+
+
+def _contents_json(
+    full_name: str, rev: str, path: str, oid: str, body: bytes
+) -> dict[str, Any]:
+    """Rebuild the REST Contents API payload for a file read over GraphQL."""
+
+    api_base = GITHUB_API_BASE.rstrip("/")
+    html_base, raw_base = _web_bases()
+    quoted_path = quote(path)
+    url = f"{api_base}/repos/{full_name}/contents/{quoted_path}?ref={quote(rev)}"
+    git_url = f"{api_base}/repos/{full_name}/git/blobs/{oid}"
+    html_url = f"{html_base}/{full_name}/blob/{rev}/{quoted_path}"
+    if raw_base == html_base:
+        download_url = f"{raw_base}/{full_name}/raw/{rev}/{quoted_path}"
+    else:
+        download_url = f"{raw_base}/{full_name}/{rev}/{quoted_path}"
+    # GitHub wraps the base64 body at 60 characters per line.
+    encoded = base64.b64encode(body).decode("ascii")
+    content = "".join(f"{encoded[i : i + 60]}\n" for i in range(0, len(encoded), 60))
+    return {
+        "name": posixpath.basename(path),
+        "path": path,
+        "sha": oid,
+        "size": len(body),
+        "url": url,
+        "html_url": html_url,
+        "git_url": git_url,
+        "download_url": download_url,
+        "type": "file",
+        "content": content,
+        "encoding": "base64",
+        "_links": {"self": url, "git": git_url, "html": html_url},
+    }
+
+
+def _decoded_from_blob(
+    path: str, blob: Mapping[str, Any], *, full_name: str, rev: str
+) -> dict[str, Any] | None:
+    """Shape a GraphQL blob like ``_decode_github_content`` output, if exact."""
+
+    text = blob.get("text")
+    if blob.get("isBinary") or blob.get("isTruncated") or not isinstance(text, str):
+        return None
+    decoded_bytes = text.encode("utf-8")
+    oid = blob.get("oid")
+    # GraphQL replaces undecodable bytes; only trust content that hashes back
+    # to the blob id.
+    if not isinstance(oid, str) or git_blob_sha(decoded_bytes) != oid:
+        return None
+    json_blob = _contents_json(full_name, rev, path, oid, decoded_bytes)
+    return {
+        "json": json_blob,
+        "content": json_blob["content"] if ADAPTIV_MCP_INCLUDE_BASE64_CONTENT else None,
+        "encoding": "base64" if ADAPTIV_MCP_INCLUDE_BASE64_CONTENT else None,
+        "sha": oid,
+        "text": text,
+        "decoded_bytes": decoded_bytes,
+        "size": len(decoded_bytes),
+    }
+
+
+async def fetch_blobs_graphql(
+    full_name: str,
+    rev: str,
+    paths: Sequence[str],
+    *,
+    request: GitHubRequest,
+    sizes: Mapping[str, int] | None = None,
+) -> tuple[dict[str, dict[str, Any]], list[str], dict[str, int]]:
+    """Read ``paths`` at ``rev`` with batched GraphQL queries.
+
+    Returns ``(decoded, rest_paths, stats)``: decoded payloads by path, the
+    paths that still need a REST read, and request counters.
+    """
+
+    owner, _, name = full_name.partition("/")
+    chunks, rest_paths = chunk_paths(paths, sizes)
+    decoded: dict[str, dict[str, Any]] = {}
+    stats = {"requests": 0, "files": 0, "fallback": 0}
+    for chunk in chunks:
+        variables: dict[str, Any] = {"owner": owner, "name": name}
+        for i, path in enumerate(chunk):
+            variables[f"e{i}"] = f"{rev}:{path}"
+        stats["requests"] += 1
+        try:
+            resp = await request(
+                "POST",
+                "/graphql",
+                json_body={"query": _build_query(len(chunk)), "variables": variables},
+            )
+        except Exception:
+            rest_paths.extend(chunk)
+            continue
+        payload = resp.get("json") if isinstance(resp, Mapping) else None
+        data = payload.get("data") if isinstance(payload, Mapping) else None
+        repo = data.get("repository") if isinstance(data, Mapping) else None
+        for i, path in enumerate(chunk):
+            blob = repo.get(f"f{i}") if isinstance(repo, Mapping) else None
+            item = (
+                _decoded_from_blob(path, blob, full_name=full_name, rev=rev)
+                if isinstance(blob, Mapping)
+                else None
+            )
+            if item is None:
+                rest_paths.append(path)
+            else:
+                decoded[path] = item
+    stats["files"] = len(decoded)
+    stats["fallback"] = len(rest_paths)
+    return decoded, rest_paths, stats
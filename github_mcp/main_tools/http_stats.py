@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Any
+
+from github_mcp.http_clients import coalescing_stats
+from github_mcp.outbound_limiter import outbound_limiter_stats
+from github_mcp.rate_budget import rate_budget_stats
+from github_mcp.ref_cache import ref_cache_stats
+from github_mcp.response_cache import clear_response_cache, response_cache_stats
+
+
+async def get_outbound_http_stats(clear_cache: bool = False) -> dict[str, Any]:
+    """Return counters for the outbound GitHub HTTP layer.
+
+    ``clear_cache`` drops the conditional-request cache and resets its
+    counters after the snapshot is taken.
+    """
+
+    payload: dict[str, Any] = {
+        "response_cache": response_cache_stats(),
+        "coalescing": coalescing_stats(),
+        "ref_cache": ref_cache_stats(),
+        "rate_budget": rate_budget_stats(),
+        "limiter": outbound_limiter_stats(),
+    }
+    if clear_cache:
+        clear_response_cache()
+        payload["cleared"] = True
+    return payload
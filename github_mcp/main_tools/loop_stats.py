@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from typing import Any
+
+from github_mcp.blocking import event_loop_stats
+
+
+async def get_event_loop_stats() -> dict[str, Any]:
+    """Return blocking-executor usage and event-loop lag counters.
+
+    ``loop_lag.blocked_seconds_total`` is the time the loop overslept its
+    probe by at least ``stall_seconds``; a rising value means something is
+    still running synchronously on the loop.
+    """
+
+    return event_loop_stats()
@@ -7,8 +7,9 @@ from github_mcp.http_clients import (
     _external_client_instance as _default_external_client_instance,
 )
 from github_mcp.http_clients import (
-    _get_concurrency_semaphore as _default_get_concurrency_semaphore,
+    _get_outbound_limiter as _default_get_outbound_limiter,
 )
+from github_mcp.outbound_limiter import REQUEST_CLASS_EXTERNAL
 
 from github_mcp.server import (
     _github_request as _default_github_request,
@@ -73,8 +74,8 @@ async def fetch_url(url: str) -> dict[str, Any]:
     external_client_instance = _resolve_main_helper(
         "_external_client_instance", _default_external_client_instance
     )
-    get_concurrency_semaphore = _resolve_main_helper(
-        "_get_concurrency_semaphore", _default_get_concurrency_semaphore
+    get_outbound_limiter = _resolve_main_helper(
+        "_get_outbound_limiter", _default_get_outbound_limiter
     )
     structured_tool_error = _resolve_main_helper(
         "_structured_tool_error", _default_structured_tool_error
@@ -86,7 +87,9 @@ async def fetch_url(url: str) -> dict[str, Any]:
     status_code: int | None = None
     response_headers: dict[str, Any] = {}
 
-    async with get_concurrency_semaphore():
+    # External hosts get their own pools so slow third-party servers do not
+    # hold GitHub API slots.
+    async with get_outbound_limiter(url, REQUEST_CLASS_EXTERNAL):
         try:
             async with client.stream("GET", url) as resp:
                 status_code = resp.status_code
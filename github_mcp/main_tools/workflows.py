@@ -11,6 +11,13 @@ except ImportError:  # pragma: no cover - Python < 3.11 fallback
     UTC = timezone.utc
 
 from github_mcp.exceptions import GitHubAPIError
+from github_mcp.outbound_limiter import REQUEST_CLASS_DOWNLOAD
+from github_mcp.rate_budget import (
+    PRIORITY_BACKGROUND,
+    record_rate_limit_headers,
+    request_priority,
+    wait_for_budget,
+)
 
 from ._main import _main
 
@@ -357,7 +364,14 @@ async def get_job_logs(full_name: str, job_id: int) -> dict[str, Any]:
         f"/repos/{full_name}/actions/jobs/{job_id}/logs",
         headers={"Accept": "application/vnd.github+json"},
     )
-    async with m._get_concurrency_semaphore():
+    get_outbound_limiter = getattr(m, "_get_outbound_limiter", None)
+    if get_outbound_limiter is None:
+        from github_mcp.http_clients import (
+            _get_outbound_limiter as get_outbound_limiter,
+        )
+
+    # Log archives can be large; keep them out of the pool used for API reads.
+    async with get_outbound_limiter(None, REQUEST_CLASS_DOWNLOAD):
         resp = await client.send(request, follow_redirects=True)
     if resp.status_code >= 400:
         raise GitHubAPIError(f"GitHub job logs error {resp.status_code}: {resp.text}")
@@ -404,11 +418,14 @@ async def wait_for_workflow_run(
 
     end_time = loop.time() + timeout_seconds
 
+    run_path = f"/repos/{full_name}/actions/runs/{run_id}"
     while True:
+        # Polling is background work: it yields budget to interactive calls.
+        with request_priority(PRIORITY_BACKGROUND):
+            await wait_for_budget(run_path)
         async with m._get_concurrency_semaphore():
-            resp = await client.get(
-                f"/repos/{full_name}/actions/runs/{run_id}",
-            )
+            resp = await client.get(run_path)
+        record_rate_limit_headers(run_path, getattr(resp, "headers", None))
         if resp.status_code >= 400:
             raise GitHubAPIError(
                 f"GitHub workflow run error {resp.status_code}: {resp.text}"
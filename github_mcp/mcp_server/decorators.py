@@ -48,6 +48,7 @@ from github_mcp.mcp_server.schemas import (
     _normalize_tool_description,
     _schema_from_signature,
 )
+from github_mcp.workspace_locks import tool_lock_scope
 
 try:
     from github_mcp.redaction import redact_any
@@ -1759,6 +1760,35 @@ def _bind_call_args(
         return dict(kwargs)
 
 
+def _resolve_lock_write(
+    resolver: Callable[[Mapping[str, Any]], bool] | None,
+    default: bool,
+    signature: inspect.Signature | None,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> bool:
+    """Whether a call needs exclusive workspace locks (see ``workspace_locks``)."""
+
+    if resolver is None:
+        return default
+    try:
+        return bool(resolver(_bind_call_args(signature, args, kwargs)))
+    except Exception:
+        return default
+
+
+async def _call_in_lock_scope(
+    func: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    *,
+    write: bool,
+) -> Any:
+    # Inside the (possibly deduplicated) task so locks follow the work.
+    async with tool_lock_scope(write=write):
+        return await func(*args, **kwargs)
+
+
 def _strip_tool_meta(kwargs: Mapping[str, Any]) -> dict[str, Any]:
     if not kwargs:
         return {}
@@ -3378,6 +3408,13 @@ def mcp_tool(
                 start = time.perf_counter()
 
                 write_action_value = bool(write_action)
+                lock_write = _resolve_lock_write(
+                    write_action_resolver,
+                    write_action_value,
+                    signature,
+                    args,
+                    clean_kwargs,
+                )
 
                 schema = getattr(wrapper, "__mcp_input_schema__", None)
                 schema_hash = getattr(wrapper, "__mcp_input_schema_hash__", None)
@@ -3500,13 +3537,19 @@ def mcp_tool(
                             )
                             result = await _maybe_dedupe_call(
                                 dedupe_key,
-                                lambda: func(*args, **clean_kwargs),
+                                lambda: _call_in_lock_scope(
+                                    func, args, clean_kwargs, write=lock_write
+                                ),
                                 ttl_s=ttl_s,
                             )
                         else:
-                            result = await func(*args, **clean_kwargs)
+                            result = await _call_in_lock_scope(
+                                func, args, clean_kwargs, write=lock_write
+                            )
                     else:
-                        result = await func(*args, **clean_kwargs)
+                        result = await _call_in_lock_scope(
+                            func, args, clean_kwargs, write=lock_write
+                        )
                 except asyncio.CancelledError as exc:
                     duration_ms = (time.perf_counter() - start) * 1000
                     _log_tool_cancelled(
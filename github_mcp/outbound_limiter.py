@@ -0,0 +1,191 @@
+"""Per-host, per-class concurrency limits for outbound HTTP with fair queuing.
+
+Every outbound call takes a slot from the pool for its upstream host and
+request class (``api`` metadata reads, ``download`` for logs and other large
+bodies, ``external`` for arbitrary URLs), so a slow download cannot starve
+quick GitHub API reads.
+
+When a pool is saturated, waiters are queued per MCP session and served
+round-robin. Each session is granted up to its weight per turn (interactive
+work weighs more than background polling), so one noisy session cannot
+monopolize a pool. Pools record queue depth and wait-time metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from collections import OrderedDict, deque
+from typing import Any
+from urllib.parse import urlparse
+
+from . import config
+from .async_utils import active_event_loop
+from .mcp_server.context import REQUEST_SESSION_ID
+from .rate_budget import PRIORITY_BACKGROUND, current_priority
+
+REQUEST_CLASS_API = "api"
+REQUEST_CLASS_DOWNLOAD = "download"
+REQUEST_CLASS_EXTERNAL = "external"
+
+_PRIORITY_WEIGHTS = {PRIORITY_BACKGROUND: 1}
+_DEFAULT_WEIGHT = 4
+
+
+def _class_limit(request_class: str) -> int:
+    limits = {
+        REQUEST_CLASS_API: config.MAX_CONCURRENCY,
+        REQUEST_CLASS_DOWNLOAD: config.OUTBOUND_DOWNLOAD_CONCURRENCY,
+        REQUEST_CLASS_EXTERNAL: config.OUTBOUND_EXTERNAL_CONCURRENCY,
+    }
+    return max(1, limits.get(request_class, config.MAX_CONCURRENCY))
+
+
+def host_for_url(url: str | None) -> str:
+    return (urlparse(url or "").hostname or "unknown").lower()
+
+
+class FairLimiter:
+    """Counting limiter with per-session round-robin queuing.
+
+    Usable as ``async with limiter:`` like ``asyncio.Semaphore``. The
+    uncontended path takes a slot without touching the event loop.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._in_use = 0
+        # session -> queued (future, enqueued_at); order is the service rotation.
+        self._queues: OrderedDict[str, deque[tuple[asyncio.Future, float]]] = (
+            OrderedDict()
+        )
+        # session -> slots per turn, and what is left of the current turn.
+        self._weights: dict[str, int] = {}
+        self._quantum: dict[str, int] = {}
+        self._waiting = 0
+        self.acquired = 0
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def acquire(self) -> None:
+        if self._in_use < self.capacity and not self._waiting:
+            self._in_use += 1
+            self.acquired += 1
+            return
+
+        session = REQUEST_SESSION_ID.get() or "default"
+        weight = _PRIORITY_WEIGHTS.get(current_priority(), _DEFAULT_WEIGHT)
+        future = asyncio.get_running_loop().create_future()
+        enqueued_at = time.monotonic()
+        queue = self._queues.get(session)
+        self._weights[session] = weight
+        if queue is None:
+            queue = self._queues[session] = deque()
+            self._quantum[session] = weight
+        queue.append((future, enqueued_at))
+        self._waiting += 1
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._waiting)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before cancellation; pass it on.
+                self.release()
+            else:
+                self._discard(session, future)
+            raise
+        waited = time.monotonic() - enqueued_at
+        self.wait_seconds_total += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def _discard(self, session: str, future: asyncio.Future) -> None:
+        queue = self._queues.get(session)
+        if queue is None:
+            return
+        for item in queue:
+            if item[0] is future:
+                queue.remove(item)
+                self._waiting -= 1
+                break
+        if not queue:
+            self._forget(session)
+
+    def _forget(self, session: str) -> None:
+        del self._queues[session]
+        self._weights.pop(session, None)
+        self._quantum.pop(session, None)
+
+    def release(self) -> None:
+        while self._queues:
+            session, queue = next(iter(self._queues.items()))
+            future, _ = queue.popleft()
+            self._waiting -= 1
+            self._quantum[session] -= 1
+            if not queue:
+                self._forget(session)
+            elif self._quantum[session] <= 0:
+                # Turn used up: move to the back of the rotation.
+                self._queues.move_to_end(session)
+                self._quantum[session] = self._weights[session]
+            if future.done():
+                continue
+            # Hand the slot straight to the waiter; ``_in_use`` is unchanged.
+            self.acquired += 1
+            future.set_result(None)
+            return
+        self._in_use -= 1
+
+    async def __aenter__(self) -> FairLimiter:
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "in_use": self._in_use,
+            "queue_depth": self._waiting,
+            "queued_sessions": len(self._queues),
+            "acquired": self.acquired,
+            "queued": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+        }
+
+
+_loop_limiters: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[str, str], FairLimiter]
+] = weakref.WeakKeyDictionary()
+
+
+def get_limiter(host: str, request_class: str = REQUEST_CLASS_API) -> FairLimiter:
+    """Return the pool for ``(host, request_class)`` on the active loop."""
+
+    loop = active_event_loop()
+    pools = _loop_limiters.get(loop)
+    if pools is None:
+        pools = _loop_limiters[loop] = {}
+    key = (host.lower(), request_class)
+    limiter = pools.get(key)
+    if limiter is None:
+        limiter = pools[key] = FairLimiter(_class_limit(request_class))
+    return limiter
+
+
+def get_url_limiter(url: str, request_class: str = REQUEST_CLASS_EXTERNAL):
+    return get_limiter(host_for_url(url), request_class)
+
+
+def outbound_limiter_stats() -> dict[str, Any]:
+    pools = _loop_limiters.get(active_event_loop()) or {}
+    return {
+        f"{host}/{request_class}": limiter.stats()
+        for (host, request_class), limiter in sorted(pools.items())
+    }
@@ -0,0 +1,416 @@
+"""Bounded, streaming capture of subprocess output.
+
+``_run_shell`` used to ``communicate()`` and return every byte a command
+printed, so one chatty test run could put hundreds of megabytes on the heap.
+``StreamCapture`` instead consumes a pipe chunk by chunk and keeps only:
+
+- the first ``head_bytes`` and the last ``tail_bytes`` (a ring buffer),
+- running byte and line totals,
+- optionally, the full stream in a spill file under
+  ``<WORKSPACE_BASE_DIR>/.outputs`` that ``read_command_output`` can page
+  through later by handle. Spill files stop growing at ``spill_max_bytes``
+  and the result reports when a stream was cut off.
+
+Spill I/O stays off the event loop: files are created (and old ones swept, at
+most every few minutes) on the ``run_blocking`` executor, and ``feed`` only
+buffers spill bytes, which ``flush`` writes out in batches on the executor.
+
+Bounds only apply inside ``bounded_output()``; internal git plumbing that
+parses complete output runs unbounded as before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import uuid
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import IO, Any
+
+from . import config
+from .blocking import run_blocking
+from .config import BASE_LOGGER
+from .utils import _get_main_module
+
+LOGGER = BASE_LOGGER.getChild("output_capture")
+
+_OUTPUTS_DIRNAME = ".outputs"
+OUTPUT_STREAMS = ("stdout", "stderr")
+# Marker lines longer than this are not worth retaining.
+_MAX_MARKER_LINE_BYTES = 4096
+_MAX_MARKERS = 2000
+# Spill bytes are buffered and written in batches of about this size.
+_SPILL_BATCH_BYTES = 256 * 1024
+# Stale spill files are swept at most this often per outputs directory.
+_SWEEP_INTERVAL_SECONDS = 300.0
+_last_sweep: dict[str, float] = {}
+
+
+@dataclass(frozen=True)
+class OutputPolicy:
+    head_bytes: int
+    tail_bytes: int
+    spill: bool
+    spill_max_bytes: int = 0
+    # Lines starting with one of these are kept even when they fall in the
+    # elided middle (e.g. the quality suite's step markers).
+    keep_line_prefixes: tuple[bytes, ...] = ()
+
+
+_POLICY: ContextVar[OutputPolicy | None] = ContextVar(
+    "github_mcp_output_policy", default=None
+)
+
+
+def current_output_policy() -> OutputPolicy | None:
+    return _POLICY.get()
+
+
+@contextmanager
+def bounded_output(
+    *,
+    head_bytes: int | None = None,
+    tail_bytes: int | None = None,
+    spill: bool | None = None,
+    spill_max_bytes: int | None = None,
+    keep_line_prefixes: Sequence[str] = (),
+) -> Iterator[OutputPolicy]:
+    """Bound the output captured by ``_run_shell`` calls made in this block.
+
+    Unset arguments inherit from an enclosing ``bounded_output()`` block, then
+    from config; line prefixes accumulate.
+    """
+
+    outer = _POLICY.get()
+    if head_bytes is None:
+        head_bytes = outer.head_bytes if outer else config.WORKSPACE_OUTPUT_HEAD_BYTES
+    if tail_bytes is None:
+        tail_bytes = outer.tail_bytes if outer else config.WORKSPACE_OUTPUT_TAIL_BYTES
+    if spill is None:
+        spill = outer.spill if outer else config.WORKSPACE_OUTPUT_SPILL
+    if spill_max_bytes is None:
+        spill_max_bytes = (
+            outer.spill_max_bytes if outer else config.WORKSPACE_OUTPUT_SPILL_MAX_BYTES
+        )
+    prefixes = (outer.keep_line_prefixes if outer else ()) + tuple(
+        p.encode("utf-8") for p in keep_line_prefixes
+    )
+    policy = OutputPolicy(
+        head_bytes=max(0, head_bytes),
+        tail_bytes=max(0, tail_bytes),
+        spill=spill,
+        spill_max_bytes=max(0, spill_max_bytes),
+        keep_line_prefixes=prefixes,
+    )
+    token = _POLICY.set(policy)
+    try:
+        yield policy
+    finally:
+        _POLICY.reset(token)
+
+
+def outputs_dir() -> str:
+    base = getattr(_get_main_module(), "WORKSPACE_BASE_DIR", config.WORKSPACE_BASE_DIR)
+    return os.path.join(base, _OUTPUTS_DIRNAME)
+
+
+def spill_path(handle: str, stream: str) -> str:
+    """Return the spill file for ``handle``/``stream``; reject malformed input."""
+
+    if stream not in OUTPUT_STREAMS:
+        raise ValueError(f"stream must be one of {', '.join(OUTPUT_STREAMS)}")
+    try:
+        handle = uuid.UUID(hex=str(handle)).hex
+    except ValueError:
+        raise ValueError("handle must be an output handle from a command result")
+    return os.path.join(outputs_dir(), f"{handle}.{stream}")
+
+
+def _sweep_stale(root: str) -> None:
+    now = time.monotonic()
+    last = _last_sweep.get(root)
+    if last is not None and now - last < _SWEEP_INTERVAL_SECONDS:
+        return
+    _last_sweep[root] = now
+    cutoff = time.time() - config.WORKSPACE_OUTPUT_SPILL_TTL_SECONDS
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            continue
+
+
+def _open_spill_files(root: str, handle: str) -> dict[str, IO[bytes]]:
+    os.makedirs(root, exist_ok=True)
+    _sweep_stale(root)
+    files: dict[str, IO[bytes]] = {}
+    try:
+        for stream in OUTPUT_STREAMS:
+            files[stream] = open(spill_path(handle, stream), "wb")
+    except OSError:
+        for fh in files.values():
+            fh.close()
+        raise
+    return files
+
+
+def _finish_spill(spill: IO[bytes], data: bytes, remove: bool) -> None:
+    try:
+        if data and not remove:
+            spill.write(data)
+    finally:
+        spill.close()
+        if remove:
+            try:
+                os.remove(spill.name)
+            except OSError:
+                pass
+
+
+class StreamCapture:
+    """Consume one output stream with bounded memory.
+
+    ``head_bytes=None`` keeps everything (the unbounded legacy behaviour).
+    ``spill_to`` is an open file that receives the full stream; ``feed`` only
+    buffers for it, ``flush`` writes batches on the executor, and ``aclose``
+    must be used to finish it. ``spill_max_bytes`` caps the spill file
+    (0 = no cap); past it nothing more is written and ``spill_truncated`` is
+    set.
+    """
+
+    def __init__(
+        self,
+        *,
+        head_bytes: int | None = None,
+        tail_bytes: int = 0,
+        spill_to: IO[bytes] | None = None,
+        spill_max_bytes: int = 0,
+        keep_line_prefixes: tuple[bytes, ...] = (),
+    ):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.keep_line_prefixes = keep_line_prefixes
+        self.total_bytes = 0
+        self.newlines = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._last_byte = b""
+        self._line_start = b""
+        self._line_offset = 0
+        self._markers: list[tuple[int, bytes]] = []
+        self._spill = spill_to
+        self.spill_path: str | None = spill_to.name if spill_to is not None else None
+        self.spill_max_bytes = spill_max_bytes
+        self.spill_truncated = False
+        self._spilled_bytes = 0
+        self._pending = bytearray()
+        self._writing: asyncio.Future[int] | None = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.head_bytes is not None and self.total_bytes > (
+            self.head_bytes + self.tail_bytes
+        )
+
+    @property
+    def lines(self) -> int:
+        if not self.total_bytes:
+            return 0
+        return self.newlines + (0 if self._last_byte == b"\n" else 1)
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        if self._spill is not None:
+            self._write_spill(chunk)
+        if self.keep_line_prefixes:
+            self._scan_markers(chunk)
+        self.newlines += chunk.count(b"\n")
+        self.total_bytes += len(chunk)
+        self._last_byte = chunk[-1:]
+
+        if self.head_bytes is None:
+            self._head += chunk
+            return
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head += chunk[:room]
+            chunk = chunk[room:]
+        if chunk and self.tail_bytes:
+            self._tail += chunk[-self.tail_bytes :]
+            excess = len(self._tail) - self.tail_bytes
+            if excess > 0:
+                del self._tail[:excess]
+
+    def _write_spill(self, chunk: bytes) -> None:
+        if self.spill_truncated:
+            return
+        room = self.spill_max_bytes - self._spilled_bytes
+        if self.spill_max_bytes > 0 and len(chunk) > room:
+            chunk = chunk[:room]
+            self.spill_truncated = True
+        self._pending += chunk
+        self._spilled_bytes += len(chunk)
+
+    async def flush(self) -> None:
+        """Write buffered spill bytes once a batch has built up."""
+
+        if self._spill is None or len(self._pending) < _SPILL_BATCH_BYTES:
+            return
+        await self._settle()
+        if self._spill is None:
+            return
+        data = bytes(self._pending)
+        self._pending.clear()
+        self._writing = asyncio.ensure_future(run_blocking(self._spill.write, data))
+        await self._settle()
+
+    async def _settle(self) -> None:
+        """Wait for the batch being written.
+
+        The write is shielded: a pump cancelled by a timeout is resumed later,
+        and its next batch must not overtake (or be closed under) this one.
+        """
+
+        writing = self._writing
+        if writing is None:
+            return
+        try:
+            await asyncio.shield(writing)
+        except OSError as exc:
+            LOGGER.warning(
+                "Cannot spill command output to %s: %s", self.spill_path, exc
+            )
+            self.spill_truncated = True
+            spill, self._spill = self._spill, None
+            if spill is not None:
+                await run_blocking(spill.close)
+        finally:
+            if writing.done():
+                self._writing = None
+
+    def _scan_markers(self, chunk: bytes) -> None:
+        offset = self.total_bytes
+        parts = chunk.split(b"\n")
+        for i, part in enumerate(parts):
+            if i == 0:
+                start = self._line_offset
+                line = (self._line_start + part)[:_MAX_MARKER_LINE_BYTES]
+            else:
+                start = offset
+                line = part[:_MAX_MARKER_LINE_BYTES]
+            offset += len(part) + 1
+            if i == len(parts) - 1:
+                # Incomplete line: finish it with the next chunk.
+                self._line_start = line
+                self._line_offset = start
+                return
+            if line.startswith(self.keep_line_prefixes):
+                if len(self._markers) < _MAX_MARKERS:
+                    self._markers.append((start, line))
+
+    def close(self) -> None:
+        if self.keep_line_prefixes and self._line_start:
+            line = self._line_start
+            self._line_start = b""
+            if line.startswith(self.keep_line_prefixes):
+                self._markers.append((self._line_offset, line))
+
+    async def aclose(self) -> None:
+        """``close``, then write out and close the spill file on the executor."""
+
+        self.close()
+        await self._settle()
+        if self._spill is None:
+            return
+        spill, self._spill = self._spill, None
+        data = bytes(self._pending)
+        self._pending.clear()
+        # Everything fits in memory; nothing to page through later.
+        remove = not self.truncated
+        if remove:
+            self.spill_path = None
+        await run_blocking(_finish_spill, spill, data, remove)
+
+    def text(self) -> str:
+        if not self.truncated:
+            data = bytes(self._head) + bytes(self._tail)
+            return data.decode("utf-8", errors="replace")
+        head_end = len(self._head)
+        tail_start = self.total_bytes - len(self._tail)
+        elided = tail_start - head_end
+        kept = [line for start, line in self._markers if head_end <= start < tail_start]
+        middle = f"\n... [{elided} bytes elided] ...\n".encode()
+        if kept:
+            middle += b"\n".join(kept) + b"\n"
+        data = bytes(self._head) + middle + bytes(self._tail)
+        return data.decode("utf-8", errors="replace")
+
+
+async def new_captures() -> tuple[StreamCapture, StreamCapture, str | None]:
+    """Create stdout/stderr captures for the active policy.
+
+    Returns ``(stdout, stderr, handle)``; ``handle`` is set when spilling.
+    """
+
+    policy = current_output_policy()
+    if policy is None:
+        return StreamCapture(), StreamCapture(), None
+
+    handle: str | None = None
+    spill: dict[str, IO[bytes] | None] = {stream: None for stream in OUTPUT_STREAMS}
+    if policy.spill:
+        handle = uuid.uuid4().hex
+        try:
+            spill = {
+                **spill,
+                **await run_blocking(_open_spill_files, outputs_dir(), handle),
+            }
+        except OSError as exc:
+            LOGGER.warning("Output spill disabled: %s", exc)
+            handle = None
+
+    captures = [
+        StreamCapture(
+            head_bytes=policy.head_bytes,
+            tail_bytes=policy.tail_bytes,
+            spill_to=spill[stream],
+            spill_max_bytes=policy.spill_max_bytes,
+            keep_line_prefixes=policy.keep_line_prefixes,
+        )
+        for stream in OUTPUT_STREAMS
+    ]
+    return captures[0], captures[1], handle
+
+
+async def capture_fields(
+    stdout: StreamCapture, stderr: StreamCapture, handle: str | None
+) -> dict[str, Any]:
+    """Close both captures and return their ``_run_shell`` result fields."""
+
+    await stdout.aclose()
+    await stderr.aclose()
+    fields: dict[str, Any] = {
+        "stdout": stdout.text(),
+        "stderr": stderr.text(),
+        "stdout_truncated": stdout.truncated,
+        "stderr_truncated": stderr.truncated,
+        "stdout_bytes": stdout.total_bytes,
+        "stderr_bytes": stderr.total_bytes,
+        "stdout_lines": stdout.lines,
+        "stderr_lines": stderr.lines,
+    }
+    if handle is not None and (stdout.spill_path or stderr.spill_path):
+        fields["output_handle"] = handle
+        fields["stdout_spill_truncated"] = stdout.spill_truncated
+        fields["stderr_spill_truncated"] = stderr.spill_truncated
+    return fields
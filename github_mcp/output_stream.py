@@ -0,0 +1,257 @@
+"""Live delivery of command output while the command is still running.
+
+``terminal_command`` (and ``run_tests``/``render_shell`` on top of it) only
+returned once the process exited, so a long test run looked hung. When a
+caller can receive incremental output, ``_run_shell`` also forwards each chunk
+it reads to the active ``OutputStream``:
+
+- MCP clients that send a ``progressToken`` get ``notifications/progress``
+  messages whose ``message`` carries the output (``live_output()``).
+- ``POST /tools/<name>?stream=true`` answers with newline-delimited JSON
+  events followed by the final result (see ``http_routes.tool_registry``).
+
+The stream buffers at most ``WORKSPACE_STREAM_MAX_PENDING_CHUNKS`` chunks;
+beyond that the reader stops draining the pipes, which pauses the command
+rather than growing memory. Idle periods produce heartbeat events.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from . import config
+from .config import BASE_LOGGER
+from .workspace_tools.stream_utils import normalize_stream_text
+
+LOGGER = BASE_LOGGER.getChild("output_stream")
+
+# Coalesce queued chunks into events of at most this many characters.
+_MAX_EVENT_CHARS = 64 * 1024
+
+_SINK: ContextVar[OutputStream | None] = ContextVar(
+    "github_mcp_output_sink", default=None
+)
+
+
+def current_output_stream() -> OutputStream | None:
+    return _SINK.get()
+
+
+class OutputStream:
+    """Bounded queue of decoded output chunks with heartbeat-aware draining."""
+
+    def __init__(
+        self,
+        *,
+        max_pending_chunks: int | None = None,
+        heartbeat_seconds: float | None = None,
+    ):
+        if max_pending_chunks is None:
+            max_pending_chunks = config.WORKSPACE_STREAM_MAX_PENDING_CHUNKS
+        if heartbeat_seconds is None:
+            heartbeat_seconds = config.WORKSPACE_STREAM_HEARTBEAT_SECONDS
+        self.heartbeat_seconds = heartbeat_seconds
+        self._queue: asyncio.Queue[tuple[str, str] | None] = asyncio.Queue(
+            maxsize=max(1, max_pending_chunks)
+        )
+        self._decoders: dict[str, Any] = {}
+        # A trailing "\r" may be the first half of "\r\n"; hold it back.
+        self._held_cr: dict[str, bool] = {}
+        self._started = time.monotonic()
+        self._closed = False
+        self.seq = 0
+        self.chunks = 0
+        self.blocked_seconds = 0.0
+
+    def _decode(self, stream: str, data: bytes, *, final: bool = False) -> str:
+        decoder = self._decoders.get(stream)
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            self._decoders[stream] = decoder
+        text = decoder.decode(data, final=final)
+        if self._held_cr.pop(stream, False):
+            text = "\r" + text
+        if text.endswith("\r") and not final:
+            self._held_cr[stream] = True
+            text = text[:-1]
+        return normalize_stream_text(text)
+
+    async def send(self, stream: str, data: bytes) -> None:
+        """Queue a raw chunk; waits while the reader is behind (backpressure)."""
+
+        if self._closed:
+            return
+        text = self._decode(stream, data)
+        if not text:
+            return
+        if self._queue.full():
+            started = time.monotonic()
+            await self._queue.put((stream, text))
+            self.blocked_seconds += time.monotonic() - started
+        else:
+            self._queue.put_nowait((stream, text))
+        self.chunks += 1
+
+    def close(self) -> None:
+        """Flush decoder state and end ``events()`` once the queue drains."""
+
+        if self._closed:
+            return
+        self._closed = True
+        for stream in list(self._decoders):
+            tail = self._decode(stream, b"", final=True)
+            if tail:
+                self._put_final((stream, tail))
+        self._put_final(None)
+
+    def _put_final(self, item: tuple[str, str] | None) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # The reader is behind; deliver the end marker once there is room.
+            asyncio.get_running_loop().create_task(self._queue.put(item))
+
+    def _event(self, stream: str, text: str) -> dict[str, Any]:
+        self.seq += 1
+        return {"type": "output", "seq": self.seq, "stream": stream, "text": text}
+
+    def _heartbeat(self) -> dict[str, Any]:
+        return {
+            "type": "heartbeat",
+            "seq": self.seq,
+            "elapsed_seconds": round(time.monotonic() - self._started, 3),
+        }
+
+    async def events(self) -> AsyncIterator[dict[str, Any]]:
+        """Yield output and heartbeat events until ``close()``."""
+
+        while True:
+            try:
+                if self.heartbeat_seconds > 0:
+                    item = await asyncio.wait_for(
+                        self._queue.get(), timeout=self.heartbeat_seconds
+                    )
+                else:
+                    item = await self._queue.get()
+            except asyncio.TimeoutError:
+                yield self._heartbeat()
+                continue
+            if item is None:
+                return
+
+            # Coalesce whatever else is already queued for the same stream.
+            stream, text = item
+            done = False
+            while len(text) < _MAX_EVENT_CHARS and not self._queue.empty():
+                nxt = self._queue.get_nowait()
+                if nxt is None:
+                    done = True
+                    break
+                if nxt[0] != stream:
+                    yield self._event(stream, text)
+                    stream, text = nxt
+                    continue
+                text += nxt[1]
+            yield self._event(stream, text)
+            if done:
+                return
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "events": self.seq,
+            "chunks": self.chunks,
+            "backpressure_seconds": round(self.blocked_seconds, 3),
+        }
+
+
+@asynccontextmanager
+async def stream_output_to(stream: OutputStream) -> AsyncIterator[OutputStream]:
+    """Forward ``_run_shell`` output produced in this block to ``stream``."""
+
+    token = _SINK.set(stream)
+    try:
+        yield stream
+    finally:
+        _SINK.reset(token)
+
+
+def _mcp_progress_target() -> tuple[Any, Any, Any] | None:
+    """Return ``(session, progress_token, request_id)`` for MCP requests."""
+
+    try:
+        from mcp.server.lowlevel.server import request_ctx  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+    try:
+        ctx = request_ctx.get()
+    except LookupError:
+        return None
+    token = getattr(getattr(ctx, "meta", None), "progressToken", None)
+    session = getattr(ctx, "session", None)
+    if token is None or session is None:
+        return None
+    return session, token, getattr(ctx, "request_id", None)
+
+
+async def _forward_progress(stream: OutputStream, target: tuple[Any, Any, Any]):
+    session, token, request_id = target
+    # MCP progress must increase on every notification. Heartbeats repeat the
+    # last output ``seq``, so count notifications separately.
+    progress = 0
+    async for event in stream.events():
+        if event["type"] == "output":
+            prefix = "[stderr] " if event["stream"] == "stderr" else ""
+            message = prefix + event["text"]
+        else:
+            message = f"still running ({event['elapsed_seconds']:.0f}s)"
+        progress += 1
+        try:
+            await session.send_progress_notification(
+                token,
+                float(progress),
+                message=message,
+                related_request_id=str(request_id) if request_id is not None else None,
+            )
+        except Exception as exc:  # noqa: BLE001
+            # The client went away; keep draining so the command is not paused.
+            LOGGER.debug("Progress notification failed: %s", exc)
+
+
+@asynccontextmanager
+async def live_output() -> AsyncIterator[OutputStream | None]:
+    """Stream command output for the current request when the caller can take it.
+
+    No-op when a stream is already attached (HTTP streaming) or when the MCP
+    request carries no progress token.
+    """
+
+    existing = _SINK.get()
+    if existing is not None:
+        yield existing
+        return
+    target = _mcp_progress_target()
+    if target is None:
+        yield None
+        return
+
+    stream = OutputStream()
+    forwarder = asyncio.get_running_loop().create_task(
+        _forward_progress(stream, target)
+    )
+    try:
+        async with stream_output_to(stream):
+            yield stream
+    finally:
+        stream.close()
+        try:
+            await asyncio.wait_for(asyncio.shield(forwarder), timeout=5)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            forwarder.cancel()
+        except Exception:  # noqa: BLE001
+            pass
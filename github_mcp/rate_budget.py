@@ -0,0 +1,191 @@
+"""Proactive pacing of outbound GitHub requests against the rate-limit budget.
+
+GitHub reports the budget for each resource bucket (``core``, ``search``,
+``code_search``, ``graphql``, ...) in ``X-RateLimit-*`` response headers.
+``RateBudget`` keeps the latest values per bucket and, once a bucket runs low,
+spaces requests out so the remaining budget lasts until the window resets
+instead of hitting the wall and stalling on 403/429 retries.
+
+Requests carry a priority. Interactive tool calls are only paced when the
+budget is nearly gone; background work (e.g. polling a workflow run) is paced
+earlier and never spends the reserve kept for interactive calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections.abc import Iterator, Mapping
+from contextvars import ContextVar
+from typing import Any
+
+from . import config
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+_REQUEST_PRIORITY: ContextVar[str] = ContextVar(
+    "GITHUB_REQUEST_PRIORITY", default=PRIORITY_INTERACTIVE
+)
+
+
+@contextlib.contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    """Run GitHub requests issued inside the block with ``priority``."""
+
+    token = _REQUEST_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _REQUEST_PRIORITY.reset(token)
+
+
+def current_priority() -> str:
+    return _REQUEST_PRIORITY.get()
+
+
+def bucket_for_path(path: str) -> str:
+    """Best guess of the rate-limit bucket before GitHub tells us."""
+
+    normalized = (path or "").lstrip("/").split("?", 1)[0].rstrip("/")
+    # Code search has its own, smaller bucket (``code_search``).
+    if normalized == "search/code":
+        return "code_search"
+    if normalized.startswith("search/"):
+        return "search"
+    if normalized == "graphql":
+        return "graphql"
+    return "core"
+
+
+def _header(headers: Mapping[str, Any], name: str) -> str | None:
+    value = headers.get(name)
+    if value is None:
+        lowered = name.lower()
+        for key, header_value in headers.items():
+            if str(key).lower() == lowered:
+                return header_value
+    return value
+
+
+class RateBudget:
+    """Per-bucket rate-limit state plus a simple slot scheduler."""
+
+    def __init__(
+        self,
+        *,
+        pace_below_fraction: float,
+        interactive_reserve_fraction: float,
+        max_wait_seconds: float,
+    ):
+        self.pace_below_fraction = pace_below_fraction
+        self.interactive_reserve_fraction = interactive_reserve_fraction
+        self.max_wait_seconds = max_wait_seconds
+        self._buckets: dict[str, dict[str, Any]] = {}
+
+    def record(self, path: str, headers: Mapping[str, Any] | None) -> None:
+        """Update bucket state from a response's ``X-RateLimit-*`` headers."""
+
+        if not headers:
+            return
+        try:
+            remaining = int(_header(headers, "X-RateLimit-Remaining"))
+            limit = int(_header(headers, "X-RateLimit-Limit") or 0)
+            reset_at = float(_header(headers, "X-RateLimit-Reset") or 0)
+        except (TypeError, ValueError):
+            return
+        name = _header(headers, "X-RateLimit-Resource") or bucket_for_path(path)
+        bucket = self._buckets.setdefault(
+            name, {"next_slot": 0.0, "paced": 0, "waited_seconds": 0.0}
+        )
+        if reset_at > bucket.get("reset_at", reset_at):
+            # A new window: slots paced out over the exhausted one are void.
+            bucket["next_slot"] = 0.0
+        bucket.update(
+            remaining=remaining,
+            limit=max(limit, remaining),
+            reset_at=reset_at,
+            updated_at=time.time(),
+        )
+
+    def delay_for(self, path: str, priority: str | None = None) -> float:
+        """Reserve the next request slot and return how long to wait for it."""
+
+        bucket = self._buckets.get(bucket_for_path(path))
+        if bucket is None or not bucket.get("limit"):
+            return 0.0
+        now = time.time()
+        time_left = bucket["reset_at"] - now
+        if time_left <= 0:
+            # The window has reset since we last heard from GitHub.
+            return 0.0
+
+        limit = bucket["limit"]
+        remaining = bucket["remaining"]
+        if (priority or current_priority()) == PRIORITY_BACKGROUND:
+            reserve = int(limit * self.interactive_reserve_fraction)
+            budget = remaining - reserve
+            threshold = limit * min(1.0, self.pace_below_fraction * 2)
+        else:
+            budget = remaining
+            threshold = limit * self.pace_below_fraction
+        if remaining > threshold:
+            return 0.0
+
+        interval = time_left if budget <= 0 else time_left / budget
+        start = max(now, bucket["next_slot"])
+        bucket["next_slot"] = start + interval
+        # Optimistically spend one request; the next response corrects this.
+        bucket["remaining"] = max(0, remaining - 1)
+        delay = min(start - now, self.max_wait_seconds)
+        if delay > 0:
+            bucket["paced"] += 1
+            bucket["waited_seconds"] += delay
+        return max(0.0, delay)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    def stats(self) -> dict[str, Any]:
+        now = time.time()
+        return {
+            "enabled": bool(config.GITHUB_RATE_BUDGET_ENABLED),
+            "pace_below_fraction": self.pace_below_fraction,
+            "interactive_reserve_fraction": self.interactive_reserve_fraction,
+            "buckets": {
+                name: {
+                    "limit": bucket.get("limit"),
+                    "remaining": bucket.get("remaining"),
+                    "reset_in_seconds": max(0.0, bucket.get("reset_at", 0) - now),
+                    "paced_requests": bucket["paced"],
+                    "waited_seconds": round(bucket["waited_seconds"], 3),
+                }
+                for name, bucket in self._buckets.items()
+            },
+        }
+
+
+RATE_BUDGET = RateBudget(
+    pace_below_fraction=config.GITHUB_RATE_BUDGET_PACE_BELOW_FRACTION,
+    interactive_reserve_fraction=config.GITHUB_RATE_BUDGET_INTERACTIVE_RESERVE_FRACTION,
+    max_wait_seconds=config.GITHUB_RATE_BUDGET_MAX_WAIT_SECONDS,
+)
+
+
+async def wait_for_budget(path: str) -> None:
+    """Sleep until the scheduler's slot for ``path`` (no-op when disabled)."""
+
+    if not config.GITHUB_RATE_BUDGET_ENABLED:
+        return
+    delay = RATE_BUDGET.delay_for(path)
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def record_rate_limit_headers(path: str, headers: Mapping[str, Any] | None) -> None:
+    RATE_BUDGET.record(path, headers)
+
+
+def rate_budget_stats() -> dict[str, Any]:
+    return RATE_BUDGET.stats()
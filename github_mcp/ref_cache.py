@@ -0,0 +1,138 @@
+"""Short-lived cache of branch/tag name -> commit SHA resolutions.
+
+Content reads resolve moving refs to an immutable commit SHA before touching
+the file cache. Refs only move when someone pushes, so a resolution is reused
+for a few seconds (``GITHUB_REF_CACHE_TTL_SECONDS``) and dropped immediately
+whenever this server writes to the repository itself.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Any
+
+from . import config
+
+_COMMIT_SHA_RE = re.compile(r"[0-9a-fA-F]{40}|[0-9a-fA-F]{64}")
+_REPO_PATH_RE = re.compile(r"^/?repos/([^/]+/[^/?#]+)")
+
+
+def is_commit_sha(ref: object) -> bool:
+    """Return True for full (SHA-1 or SHA-256) hex object ids."""
+
+    return isinstance(ref, str) and _COMMIT_SHA_RE.fullmatch(ref) is not None
+
+
+def repo_from_api_path(path: str) -> str | None:
+    """Extract ``owner/repo`` from a ``/repos/{owner}/{repo}/...`` API path."""
+
+    match = _REPO_PATH_RE.match(path or "")
+    return match.group(1) if match else None
+
+
+class RefCache:
+    """TTL cache keyed by (repository, ref).
+
+    Per-repository write times are kept for ``write_window_seconds`` so
+    ``written_since`` can answer for any mirror still inside its freshness
+    window; older entries can no longer change an answer and are pruned.
+    """
+
+    def __init__(self, ttl_seconds: float, write_window_seconds: float = 0.0):
+        self.ttl_seconds = ttl_seconds
+        self.write_window_seconds = max(ttl_seconds, write_window_seconds)
+        self._entries: dict[tuple[str, str], tuple[str, float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._written_at: dict[str, float] = {}
+
+    @staticmethod
+    def _key(full_name: str, ref: str) -> tuple[str, str]:
+        return full_name.lower(), ref
+
+    def get(self, full_name: str, ref: str) -> str | None:
+        key = self._key(full_name, ref)
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        sha, expires_at = item
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self.hits += 1
+        return sha
+
+    def put(self, full_name: str, ref: str, sha: str) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[self._key(full_name, ref)] = (
+            sha,
+            time.monotonic() + self.ttl_seconds,
+        )
+
+    def invalidate(self, full_name: str, ref: str | None = None) -> None:
+        """Drop ``ref`` (or every ref of the repository when ref is None)."""
+
+        repo = full_name.lower()
+        now = time.monotonic()
+        self._prune_written(now)
+        self._written_at[repo] = now
+        if ref is not None:
+            removed = self._entries.pop(self._key(full_name, ref), None) is not None
+        else:
+            stale = [key for key in self._entries if key[0] == repo]
+            for key in stale:
+                del self._entries[key]
+            removed = bool(stale)
+        if removed:
+            self.invalidations += 1
+
+    def _prune_written(self, now: float) -> None:
+        cutoff = now - self.write_window_seconds
+        stale = [repo for repo, at in self._written_at.items() if at < cutoff]
+        for repo in stale:
+            del self._written_at[repo]
+
+    def written_since(self, full_name: str, since: float) -> bool:
+        """True if the repository was invalidated after ``since`` (monotonic)."""
+
+        return self._written_at.get(full_name.lower(), float("-inf")) > since
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._written_at.clear()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "written_repos": len(self._written_at),
+        }
+
+
+REF_CACHE = RefCache(
+    ttl_seconds=config.GITHUB_REF_CACHE_TTL_SECONDS,
+    write_window_seconds=config.WORKSPACE_REFRESH_STALE_SECONDS,
+)
+
+
+def invalidate_ref_cache(full_name: str, ref: str | None = None) -> None:
+    REF_CACHE.invalidate(full_name, ref)
+
+
+def clear_ref_cache() -> None:
+    REF_CACHE.clear()
+
+
+def ref_cache_stats() -> dict[str, Any]:
+    return REF_CACHE.stats()
@@ -36,7 +36,7 @@ from github_mcp.config import (
     summarize_request_context,
 )
 from github_mcp.exceptions import RenderAPIError, RenderAuthError
-from github_mcp.http_clients import _get_concurrency_semaphore
+from github_mcp.http_clients import _get_outbound_limiter
 from github_mcp.mcp_server.context import get_request_context
 from github_mcp.mcp_server.decorators import (
     ANSI_CYAN,
@@ -350,7 +350,7 @@ async def _send_request(
     json_body: Any | None,
     headers: dict[str, str] | None,
 ) -> httpx.Response:
-    async with _get_concurrency_semaphore():
+    async with _get_outbound_limiter(RENDER_API_BASE):
         return await client.request(
             method,
             path,
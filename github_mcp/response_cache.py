@@ -0,0 +1,224 @@
+"""Conditional-request (ETag / Last-Modified) cache for GitHub API reads.
+
+GitHub returns ``ETag`` and ``Last-Modified`` validators on most REST reads and
+does not count ``304 Not Modified`` replies against the primary rate limit.
+This module keeps the last successful payload for each (method, path, params,
+token identity) so ``_github_request`` can replay the validators as
+``If-None-Match`` / ``If-Modified-Since`` and serve the cached body on 304.
+
+The cache is opt-in (``GITHUB_RESPONSE_CACHE_ENABLED``) and bounded by entry
+and byte caps with LRU eviction.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any
+
+from . import config
+
+_CONDITIONAL_HEADERS = {"if-none-match", "if-modified-since"}
+
+
+def _header_value(headers: Mapping[str, Any] | None, name: str) -> str | None:
+    if not headers:
+        return None
+    value = headers.get(name)
+    if value is not None:
+        return str(value)
+    lowered = name.lower()
+    for key, header_value in headers.items():
+        if str(key).lower() == lowered:
+            return str(header_value)
+    return None
+
+
+def token_fingerprint(token: str | None) -> str:
+    """Return a short, non-reversible identity for the active token."""
+
+    if not token:
+        return "anonymous"
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+def response_cache_key(
+    method: str,
+    path: str,
+    *,
+    params: Mapping[str, Any] | None,
+    headers: Mapping[str, Any] | None,
+    token: str | None,
+) -> str:
+    """Build a stable cache key for a request.
+
+    Caller-supplied headers are part of the key (they can change the response
+    representation, e.g. ``Accept``), except for conditional headers which are
+    owned by the cache itself.
+    """
+
+    safe_headers = {
+        str(k).lower(): str(v)
+        for k, v in (headers or {}).items()
+        if str(k).lower() not in _CONDITIONAL_HEADERS
+        and str(k).lower() != "authorization"
+    }
+    parts = [
+        str(method).upper(),
+        path,
+        json.dumps(dict(params or {}), sort_keys=True, default=str),
+        json.dumps(safe_headers, sort_keys=True),
+        token_fingerprint(token),
+    ]
+    return "|".join(parts)
+
+
+class ResponseCache:
+    """LRU cache of validated GitHub responses with hit/miss/304 counters."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    def _evict_if_needed(self) -> None:
+        while self.max_entries > 0 and len(self._cache) > self.max_entries:
+            _, evicted = self._cache.popitem(last=False)
+            self._current_bytes -= evicted.get("size_bytes", 0)
+            self.evictions += 1
+
+        while self.max_bytes > 0 and self._current_bytes > self.max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._current_bytes -= evicted.get("size_bytes", 0)
+            self.evictions += 1
+
+    def conditional_headers(self, key: str) -> dict[str, str]:
+        """Return validator headers for ``key`` (empty when not cached).
+
+        A lookup without an entry counts as a miss. Hits are counted by
+        ``replay``, once a 304 has actually been served from the cache.
+        """
+
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return {}
+        self._cache.move_to_end(key)
+        out: dict[str, str] = {}
+        if entry.get("etag"):
+            out["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            out["If-Modified-Since"] = entry["last_modified"]
+        return out
+
+    def replay(self, key: str) -> dict[str, Any] | None:
+        """Return a private copy of the cached payload after a 304 reply.
+
+        Returns ``None`` (a miss) when the entry was evicted after its
+        validators were sent.
+        """
+
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        self.not_modified += 1
+        self.bytes_saved += entry.get("size_bytes", 0)
+        entry["validated_at"] = time.time()
+        return copy.deepcopy(entry["payload"])
+
+    def store(
+        self,
+        key: str,
+        *,
+        payload: dict[str, Any],
+        response_headers: Mapping[str, Any] | None,
+        size_bytes: int,
+    ) -> bool:
+        """Store ``payload`` when the response carries a validator."""
+
+        etag = _header_value(response_headers, "ETag")
+        last_modified = _header_value(response_headers, "Last-Modified")
+        if not etag and not last_modified:
+            return False
+        if self.max_bytes > 0 and size_bytes > self.max_bytes:
+            return False
+
+        if key in self._cache:
+            existing = self._cache.pop(key)
+            self._current_bytes -= existing.get("size_bytes", 0)
+
+        now = time.time()
+        self._cache[key] = {
+            "payload": copy.deepcopy(payload),
+            "etag": etag,
+            "last_modified": last_modified,
+            "size_bytes": size_bytes,
+            "stored_at": now,
+            "validated_at": now,
+        }
+        self._current_bytes += size_bytes
+        self.stores += 1
+        self._evict_if_needed()
+        return True
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._current_bytes = 0
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": bool(config.GITHUB_RESPONSE_CACHE_ENABLED),
+            "entries": len(self._cache),
+            "bytes": self._current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "bytes_saved": self.bytes_saved,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+RESPONSE_CACHE = ResponseCache(
+    max_entries=config.GITHUB_RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=config.GITHUB_RESPONSE_CACHE_MAX_BYTES,
+)
+
+
+def response_cache_enabled() -> bool:
+    return bool(config.GITHUB_RESPONSE_CACHE_ENABLED)
+
+
+def clear_response_cache() -> None:
+    RESPONSE_CACHE.clear()
+    RESPONSE_CACHE.reset_counters()
+
+
+def response_cache_stats() -> dict[str, Any]:
+    return RESPONSE_CACHE.stats()
@@ -0,0 +1,107 @@
+"""Cached per-file metadata for ``scan_workspace_tree``.
+
+Every scan used to re-read each file to detect binaries, hash its first
+``hash_max_bytes`` and count its lines. A ``ScanManifest`` remembers those
+results per file, keyed by ``(size, mtime_ns, inode)``. A repeat scan then
+only reads files that changed since the last one. Results are stored per
+limit (e.g. ``("sha256", hash_max_bytes)``), so scans with different
+limits do not evict each other. File heads are not kept; they can be large.
+
+Manifests live in memory, LRU over ``WORKSPACE_SCAN_MANIFEST_MAX_REPOS``
+mirrors.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from . import config
+
+StatKey = tuple[int, int, int]
+
+
+def stat_key(st: os.stat_result) -> StatKey:
+    return (int(st.st_size), int(st.st_mtime_ns), int(st.st_ino))
+
+
+class ScanManifest:
+    """Metadata for the files of one mirror, valid while their stat matches."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.files: dict[str, tuple[StatKey, dict[Any, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def values(self, rel: str, st: os.stat_result) -> dict[Any, Any]:
+        """Return the cached results for ``rel``; empty if the file changed."""
+
+        key = stat_key(st)
+        with self._lock:
+            cached = self.files.get(rel)
+            if cached is not None and cached[0] == key:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            values: dict[Any, Any] = {}
+            self.files[rel] = (key, values)
+            return values
+
+    def retain(self, seen: set[str]) -> None:
+        """Forget files a full scan no longer found."""
+
+        with self._lock:
+            for rel in [rel for rel in self.files if rel not in seen]:
+                del self.files[rel]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "root": self.root,
+            "files": len(self.files),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class ScanManifestCache:
+    """In-memory manifests for recently scanned mirrors."""
+
+    def __init__(self, max_repos: int):
+        self.max_repos = max(1, max_repos)
+        self._manifests: OrderedDict[str, ScanManifest] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, repo_dir: str) -> ScanManifest | None:
+        if not config.WORKSPACE_SCAN_MANIFEST:
+            return None
+        root = os.path.realpath(repo_dir)
+        with self._lock:
+            manifest = self._manifests.get(root)
+            if manifest is None:
+                manifest = ScanManifest(root)
+                self._manifests[root] = manifest
+                while len(self._manifests) > self.max_repos:
+                    self._manifests.popitem(last=False)
+            else:
+                self._manifests.move_to_end(root)
+            return manifest
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            manifests = list(self._manifests.values())
+        return {
+            "enabled": bool(config.WORKSPACE_SCAN_MANIFEST),
+            "max_repos": self.max_repos,
+            "manifests": [manifest.stats() for manifest in manifests],
+        }
+
+
+SCAN_MANIFESTS = ScanManifestCache(config.WORKSPACE_SCAN_MANIFEST_MAX_REPOS)
+
+
+def scan_manifest_stats() -> dict[str, Any]:
+    return SCAN_MANIFESTS.stats()
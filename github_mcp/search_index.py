@@ -0,0 +1,398 @@
+"""Per-mirror trigram signatures that let text search skip files.
+
+``search_workspace`` and the Python fallback of ``rg_search_workspace`` read
+every file for every query. ``SearchIndex`` keeps, per file, a bit signature
+of the lowercased trigrams it contains (a Bloom filter sized to the file). A
+query's required trigrams are extracted from the literal, or from the literal
+runs of a regex; a file whose signature lacks any of them cannot match and is
+skipped without being opened.
+
+Signatures are keyed by ``(mtime_ns, size)``. Any file whose stat differs,
+e.g. after an edit, a fetch or a reset, is simply searched directly and
+re-indexed from the bytes that search already read, so the index never hides
+a match; it only gets faster as it fills. Each search spends at most
+``WORKSPACE_SEARCH_INDEX_BUILD_SECONDS`` indexing, so a large mirror is
+indexed over several searches rather than stalling the first one. Indexes
+live in memory (LRU over ``WORKSPACE_SEARCH_INDEX_MAX_REPOS`` mirrors) and
+are saved to ``.git/mcp-search-index`` inside the mirror.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle  # nosec B403
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from . import config
+from .config import BASE_LOGGER
+
+try:  # Python 3.11+
+    from re import _constants as _sre_constants  # type: ignore[attr-defined]
+    from re import _parser as _sre_parse  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_constants as _sre_constants  # type: ignore[no-redef]
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+LOGGER = BASE_LOGGER.getChild("search_index")
+
+_INDEX_FILENAME = "mcp-search-index"
+_INDEX_VERSION = 1
+# Signature sizes are powers of two between these bounds, ~4 bits per trigram.
+_MIN_BITS_LOG2 = 10
+_MAX_BITS_LOG2 = 19
+# ``bits_log2`` recorded for files search skips as binary.
+_BINARY = 0
+# Non-ASCII characters that case-insensitive matching folds onto ASCII letters
+# (``str.lower`` or ``re.IGNORECASE``); index them as their ASCII form.
+_ASCII_FOLDS = (("\u0130", "i"), ("\u0131", "i"), ("\u017f", "s"), ("\u212a", "k"))
+# Only trigrams inside runs of ASCII word characters are indexed: a query's
+# word runs always sit inside one word run of a matching line, and repeated
+# identifiers are hashed once (per process) rather than once per file.
+_WORD_CHARS = b"0123456789abcdefghijklmnopqrstuvwxyz_"
+_WORD_TABLE = bytes(c if c in _WORD_CHARS else 0x20 for c in range(256))
+_NON_WORD = re.compile(r"[^0-9a-z_]")
+_WORD_HASHES: dict[bytes, frozenset[int]] = {}
+_WORD_HASHES_MAX = 500_000
+_REPEATS = {
+    getattr(_sre_constants, name)
+    for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(_sre_constants, name)
+}
+
+
+def _normalize(data: bytes) -> bytes:
+    if data.isascii():
+        return data.lower()
+    text = data.decode("utf-8", errors="ignore")
+    for src, dst in _ASCII_FOLDS:
+        if src in text:
+            text = text.replace(src, dst)
+    return text.encode("utf-8").lower()
+
+
+def _trigrams(data: bytes) -> set[bytes]:
+    return {data[i : i + 3] for i in range(len(data) - 2)}
+
+
+def _trigram_hashes(data: bytes) -> set[int]:
+    """Hashes of the trigrams inside the (normalized) words of ``data``."""
+
+    out: set[int] = set()
+    cache = _WORD_HASHES
+    for word in set(data.translate(_WORD_TABLE).split()):
+        hashes = cache.get(word)
+        if hashes is None:
+            if len(cache) >= _WORD_HASHES_MAX:
+                cache.clear()
+            hashes = cache[word] = frozenset(
+                _hash(word[i : i + 3]) for i in range(len(word) - 2)
+            )
+        out |= hashes
+    return out
+
+
+def _hash(trigram: bytes) -> int:
+    return (int.from_bytes(trigram, "big") * 0x9E3779B1) & 0xFFFFFFFF
+
+
+def _signature(hashes: set[int] | frozenset[int], bits_log2: int) -> int:
+    shift = 32 - bits_log2
+    buf = bytearray(1 << (bits_log2 - 3))
+    for h in hashes:
+        bit = h >> shift
+        buf[bit >> 3] |= 1 << (bit & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _bits_log2(trigram_count: int) -> int:
+    wanted = max(1, trigram_count * 4 - 1).bit_length()
+    return min(_MAX_BITS_LOG2, max(_MIN_BITS_LOG2, wanted))
+
+
+def _regex_literal_runs(pattern: str) -> list[str]:
+    """Return literal strings every match of ``pattern`` must contain."""
+
+    try:
+        parsed = _sre_parse.parse(pattern, re.IGNORECASE)
+    except Exception:
+        return []
+
+    runs: list[str] = []
+    current: list[str] = []
+
+    def _flush() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    def _walk(items: Any) -> None:
+        for op, av in items:
+            if op is _sre_constants.LITERAL:
+                current.append(chr(av))
+            elif op is _sre_constants.SUBPATTERN:
+                _walk(av[-1])
+            elif op in _REPEATS:
+                _flush()
+                if av[0] >= 1:
+                    _walk(av[2])
+                    _flush()
+            elif op is _sre_constants.AT:
+                # Zero-width (^, $, \b): does not break a literal run.
+                continue
+            else:
+                # Alternation, classes, wildcards, lookarounds, ...
+                _flush()
+
+    _walk(parsed)
+    _flush()
+    return runs
+
+
+def query_trigrams(query: str, *, regex: bool) -> frozenset[bytes]:
+    """Lowercased ASCII word trigrams any line matching ``query`` contains."""
+
+    runs = _regex_literal_runs(query) if regex else [query]
+    out: set[bytes] = set()
+    for run in runs:
+        for segment in _NON_WORD.split(run.lower()):
+            if len(segment) >= 3:
+                out |= _trigrams(segment.encode("ascii"))
+    return frozenset(out)
+
+
+class IndexQuery:
+    """One search against a ``SearchIndex``: prunes files and fills the index."""
+
+    def __init__(self, index: SearchIndex, trigrams: frozenset[bytes]):
+        self.index = index
+        self.hashes = frozenset(_hash(t) for t in trigrams)
+        self._masks: dict[int, int] = {}
+        self.build_seconds = 0.0
+        self.pruned = 0
+        self.indexed = 0
+
+    def _entry(
+        self, rel_path: str, st: os.stat_result
+    ) -> tuple[int, int, int, int] | None:
+        entry = self.index.files.get(rel_path)
+        if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+            return None
+        return entry
+
+    def known_binary(self, rel_path: str, st: os.stat_result) -> bool:
+        entry = self._entry(rel_path, st)
+        return entry is not None and entry[2] == _BINARY
+
+    def check(self, rel_path: str, st: os.stat_result) -> bool | None:
+        """``False`` when the file cannot match; ``None`` when unknown."""
+
+        if not self.hashes:
+            return None
+        entry = self._entry(rel_path, st)
+        if entry is None or entry[2] == _BINARY:
+            return None
+        bits_log2, signature = entry[2], entry[3]
+        mask = self._masks.get(bits_log2)
+        if mask is None:
+            mask = _signature(self.hashes, bits_log2)
+            self._masks[bits_log2] = mask
+        if signature & mask == mask:
+            return True
+        self.pruned += 1
+        return False
+
+    def needs(self, rel_path: str, st: os.stat_result) -> bool:
+        """Whether to (re-)index ``rel_path`` from the bytes about to be read.
+
+        Indexing stops for this search once its build budget is spent; later
+        searches pick up where it left off.
+        """
+
+        if st.st_size > config.WORKSPACE_SEARCH_INDEX_MAX_FILE_BYTES:
+            return False
+        if self.build_seconds >= config.WORKSPACE_SEARCH_INDEX_BUILD_SECONDS:
+            return False
+        entry = self.index.files.get(rel_path)
+        return entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size
+
+    def add(self, rel_path: str, st: os.stat_result, data: bytes) -> None:
+        started = time.monotonic()
+        self.index.add(rel_path, st, data)
+        self.build_seconds += time.monotonic() - started
+        self.indexed += 1
+
+    def mark_binary(self, rel_path: str, st: os.stat_result) -> None:
+        """Remember that ``rel_path`` is binary so later searches skip it."""
+
+        if self._entry(rel_path, st) is None:
+            self.index.set_entry(rel_path, (st.st_mtime_ns, st.st_size, _BINARY, 0))
+
+    def finish(self) -> dict[str, Any]:
+        """Persist new entries and return this search's summary (blocking)."""
+
+        return self.index.finish(self)
+
+
+class SearchIndex:
+    """Trigram signatures for the files of one mirror."""
+
+    def __init__(self, root: str):
+        self.root = root
+        # rel_path -> (mtime_ns, size, bits_log2, signature)
+        self.files: dict[str, tuple[int, int, int, int]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.build_seconds = 0.0
+        self.load_seconds = 0.0
+        self.indexed = 0
+        self.queries = 0
+        self.pruned = 0
+        self.saved_bytes = 0
+
+    @property
+    def path(self) -> str | None:
+        git_dir = os.path.join(self.root, ".git")
+        if not os.path.isdir(git_dir):
+            return None
+        return os.path.join(git_dir, _INDEX_FILENAME)
+
+    def load(self) -> None:
+        path = self.path
+        if path is None:
+            return
+        started = time.monotonic()
+        try:
+            with open(path, "rb") as fh:
+                payload = pickle.load(fh)  # nosec B301 - written by save()
+            self.saved_bytes = os.path.getsize(path)
+        except FileNotFoundError:
+            return
+        except Exception as exc:
+            LOGGER.warning("Discarding unreadable search index %s: %s", path, exc)
+            return
+        if isinstance(payload, dict) and payload.get("version") == _INDEX_VERSION:
+            self.files = payload.get("files") or {}
+        self.load_seconds = time.monotonic() - started
+
+    def save(self) -> None:
+        path = self.path
+        with self._lock:
+            if path is None or not self._dirty:
+                return
+            payload = {"version": _INDEX_VERSION, "files": dict(self.files)}
+            self._dirty = False
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as fh:
+                pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            self.saved_bytes = os.path.getsize(path)
+        except OSError as exc:
+            LOGGER.warning("Cannot save search index %s: %s", path, exc)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def query(self, query: str, *, regex: bool) -> IndexQuery:
+        self.queries += 1
+        return IndexQuery(self, query_trigrams(query, regex=regex))
+
+    def add(self, rel_path: str, st: os.stat_result, data: bytes) -> None:
+        started = time.monotonic()
+        hashes = _trigram_hashes(_normalize(data))
+        bits_log2 = _bits_log2(len(hashes))
+        entry = (st.st_mtime_ns, st.st_size, bits_log2, _signature(hashes, bits_log2))
+        self.set_entry(rel_path, entry)
+        with self._lock:
+            self.indexed += 1
+            self.build_seconds += time.monotonic() - started
+
+    def set_entry(self, rel_path: str, entry: tuple[int, int, int, int]) -> None:
+        with self._lock:
+            self.files[rel_path] = entry
+            self._dirty = True
+
+    def retain(self, seen: set[str]) -> None:
+        """Drop entries for files a full walk no longer found."""
+
+        with self._lock:
+            stale = [rel for rel in self.files if rel not in seen]
+            for rel in stale:
+                del self.files[rel]
+            if stale:
+                self._dirty = True
+
+    def finish(self, query: IndexQuery) -> dict[str, Any]:
+        """Record a finished search, persist new entries, return its summary."""
+
+        self.pruned += query.pruned
+        self.save()
+        return {
+            "files": len(self.files),
+            "pruned": query.pruned,
+            "indexed": query.indexed,
+            "build_seconds": round(query.build_seconds, 6),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "root": self.root,
+            "files": len(self.files),
+            "signature_bytes": sum(
+                1 << (e[2] - 3) for e in self.files.values() if e[2] != _BINARY
+            ),
+            "saved_bytes": self.saved_bytes,
+            "indexed": self.indexed,
+            "build_seconds": round(self.build_seconds, 6),
+            "load_seconds": round(self.load_seconds, 6),
+            "queries": self.queries,
+            "pruned": self.pruned,
+        }
+
+
+class SearchIndexCache:
+    """In-memory indexes for recently searched mirrors."""
+
+    def __init__(self, max_repos: int):
+        self.max_repos = max(1, max_repos)
+        self._indexes: OrderedDict[str, SearchIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, repo_dir: str) -> SearchIndex | None:
+        """Return the index for ``repo_dir`` (blocking: may read from disk)."""
+
+        if not config.WORKSPACE_SEARCH_INDEX:
+            return None
+        root = os.path.realpath(repo_dir)
+        with self._lock:
+            index = self._indexes.get(root)
+            if index is not None:
+                self._indexes.move_to_end(root)
+                return index
+            index = SearchIndex(root)
+            index.load()
+            self._indexes[root] = index
+            while len(self._indexes) > self.max_repos:
+                self._indexes.popitem(last=False)
+            return index
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            indexes = list(self._indexes.values())
+        return {
+            "enabled": bool(config.WORKSPACE_SEARCH_INDEX),
+            "max_repos": self.max_repos,
+            "indexes": [index.stats() for index in indexes],
+        }
+
+
+SEARCH_INDEXES = SearchIndexCache(config.WORKSPACE_SEARCH_INDEX_MAX_REPOS)
+
+
+def search_index_stats() -> dict[str, Any]:
+    return SEARCH_INDEXES.stats()
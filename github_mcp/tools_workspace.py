@@ -33,6 +33,7 @@ from github_mcp.workspace_tools import git_worktree as _git_worktree
 from github_mcp.workspace_tools import listing as _listing
 from github_mcp.workspace_tools import pr as _pr
 from github_mcp.workspace_tools import rg as _rg
+from github_mcp.workspace_tools import scratch as _scratch
 from github_mcp.workspace_tools import suites as _suites
 from github_mcp.workspace_tools import task_workflows as _task_workflows
 from github_mcp.workspace_tools import venv as _venv
@@ -80,6 +81,7 @@ _resolve_ref = _shared._resolve_ref
 
 # tools
 ensure_workspace_clone = _clone.ensure_workspace_clone
+get_workspace_pool_stats = _clone.get_workspace_pool_stats
 
 _workspace_safe_join = _fs._workspace_safe_join
 _workspace_read_text = _fs._workspace_read_text
@@ -126,6 +128,10 @@ rg_search_workspace = _rg.rg_search_workspace
 render_shell = _commands.render_shell
 terminal_command = _commands.terminal_command
 run_python = _commands.run_python
+read_command_output = _commands.read_command_output
+
+# Disposable copies of the mirror for speculative edits and test runs.
+run_in_scratch_workspace = _scratch.run_in_scratch_workspace
 
 # Backward-compatible aliases for older callers/tool catalogs.
 run_command = _commands.run_command_alias
@@ -219,6 +225,7 @@ __all__ = [
     "_resolve_full_name",
     "_resolve_ref",
     "ensure_workspace_clone",
+    "get_workspace_pool_stats",
     "get_workspace_file_contents",
     "get_workspace_files_contents",
     "read_workspace_file_excerpt",
@@ -259,6 +266,8 @@ __all__ = [
     "terminal_commands",
     "run_terminal_commands",
     "run_python",
+    "read_command_output",
+    "run_in_scratch_workspace",
     "workspace_create_branch",
     "workspace_delete_branch",
     "workspace_self_heal_branch",
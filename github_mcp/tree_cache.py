@@ -0,0 +1,206 @@
+"""In-process cache of parsed git trees, keyed by tree SHA.
+
+Git trees are immutable, so a recursive listing fetched once for a tree SHA can
+be reused for the lifetime of the process. Each cached tree is indexed by path
+in sorted order, which turns prefix filtering, type selection and paging into
+``bisect`` range lookups instead of scans over the full listing (large
+monorepos return 100k+ entries).
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+from . import config
+
+_TYPES = ("blob", "tree")
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    # Smallest string greater than every string starting with ``prefix``.
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class TreeIndex:
+    """Sorted, per-type path index over one git tree listing."""
+
+    def __init__(
+        self,
+        entries: Iterable[Any],
+        *,
+        sha: str | None = None,
+        truncated: bool = False,
+        normalize_path: Callable[[str], str] | None = None,
+    ):
+        by_type: dict[str, list[tuple[str, dict[str, Any]]]] = {t: [] for t in _TYPES}
+        for entry in entries:
+            if not isinstance(entry, Mapping):
+                continue
+            entry_type = entry.get("type")
+            path = entry.get("path")
+            if entry_type not in by_type or not isinstance(path, str):
+                continue
+            by_type[entry_type].append(
+                (
+                    path,
+                    {
+                        "path": normalize_path(path) if normalize_path else path,
+                        "type": entry_type,
+                        "mode": entry.get("mode"),
+                        "size": entry.get("size"),
+                        "sha": entry.get("sha"),
+                    },
+                )
+            )
+
+        self.sha = sha
+        self.truncated = truncated
+        self._blob_shas: dict[str, str] | None = None
+        self._paths: dict[str, list[str]] = {}
+        self._entries: dict[str, list[dict[str, Any]]] = {}
+        for entry_type, items in by_type.items():
+            items.sort(key=lambda item: item[0])
+            self._paths[entry_type] = [path for path, _ in items]
+            self._entries[entry_type] = [entry for _, entry in items]
+        merged = sorted(
+            (item for items in by_type.values() for item in items),
+            key=lambda item: item[0],
+        )
+        self._paths["*"] = [path for path, _ in merged]
+        self._entries["*"] = [entry for _, entry in merged]
+
+    def __len__(self) -> int:
+        return len(self._paths["*"])
+
+    def _bucket(self, types: Iterable[str]) -> str | None:
+        wanted = {t for t in types if t in _TYPES}
+        if not wanted:
+            return None
+        if len(wanted) == len(_TYPES):
+            return "*"
+        return wanted.pop()
+
+    def _range(self, bucket: str, prefix: str | None) -> tuple[int, int]:
+        paths = self._paths[bucket]
+        if not prefix:
+            return 0, len(paths)
+        lo = bisect.bisect_left(paths, prefix)
+        hi = bisect.bisect_left(paths, _prefix_upper_bound(prefix), lo)
+        return lo, hi
+
+    def count(self, *, prefix: str | None = None, types: Iterable[str] = _TYPES) -> int:
+        bucket = self._bucket(types)
+        if bucket is None:
+            return 0
+        lo, hi = self._range(bucket, prefix)
+        return hi - lo
+
+    def select(
+        self,
+        *,
+        prefix: str | None = None,
+        types: Iterable[str] = _TYPES,
+        start_after: str | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Return entries under ``prefix`` in path order plus a resume cursor.
+
+        ``start_after`` is the cursor returned by a previous call; the cursor is
+        None once the range is exhausted.
+        """
+
+        bucket = self._bucket(types)
+        if bucket is None:
+            return [], None
+        paths = self._paths[bucket]
+        lo, hi = self._range(bucket, prefix)
+        if start_after:
+            lo = max(lo, bisect.bisect_right(paths, start_after, lo, hi))
+        end = hi if limit is None or limit <= 0 else min(hi, lo + limit)
+        cursor = paths[end - 1] if end < hi and end > lo else None
+        return self._entries[bucket][lo:end], cursor
+
+    def blob_sizes(self) -> dict[str, int]:
+        """Map blob paths to their sizes in bytes."""
+
+        return {
+            entry["path"]: entry["size"]
+            for entry in self._entries["blob"]
+            if isinstance(entry.get("size"), int)
+        }
+
+    def blob_shas(self) -> dict[str, str]:
+        """Map blob paths to blob SHAs (built once per tree)."""
+
+        if self._blob_shas is None:
+            self._blob_shas = {
+                entry["path"]: entry["sha"]
+                for entry in self._entries["blob"]
+                if isinstance(entry.get("sha"), str)
+            }
+        return self._blob_shas
+
+
+class TreeCache:
+    """LRU cache of ``TreeIndex`` objects capped by total entry count."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._cache: OrderedDict[str, TreeIndex] = OrderedDict()
+        self._current_entries = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> TreeIndex | None:
+        index = self._cache.get(key)
+        if index is None:
+            self.misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return index
+
+    def put(self, key: str, index: TreeIndex) -> None:
+        if self.max_entries > 0 and len(index) > self.max_entries:
+            return
+        existing = self._cache.pop(key, None)
+        if existing is not None:
+            self._current_entries -= len(existing)
+        self._cache[key] = index
+        self._current_entries += len(index)
+        while self.max_entries > 0 and self._current_entries > self.max_entries:
+            _, evicted = self._cache.popitem(last=False)
+            self._current_entries -= len(evicted)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._current_entries = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "trees": len(self._cache),
+            "entries": self._current_entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+TREE_CACHE = TreeCache(max_entries=config.TREE_CACHE_MAX_ENTRIES)
+
+
+def tree_cache_key(full_name: str, tree_sha: str, *, recursive: bool) -> str:
+    return "|".join([full_name, tree_sha, "recursive" if recursive else "top"])
+
+
+def clear_tree_cache() -> None:
+    TREE_CACHE.clear()
+
+
+def tree_cache_stats() -> dict[str, Any]:
+    return TREE_CACHE.stats()
@@ -14,7 +14,18 @@ from typing import Any
 from . import config
 from .exceptions import GitHubAPIError, GitHubAuthError
 from .http_clients import _get_github_token
+from .output_capture import capture_fields, new_captures
+from .output_stream import current_output_stream
+from .ref_cache import REF_CACHE, is_commit_sha
 from .utils import _get_main_module, _parse_github_remote_repo
+from .workspace_freshness import WORKSPACE_FRESHNESS, run_coalesced
+from .workspace_locks import WORKSPACE_LOCKS
+from .workspace_pool import (
+    _SHARED_STORE_DIRNAME,
+    WORKSPACE_POOL,
+    schedule_budget_enforcement,
+)
+from .workspace_shell import WARM_SHELLS, warm_shell_available
 
 
 def _is_git_rate_limit_error(message: str) -> bool:
@@ -66,20 +77,9 @@ async def _run_git_with_retry(
         return result
 
 
-async def _run_shell(
-    cmd: str,
-    cwd: str | None = None,
-    timeout_seconds: int = 0,
-    env: dict[str, str] | None = None,
-) -> dict[str, Any]:
-    """Execute a shell command with author/committer env vars injected."""
-    shell_executable = os.environ.get("SHELL")
-    if os.name == "nt":
-        shell_executable = shell_executable or shutil.which("bash")
-
+def _git_identity_env() -> dict[str, str]:
     main_module = _get_main_module()
-    proc_env = {
-        **os.environ,
+    return {
         "GIT_AUTHOR_NAME": getattr(
             main_module, "GIT_AUTHOR_NAME", config.GIT_AUTHOR_NAME
         ),
@@ -93,6 +93,14 @@ async def _run_shell(
             main_module, "GIT_COMMITTER_EMAIL", config.GIT_COMMITTER_EMAIL
         ),
     }
+
+
+def _shell_env(
+    cwd: str | None, env: dict[str, str] | None, identity: dict[str, str]
+) -> dict[str, str]:
+    """Build the environment for a workspace shell."""
+
+    proc_env = {**os.environ, **identity}
     if env is not None:
         proc_env.update(env)
 
@@ -117,6 +125,59 @@ async def _run_shell(
         except Exception:  # nosec B110
             # Avoid failing the tool due to PATH decoration.
             pass
+    return proc_env
+
+
+async def _run_shell(
+    cmd: str,
+    cwd: str | None = None,
+    timeout_seconds: int = 0,
+    env: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """Execute a shell command with author/committer env vars injected."""
+    shell_executable = os.environ.get("SHELL")
+    if os.name == "nt":
+        shell_executable = shell_executable or shutil.which("bash")
+
+    identity = _git_identity_env()
+    stdout_capture, stderr_capture, output_handle = await new_captures()
+    live = current_output_stream()
+
+    if cwd and warm_shell_available():
+
+        async def _deliver(name: str, chunk: bytes) -> None:
+            capture = stdout_capture if name == "stdout" else stderr_capture
+            capture.feed(chunk)
+            await capture.flush()
+            if live is not None:
+                await live.send(name, chunk)
+
+        key = (
+            os.path.realpath(cwd),
+            tuple(sorted(identity.items())),
+            tuple(sorted((env or {}).items())),
+        )
+        try:
+            warm = await WARM_SHELLS.run(
+                cmd,
+                key=key,
+                cwd=cwd,
+                build_env=lambda: _shell_env(cwd, env, identity),
+                timeout_seconds=timeout_seconds,
+                on_output=_deliver,
+            )
+        except BaseException:
+            await capture_fields(stdout_capture, stderr_capture, output_handle)
+            raise
+        if warm is not None:
+            exit_code, timed_out = warm
+            return {
+                "exit_code": exit_code,
+                "timed_out": timed_out,
+                **await capture_fields(stdout_capture, stderr_capture, output_handle),
+            }
+
+    proc_env = _shell_env(cwd, env, identity)
 
     start_new_session = os.name != "nt"
     proc = await asyncio.create_subprocess_shell(
@@ -164,14 +225,43 @@ async def _run_shell(
             except Exception:  # nosec B110
                 pass
 
+    async def _pump(stream, capture, name: str) -> None:
+        while True:
+            chunk = await stream.read(64 * 1024)
+            if not chunk:
+                return
+            capture.feed(chunk)
+            await capture.flush()
+            if live is not None:
+                # Waits while the live reader is behind, pausing the command.
+                await live.send(name, chunk)
+
+    async def _collect_output() -> None:
+        """Stream both pipes into the captures until the process exits.
+
+        Resumable: after a timeout cancels it, calling it again picks up
+        whatever the pipes still hold.
+        """
+
+        stdout_stream = getattr(proc, "stdout", None)
+        stderr_stream = getattr(proc, "stderr", None)
+        if stdout_stream is None or stderr_stream is None:
+            stdout_bytes, stderr_bytes = await proc.communicate()
+            stdout_capture.feed(stdout_bytes or b"")
+            stderr_capture.feed(stderr_bytes or b"")
+            return
+        await asyncio.gather(
+            _pump(stdout_stream, stdout_capture, "stdout"),
+            _pump(stderr_stream, stderr_capture, "stderr"),
+        )
+        await proc.wait()
+
     try:
         if timeout_seconds and timeout_seconds > 0:
-            stdout_bytes, stderr_bytes = await asyncio.wait_for(
-                proc.communicate(), timeout=timeout_seconds
-            )
+            await asyncio.wait_for(_collect_output(), timeout=timeout_seconds)
             timed_out = False
         else:
-            stdout_bytes, stderr_bytes = await proc.communicate()
+            await _collect_output()
             timed_out = False
     except asyncio.CancelledError:
         # Client disconnects/cancellation: ensure the subprocess does not keep
@@ -191,6 +281,8 @@ async def _run_shell(
             await asyncio.shield(_terminate_process())
         except Exception:  # nosec B110
             pass
+        finally:
+            await capture_fields(stdout_capture, stderr_capture, output_handle)
         raise
     except asyncio.TimeoutError:
         timed_out = True
@@ -215,32 +307,26 @@ async def _run_shell(
             if collect_timeout_int <= 0:
                 collect_timeout_int = 1
 
-            stdout_bytes, stderr_bytes = await asyncio.wait_for(
-                proc.communicate(), timeout=float(collect_timeout_int)
+            await asyncio.wait_for(
+                _collect_output(), timeout=float(collect_timeout_int)
             )
         except Exception as exc:
             # Do not swallow errors while collecting stdout/stderr after a timeout.
-            # When communicate() fails (e.g., pipes already closed), return a
-            # diagnostic string in stderr so callers can surface meaningful context.
-            stdout_bytes = b""
+            # When collection fails (e.g., pipes already closed), keep what was
+            # read and add a diagnostic to stderr so callers can surface context.
             try:
-                stderr_bytes = (
+                message = (
                     f"Failed to collect process output after timeout: {exc.__class__.__name__}: {exc}\n"
                 ).encode("utf-8", errors="replace")
             except Exception:
-                stderr_bytes = b"Failed to collect process output after timeout.\n"
-
-    raw_stdout = stdout_bytes.decode("utf-8", errors="replace")
-    raw_stderr = stderr_bytes.decode("utf-8", errors="replace")
+                message = b"Failed to collect process output after timeout.\n"
+            stderr_capture.feed(message)
 
-    # No truncation (by request).
+    # Output is only bounded inside bounded_output(); see output_capture.
     return {
         "exit_code": proc.returncode,
         "timed_out": timed_out,
-        "stdout": raw_stdout,
-        "stderr": raw_stderr,
-        "stdout_truncated": False,
-        "stderr_truncated": False,
+        **await capture_fields(stdout_capture, stderr_capture, output_handle),
     }
 
 
@@ -362,6 +448,220 @@ def _sanitize_workspace_ref(ref: str) -> str:
     return "/".join(parts)
 
 
+def _shared_store_path(full_name: str) -> str:
+    """Return the bare repository whose objects every ref mirror of a repo shares."""
+
+    main_module = _get_main_module()
+    base_dir = getattr(main_module, "WORKSPACE_BASE_DIR", config.WORKSPACE_BASE_DIR)
+    return os.path.join(base_dir, full_name.replace("/", "__"), _SHARED_STORE_DIRNAME)
+
+
+def _shared_store_fetch_cmd(store_dir: str) -> str:
+    """Fetch command that updates a ref mirror's origin/* from the shared store."""
+
+    refspec = shlex.quote("+refs/heads/*:refs/remotes/origin/*")
+    return f"git fetch --prune {shlex.quote(store_dir)} {refspec}"
+
+
+async def _run_git_with_auth_fallback(
+    run_shell,
+    cmd: str,
+    *,
+    cwd: str | None,
+    timeout_seconds: int,
+    env: dict[str, str],
+    no_auth_env: dict[str, str],
+) -> dict[str, Any]:
+    result = await _run_git_with_retry(
+        run_shell, cmd, cwd=cwd, timeout_seconds=timeout_seconds, env=env
+    )
+    if result["exit_code"] != 0:
+        stderr = result.get("stderr", "") or result.get("stdout", "")
+        if _is_git_auth_error(stderr) and _git_env_has_auth_header(env):
+            result = await _run_git_with_retry(
+                run_shell,
+                cmd,
+                cwd=cwd,
+                timeout_seconds=timeout_seconds,
+                env=no_auth_env,
+            )
+    return result
+
+
+async def _refresh_shared_store(
+    run_shell,
+    full_name: str,
+    *,
+    create: bool,
+    timeout_seconds: int,
+    env: dict[str, str],
+    no_auth_env: dict[str, str],
+) -> str | None:
+    """Fetch (or create) the shared bare store for ``full_name``.
+
+    One fetch here brings in the objects for every branch, so ref mirrors can
+    then be cloned or refreshed from the store without touching the network.
+    Returns the store path, or ``None`` when it is disabled or unavailable and
+    callers should talk to GitHub directly.
+    """
+
+    if not config.WORKSPACE_SHARED_OBJECTS:
+        return None
+
+    store_dir = _shared_store_path(full_name)
+    if os.path.isdir(store_dir):
+        result = await _run_git_with_auth_fallback(
+            run_shell,
+            "git fetch origin --prune",
+            cwd=store_dir,
+            timeout_seconds=timeout_seconds,
+            env=env,
+            no_auth_env=no_auth_env,
+        )
+        return store_dir if result["exit_code"] == 0 else None
+    if not create:
+        return None
+
+    parent = os.path.dirname(store_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmpdir = tempfile.mkdtemp(prefix=".objects-", dir=parent)
+    q_url = shlex.quote(f"https://github.com/{full_name}.git")
+    steps = [
+        (f"git clone --bare {q_url} {shlex.quote(tmpdir)}", None),
+        # Bare clones have no fetch refspec; mirror branches and tags 1:1.
+        (
+            "git config remote.origin.fetch "
+            + shlex.quote("+refs/heads/*:refs/heads/*"),
+            tmpdir,
+        ),
+        (
+            "git config --add remote.origin.fetch "
+            + shlex.quote("+refs/tags/*:refs/tags/*"),
+            tmpdir,
+        ),
+        # Ref mirrors borrow objects via alternates; never prune them away.
+        ("git config gc.pruneExpire never", tmpdir),
+    ]
+    for cmd, cwd in steps:
+        result = await _run_git_with_auth_fallback(
+            run_shell,
+            cmd,
+            cwd=cwd,
+            timeout_seconds=timeout_seconds,
+            env=env,
+            no_auth_env=no_auth_env,
+        )
+        if result["exit_code"] != 0:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            return None
+
+    try:
+        os.rename(tmpdir, store_dir)
+    except OSError:
+        # A concurrent clone created the store first.
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return store_dir if os.path.isdir(store_dir) else None
+
+
+def _clone_strategy_flags() -> str:
+    """Extra ``git clone`` flags for partial, shallow, and sparse mirrors."""
+
+    flags = []
+    if config.WORKSPACE_CLONE_FILTER:
+        flags.append(f"--filter={shlex.quote(config.WORKSPACE_CLONE_FILTER)}")
+    if config.WORKSPACE_CLONE_DEPTH > 0:
+        flags.append(f"--depth {int(config.WORKSPACE_CLONE_DEPTH)}")
+    if config.WORKSPACE_SPARSE_PATHS:
+        flags.append("--sparse")
+    return "".join(f"{flag} " for flag in flags)
+
+
+async def _init_sparse_checkout(
+    run_shell, repo_dir: str, *, timeout_seconds: int, env: dict[str, str]
+) -> None:
+    """Set the configured sparse-checkout cone on a freshly cloned mirror."""
+
+    if not config.WORKSPACE_SPARSE_PATHS:
+        return
+    paths = " ".join(shlex.quote(p) for p in config.WORKSPACE_SPARSE_PATHS)
+    result = await _run_git_with_retry(
+        run_shell,
+        f"git sparse-checkout set --cone {paths}",
+        cwd=repo_dir,
+        timeout_seconds=timeout_seconds,
+        env=env,
+    )
+    if result["exit_code"] != 0:
+        shutil.rmtree(repo_dir, ignore_errors=True)
+        stderr = result.get("stderr", "") or result.get("stdout", "")
+        raise GitHubAPIError(f"git sparse-checkout set failed: {stderr}")
+
+
+async def _widen_sparse_checkout(repo_dir: str, paths: list[str]) -> list[str]:
+    """Add directories holding ``paths`` to a sparse mirror's checkout cone.
+
+    Paths that already exist on disk (or that are not in ``HEAD``) are left
+    alone, so this is a no-op for full checkouts. Returns the directories that
+    were added; their blobs are fetched on demand for partial clones.
+    """
+
+    if not os.path.isfile(os.path.join(repo_dir, ".git", "info", "sparse-checkout")):
+        return []
+    missing: list[str] = []
+    for path in paths:
+        rel = (path or "").replace("\\", "/")
+        if os.path.isabs(rel):
+            continue
+        rel = rel.strip("/")
+        if rel and not os.path.lexists(os.path.join(repo_dir, rel)):
+            missing.append(rel)
+    if not missing:
+        return []
+
+    main_module = _get_main_module()
+    run_shell = getattr(main_module, "_run_shell", _run_shell)
+    git_timeout = int(getattr(config, "ADAPTIV_MCP_DEFAULT_TIMEOUT_SECONDS", 0) or 0)
+    enabled = await run_shell(
+        "git config --get core.sparseCheckout",
+        cwd=repo_dir,
+        timeout_seconds=git_timeout,
+    )
+    if (enabled.get("stdout", "") or "").strip().lower() != "true":
+        return []
+
+    dirs: list[str] = []
+    for rel in missing:
+        kind = await run_shell(
+            f"git cat-file -t {shlex.quote('HEAD:' + rel)}",
+            cwd=repo_dir,
+            timeout_seconds=git_timeout,
+        )
+        object_type = (kind.get("stdout", "") or "").strip()
+        if object_type == "tree":
+            cone_dir = rel
+        elif object_type == "blob":
+            cone_dir = os.path.dirname(rel)
+        else:
+            continue
+        # Files at the top level are always part of a cone checkout.
+        if cone_dir and cone_dir not in dirs:
+            dirs.append(cone_dir)
+    if not dirs:
+        return []
+
+    result = await _run_git_with_retry(
+        run_shell,
+        "git sparse-checkout add " + " ".join(shlex.quote(d) for d in dirs),
+        cwd=repo_dir,
+        timeout_seconds=git_timeout,
+        env=_git_auth_env(),
+    )
+    if result["exit_code"] != 0:
+        stderr = result.get("stderr", "") or result.get("stdout", "")
+        raise GitHubAPIError(f"git sparse-checkout add failed: {stderr}")
+    return dirs
+
+
 async def _ensure_repo_remote(
     run_shell,
     repo_dir: str,
@@ -431,11 +731,115 @@ async def _clone_repo(
     workspace_dir = _workspace_path(full_name, effective_ref)
     os.makedirs(os.path.dirname(workspace_dir), exist_ok=True)
 
+    existed = os.path.isdir(os.path.join(workspace_dir, ".git"))
+    if (
+        existed
+        and preserve_changes
+        and WORKSPACE_FRESHNESS.is_fresh(workspace_dir)
+        and _head_branch(workspace_dir) == effective_ref
+    ):
+        WORKSPACE_FRESHNESS.skipped_fresh += 1
+        WORKSPACE_POOL.note_access(workspace_dir, full_name, effective_ref, hit=True)
+        return workspace_dir
+
+    async def _locked_sync() -> str:
+        # Pin the shared store too: the pool must not delete it while this
+        # refresh fetches into it or clones a mirror that borrows its objects.
+        store_dir = _shared_store_path(full_name)
+        async with WORKSPACE_LOCKS.hold(workspace_dir, write=True, pin=True):
+            async with WORKSPACE_LOCKS.hold(store_dir, write=False, pin=True):
+                return await _sync_repo_mirror(
+                    full_name,
+                    effective_ref,
+                    workspace_dir,
+                    preserve_changes=preserve_changes,
+                )
+
+    # Concurrent tool calls on the same mirror share one refresh. A caller that
+    # already holds the mirror lets go while it waits; otherwise a leader
+    # waiting for the exclusive lock would wait on it forever.
+    async with WORKSPACE_LOCKS.released(workspace_dir):
+        repo_dir = await run_coalesced(
+            f"{workspace_dir}\0{int(preserve_changes)}", _locked_sync
+        )
+    WORKSPACE_POOL.note_access(workspace_dir, full_name, effective_ref, hit=existed)
+    if not existed:
+        schedule_budget_enforcement(protect=workspace_dir)
+    return repo_dir
+
+
+def _head_branch(repo_dir: str) -> str | None:
+    """Read the checked-out branch from ``.git/HEAD`` without spawning git."""
+
+    try:
+        with open(os.path.join(repo_dir, ".git", "HEAD"), encoding="utf-8") as fh:
+            head = fh.read().strip()
+    except OSError:
+        return None
+    prefix = "ref: refs/heads/"
+    return head[len(prefix) :] if head.startswith(prefix) else None
+
+
+def _read_ref_sha(repo_dir: str, refname: str) -> str | None:
+    """Resolve ``refname`` from loose refs or ``packed-refs`` without git."""
+
+    git_dir = os.path.join(repo_dir, ".git")
+    try:
+        with open(os.path.join(git_dir, *refname.split("/")), encoding="utf-8") as fh:
+            sha = fh.read().strip()
+        return sha if is_commit_sha(sha) else None
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(git_dir, "packed-refs"), encoding="utf-8") as fh:
+            for line in fh:
+                sha, _, name = line.strip().partition(" ")
+                if name == refname and is_commit_sha(sha):
+                    return sha
+    except OSError:
+        pass
+    return None
+
+
+async def _remote_branch_sha(
+    run_shell,
+    full_name: str,
+    ref: str,
+    repo_dir: str,
+    *,
+    timeout_seconds: int,
+    env: dict[str, str],
+) -> str | None:
+    """Current upstream commit of branch ``ref``: ref cache, then ``ls-remote``."""
+
+    cached = REF_CACHE.get(full_name, ref)
+    if cached:
+        return cached
+    result = await run_shell(
+        f"git ls-remote origin {shlex.quote('refs/heads/' + ref)}",
+        cwd=repo_dir,
+        timeout_seconds=timeout_seconds,
+        env=env,
+    )
+    if result.get("exit_code", 0) != 0:
+        return None
+    sha = (result.get("stdout", "") or "").split("\t", 1)[0].strip()
+    return sha if is_commit_sha(sha) else None
+
+
+async def _sync_repo_mirror(
+    full_name: str,
+    effective_ref: str,
+    workspace_dir: str,
+    *,
+    preserve_changes: bool,
+) -> str:
     main_module = _get_main_module()
     run_shell = getattr(main_module, "_run_shell", _run_shell)
     auth_env = _git_auth_env()
     no_auth_env = _git_no_auth_env()
     git_env = auth_env
+    origin_ref = f"refs/remotes/origin/{effective_ref}"
 
     if os.path.isdir(os.path.join(workspace_dir, ".git")):
         git_timeout = int(
@@ -448,6 +852,37 @@ async def _clone_repo(
             timeout_seconds=git_timeout,
             env=git_env,
         )
+        remote_sha = None
+        known_sha = WORKSPACE_FRESHNESS.remote_sha(workspace_dir)
+        if preserve_changes and known_sha:
+            remote_sha = await _remote_branch_sha(
+                run_shell,
+                full_name,
+                effective_ref,
+                workspace_dir,
+                timeout_seconds=git_timeout,
+                env=git_env,
+            )
+        fetch_cmd = None
+        if remote_sha is not None and remote_sha == known_sha:
+            # The branch has not moved upstream since the last fetch.
+            WORKSPACE_FRESHNESS.mark_unchanged(workspace_dir)
+        else:
+            # Refresh the shared store once, then update this mirror from it
+            # locally.
+            store_dir = await _refresh_shared_store(
+                run_shell,
+                full_name,
+                create=False,
+                timeout_seconds=git_timeout,
+                env=git_env,
+                no_auth_env=no_auth_env,
+            )
+            fetch_cmd = (
+                _shared_store_fetch_cmd(store_dir)
+                if store_dir
+                else "git fetch origin --prune"
+            )
         if preserve_changes:
             # Workspace directories are keyed by ref, so callers expect the repo mirror
             # (workspace mirror) to be checked out on ``effective_ref``. Some tools
@@ -455,34 +890,45 @@ async def _clone_repo(
             # existing repo mirror. When preserving changes we avoid destructive
             # resets, but we still enforce the requested branch when the repo mirror
             # is clean.
-            fetch_result = await _run_git_with_retry(
-                run_shell,
-                "git fetch origin --prune",
-                cwd=workspace_dir,
-                timeout_seconds=git_timeout,
-                env=git_env,
-            )
-            if fetch_result["exit_code"] != 0:
-                stderr = fetch_result.get("stderr", "") or fetch_result.get(
-                    "stdout", ""
+            if fetch_cmd is not None:
+                fetch_result = await _run_git_with_retry(
+                    run_shell,
+                    fetch_cmd,
+                    cwd=workspace_dir,
+                    timeout_seconds=git_timeout,
+                    env=git_env,
                 )
-                if _is_git_auth_error(stderr) and _git_env_has_auth_header(git_env):
-                    fetch_result = await _run_git_with_retry(
-                        run_shell,
-                        "git fetch origin --prune",
-                        cwd=workspace_dir,
-                        timeout_seconds=git_timeout,
-                        env=no_auth_env,
-                    )
-                    if fetch_result["exit_code"] == 0:
-                        git_env = no_auth_env
-                        return workspace_dir
+                if fetch_result["exit_code"] != 0:
                     stderr = fetch_result.get("stderr", "") or fetch_result.get(
                         "stdout", ""
                     )
-                _raise_git_auth_error("Repo mirror fetch", stderr)
-                raise GitHubAPIError(
-                    f"Repo mirror fetch failed for {full_name}@{effective_ref}: {stderr}"
+                    if _is_git_auth_error(stderr) and _git_env_has_auth_header(git_env):
+                        fetch_result = await _run_git_with_retry(
+                            run_shell,
+                            fetch_cmd,
+                            cwd=workspace_dir,
+                            timeout_seconds=git_timeout,
+                            env=no_auth_env,
+                        )
+                        if fetch_result["exit_code"] == 0:
+                            git_env = no_auth_env
+                            WORKSPACE_FRESHNESS.record_fetch(
+                                workspace_dir,
+                                full_name,
+                                _read_ref_sha(workspace_dir, origin_ref),
+                            )
+                            return workspace_dir
+                        stderr = fetch_result.get("stderr", "") or fetch_result.get(
+                            "stdout", ""
+                        )
+                    _raise_git_auth_error("Repo mirror fetch", stderr)
+                    raise GitHubAPIError(
+                        f"Repo mirror fetch failed for {full_name}@{effective_ref}: {stderr}"
+                    )
+                WORKSPACE_FRESHNESS.record_fetch(
+                    workspace_dir,
+                    full_name,
+                    remote_sha or _read_ref_sha(workspace_dir, origin_ref),
                 )
 
             # Ensure we are on the expected branch/ref.
@@ -539,7 +985,7 @@ async def _clone_repo(
         # When not preserving changes, ensure we are on the requested branch/ref and
         # hard-reset to match origin.
         refresh_steps = [
-            ("git fetch origin --prune", git_timeout),
+            (fetch_cmd, git_timeout),
             (f"git checkout -B {q_ref} origin/{q_ref}", git_timeout),
             (f"git reset --hard origin/{q_ref}", git_timeout),
             ("git clean -fdx --exclude .venv-mcp", git_timeout),
@@ -572,18 +1018,60 @@ async def _clone_repo(
                     f"Repo mirror refresh failed for {full_name}@{effective_ref}: {stderr}"
                 )
 
+        WORKSPACE_FRESHNESS.record_fetch(
+            workspace_dir, full_name, _read_ref_sha(workspace_dir, origin_ref)
+        )
         return workspace_dir
 
     if os.path.exists(workspace_dir):
         shutil.rmtree(workspace_dir)
 
+    git_timeout = int(getattr(config, "ADAPTIV_MCP_DEFAULT_TIMEOUT_SECONDS", 0) or 0)
+    q_ref = shlex.quote(effective_ref)
+    clone_flags = _clone_strategy_flags()
+    store_dir = None
+    if not clone_flags:
+        # Partial/shallow mirrors clone straight from GitHub: lazy blob fetches
+        # cannot be chained through a shared store's alternates.
+        store_dir = await _refresh_shared_store(
+            run_shell,
+            full_name,
+            create=True,
+            timeout_seconds=git_timeout,
+            env=git_env,
+            no_auth_env=no_auth_env,
+        )
+    if store_dir:
+        # Borrow objects from the shared store (alternates) instead of cloning
+        # the whole history again; origin is pointed back at GitHub below.
+        tmpdir = tempfile.mkdtemp(prefix="mcp-github-")
+        result = await _run_git_with_retry(
+            run_shell,
+            f"git clone --shared --branch {q_ref} "
+            f"{shlex.quote(store_dir)} {shlex.quote(tmpdir)}",
+            cwd=None,
+            timeout_seconds=git_timeout,
+        )
+        if result["exit_code"] == 0:
+            shutil.move(tmpdir, workspace_dir)
+            await _ensure_repo_remote(
+                run_shell,
+                workspace_dir,
+                full_name,
+                timeout_seconds=git_timeout,
+                env=git_env,
+            )
+            WORKSPACE_FRESHNESS.record_fetch(
+                workspace_dir, full_name, _read_ref_sha(workspace_dir, origin_ref)
+            )
+            return workspace_dir
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
     tmpdir = tempfile.mkdtemp(prefix="mcp-github-")
     url = f"https://github.com/{full_name}.git"
-    q_ref = shlex.quote(effective_ref)
     q_url = shlex.quote(url)
     q_tmpdir = shlex.quote(tmpdir)
-    cmd = f"git clone --branch {q_ref} {q_url} {q_tmpdir}"
-    git_timeout = int(getattr(config, "ADAPTIV_MCP_DEFAULT_TIMEOUT_SECONDS", 0) or 0)
+    cmd = f"git clone {clone_flags}--branch {q_ref} {q_url} {q_tmpdir}"
     result = await _run_git_with_retry(
         run_shell,
         cmd,
@@ -597,7 +1085,7 @@ async def _clone_repo(
             shutil.rmtree(tmpdir, ignore_errors=True)
             tmpdir = tempfile.mkdtemp(prefix="mcp-github-")
             q_tmpdir = shlex.quote(tmpdir)
-            cmd = f"git clone --branch {q_ref} {q_url} {q_tmpdir}"
+            cmd = f"git clone {clone_flags}--branch {q_ref} {q_url} {q_tmpdir}"
             result = await _run_git_with_retry(
                 run_shell,
                 cmd,
@@ -606,12 +1094,21 @@ async def _clone_repo(
                 env=no_auth_env,
             )
             if result["exit_code"] == 0:
+                await _init_sparse_checkout(
+                    run_shell, tmpdir, timeout_seconds=git_timeout, env=no_auth_env
+                )
                 shutil.move(tmpdir, workspace_dir)
+                WORKSPACE_FRESHNESS.record_fetch(
+                    workspace_dir, full_name, _read_ref_sha(workspace_dir, origin_ref)
+                )
                 return workspace_dir
             stderr = result.get("stderr", "") or result.get("stdout", "")
         _raise_git_auth_error("git clone", stderr)
         raise GitHubAPIError(f"git clone failed: {stderr}")
 
+    await _init_sparse_checkout(
+        run_shell, tmpdir, timeout_seconds=git_timeout, env=git_env
+    )
     shutil.move(tmpdir, workspace_dir)
     await _ensure_repo_remote(
         run_shell,
@@ -620,6 +1117,9 @@ async def _clone_repo(
         timeout_seconds=git_timeout,
         env=git_env,
     )
+    WORKSPACE_FRESHNESS.record_fetch(
+        workspace_dir, full_name, _read_ref_sha(workspace_dir, origin_ref)
+    )
     return workspace_dir
 
 
@@ -645,7 +1145,8 @@ async def _prepare_temp_virtualenv(repo_dir: str) -> dict[str, str]:
     venv_dir = os.path.join(repo_dir, ".venv-mcp")
     ready_marker = os.path.join(venv_dir, ".mcp_ready")
 
-    # Per-repo lock so concurrent tool calls don't fight over the venv.
+    # Per-repo lock so concurrent tool calls don't fight over the venv. This
+    # is always on, independent of the optional WORKSPACE_LOCKS mirror locks.
     if not hasattr(_prepare_temp_virtualenv, "_locks"):
         _prepare_temp_virtualenv._locks = {}
     locks: dict[str, asyncio.Lock] = _prepare_temp_virtualenv._locks
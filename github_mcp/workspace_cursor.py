@@ -0,0 +1,162 @@
+"""Opaque, position-based continuation tokens for workspace walks.
+
+``list_workspace_files``, ``search_workspace`` and ``scan_workspace_tree``
+walk the mirror in a fixed order (``os.walk`` with sorted names). An integer
+offset cursor makes every page re-walk and re-match everything before it,
+and silently shifts when files are added or removed between pages. The
+tokens built here record *where* the previous page stopped instead:
+
+    {"v": 1, "t": <tool>, "q": <args hash>, "p": <last path>,
+     "l": <last line>, "o": <offset>, "f": <workspace fingerprint>}
+
+Resuming prunes every directory that sorts entirely before ``p`` without
+listing it, so page N costs about the same as page 1. ``o`` keeps the
+legacy integer ``next_cursor`` consistent, and ``f`` (HEAD commit plus the
+git index mtime) tells callers when the tree changed under their cursor.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any
+
+from .workspace import _read_ref_sha
+
+_VERSION = 1
+_PREFIX = "wc1."
+
+# Sort key used between a directory's own entries and its subdirectories.
+# os.walk visits a directory's files before descending, and "" sorts before
+# every real name.
+_HERE = ""
+_DIR = 0
+_FILE = 1
+
+
+def walk_key(rel_path: str, *, is_dir: bool = False) -> tuple[Any, ...]:
+    """Sort key of ``rel_path`` in the order the workspace walks emit it."""
+
+    parts = rel_path.replace("\\", "/").split("/")
+    return (*parts[:-1], _HERE, _DIR if is_dir else _FILE, parts[-1])
+
+
+def workspace_fingerprint(repo_dir: str) -> str:
+    """Short digest of HEAD and the git index mtime, read without git."""
+
+    git_dir = os.path.join(repo_dir, ".git")
+    try:
+        with open(os.path.join(git_dir, "HEAD"), encoding="utf-8") as fh:
+            head = fh.read().strip()
+    except OSError:
+        head = ""
+    if head.startswith("ref: "):
+        head = _read_ref_sha(repo_dir, head[len("ref: ") :]) or head
+    try:
+        index_mtime = os.stat(os.path.join(git_dir, "index")).st_mtime_ns
+    except OSError:
+        index_mtime = 0
+    return hashlib.sha256(f"{head}\0{index_mtime}".encode()).hexdigest()[:16]
+
+
+def _args_hash(tool: str, args: dict[str, Any]) -> str:
+    payload = json.dumps([tool, args], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class WalkCursor:
+    """Decoded continuation token: resume after ``path`` (and ``line``)."""
+
+    path: str
+    line: int
+    offset: int
+    fingerprint: str
+    is_dir: bool = False
+
+    @property
+    def key(self) -> tuple[Any, ...]:
+        return walk_key(self.path, is_dir=self.is_dir)
+
+    def prune(self, rel_dir: str, dirnames: list[str]) -> None:
+        """Drop subdirectories of ``rel_dir`` that sort wholly before the cursor."""
+
+        base = (
+            () if rel_dir in {"", "."} else tuple(rel_dir.replace("\\", "/").split("/"))
+        )
+        key = self.key
+        dirnames[:] = [d for d in dirnames if not (*base, d) < key[: len(base) + 1]]
+
+    def done(self, rel_path: str, *, is_dir: bool = False) -> bool:
+        """True when ``rel_path`` was already returned by an earlier page."""
+
+        return walk_key(rel_path, is_dir=is_dir) <= self.key
+
+    def before(self, rel_path: str) -> bool:
+        """True when the whole file sorts before the cursor's file."""
+
+        return walk_key(rel_path) < self.key
+
+
+def encode_cursor(
+    tool: str,
+    args: dict[str, Any],
+    *,
+    path: str,
+    offset: int,
+    fingerprint: str,
+    line: int = 0,
+    is_dir: bool = False,
+) -> str:
+    payload = {
+        "v": _VERSION,
+        "t": tool,
+        "q": _args_hash(tool, args),
+        "p": path.replace("\\", "/"),
+        "l": int(line),
+        "o": int(offset),
+        "f": fingerprint,
+    }
+    if is_dir:
+        payload["d"] = 1
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return _PREFIX + base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, tool: str, args: dict[str, Any]) -> WalkCursor:
+    """Decode a token from ``encode_cursor``; ValueError if it does not apply."""
+
+    if not token.startswith(_PREFIX):
+        raise ValueError("cursor must be an int >= 0 or a next_cursor_token")
+    body = token[len(_PREFIX) :]
+    try:
+        raw = base64.urlsafe_b64decode(body + "=" * (-len(body) % 4))
+        payload = json.loads(raw)
+        if payload.get("v") != _VERSION:
+            raise ValueError("unsupported cursor version")
+        cursor = WalkCursor(
+            path=str(payload["p"]),
+            line=int(payload.get("l", 0)),
+            offset=int(payload["o"]),
+            fingerprint=str(payload.get("f", "")),
+            is_dir=bool(payload.get("d")),
+        )
+    except (
+        AttributeError,
+        binascii.Error,
+        KeyError,
+        TypeError,
+        UnicodeDecodeError,
+        ValueError,
+    ):
+        raise ValueError("cursor token is malformed") from None
+    if payload.get("t") != tool or payload.get("q") != _args_hash(tool, args):
+        raise ValueError(
+            "cursor token was issued for a different tool call; "
+            "repeat the original arguments when paging"
+        )
+    return cursor
@@ -0,0 +1,145 @@
+"""Freshness tracking for repo mirror refreshes.
+
+Every workspace tool goes through ``_clone_repo``, which used to fetch from
+GitHub on each call. ``WorkspaceFreshness`` remembers when each mirror was last
+fetched and which commit its branch pointed at upstream, so read-heavy
+sessions can skip redundant fetches:
+
+- within ``MCP_WORKSPACE_REFRESH_STALE_SECONDS`` of the last fetch the mirror
+  is used as-is, unless this server has written to the repository since;
+- after that, a cached ref resolution or a cheap ``git ls-remote`` decides
+  whether the branch moved before paying for a fetch.
+
+``run_coalesced`` lets concurrent refreshes of the same mirror share one run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from . import config
+from .async_utils import active_event_loop
+from .ref_cache import REF_CACHE
+
+T = TypeVar("T")
+
+
+class WorkspaceFreshness:
+    """Last-fetch bookkeeping keyed by mirror directory."""
+
+    def __init__(self, stale_seconds: float):
+        self.stale_seconds = stale_seconds
+        self._records: dict[str, dict[str, Any]] = {}
+        self.fetches = 0
+        self.skipped_fresh = 0
+        self.skipped_unchanged = 0
+        self.coalesced = 0
+
+    def record_fetch(
+        self, workspace_dir: str, full_name: str, remote_sha: str | None
+    ) -> None:
+        self.fetches += 1
+        self._records[workspace_dir] = {
+            "full_name": full_name,
+            "fetched_at": time.monotonic(),
+            "remote_sha": remote_sha,
+        }
+
+    def is_fresh(self, workspace_dir: str) -> bool:
+        record = self._records.get(workspace_dir)
+        if record is None or self.stale_seconds <= 0:
+            return False
+        fetched_at = record["fetched_at"]
+        if time.monotonic() - fetched_at >= self.stale_seconds:
+            return False
+        return not REF_CACHE.written_since(record["full_name"], fetched_at)
+
+    def remote_sha(self, workspace_dir: str) -> str | None:
+        record = self._records.get(workspace_dir)
+        return record["remote_sha"] if record else None
+
+    def mark_unchanged(self, workspace_dir: str) -> None:
+        """Restart the staleness window after confirming nothing moved."""
+
+        record = self._records.get(workspace_dir)
+        if record is not None:
+            record["fetched_at"] = time.monotonic()
+        self.skipped_unchanged += 1
+
+    def forget(self, workspace_dir: str) -> None:
+        self._records.pop(workspace_dir, None)
+
+    def clear(self) -> None:
+        self._records.clear()
+        self.fetches = 0
+        self.skipped_fresh = 0
+        self.skipped_unchanged = 0
+        self.coalesced = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "tracked_workspaces": len(self._records),
+            "stale_seconds": self.stale_seconds,
+            "fetches": self.fetches,
+            "skipped_fresh": self.skipped_fresh,
+            "skipped_unchanged": self.skipped_unchanged,
+            "coalesced": self.coalesced,
+        }
+
+
+WORKSPACE_FRESHNESS = WorkspaceFreshness(
+    stale_seconds=config.WORKSPACE_REFRESH_STALE_SECONDS
+)
+
+_loop_inflight: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, dict[str, Any]]
+] = weakref.WeakKeyDictionary()
+
+
+async def run_coalesced(key: str, start: Callable[[], Awaitable[T]]) -> T:
+    """Run ``start()`` once for concurrent callers sharing ``key``.
+
+    The first caller runs inline; later callers wait for its result. If the
+    leader fails or is cancelled, waiters retry on their own so they see their
+    own error instead of someone else's cancellation.
+    """
+
+    loop = active_event_loop()
+    inflight = _loop_inflight.get(loop)
+    if inflight is None:
+        inflight = _loop_inflight[loop] = {}
+
+    while (entry := inflight.get(key)) is not None:
+        future = entry["future"]
+        if future is None:
+            future = entry["future"] = asyncio.get_running_loop().create_future()
+        WORKSPACE_FRESHNESS.coalesced += 1
+        ok, value = await asyncio.shield(future)
+        if ok:
+            return value
+
+    entry = {"future": None}
+    inflight[key] = entry
+    outcome: tuple[bool, Any] = (False, None)
+    try:
+        value = await start()
+        outcome = (True, value)
+        return value
+    finally:
+        if inflight.get(key) is entry:
+            del inflight[key]
+        future = entry["future"]
+        if future is not None and not future.done():
+            future.set_result(outcome)
+
+
+def clear_workspace_freshness() -> None:
+    WORKSPACE_FRESHNESS.clear()
+
+
+def workspace_freshness_stats() -> dict[str, Any]:
+    return WORKSPACE_FRESHNESS.stats()
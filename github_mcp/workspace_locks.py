@@ -0,0 +1,374 @@
+"""Reader/writer locks for repo mirrors.
+
+Tool calls against the same mirror used to run uncoordinated, so a
+``terminal_command``, an ``apply_workspace_operations`` and a hard-reset
+refresh in ``_clone_repo`` could interleave on one directory.
+``WorkspaceLockManager`` gives every mirror an async reader/writer lock:
+searches, reads and diffs share it, while mutations and refreshes get it
+exclusively. Waiters are served in arrival order, so a queued writer is not
+starved by a steady stream of readers.
+
+Each ``mcp_tool`` call opens a lock scope (``tool_lock_scope``) in the mode its
+write classification implies. The workspace ``clone_repo`` dependency locks the
+mirror in that scope once it knows the directory, and the scope releases it
+when the tool returns. Locks are reentrant within a task; a task holding the
+shared lock that asks for the exclusive one gives up its shared hold while it
+waits, which keeps two upgrading readers from deadlocking. For the same
+reason a holder waiting on another task's coalesced mirror refresh drops its
+hold until the refresh is done.
+
+Mirror eviction (``workspace_pool``) must never delete a directory a tool is
+using, so tool scopes and refreshes *pin* their mirror even when the locks
+are disabled: a pin is a shared hold, which never blocks other tool calls but
+makes the pool's non-blocking exclusive ``try_hold`` fail.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import weakref
+from collections import deque
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from . import config
+from .async_utils import active_event_loop
+
+
+class WorkspaceRWLock:
+    """FIFO async reader/writer lock.
+
+    The uncontended path never touches the event loop. Grants are handed to
+    waiters on release, so a woken waiter already owns the lock.
+    """
+
+    def __init__(self) -> None:
+        self.readers = 0
+        self.writer = False
+        self._waiters: deque[tuple[bool, asyncio.Future]] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def idle(self) -> bool:
+        return not self.readers and not self.writer and not self._waiters
+
+    def try_acquire(self, write: bool) -> bool:
+        if self._waiters or self.writer or (write and self.readers):
+            return False
+        if write:
+            self.writer = True
+        else:
+            self.readers += 1
+        return True
+
+    async def wait(self, write: bool) -> None:
+        future = asyncio.get_running_loop().create_future()
+        entry = (write, future)
+        self._waiters.append(entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before cancellation; hand it on.
+                self.release(write)
+            else:
+                self._waiters.remove(entry)
+                # A cancelled writer may have been holding back readers.
+                self._wake()
+            raise
+
+    def release(self, write: bool) -> None:
+        if write:
+            self.writer = False
+        else:
+            self.readers -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            write, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if write:
+                if self.readers or self.writer:
+                    return
+                self._waiters.popleft()
+                self.writer = True
+                future.set_result(None)
+                return
+            if self.writer:
+                return
+            self._waiters.popleft()
+            self.readers += 1
+            future.set_result(None)
+
+
+class _Hold:
+    """A task's hold on one mirror lock (shared with nested scopes)."""
+
+    __slots__ = ("active", "key", "write")
+
+    def __init__(self, key: str, write: bool):
+        self.key = key
+        self.write = write
+        self.active = True
+
+
+# mirror key -> hold, for reentrancy within a task.
+_HELD: ContextVar[Mapping[str, _Hold] | None] = ContextVar(
+    "workspace_locks_held", default=None
+)
+
+
+class WorkspaceLockManager:
+    """Per-mirror reader/writer locks with queueing metrics."""
+
+    def __init__(self, *, enabled: bool = True):
+        self.enabled = enabled
+        self._loop_locks: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, WorkspaceRWLock]
+        ] = weakref.WeakKeyDictionary()
+        self.acquired_read = 0
+        self.acquired_write = 0
+        self.reentrant = 0
+        self.upgrades = 0
+        self.contended = 0
+        self.max_queue_depth = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _locks(self) -> dict[str, WorkspaceRWLock]:
+        loop = active_event_loop()
+        locks = self._loop_locks.get(loop)
+        if locks is None:
+            locks = self._loop_locks[loop] = {}
+        return locks
+
+    async def acquire(self, key: str, *, write: bool) -> None:
+        locks = self._locks()
+        lock = locks.get(key)
+        if lock is None:
+            lock = locks[key] = WorkspaceRWLock()
+        if not lock.try_acquire(write):
+            self.contended += 1
+            self.max_queue_depth = max(self.max_queue_depth, lock.queue_depth + 1)
+            started = time.monotonic()
+            try:
+                await lock.wait(write)
+            finally:
+                if lock.idle:
+                    locks.pop(key, None)
+            waited = time.monotonic() - started
+            self.wait_seconds_total += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        if write:
+            self.acquired_write += 1
+        else:
+            self.acquired_read += 1
+
+    def release(self, key: str, *, write: bool) -> None:
+        locks = self._locks()
+        lock = locks.get(key)
+        if lock is None:
+            return
+        lock.release(write)
+        if lock.idle:
+            locks.pop(key, None)
+
+    async def _enter(
+        self, path: str, write: bool, *, pin: bool = False
+    ) -> tuple[_Hold, bool] | None:
+        """Take ``path``'s lock for this task; ``None`` when already covered.
+
+        With ``pin`` a disabled manager still takes a shared hold.
+        """
+
+        if not self.enabled:
+            if not pin:
+                return None
+            write = False
+        key = os.path.abspath(path)
+        held = _HELD.get() or {}
+        hold = held.get(key)
+        if hold is not None and hold.active:
+            if hold.write or not write:
+                self.reentrant += 1
+                return None
+            self.upgrades += 1
+            self.release(key, write=False)
+            hold.active = False
+            await self.acquire(key, write=True)
+            hold.write = hold.active = True
+            return hold, True
+        await self.acquire(key, write=write)
+        hold = _Hold(key, write)
+        _HELD.set({**held, key: hold})
+        return hold, False
+
+    async def _exit(self, entry: tuple[_Hold, bool] | None) -> None:
+        if entry is None:
+            return
+        hold, restore_read = entry
+        if hold.active:
+            self.release(hold.key, write=hold.write)
+            hold.active = False
+        if restore_read:
+            await self.acquire(hold.key, write=False)
+            hold.write = False
+            hold.active = True
+
+    @asynccontextmanager
+    async def hold(
+        self, path: str, *, write: bool, pin: bool = False
+    ) -> AsyncIterator[None]:
+        """Hold ``path``'s lock (shared or exclusive) for the ``with`` block."""
+
+        entry = await self._enter(path, write, pin=pin)
+        try:
+            yield
+        finally:
+            await self._exit(entry)
+
+    @asynccontextmanager
+    async def try_hold(self, path: str, *, write: bool) -> AsyncIterator[bool]:
+        """Take ``path``'s lock only if it is free, whether or not enabled.
+
+        Yields whether the lock was taken; never waits and never reenters.
+        """
+
+        key = os.path.abspath(path)
+        locks = self._locks()
+        lock = locks.get(key)
+        if lock is None:
+            lock = locks[key] = WorkspaceRWLock()
+        acquired = lock.try_acquire(write)
+        if not acquired and lock.idle:
+            locks.pop(key, None)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release(key, write=write)
+
+    @asynccontextmanager
+    async def released(self, path: str) -> AsyncIterator[None]:
+        """Give up this task's hold on ``path`` for the ``with`` block.
+
+        For waiting on another task's work that may need the exclusive lock
+        (a coalesced refresh): keeping our hold would block it forever. The
+        hold is taken back, in the same mode, on the way out.
+        """
+
+        held = _HELD.get() or {}
+        hold = held.get(os.path.abspath(path))
+        if not self.enabled or hold is None or not hold.active:
+            yield
+            return
+        self.release(hold.key, write=hold.write)
+        hold.active = False
+        try:
+            yield
+        finally:
+            # Holds taken inside the block must not shadow ours afterwards.
+            _HELD.set(held)
+            await self.acquire(hold.key, write=hold.write)
+            hold.active = True
+
+    def stats(self) -> dict[str, Any]:
+        active: dict[str, dict[str, Any]] = {}
+        for locks in list(self._loop_locks.values()):
+            for key, lock in locks.items():
+                active[key] = {
+                    "readers": lock.readers,
+                    "writer": lock.writer,
+                    "queue_depth": lock.queue_depth,
+                }
+        return {
+            "enabled": self.enabled,
+            "acquired_read": self.acquired_read,
+            "acquired_write": self.acquired_write,
+            "reentrant": self.reentrant,
+            "upgrades": self.upgrades,
+            "contended": self.contended,
+            "max_queue_depth": self.max_queue_depth,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "max_wait_seconds": round(self.max_wait_seconds, 6),
+            "active": active,
+        }
+
+    def clear(self) -> None:
+        self._loop_locks = weakref.WeakKeyDictionary()
+        self.acquired_read = 0
+        self.acquired_write = 0
+        self.reentrant = 0
+        self.upgrades = 0
+        self.contended = 0
+        self.max_queue_depth = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+
+WORKSPACE_LOCKS = WorkspaceLockManager(enabled=config.WORKSPACE_LOCKS)
+
+
+class _ToolScope:
+    __slots__ = ("entries", "write")
+
+    def __init__(self, write: bool):
+        self.write = write
+        self.entries: list[tuple[_Hold, bool]] = []
+
+
+_TOOL_SCOPE: ContextVar[_ToolScope | None] = ContextVar(
+    "workspace_lock_tool_scope", default=None
+)
+
+
+@asynccontextmanager
+async def tool_lock_scope(*, write: bool) -> AsyncIterator[None]:
+    """Release mirror locks taken by ``lock_workspace_for_tool`` on exit."""
+
+    scope = _ToolScope(write)
+    token = _TOOL_SCOPE.set(scope)
+    try:
+        yield
+    finally:
+        _TOOL_SCOPE.reset(token)
+        from .workspace_pool import WORKSPACE_POOL
+
+        for entry in reversed(scope.entries):
+            WORKSPACE_POOL.touch(entry[0].key)
+            await WORKSPACE_LOCKS._exit(entry)
+
+
+async def lock_workspace_for_tool(repo_dir: str) -> None:
+    """Lock (or, with locks disabled, pin) ``repo_dir`` until the tool returns.
+
+    Outside a tool call (helpers, tests) this is a no-op.
+    """
+
+    scope = _TOOL_SCOPE.get()
+    if scope is None:
+        return
+    from .workspace_pool import WORKSPACE_POOL
+
+    WORKSPACE_POOL.touch(repo_dir)
+    entry = await WORKSPACE_LOCKS._enter(repo_dir, scope.write, pin=True)
+    if entry is not None:
+        scope.entries.append(entry)
+
+
+def workspace_lock_stats() -> dict[str, Any]:
+    return WORKSPACE_LOCKS.stats()
+
+
+def clear_workspace_locks() -> None:
+    WORKSPACE_LOCKS.clear()
@@ -0,0 +1,427 @@
+"""Disk budget, access tracking, and pre-warming for repo mirrors.
+
+Mirrors under ``WORKSPACE_BASE_DIR`` are created on demand by ``_clone_repo``.
+``WorkspacePool`` records when each one was last used and how much disk it
+takes, and once the total exceeds ``MCP_WORKSPACE_POOL_MAX_BYTES`` it deletes
+the least recently used mirrors that have no local work: uncommitted changes,
+commits that were never pushed, or branches without an upstream keep a mirror
+alive no matter how old it is.
+
+Shared object stores (see ``workspace._shared_store_path``) count toward the
+budget and are removed together with the last mirror of their repository.
+Refreshes pin the store as well, so it is never deleted while a mirror is being
+fetched into or cloned from it; a store left behind that way is dropped on a
+later pass once it is free.
+
+A mirror is only deleted under a non-blocking exclusive ``WORKSPACE_LOCKS``
+hold. Tool calls and refreshes pin the mirror they use (see
+``workspace_locks``), so a busy mirror is skipped rather than deleted under a
+running command.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import stat
+import time
+from typing import Any
+
+from . import config
+from .blocking import run_blocking
+from .config import BASE_LOGGER
+from .utils import _get_main_module
+from .workspace_locks import WORKSPACE_LOCKS
+
+LOGGER = BASE_LOGGER.getChild("workspace_pool")
+
+# Bare object store shared by a repo's mirrors. Git ref components cannot start
+# with ".", so it never collides with a ref mirror directory.
+_SHARED_STORE_DIRNAME = ".objects.git"
+
+
+def _base_dir() -> str:
+    main_module = _get_main_module()
+    return getattr(main_module, "WORKSPACE_BASE_DIR", config.WORKSPACE_BASE_DIR)
+
+
+def _dir_size_bytes(path: str) -> int:
+    """Disk usage of ``path`` (allocated blocks where available)."""
+
+    total = 0
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                stack.append(entry.path)
+            else:
+                blocks = getattr(st, "st_blocks", None)
+                total += blocks * 512 if blocks is not None else st.st_size
+    return total
+
+
+def _last_used(mirror_dir: str) -> float:
+    """Best guess of when an untracked mirror was last used (wall clock)."""
+
+    newest = 0.0
+    for name in ("FETCH_HEAD", "index", "HEAD"):
+        try:
+            newest = max(
+                newest, os.path.getmtime(os.path.join(mirror_dir, ".git", name))
+            )
+        except OSError:
+            continue
+    return newest
+
+
+def discover_mirrors(base_dir: str) -> list[dict[str, Any]]:
+    """Find mirror checkouts (directories holding ``.git``) under ``base_dir``."""
+
+    found: list[dict[str, Any]] = []
+    try:
+        repo_entries = sorted(os.scandir(base_dir), key=lambda e: e.name)
+    except OSError:
+        return found
+    for repo_entry in repo_entries:
+        if repo_entry.name.startswith(".") or not repo_entry.is_dir():
+            continue
+        for cur_dir, dirnames, _filenames in os.walk(repo_entry.path):
+            if ".git" in dirnames or os.path.isfile(os.path.join(cur_dir, ".git")):
+                dirnames[:] = []
+                ref = os.path.relpath(cur_dir, repo_entry.path).replace(os.sep, "/")
+                found.append({"dir": cur_dir, "repo_key": repo_entry.name, "ref": ref})
+                continue
+            dirnames[:] = sorted(
+                d
+                for d in dirnames
+                if d != _SHARED_STORE_DIRNAME and not d.startswith(".objects-")
+            )
+    return found
+
+
+class WorkspacePool:
+    """Per-mirror access/size tracking plus LRU eviction under a disk budget."""
+
+    def __init__(self, max_bytes: int, *, min_idle_seconds: float):
+        self.max_bytes = max_bytes
+        self.min_idle_seconds = min_idle_seconds
+        self._mirrors: dict[str, dict[str, Any]] = {}
+        self._sizes: dict[str, int] = {}
+        self._enforcing = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.kept_dirty = 0
+        self.skipped_busy = 0
+        self.prewarmed = 0
+        self.last_total_bytes: int | None = None
+
+    def note_access(
+        self, workspace_dir: str, full_name: str, ref: str, *, hit: bool
+    ) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+            # New checkout: its size is unknown until the next measurement.
+            self._sizes.pop(workspace_dir, None)
+        self._mirrors[os.path.abspath(workspace_dir)] = {
+            "full_name": full_name,
+            "ref": ref,
+            "last_access": time.time(),
+        }
+
+    def touch(self, workspace_dir: str) -> None:
+        """Mark a tracked mirror as used now (tool calls on it keep it warm)."""
+
+        tracked = self._mirrors.get(os.path.abspath(workspace_dir))
+        if tracked is not None:
+            tracked["last_access"] = time.time()
+
+    def forget(self, workspace_dir: str) -> None:
+        self._mirrors.pop(os.path.abspath(workspace_dir), None)
+        self._sizes.pop(workspace_dir, None)
+
+    def last_access(self, workspace_dir: str) -> float:
+        tracked = self._mirrors.get(os.path.abspath(workspace_dir))
+        return tracked["last_access"] if tracked else _last_used(workspace_dir)
+
+    def measure(self, base_dir: str, *, refresh: bool = False) -> list[dict[str, Any]]:
+        """Mirrors and shared stores under ``base_dir`` with sizes (blocking)."""
+
+        items: list[dict[str, Any]] = []
+        for mirror in discover_mirrors(base_dir):
+            path = mirror["dir"]
+            if refresh or path not in self._sizes:
+                self._sizes[path] = _dir_size_bytes(path)
+            mirror["size_bytes"] = self._sizes[path]
+            mirror["last_access"] = self.last_access(path)
+            items.append(mirror)
+        for repo_key in {m["repo_key"] for m in items} | set(
+            _store_repo_keys(base_dir)
+        ):
+            store = os.path.join(base_dir, repo_key, _SHARED_STORE_DIRNAME)
+            if not os.path.isdir(store):
+                continue
+            if refresh or store not in self._sizes:
+                self._sizes[store] = _dir_size_bytes(store)
+            items.append(
+                {
+                    "dir": store,
+                    "repo_key": repo_key,
+                    "ref": None,
+                    "size_bytes": self._sizes[store],
+                    "store": True,
+                }
+            )
+        self.last_total_bytes = sum(item["size_bytes"] for item in items)
+        return items
+
+    async def enforce_budget(
+        self, *, protect: str | None = None, refresh: bool = False
+    ) -> dict[str, Any]:
+        """Evict least recently used clean mirrors until under ``max_bytes``."""
+
+        summary: dict[str, Any] = {
+            "evicted": [],
+            "kept_dirty": [],
+            "skipped_busy": [],
+            "freed_bytes": 0,
+        }
+        if self.max_bytes <= 0 or self._enforcing:
+            return summary
+        self._enforcing = True
+        try:
+            base_dir = _base_dir()
+            items = await run_blocking(self.measure, base_dir, refresh=refresh)
+            total = sum(item["size_bytes"] for item in items)
+            summary["total_bytes_before"] = total
+            if total <= self.max_bytes:
+                return summary
+
+            mirrors = sorted(
+                (item for item in items if not item.get("store")),
+                key=lambda item: item["last_access"],
+            )
+            remaining = {item["repo_key"]: 0 for item in items}
+            for item in mirrors:
+                remaining[item["repo_key"]] += 1
+
+            # Stores whose mirrors are all gone (their removal was skipped
+            # while a refresh had them pinned).
+            for repo_key, count in remaining.items():
+                if total <= self.max_bytes:
+                    break
+                if count == 0:
+                    freed = await self._evict_store(base_dir, repo_key)
+                    total -= freed
+                    self.evicted_bytes += freed
+                    summary["freed_bytes"] += freed
+
+            for item in mirrors:
+                if total <= self.max_bytes:
+                    break
+                path = item["dir"]
+                if path == protect or self._recently_used(path):
+                    continue
+                async with WORKSPACE_LOCKS.try_hold(path, write=True) as acquired:
+                    # Pinned by a running tool call or refresh.
+                    if not acquired:
+                        self.skipped_busy += 1
+                        summary["skipped_busy"].append(path)
+                        continue
+                    if await _has_local_work(path):
+                        self.kept_dirty += 1
+                        summary["kept_dirty"].append(path)
+                        continue
+                    # A tool may have touched it since the sizes were measured.
+                    if self._recently_used(path):
+                        continue
+                    await run_blocking(shutil.rmtree, path, True)
+                    self._forget_everywhere(path)
+                freed = item["size_bytes"]
+                remaining[item["repo_key"]] -= 1
+                if remaining[item["repo_key"]] == 0:
+                    freed += await self._evict_store(base_dir, item["repo_key"])
+                total -= freed
+                self.evictions += 1
+                self.evicted_bytes += freed
+                summary["evicted"].append(path)
+                summary["freed_bytes"] += freed
+                LOGGER.info("Evicted repo mirror %s (%d bytes)", path, freed)
+
+            self.last_total_bytes = total
+            summary["total_bytes_after"] = total
+            return summary
+        finally:
+            self._enforcing = False
+
+    async def _evict_store(self, base_dir: str, repo_key: str) -> int:
+        """Delete ``repo_key``'s shared store unless a refresh has it pinned."""
+
+        store = os.path.join(base_dir, repo_key, _SHARED_STORE_DIRNAME)
+        async with WORKSPACE_LOCKS.try_hold(store, write=True) as acquired:
+            if not acquired:
+                self.skipped_busy += 1
+                return 0
+            if not os.path.isdir(store):
+                return 0
+            await run_blocking(shutil.rmtree, store, True)
+        return self._sizes.pop(store, 0)
+
+    def _recently_used(self, path: str) -> bool:
+        return time.time() - self.last_access(path) < self.min_idle_seconds
+
+    def _forget_everywhere(self, path: str) -> None:
+        from .workspace_freshness import WORKSPACE_FRESHNESS
+
+        self.forget(path)
+        WORKSPACE_FRESHNESS.forget(path)
+
+    def clear(self) -> None:
+        self._mirrors.clear()
+        self._sizes.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.kept_dirty = 0
+        self.skipped_busy = 0
+        self.prewarmed = 0
+        self.last_total_bytes = None
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        total = self.last_total_bytes
+        return {
+            "max_bytes": self.max_bytes,
+            "total_bytes": total,
+            "disk_pressure": (
+                round(total / self.max_bytes, 3)
+                if total is not None and self.max_bytes > 0
+                else None
+            ),
+            "tracked_mirrors": len(self._mirrors),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+            "kept_dirty": self.kept_dirty,
+            "skipped_busy": self.skipped_busy,
+            "prewarmed": self.prewarmed,
+        }
+
+
+def _store_repo_keys(base_dir: str) -> list[str]:
+    try:
+        return [
+            entry.name
+            for entry in os.scandir(base_dir)
+            if entry.is_dir()
+            and os.path.isdir(os.path.join(entry.path, _SHARED_STORE_DIRNAME))
+        ]
+    except OSError:
+        return []
+
+
+async def _has_local_work(mirror_dir: str) -> bool:
+    """True when a mirror has uncommitted changes or unpushed commits."""
+
+    from .workspace import _run_shell
+
+    main_module = _get_main_module()
+    run_shell = getattr(main_module, "_run_shell", _run_shell)
+    result = await run_shell(
+        "git status --porcelain --branch", cwd=mirror_dir, timeout_seconds=60
+    )
+    if result.get("exit_code", 0) != 0:
+        # Unknown state: never delete what we cannot inspect.
+        return True
+    lines = (result.get("stdout", "") or "").splitlines()
+    if any(line and not line.startswith("##") for line in lines):
+        return True
+    branch_line = next((line for line in lines if line.startswith("##")), "")
+    # "## main...origin/main [ahead 1]", a branch with no upstream at all, or a
+    # detached HEAD ("## HEAD (no branch)"), whose commits no branch keeps.
+    return "[ahead" in branch_line or "..." not in branch_line
+
+
+WORKSPACE_POOL = WorkspacePool(
+    config.WORKSPACE_POOL_MAX_BYTES,
+    min_idle_seconds=config.WORKSPACE_POOL_MIN_IDLE_SECONDS,
+)
+
+
+def schedule_budget_enforcement(protect: str | None = None) -> None:
+    """Run ``enforce_budget`` in the background on the running asyncio loop."""
+
+    if WORKSPACE_POOL.max_bytes <= 0:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(WORKSPACE_POOL.enforce_budget(protect=protect))
+    task.add_done_callback(_log_enforcement_failure)
+
+
+def _log_enforcement_failure(task: asyncio.Task) -> None:
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        LOGGER.warning("Workspace pool eviction failed: %s", exc)
+
+
+def prewarm_targets() -> list[tuple[str, str | None]]:
+    """Configured ``owner/repo[@ref]`` mirrors to create at startup."""
+
+    targets: list[tuple[str, str | None]] = []
+    if config.WORKSPACE_PREWARM_CONTROLLER:
+        from .utils import CONTROLLER_DEFAULT_BRANCH, CONTROLLER_REPO
+
+        targets.append((CONTROLLER_REPO, CONTROLLER_DEFAULT_BRANCH))
+    for spec in config.WORKSPACE_PREWARM:
+        full_name, _, ref = spec.partition("@")
+        target = (full_name.strip(), ref.strip() or None)
+        if target[0] and target not in targets:
+            targets.append(target)
+    return targets
+
+
+async def prewarm_workspaces(
+    targets: list[tuple[str, str | None]] | None = None,
+) -> list[dict[str, Any]]:
+    """Create or refresh mirrors for ``targets`` (defaults to the configured list)."""
+
+    from .workspace import _clone_repo
+
+    main_module = _get_main_module()
+    clone_repo = getattr(main_module, "_clone_repo", _clone_repo)
+    results: list[dict[str, Any]] = []
+    for full_name, ref in prewarm_targets() if targets is None else targets:
+        try:
+            repo_dir = await clone_repo(full_name, ref=ref, preserve_changes=True)
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.warning("Pre-warming %s@%s failed: %s", full_name, ref, exc)
+            results.append({"full_name": full_name, "ref": ref, "error": str(exc)})
+            continue
+        WORKSPACE_POOL.prewarmed += 1
+        results.append({"full_name": full_name, "ref": ref, "repo_dir": repo_dir})
+    return results
+
+
+def workspace_pool_stats() -> dict[str, Any]:
+    return WORKSPACE_POOL.stats()
@@ -0,0 +1,363 @@
+"""Disposable scratch copies of repo mirrors.
+
+Trying an edit and running the tests against it used to dirty the shared
+mirror, which then needed ``workspace_git_reset``/``clean`` and blocked other
+callers meanwhile. A scratch workspace is a throwaway copy of a mirror under
+``<WORKSPACE_BASE_DIR>/.scratch`` made with one of two strategies:
+
+- ``reflink``: a copy-on-write ``cp --reflink=always`` of the working tree
+  (including ``.git``, untracked and ignored files). Near free on
+  filesystems that support it (btrfs, XFS, APFS).
+- ``worktree``: ``git worktree add --detach`` at the mirror's ``HEAD``, sharing
+  its object store. Uncommitted and untracked changes are carried over.
+
+``auto`` picks ``reflink`` when a probe copy succeeds. The mirror is only held
+(shared) while the copy is made, so any number of scratch runs can proceed in
+parallel with each other and with reads of the mirror.
+
+The mirror's ``.venv-mcp`` is never copied. A scratch run that needs a
+virtualenv gets its own (``prepare_scratch_virtualenv``), layered over the
+mirror's so installed packages are visible but never modified.
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+import shlex
+import shutil
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from . import config
+from .blocking import run_blocking
+from .config import BASE_LOGGER
+from .exceptions import GitHubAPIError, UsageError
+from .utils import _get_main_module
+from .workspace_locks import WORKSPACE_LOCKS
+
+LOGGER = BASE_LOGGER.getChild("workspace_scratch")
+
+SCRATCH_STRATEGIES = ("auto", "reflink", "worktree")
+
+_SCRATCH_DIRNAME = ".scratch"
+# Leftovers from a crashed process are swept once they are this old.
+_STALE_SCRATCH_SECONDS = 24 * 3600
+_VENV_DIRNAME = ".venv-mcp"
+# Never copied: scratch copies layer their own virtualenv over the mirror's.
+_SKIP_COPY = frozenset({_VENV_DIRNAME})
+_BASE_VENV_PTH = "_mcp_base_venv.pth"
+
+_REFLINK_SUPPORT: dict[str, bool] = {}
+
+
+def _run_shell_fn():
+    from .workspace import _run_shell
+
+    return getattr(_get_main_module(), "_run_shell", _run_shell)
+
+
+def scratch_root() -> str:
+    base = getattr(_get_main_module(), "WORKSPACE_BASE_DIR", config.WORKSPACE_BASE_DIR)
+    return os.path.join(base, _SCRATCH_DIRNAME)
+
+
+async def reflink_supported(root: str) -> bool:
+    """Probe (once per root) whether ``cp --reflink=always`` works there."""
+
+    cached = _REFLINK_SUPPORT.get(root)
+    if cached is not None:
+        return cached
+    src = os.path.join(root, f".reflink-probe-{uuid.uuid4().hex}")
+    dst = src + ".copy"
+    try:
+        await run_blocking(_write_file, src, b"probe")
+        result = await _run_shell_fn()(
+            f"cp --reflink=always {shlex.quote(src)} {shlex.quote(dst)}",
+            cwd=root,
+            timeout_seconds=30,
+        )
+        supported = result.get("exit_code", 1) == 0
+    finally:
+        await run_blocking(_remove_files, src, dst)
+    _REFLINK_SUPPORT[root] = supported
+    return supported
+
+
+def _write_file(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fh:
+        fh.write(data)
+
+
+def _remove_files(*paths: str) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _sweep_stale(root: str) -> None:
+    os.makedirs(root, exist_ok=True)
+    cutoff = time.time() - _STALE_SCRATCH_SECONDS
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            continue
+
+
+async def _checked(cmd: str, *, cwd: str, what: str) -> dict[str, Any]:
+    timeout = int(getattr(config, "ADAPTIV_MCP_DEFAULT_TIMEOUT_SECONDS", 0) or 0)
+    result = await _run_shell_fn()(cmd, cwd=cwd, timeout_seconds=timeout)
+    if result.get("exit_code", 0) != 0:
+        stderr = result.get("stderr", "") or result.get("stdout", "")
+        raise GitHubAPIError(f"Scratch workspace {what} failed: {stderr}")
+    return result
+
+
+def _reflink_entries(repo_dir: str, dest: str) -> list[str]:
+    """Create ``dest`` and list the top-level entries of ``repo_dir`` to copy."""
+
+    entries = sorted(name for name in os.listdir(repo_dir) if name not in _SKIP_COPY)
+    os.makedirs(dest)
+    return entries
+
+
+async def _copy_reflink(repo_dir: str, dest: str) -> None:
+    entries = await run_blocking(_reflink_entries, repo_dir, dest)
+    if not entries:
+        return
+    sources = " ".join(shlex.quote(os.path.join(repo_dir, name)) for name in entries)
+    await _checked(
+        f"cp -a --reflink=always -- {sources} {shlex.quote(dest + os.sep)}",
+        cwd=repo_dir,
+        what="reflink copy",
+    )
+
+
+async def _add_worktree(repo_dir: str, dest: str, *, include_changes: bool) -> None:
+    await _checked(
+        f"git worktree add --detach {shlex.quote(dest)} HEAD",
+        cwd=repo_dir,
+        what="git worktree add",
+    )
+    if not include_changes:
+        return
+
+    patch_path = dest + ".diff"
+    try:
+        # Redirect in the shell so binary-safe diff bytes never pass through
+        # decoded stdout.
+        await _checked(
+            f"git diff --binary HEAD > {shlex.quote(patch_path)}",
+            cwd=repo_dir,
+            what="git diff",
+        )
+        if await run_blocking(os.path.getsize, patch_path) > 0:
+            await _checked(
+                f"git apply --binary --whitespace=nowarn {shlex.quote(patch_path)}",
+                cwd=dest,
+                what="carrying over local changes",
+            )
+    finally:
+        await run_blocking(_remove_files, patch_path)
+
+    untracked = await _checked(
+        "git ls-files --others --exclude-standard -z",
+        cwd=repo_dir,
+        what="listing untracked files",
+    )
+    rel_paths = (untracked.get("stdout", "") or "").split("\0")
+    await run_blocking(_copy_untracked, repo_dir, dest, rel_paths)
+
+
+def _copy_untracked(repo_dir: str, dest: str, rel_paths: list[str]) -> None:
+    for rel_path in rel_paths:
+        if not rel_path or rel_path.split("/", 1)[0] in _SKIP_COPY:
+            continue
+        target = os.path.join(dest, rel_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(os.path.join(repo_dir, rel_path), target, follow_symlinks=False)
+
+
+async def create_scratch_workspace(
+    repo_dir: str, *, strategy: str = "auto", include_changes: bool = True
+) -> dict[str, Any]:
+    """Copy the mirror at ``repo_dir`` into a new scratch directory."""
+
+    if strategy not in SCRATCH_STRATEGIES:
+        raise UsageError(
+            f"strategy must be one of {', '.join(SCRATCH_STRATEGIES)}; got {strategy!r}"
+        )
+    if strategy == "reflink" and not include_changes:
+        raise UsageError("The reflink strategy always copies local changes")
+    root = scratch_root()
+    await run_blocking(_sweep_stale, root)
+
+    if strategy == "auto":
+        strategy = (
+            "reflink"
+            if include_changes and await reflink_supported(root)
+            else "worktree"
+        )
+    dest = os.path.join(root, uuid.uuid4().hex)
+    started = time.monotonic()
+    async with WORKSPACE_LOCKS.hold(repo_dir, write=False):
+        if strategy == "reflink":
+            try:
+                await _copy_reflink(repo_dir, dest)
+            except GitHubAPIError:
+                await run_blocking(shutil.rmtree, dest, True)
+                raise
+        else:
+            try:
+                await _add_worktree(repo_dir, dest, include_changes=include_changes)
+            except GitHubAPIError:
+                await _remove_worktree(repo_dir, dest)
+                raise
+    return {
+        "scratch_dir": dest,
+        "source_dir": repo_dir,
+        "strategy": strategy,
+        "include_changes": include_changes,
+        "setup_seconds": round(time.monotonic() - started, 3),
+    }
+
+
+def _venv_bin_dir(venv_root: str) -> str:
+    return os.path.join(venv_root, "Scripts" if os.name == "nt" else "bin")
+
+
+def _venv_python(venv_root: str) -> str:
+    exe = "python.exe" if os.name == "nt" else "python"
+    return os.path.join(_venv_bin_dir(venv_root), exe)
+
+
+def _site_packages(venv_root: str) -> list[str]:
+    if os.name == "nt":
+        pattern = os.path.join(venv_root, "Lib", "site-packages")
+    else:
+        pattern = os.path.join(venv_root, "lib", "python*", "site-packages")
+    return sorted(glob.glob(pattern))
+
+
+def _layer_virtualenv(venv_dir: str, base_root: str) -> None:
+    """Expose ``base_root``'s packages and scripts inside ``venv_dir``."""
+
+    own = _site_packages(venv_dir)
+    base = _site_packages(base_root)
+    if own and base:
+        # addsitedir (not a bare path) so the base's own .pth files, such as
+        # editable installs, are processed too.
+        with open(os.path.join(own[0], _BASE_VENV_PTH), "w", encoding="utf-8") as fh:
+            fh.writelines(f"import site; site.addsitedir({path!r})\n" for path in base)
+
+    # Console scripts (pytest, pip, ...) point at the base interpreter in
+    # their shebang; re-point copies at ours so they run in this venv.
+    base_bin, own_bin = _venv_bin_dir(base_root), _venv_bin_dir(venv_dir)
+    own_python = os.fsencode(_venv_python(venv_dir))
+    try:
+        names = os.listdir(base_bin)
+    except OSError:
+        return
+    for name in names:
+        target = os.path.join(own_bin, name)
+        if os.path.lexists(target):
+            continue
+        source = os.path.join(base_bin, name)
+        try:
+            with open(source, "rb") as fh:
+                head = fh.readline(4096)
+                if not head.startswith(b"#!"):
+                    continue
+                interpreter, sep, args = head[2:].rstrip(b"\r\n").partition(b" ")
+                where, exe = os.path.split(interpreter)
+                if where != os.fsencode(base_bin) or not exe.startswith(b"python"):
+                    continue
+                body = fh.read()
+        except OSError:
+            continue
+        with open(target, "wb") as fh:
+            fh.write(b"#!" + own_python + sep + args + b"\n" + body)
+        shutil.copymode(source, target)
+
+
+async def prepare_scratch_virtualenv(
+    scratch_dir: str, base_env: dict[str, str]
+) -> dict[str, str]:
+    """Create a scratch copy's own virtualenv, layered over the mirror's.
+
+    ``base_env`` is the activation env of the mirror's ``.venv-mcp``. The new
+    venv is made without pip and sees the mirror venv's packages through a
+    ``.pth`` file, so nothing is reinstalled. Installs land in the scratch
+    venv, and pip does not uninstall or upgrade packages outside its own
+    environment, so the mirror's venv is only ever read.
+    """
+
+    base_root = base_env["VIRTUAL_ENV"]
+    venv_dir = os.path.join(scratch_dir, _VENV_DIRNAME)
+    await _checked(
+        f"{shlex.quote(_venv_python(base_root))} -m venv --without-pip "
+        f"{shlex.quote(venv_dir)}",
+        cwd=scratch_dir,
+        what="virtualenv creation",
+    )
+    await run_blocking(_layer_virtualenv, venv_dir, base_root)
+    return {
+        **base_env,
+        "VIRTUAL_ENV": venv_dir,
+        "PATH": f"{_venv_bin_dir(venv_dir)}{os.pathsep}" + os.environ.get("PATH", ""),
+    }
+
+
+async def _remove_worktree(repo_dir: str, dest: str) -> None:
+    timeout = int(getattr(config, "ADAPTIV_MCP_DEFAULT_TIMEOUT_SECONDS", 0) or 0)
+    run_shell = _run_shell_fn()
+    result = await run_shell(
+        f"git worktree remove --force --force {shlex.quote(dest)}",
+        cwd=repo_dir,
+        timeout_seconds=timeout,
+    )
+    if result.get("exit_code", 0) != 0 or os.path.exists(dest):
+        await run_blocking(shutil.rmtree, dest, True)
+        await run_shell("git worktree prune", cwd=repo_dir, timeout_seconds=timeout)
+
+
+async def discard_scratch_workspace(scratch: dict[str, Any]) -> None:
+    dest = scratch["scratch_dir"]
+    if scratch["strategy"] == "worktree":
+        await _remove_worktree(scratch["source_dir"], dest)
+    else:
+        await run_blocking(shutil.rmtree, dest, True)
+
+
+@asynccontextmanager
+async def scratch_workspace(
+    repo_dir: str, *, strategy: str = "auto", include_changes: bool = True
+) -> AsyncIterator[dict[str, Any]]:
+    """Create a scratch workspace for the ``with`` block, then discard it."""
+
+    scratch = await create_scratch_workspace(
+        repo_dir, strategy=strategy, include_changes=include_changes
+    )
+    try:
+        yield scratch
+    finally:
+        try:
+            await discard_scratch_workspace(scratch)
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.warning(
+                "Failed to discard scratch workspace %s: %s",
+                scratch["scratch_dir"],
+                exc,
+            )
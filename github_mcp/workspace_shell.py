@@ -0,0 +1,310 @@
+"""Long-lived shells that run workspace commands without a cold start.
+
+Each ``_run_shell`` call normally spawns a fresh shell, rebuilds its
+environment and searches parent directories for the bundled ``rg``. With
+``MCP_WORKSPACE_WARM_SHELL`` enabled, commands for a given working directory
+and environment (which includes an activated ``.venv-mcp``) are instead
+written to a shell process kept running for that workspace:
+
+    ( cd -- <cwd> && eval <command> ) </dev/null
+    printf '<sentinel> %d\\n' $?        # and '<sentinel>\\n' on stderr
+
+The subshell keeps ``cd``/``export``/``exit`` from leaking into later
+commands; output is framed by a per-command sentinel. A shell that is busy
+is never shared, so ``run`` returns ``None`` and the caller falls back to a
+cold spawn. Timeouts and cancellation kill the shell's whole process group,
+and shells idle for ``MCP_WORKSPACE_WARM_SHELL_IDLE_SECONDS`` are closed.
+
+Commands that leave background processes writing to the shell's stdout
+should not use the warm shell; their late output would land in the next
+command's result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shlex
+import signal
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from . import config
+from .config import BASE_LOGGER
+
+LOGGER = BASE_LOGGER.getChild("workspace_shell")
+
+OutputCallback = Callable[[str, bytes], Awaitable[None]]
+
+_READ_SIZE = 64 * 1024
+
+
+def _marker_prefix_len(buf: bytes, marker: bytes) -> int:
+    """Length of the longest suffix of ``buf`` that starts ``marker``."""
+
+    for size in range(min(len(buf), len(marker) - 1), 0, -1):
+        if marker.startswith(buf[-size:]):
+            return size
+    return 0
+
+
+def warm_shell_available() -> bool:
+    if not config.WORKSPACE_WARM_SHELL or os.name == "nt":
+        return False
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class WarmShell:
+    """One shell process that runs one command at a time."""
+
+    def __init__(self, key: tuple[Any, ...], proc: asyncio.subprocess.Process):
+        self.key = key
+        self.proc = proc
+        self.loop = asyncio.get_running_loop()
+        self.busy = False
+        self.commands = 0
+        # Bytes withheld by ``_pump`` while checking for the sentinel.
+        self.held: dict[str, bytes] = {}
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None and not self.loop.is_closed()
+
+    def kill(self) -> None:
+        if self.proc.returncode is not None:
+            return
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except Exception:  # nosec B110
+            try:
+                self.proc.kill()
+            except Exception:  # nosec B110
+                pass
+
+    async def _pump(
+        self,
+        reader: asyncio.StreamReader,
+        name: str,
+        marker: bytes,
+        on_output: OutputCallback,
+    ) -> bytes:
+        """Forward output up to ``marker``; return the rest of the marker line."""
+
+        buf = b""
+        while True:
+            idx = buf.find(marker)
+            if idx >= 0:
+                self.held[name] = b""
+                if idx:
+                    await on_output(name, buf[:idx])
+                rest = buf[idx + len(marker) :]
+                while b"\n" not in rest:
+                    more = await reader.read(_READ_SIZE)
+                    if not more:
+                        break
+                    rest += more
+                return rest.split(b"\n", 1)[0]
+            # Hold back only a suffix that could be the start of the marker.
+            keep = _marker_prefix_len(buf, marker)
+            if len(buf) > keep:
+                await on_output(name, buf[: len(buf) - keep])
+                buf = buf[len(buf) - keep :]
+            self.held[name] = buf
+            chunk = await reader.read(_READ_SIZE)
+            if not chunk:
+                raise ConnectionError("warm shell exited")
+            buf += chunk
+
+    async def run(self, cmd: str, *, cwd: str, on_output: OutputCallback) -> int | None:
+        assert self.proc.stdin is not None  # nosec B101
+        assert self.proc.stdout is not None  # nosec B101
+        assert self.proc.stderr is not None  # nosec B101
+
+        sentinel = f"__MCP_WARM_{uuid.uuid4().hex}__"
+        script = (
+            f"( cd -- {shlex.quote(cwd)} && eval {shlex.quote(cmd)} ) </dev/null\n"
+            f"printf '{sentinel} %d\\n' $?\n"
+            f"printf '{sentinel}\\n' >&2\n"
+        )
+        self.proc.stdin.write(script.encode("utf-8"))
+        await self.proc.stdin.drain()
+
+        marker = sentinel.encode()
+        rc_text, _ = await asyncio.gather(
+            self._pump(self.proc.stdout, "stdout", marker, on_output),
+            self._pump(self.proc.stderr, "stderr", marker, on_output),
+        )
+        self.commands += 1
+        try:
+            return int(rc_text.strip() or b"0")
+        except ValueError:
+            return None
+
+
+class WarmShellPool:
+    """Warm shells keyed by (cwd, environment), LRU-bounded with idle expiry."""
+
+    def __init__(self, max_shells: int, idle_seconds: float):
+        self.max_shells = max(1, max_shells)
+        self.idle_seconds = idle_seconds
+        self._shells: OrderedDict[tuple[Any, ...], WarmShell] = OrderedDict()
+        self.started = 0
+        self.reused = 0
+        self.fallbacks = 0
+        self.killed = 0
+
+    def _reap(self) -> None:
+        now = time.monotonic()
+        loop = asyncio.get_running_loop()
+        for key, shell in list(self._shells.items()):
+            idle = now - shell.last_used
+            if (
+                not shell.alive
+                or shell.loop is not loop
+                or (
+                    not shell.busy
+                    and self.idle_seconds > 0
+                    and idle > self.idle_seconds
+                )
+            ):
+                shell.kill()
+                del self._shells[key]
+        while len(self._shells) > self.max_shells:
+            for key, shell in self._shells.items():
+                if not shell.busy:
+                    shell.kill()
+                    del self._shells[key]
+                    break
+            else:
+                break
+
+    async def _start(
+        self, key: tuple[Any, ...], env: dict[str, str]
+    ) -> WarmShell | None:
+        shell_executable = os.environ.get("SHELL") or "/bin/sh"
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                shell_executable,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=env,
+                start_new_session=True,
+            )
+        except OSError as exc:
+            LOGGER.warning("Cannot start warm shell: %s", exc)
+            return None
+        self.started += 1
+        return WarmShell(key, proc)
+
+    async def run(
+        self,
+        cmd: str,
+        *,
+        key: tuple[Any, ...],
+        cwd: str,
+        build_env: Callable[[], dict[str, str]],
+        timeout_seconds: float,
+        on_output: OutputCallback,
+    ) -> tuple[int | None, bool] | None:
+        """Run ``cmd`` in the warm shell for ``key``.
+
+        Returns ``(exit_code, timed_out)``, or ``None`` when the caller should
+        spawn a cold shell instead.
+        """
+
+        self._reap()
+        shell = self._shells.get(key)
+        if shell is not None and shell.busy:
+            self.fallbacks += 1
+            return None
+        if shell is None:
+            shell = await self._start(key, build_env())
+            if shell is None:
+                self.fallbacks += 1
+                return None
+            self._shells[key] = shell
+            self._reap()
+        else:
+            self.reused += 1
+        self._shells.move_to_end(key)
+
+        shell.busy = True
+        healthy = False
+        try:
+            if timeout_seconds and timeout_seconds > 0:
+                exit_code = await asyncio.wait_for(
+                    shell.run(cmd, cwd=cwd, on_output=on_output),
+                    timeout=timeout_seconds,
+                )
+            else:
+                exit_code = await shell.run(cmd, cwd=cwd, on_output=on_output)
+            healthy = True
+            return exit_code, False
+        except asyncio.TimeoutError:
+            shell.kill()
+            await shell.proc.wait()
+            for name, data in shell.held.items():
+                if data:
+                    await on_output(name, data)
+            return shell.proc.returncode, True
+        finally:
+            shell.busy = False
+            shell.last_used = time.monotonic()
+            if not healthy:
+                # Timed out, cancelled or the shell died mid-command: its
+                # framing can no longer be trusted.
+                shell.kill()
+                self.killed += 1
+                if self._shells.get(key) is shell:
+                    del self._shells[key]
+
+    async def close_all(self) -> None:
+        shells = list(self._shells.values())
+        self._shells.clear()
+        loop = asyncio.get_running_loop()
+        for shell in shells:
+            shell.kill()
+            if shell.loop is loop:
+                try:
+                    await asyncio.wait_for(shell.proc.wait(), timeout=3)
+                except Exception:  # nosec B110
+                    pass
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "enabled": bool(config.WORKSPACE_WARM_SHELL),
+            "max_shells": self.max_shells,
+            "started": self.started,
+            "reused": self.reused,
+            "fallbacks": self.fallbacks,
+            "killed": self.killed,
+            "shells": [
+                {
+                    "cwd": shell.key[0],
+                    "pid": shell.proc.pid,
+                    "busy": shell.busy,
+                    "commands": shell.commands,
+                    "idle_seconds": round(now - shell.last_used, 3),
+                }
+                for shell in self._shells.values()
+            ],
+        }
+
+
+WARM_SHELLS = WarmShellPool(
+    config.WORKSPACE_WARM_SHELL_MAX, config.WORKSPACE_WARM_SHELL_IDLE_SECONDS
+)
+
+
+def warm_shell_stats() -> dict[str, Any]:
+    return WARM_SHELLS.stats()
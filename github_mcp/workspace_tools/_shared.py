@@ -18,6 +18,7 @@ from github_mcp.workspace import (
     _stop_workspace_virtualenv,
     _workspace_virtualenv_status,
 )
+from github_mcp.workspace_locks import lock_workspace_for_tool
 
 
 def _cmd_invokes_git(cmd: object) -> bool:
@@ -450,8 +451,18 @@ def _workspace_deps() -> dict[str, Any]:
             env=(merged if merged else None),
         )
 
+    async def clone_repo_locked(*args: Any, **kwargs: Any) -> str:
+        repo_dir = await clone_repo_fn(*args, **kwargs)
+        # Hold the mirror (shared or exclusive per the tool's write
+        # classification) until the calling tool returns.
+        await lock_workspace_for_tool(repo_dir)
+        if not os.path.isdir(os.path.join(repo_dir, ".git")):
+            # Evicted by the workspace pool while we waited; clone it again.
+            repo_dir = await clone_repo_fn(*args, **kwargs)
+        return repo_dir
+
     return {
-        "clone_repo": clone_repo_fn,
+        "clone_repo": clone_repo_locked,
         "run_shell": run_shell_with_git_auth,
         "prepare_temp_virtualenv": prepare_venv_fn,
         "stop_virtualenv": stop_venv_fn,
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
 from typing import Any
 
@@ -50,3 +51,37 @@ async def ensure_workspace_clone(
         }
     except Exception as exc:
         return _structured_tool_error(exc, context="ensure_workspace_clone")
+
+
+@mcp_tool(write_action=False)
+async def get_workspace_pool_stats(refresh: bool = False) -> dict[str, Any]:
+    """Return repo mirror pool stats: disk use, hit rate, locks, shells, indexes.
+
+    ``refresh=True`` re-measures every mirror on disk instead of reusing the
+    sizes recorded during the last eviction pass.
+    """
+
+    try:
+        from github_mcp.line_index import line_index_stats
+        from github_mcp.scan_manifest import scan_manifest_stats
+        from github_mcp.search_index import search_index_stats
+        from github_mcp.workspace_freshness import workspace_freshness_stats
+        from github_mcp.workspace_locks import workspace_lock_stats
+        from github_mcp.workspace_pool import WORKSPACE_POOL, _base_dir
+        from github_mcp.workspace_shell import warm_shell_stats
+
+        if refresh or WORKSPACE_POOL.last_total_bytes is None:
+            await asyncio.to_thread(
+                WORKSPACE_POOL.measure, _base_dir(), refresh=refresh
+            )
+        return {
+            "pool": WORKSPACE_POOL.stats(),
+            "freshness": workspace_freshness_stats(),
+            "locks": workspace_lock_stats(),
+            "shells": warm_shell_stats(),
+            "search_index": search_index_stats(),
+            "line_index": line_index_stats(),
+            "scan_manifest": scan_manifest_stats(),
+        }
+    except Exception as exc:
+        return _structured_tool_error(exc, context="get_workspace_pool_stats")
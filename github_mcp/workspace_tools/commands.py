@@ -6,7 +6,10 @@ import uuid
 from typing import Any
 
 from github_mcp import config
+from github_mcp.blocking import run_blocking
 from github_mcp.command_classification import infer_write_action_from_shell
+from github_mcp.output_capture import bounded_output, spill_path
+from github_mcp.output_stream import live_output
 from github_mcp.server import (
     _structured_tool_error,
     mcp_tool,
@@ -18,6 +21,7 @@ from ._shared import (
     _maybe_install_dev_requirements,
     _tw,
 )
+from .fs import _read_lines_excerpt
 
 
 _TEST_ARTIFACT_DIRS = {
@@ -486,12 +490,14 @@ async def terminal_command(
             use_temp_venv=use_temp_venv,
         )
 
-        result = await deps["run_shell"](
-            command,
-            cwd=cwd,
-            timeout_seconds=timeout_seconds,
-            env=env,
-        )
+        async with live_output():
+            with bounded_output():
+                result = await deps["run_shell"](
+                    command,
+                    cwd=cwd,
+                    timeout_seconds=timeout_seconds,
+                    env=env,
+                )
 
         cleanup_summary: dict[str, Any] | None = None
         if is_pytest:
@@ -750,12 +756,14 @@ async def run_python(
         if args:
             cmd += " " + " ".join(shlex.quote(a) for a in args)
 
-        result = await deps["run_shell"](
-            cmd,
-            cwd=cwd,
-            timeout_seconds=timeout_seconds,
-            env=env,
-        )
+        async with live_output():
+            with bounded_output():
+                result = await deps["run_shell"](
+                    cmd,
+                    cwd=cwd,
+                    timeout_seconds=timeout_seconds,
+                    env=env,
+                )
 
         return {
             "workdir": cwd,
@@ -783,6 +791,62 @@ async def run_python(
                 pass
 
 
+@mcp_tool(write_action=False)
+async def read_command_output(
+    handle: str,
+    stream: str = "stdout",
+    *,
+    start_line: int = 1,
+    max_lines: int = 2000,
+    max_chars: int = 200000,
+) -> dict[str, Any]:
+    """Page through the full output of a command whose result was truncated.
+
+    ``terminal_command`` (and the suites built on it) keep only the head and
+    tail of large outputs in the result; when it reports ``output_handle``,
+    the complete stdout/stderr can be read here for a limited time. Spill
+    files stop at ``MCP_WORKSPACE_OUTPUT_SPILL_MAX_BYTES``; ``reached_spill_cap``
+    flags a file that hit it (the command result's ``*_spill_truncated``
+    fields say whether output was actually dropped).
+    """
+
+    try:
+        if not isinstance(start_line, int) or start_line < 1:
+            raise ValueError("start_line must be an int >= 1")
+        if not isinstance(max_lines, int) or max_lines < 1:
+            raise ValueError("max_lines must be an int >= 1")
+        if not isinstance(max_chars, int) or max_chars < 1:
+            raise ValueError("max_chars must be an int >= 1")
+
+        path = spill_path(handle, stream)
+        if not os.path.isfile(path):
+            return {
+                "handle": handle,
+                "stream": stream,
+                "exists": False,
+                "error": "Output not found; it may have expired or was never spilled.",
+            }
+        excerpt = await run_blocking(
+            _read_lines_excerpt,
+            path,
+            start_line=start_line,
+            max_lines=max_lines,
+            max_chars=max_chars,
+        )
+        size_bytes = os.path.getsize(path)
+        spill_cap = config.WORKSPACE_OUTPUT_SPILL_MAX_BYTES
+        return {
+            "handle": handle,
+            "stream": stream,
+            "exists": True,
+            "size_bytes": size_bytes,
+            "reached_spill_cap": spill_cap > 0 and size_bytes >= spill_cap,
+            "excerpt": excerpt,
+        }
+    except Exception as exc:
+        return _structured_tool_error(exc, context="read_command_output")
+
+
 # NOTE: The legacy tool name `run_command` has been removed.
 # `terminal_command` replaces it.
 #
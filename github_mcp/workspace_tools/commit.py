@@ -4,6 +4,7 @@ from typing import Any
 
 from github_mcp import config
 from github_mcp.exceptions import GitHubAPIError
+from github_mcp.ref_cache import invalidate_ref_cache
 from github_mcp.server import (
     _structured_tool_error,
     mcp_tool,
@@ -86,6 +87,7 @@ async def commit_workspace(
             if push_result["exit_code"] != 0:
                 stderr = push_result.get("stderr", "") or push_result.get("stdout", "")
                 raise GitHubAPIError(f"git push failed: {stderr}")
+            invalidate_ref_cache(full_name)
 
         # Collect commit metadata.
         rev = await deps["run_shell"](
@@ -176,6 +178,7 @@ async def commit_workspace_files(
             if push_result["exit_code"] != 0:
                 stderr = push_result.get("stderr", "") or push_result.get("stdout", "")
                 raise GitHubAPIError(f"git push failed: {stderr}")
+            invalidate_ref_cache(full_name)
 
         # Collect commit metadata.
         rev = await deps["run_shell"](
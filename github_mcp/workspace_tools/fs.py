@@ -1,4 +1,5 @@
 # Split from github_mcp.tools_workspace (generated).
+import codecs
 import glob
 import hashlib
 import os
@@ -10,12 +11,15 @@ from collections.abc import Mapping
 from typing import Any, Literal
 
 from github_mcp import config
+from github_mcp.blocking import parallel_width, run_blocking, run_blocking_map
 from github_mcp.diff_utils import build_unified_diff, diff_stats
+from github_mcp.line_index import open_text_at_line
 from github_mcp.server import (
     _structured_tool_error,
     mcp_tool,
 )
 from github_mcp.utils import _normalize_timeout_seconds
+from github_mcp.workspace import _widen_sparse_checkout
 
 from ._shared import _tw
 
@@ -24,6 +28,8 @@ from ._shared import _tw
 _DEFAULT_MAX_READ_BYTES = 8_000_000
 _DEFAULT_MAX_READ_CHARS = 2000000
 _DEFAULT_MAX_GLOB_EXPANSION = 5_000
+# Largest single read made by the budgeted multi-file reader.
+_BATCH_READ_CHUNK_BYTES = 64 * 1024
 # ---------------------------------------------------------------------------
 # Workspace operation normalization
 # ---------------------------------------------------------------------------
@@ -314,6 +320,155 @@ def _workspace_read_text_limited(
     }
 
 
+def _workspace_read_text_budgeted(
+    repo_dir: str, path: str, *, max_chars: int
+) -> dict[str, Any]:
+    """Read a workspace file as text, stopping once ``max_chars`` are decoded.
+
+    Unlike ``_workspace_read_text_limited`` no bytes past the budget are
+    loaded: each read asks for at most the characters still wanted (every
+    UTF-8 character is at least one byte). ``max_chars <= 0`` reads the whole
+    file. Binary files get the same non-text payload as the limited reader.
+    """
+
+    abs_path = _workspace_safe_join(repo_dir, path)
+    if not os.path.exists(abs_path) or _is_probably_binary(abs_path):
+        return _workspace_read_text_limited(repo_dir, path, max_chars=max(0, max_chars))
+
+    decoder = codecs.getincrementaldecoder("utf-8")("strict")
+    had_errors = False
+
+    def _decode(data: bytes, final: bool) -> str:
+        nonlocal decoder, had_errors
+        pending = decoder.getstate()[0]
+        try:
+            return decoder.decode(data, final)
+        except UnicodeDecodeError:
+            had_errors = True
+            decoder = codecs.getincrementaldecoder("utf-8")("replace")
+            return decoder.decode(pending + data, final)
+
+    parts: list[str] = []
+    chars = 0
+    bytes_read = 0
+    truncated = False
+    with open(abs_path, "rb") as f:
+        size_bytes = os.fstat(f.fileno()).st_size
+        while True:
+            want = _BATCH_READ_CHUNK_BYTES
+            if max_chars > 0:
+                want = min(want, max_chars - chars)
+            chunk = f.read(want) if want > 0 else b""
+            bytes_read += len(chunk)
+            if not chunk and max_chars > 0 and chars >= max_chars:
+                # Budget filled: report truncation only if anything is left.
+                truncated = bool(f.read(1)) or bool(_decode(b"", True))
+                break
+            text = _decode(chunk, not chunk)
+            if max_chars > 0 and chars + len(text) > max_chars:
+                text = text[: max_chars - chars]
+                truncated = True
+            parts.append(text)
+            chars += len(text)
+            if not chunk or truncated:
+                break
+
+    text = "".join(parts)
+    return {
+        "exists": True,
+        "path": path,
+        "text": text,
+        "encoding": "utf-8",
+        "had_decoding_errors": had_errors,
+        "size_bytes": int(size_bytes),
+        "bytes_read": bytes_read,
+        "truncated": truncated,
+        "truncated_bytes": False,
+        "truncated_chars": truncated,
+        "max_bytes": None,
+        "max_chars": int(max(0, max_chars)),
+        "text_digest": hashlib.blake2s(
+            text.encode("utf-8", errors="replace"), digest_size=4
+        ).hexdigest(),
+    }
+
+
+def _read_budgeted_or_error(
+    path: str, *, repo_dir: str, max_chars: int
+) -> dict[str, Any] | Exception:
+    try:
+        return _workspace_read_text_budgeted(repo_dir, path, max_chars=max_chars)
+    except Exception as exc:
+        return exc
+
+
+def _mark_cut(info: dict[str, Any], *, reason: str) -> None:
+    """Record where and why ``info["text"]`` was cut short."""
+
+    text = info.get("text") or ""
+    info["truncated"] = True
+    info["truncated_chars"] = True
+    info["cut"] = {
+        "reason": reason,
+        "at_char": len(text),
+        # Line holding the first character that was not returned.
+        "at_line": text.count("\n") + 1,
+    }
+
+
+async def _read_workspace_files_budgeted(
+    repo_dir: str,
+    paths: list[str],
+    *,
+    max_chars_per_file: int,
+    max_total_chars: int,
+) -> dict[str, Any]:
+    """Read ``paths`` in order under per-file and total character budgets.
+
+    Files are read up to ``parallel_width()`` at a time on the blocking pool,
+    but only as many as the rest of the total can cover at their full
+    per-file budget, so a batch never reads past the total. Once less than
+    one per-file budget is left (or there is no per-file budget), files are
+    read one at a time with what remains. Once the total is spent no further files are opened; they are
+    reported in ``unread``. A limit of 0 disables that budget.
+    """
+
+    remaining = max_total_chars if max_total_chars > 0 else None
+    read: list[tuple[str, dict[str, Any] | Exception]] = []
+    window = parallel_width()
+    i = 0
+    while i < len(paths) and remaining != 0:
+        width, limit = window, max_chars_per_file
+        if remaining is not None:
+            fits = remaining // max_chars_per_file if max_chars_per_file > 0 else 0
+            if fits:
+                width = min(window, fits)
+            else:
+                width, limit = 1, remaining
+        batch = paths[i : i + width]
+        i += len(batch)
+        infos = await run_blocking_map(
+            _read_budgeted_or_error, batch, repo_dir=repo_dir, max_chars=limit
+        )
+        for path, info in zip(batch, infos, strict=True):
+            if isinstance(info, dict) and info.get("exists"):
+                text = info.get("text") or ""
+                if info.get("truncated_chars"):
+                    per_file = 0 < max_chars_per_file <= len(text)
+                    _mark_cut(
+                        info,
+                        reason="max_chars_per_file" if per_file else "max_total_chars",
+                    )
+                if remaining is not None:
+                    remaining -= len(text)
+            read.append((path, info))
+    return {
+        "read": read,
+        "unread": list(paths[i:]),
+        "budget_exhausted": remaining == 0,
+    }
+
+
 def _is_probably_binary(abs_path: str) -> bool:
     try:
         with open(abs_path, "rb") as bf:
@@ -330,7 +485,10 @@ def _read_lines_excerpt(
     max_lines: int,
     max_chars: int,
 ) -> dict[str, Any]:
-    """Read a subset of lines from a text file without loading the full file."""
+    """Read a subset of lines from a text file without loading the full file.
+
+    Large files seek straight to ``start_line`` through the line index.
+    """
 
     if start_line < 1:
         raise ValueError("start_line must be >= 1")
@@ -346,8 +504,9 @@ def _read_lines_excerpt(
     had_decoding_errors = False
 
     try:
-        with open(abs_path, encoding="utf-8", errors="replace") as tf:
-            line_iter = enumerate(tf, start=1)
+        tf, first_line = open_text_at_line(abs_path, start_line)
+        with tf:
+            line_iter = enumerate(tf, start=first_line)
             for current, raw in line_iter:
                 if current < start_line:
                     continue
@@ -466,11 +625,13 @@ def _sections_from_line_iter(
     max_lines_per_section: int,
     max_chars_per_section: int,
     overlap_lines: int,
+    first_line: int = 1,
 ) -> dict[str, Any]:
     """Build multiple line-numbered sections from an iterator of text lines.
 
     The iterator must yield raw strings (including trailing newlines). Line
-    numbers are assigned based on iteration order starting at 1.
+    numbers are assigned based on iteration order starting at ``first_line``
+    (1 unless the iterator was already positioned further into the file).
     """
 
     params = _validate_section_params(
@@ -491,7 +652,7 @@ def _sections_from_line_iter(
     current_chars = 0
     current_start: int | None = None
     had_decoding_errors = False
-    line_no = 0
+    line_no = first_line - 1
     truncated = False
     next_start_line: int | None = None
 
@@ -625,11 +786,13 @@ def _read_lines_sections(
     """Read multiple line-numbered sections from a text file.
 
     This is intended for large files where callers want pagination/chunking
-    with *real* line numbers.
+    with *real* line numbers. Large files seek straight to ``start_line``
+    through the line index, so each page costs O(section), not O(file).
     """
 
     try:
-        with open(abs_path, encoding="utf-8", errors="replace") as tf:
+        tf, first_line = open_text_at_line(abs_path, int(start_line))
+        with tf:
             return _sections_from_line_iter(
                 tf,
                 start_line=int(start_line),
@@ -637,6 +800,7 @@ def _read_lines_sections(
                 max_lines_per_section=int(max_lines_per_section),
                 max_chars_per_section=int(max_chars_per_section),
                 overlap_lines=int(overlap_lines),
+                first_line=first_line,
             )
     except UnicodeDecodeError:
         # errors="replace" should avoid this, but keep schema stable.
@@ -1179,8 +1343,10 @@ async def get_workspace_file_contents(
         repo_dir = await deps["clone_repo"](
             full_name, ref=effective_ref, preserve_changes=True
         )
+        await _widen_sparse_checkout(repo_dir, [path])
 
-        info = _workspace_read_text_limited(
+        info = await run_blocking(
+            _workspace_read_text_limited,
             repo_dir,
             path,
             max_chars=int(max_chars),
@@ -1215,8 +1381,11 @@ async def get_workspace_files_contents(
       - All paths are repository-relative.
       - When expand_globs is true, glob patterns (e.g. "src/**/*.py") are
         expanded relative to the repo root.
-      - max_chars_per_file and max_total_chars are accepted for compatibility
-        but are not enforced as truncation limits.
+      - Files are read in order, several at a time, and never past their
+        budget: each returns at most max_chars_per_file characters, and once
+        max_total_chars are returned no further files are opened (they are
+        listed in unread_paths). 0 disables a budget. Files cut short carry
+        `cut: {reason, at_char, at_line}`, also listed in `summary.cut`.
     """
 
     try:
@@ -1236,6 +1405,7 @@ async def get_workspace_files_contents(
         repo_dir = await deps["clone_repo"](
             full_name, ref=effective_ref, preserve_changes=True
         )
+        await _widen_sparse_checkout(repo_dir, paths)
 
         expanded: list[str] = []
         glob_truncated = False
@@ -1270,28 +1440,31 @@ async def get_workspace_files_contents(
             seen.add(p)
             normalized_paths.append(p)
 
+        batch = await _read_workspace_files_budgeted(
+            repo_dir,
+            normalized_paths,
+            max_chars_per_file=int(max_chars_per_file),
+            max_total_chars=int(max_total_chars),
+        )
+
         files: list[dict[str, Any]] = []
         missing: list[str] = []
         errors: list[dict[str, Any]] = []
+        cut: list[dict[str, Any]] = []
         truncated = False
-        for p in normalized_paths:
-            try:
-                info = _workspace_read_text_limited(
-                    repo_dir,
-                    p,
-                    max_chars=0,
-                    max_bytes=0,
-                )
-                if info.get("exists"):
+        for p, info in batch["read"]:
+            if isinstance(info, Exception):
+                errors.append({"path": p, "error": str(info)})
+            elif info.get("exists"):
+                files.append(info)
+                if info.get("truncated"):
+                    truncated = True
+                if info.get("cut"):
+                    cut.append({"path": p, **info["cut"]})
+            else:
+                if include_missing:
                     files.append(info)
-                    if info.get("truncated"):
-                        truncated = True
-                else:
-                    if include_missing:
-                        files.append(info)
-                    missing.append(p)
-            except Exception as exc:
-                errors.append({"path": p, "error": str(exc)})
+                missing.append(p)
 
         ok = len(errors) == 0
         status = "ok" if ok else "partial"
@@ -1313,9 +1486,14 @@ async def get_workspace_files_contents(
                 "total_chars": sum(len(f.get("text") or "") for f in files),
                 "truncated": bool(truncated),
                 "glob_truncated": bool(glob_truncated),
+                "budget_exhausted": bool(batch["budget_exhausted"]),
+                "unread": len(batch["unread"]),
+                "bytes_read": sum(int(f.get("bytes_read") or 0) for f in files),
+                "cut": cut,
             },
             "files": files,
             "missing_paths": missing,
+            "unread_paths": batch["unread"],
             "errors": errors,
         }
     except Exception as exc:
@@ -1353,6 +1531,7 @@ async def read_workspace_file_excerpt(
         repo_dir = await deps["clone_repo"](
             full_name, ref=effective_ref, preserve_changes=True
         )
+        await _widen_sparse_checkout(repo_dir, [path])
 
         abs_path = _workspace_safe_join(repo_dir, path)
         if not os.path.exists(abs_path):
@@ -1456,6 +1635,7 @@ async def read_workspace_file_sections(
         repo_dir = await deps["clone_repo"](
             full_name, ref=effective_ref, preserve_changes=True
         )
+        await _widen_sparse_checkout(repo_dir, [path])
 
         abs_path = _workspace_safe_join(repo_dir, path)
         if not os.path.exists(abs_path):
@@ -1588,6 +1768,7 @@ async def read_workspace_file_with_line_numbers(
         repo_dir = await deps["clone_repo"](
             full_name, ref=effective_ref, preserve_changes=True
         )
+        await _widen_sparse_checkout(repo_dir, [path])
 
         abs_path = _workspace_safe_join(repo_dir, path)
         if not os.path.exists(abs_path):
@@ -1870,7 +2051,8 @@ async def read_git_file_excerpt(
             full_name, ref=effective_ref, preserve_changes=True
         )
 
-        exists, lines, truncated, error = _git_show_lines_excerpt_limited(
+        exists, lines, truncated, error = await run_blocking(
+            _git_show_lines_excerpt_limited,
             repo_dir,
             git_ref=git_ref.strip(),
             path=path.strip(),
@@ -1964,7 +2146,8 @@ async def read_git_file_sections(
             full_name, ref=effective_ref, preserve_changes=True
         )
 
-        exists, sections, error = _git_show_lines_sections_limited(
+        exists, sections, error = await run_blocking(
+            _git_show_lines_sections_limited,
             repo_dir,
             git_ref=git_ref.strip(),
             path=path.strip(),
@@ -2092,10 +2275,14 @@ async def compare_workspace_files(
                     if not isinstance(base_ref, str) or not base_ref.strip():
                         raise ValueError("base_ref must be a non-empty string")
 
-                    ws = _workspace_read_text_limited(
-                        repo_dir, left_path, max_chars=max_chars_per_side_value
+                    ws = await run_blocking(
+                        _workspace_read_text_limited,
+                        repo_dir,
+                        left_path,
+                        max_chars=max_chars_per_side_value,
                     )
-                    base = _git_show_text_limited(
+                    base = await run_blocking(
+                        _git_show_text_limited,
                         repo_dir,
                         base_ref,
                         left_path,
@@ -2121,13 +2308,15 @@ async def compare_workspace_files(
                     if not isinstance(right_path, str) or not right_path.strip():
                         raise ValueError("right_path must be a non-empty string")
 
-                    left_info = _git_show_text_limited(
+                    left_info = await run_blocking(
+                        _git_show_text_limited,
                         repo_dir,
                         left_ref,
                         left_path,
                         max_chars=max_chars_per_side_value,
                     )
-                    right_info = _git_show_text_limited(
+                    right_info = await run_blocking(
+                        _git_show_text_limited,
                         repo_dir,
                         right_ref,
                         right_path,
@@ -2150,11 +2339,17 @@ async def compare_workspace_files(
                         raise ValueError("left_path must be a non-empty string")
                     if not isinstance(right_path, str) or not right_path.strip():
                         raise ValueError("right_path must be a non-empty string")
-                    left_info = _workspace_read_text_limited(
-                        repo_dir, left_path, max_chars=max_chars_per_side_value
+                    left_info = await run_blocking(
+                        _workspace_read_text_limited,
+                        repo_dir,
+                        left_path,
+                        max_chars=max_chars_per_side_value,
                     )
-                    right_info = _workspace_read_text_limited(
-                        repo_dir, right_path, max_chars=max_chars_per_side_value
+                    right_info = await run_blocking(
+                        _workspace_read_text_limited,
+                        repo_dir,
+                        right_path,
+                        max_chars=max_chars_per_side_value,
                     )
                     if not left_info.get("exists"):
                         raise FileNotFoundError(left_path)
@@ -2277,8 +2472,11 @@ async def _build_workspace_diff_payload(
             full_name, ref=effective_ref, preserve_changes=True
         )
 
-        before_info = _workspace_read_text_limited(
-            repo_dir, path, max_chars=max_chars_per_side_value
+        before_info = await run_blocking(
+            _workspace_read_text_limited,
+            repo_dir,
+            path,
+            max_chars=max_chars_per_side_value,
         )
         before_text = (
             (before_info.get("text") or "") if before_info.get("exists") else ""
@@ -7,6 +7,7 @@ from typing import Any
 
 from github_mcp import config
 from github_mcp.exceptions import GitHubAPIError
+from github_mcp.ref_cache import invalidate_ref_cache
 from github_mcp.server import (
     _structured_tool_error,
     mcp_tool,
@@ -333,6 +334,7 @@ async def workspace_create_branch(
             )
             if push_result.get("exit_code", 0) != 0:
                 raise _shell_error("git push", push_result)
+            invalidate_ref_cache(full_name)
 
         # Rekey the workspace mirror directory so future calls using `ref=new_branch`
         # see the same working tree (including any uncommitted edits).
@@ -429,6 +431,7 @@ async def workspace_delete_branch(
         )
         if delete_remote.get("exit_code", 0) != 0:
             raise _shell_error("git push origin --delete", delete_remote)
+        invalidate_ref_cache(full_name)
 
         # Then delete local branch if it exists. If it does not, treat that as best-effort.
         delete_local = await deps["run_shell"](
@@ -644,6 +647,7 @@ async def workspace_self_heal_branch(
             cwd=base_repo_dir,
             timeout_seconds=t_default,
         )
+        invalidate_ref_cache(full_name)
 
         # The freshly checked out local repo mirror is used for the new branch.
         new_repo_dir = base_repo_dir
@@ -902,6 +906,7 @@ async def workspace_sync_bidirectional(
             )
             if push_result.get("exit_code", 0) != 0:
                 raise _shell_error("git push", push_result)
+            invalidate_ref_cache(full_name)
             actions.append("pushed_to_remote")
             snapshot = await _workspace_sync_snapshot(
                 deps, repo_dir=repo_dir, branch=effective_ref
@@ -22,6 +22,7 @@ from typing import Any
 
 from github_mcp import config
 from github_mcp.exceptions import GitHubAPIError
+from github_mcp.ref_cache import invalidate_ref_cache
 from github_mcp.server import _structured_tool_error, mcp_tool
 from github_mcp.utils import _normalize_timeout_seconds
 from github_mcp.workspace import _workspace_path
@@ -1004,6 +1005,7 @@ async def workspace_git_checkout(
             if push_res.get("exit_code", 0) != 0:
                 stderr = push_res.get("stderr", "") or push_res.get("stdout", "")
                 raise GitHubAPIError(f"git push failed: {stderr}")
+            invalidate_ref_cache(full_name)
 
         effective_target = _tw()._effective_ref_for_repo(full_name, target)
         moved = False
@@ -1,15 +1,27 @@
 # Split from github_mcp.tools_workspace (generated).
 
 import hashlib
+import io
 import os
 import posixpath
 import re
+import subprocess  # nosec B404
 from typing import Any
 
+from github_mcp.blocking import parallel_width, run_blocking, run_blocking_map
+from github_mcp.scan_manifest import SCAN_MANIFESTS
+from github_mcp.search_index import SEARCH_INDEXES
 from github_mcp.server import (
     _structured_tool_error,
     mcp_tool,
 )
+from github_mcp.workspace import _widen_sparse_checkout
+from github_mcp.workspace_cursor import (
+    WalkCursor,
+    decode_cursor,
+    encode_cursor,
+    workspace_fingerprint,
+)
 
 from ._shared import _tw
 
@@ -123,6 +135,109 @@ def _read_first_lines(
     return out, truncated
 
 
+# Smallest number of files handed to one pool thread by scan_workspace_tree.
+_SCAN_BATCH_MIN_FILES = 32
+
+
+def _scan_file_metadata(
+    abs_path: str,
+    values: dict[Any, Any],
+    *,
+    hash_max_bytes: int | None,
+    line_count_max_bytes: int | None,
+    head_limits: tuple[int, int] | None,
+) -> tuple[list[dict[str, Any]], bool] | None:
+    """Compute the scan metadata missing from ``values``; return the head."""
+
+    if "is_binary" not in values:
+        values["is_binary"] = _is_probably_binary(abs_path)
+    if hash_max_bytes is not None and ("sha256", hash_max_bytes) not in values:
+        values[("sha256", hash_max_bytes)] = _sha256_limited(
+            abs_path, max_bytes=hash_max_bytes
+        )
+    if values["is_binary"]:
+        return None
+    if (
+        line_count_max_bytes is not None
+        and ("line_count", line_count_max_bytes) not in values
+    ):
+        values[("line_count", line_count_max_bytes)] = _count_lines_limited(
+            abs_path, max_bytes=line_count_max_bytes
+        )
+    if head_limits is None:
+        return None
+    return _read_first_lines(
+        abs_path, max_lines=head_limits[0], max_chars=head_limits[1]
+    )
+
+
+def _scan_files_batch(
+    batch: list[tuple[str, dict[Any, Any], int | None]],
+    *,
+    line_count_max_bytes: int | None,
+    head_limits: tuple[int, int] | None,
+) -> list[tuple[list[dict[str, Any]], bool] | None]:
+    return [
+        _scan_file_metadata(
+            abs_path,
+            values,
+            hash_max_bytes=hash_max_bytes,
+            line_count_max_bytes=line_count_max_bytes,
+            head_limits=head_limits,
+        )
+        for abs_path, values, hash_max_bytes in batch
+    ]
+
+
+async def _run_scan_batches(
+    items: list[tuple[str, dict[Any, Any], int | None]], **kwargs: Any
+) -> list[tuple[list[dict[str, Any]], bool] | None]:
+    """Run ``_scan_files_batch`` over ``items`` on the blocking pool in parallel."""
+
+    if not items:
+        return []
+    size = max(_SCAN_BATCH_MIN_FILES, -(-len(items) // parallel_width()))
+    batches = [items[i : i + size] for i in range(0, len(items), size)]
+    done = await run_blocking_map(_scan_files_batch, batches, **kwargs)
+    return [head for batch in done for head in batch]
+
+
+def _git_unchanged_blob_shas(repo_dir: str) -> dict[str, str]:
+    """Blob SHAs from the git index for tracked files unmodified in the worktree."""
+
+    try:
+        staged = subprocess.run(  # nosec
+            ["git", "ls-files", "-s", "-z"],
+            cwd=repo_dir,
+            capture_output=True,
+            timeout=60,
+            check=False,
+        )
+        modified = subprocess.run(  # nosec
+            ["git", "ls-files", "-m", "-z"],
+            cwd=repo_dir,
+            capture_output=True,
+            timeout=60,
+            check=False,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return {}
+    if staged.returncode != 0 or modified.returncode != 0:
+        return {}
+
+    changed = set(os.fsdecode(modified.stdout).split("\0"))
+    shas: dict[str, str] = {}
+    for record in os.fsdecode(staged.stdout).split("\0"):
+        meta, _, rel = record.partition("\t")
+        parts = meta.split(" ")
+        # Skip conflicted stages and submodules (gitlinks).
+        if len(parts) != 3 or parts[2] != "0" or parts[0] == "160000":
+            continue
+        if rel and rel not in changed:
+            shas[rel] = parts[1]
+    return shas
+
+
 def _normalize_workspace_path(path: str) -> str:
     normalized = path.strip().replace("\\", "/")
     while "//" in normalized:
@@ -158,6 +273,24 @@ def _is_within_dir(path: str, root: str) -> bool:
         return False
 
 
+def _start_cursor(
+    cursor: int | str, tool: str, args: dict[str, Any], root: str
+) -> tuple[int, WalkCursor | None, str]:
+    """Return (offset, resume position, fingerprint) for a paging ``cursor``.
+
+    ``cursor`` is either the legacy integer offset or a ``next_cursor_token``
+    from a previous page of the same call.
+    """
+
+    fingerprint = workspace_fingerprint(root)
+    if isinstance(cursor, str):
+        resume = decode_cursor(cursor.strip(), tool, args)
+        return resume.offset, resume, fingerprint
+    if not isinstance(cursor, int) or cursor < 0:
+        raise ValueError("cursor must be an int >= 0")
+    return int(cursor), None, fingerprint
+
+
 def _resolve_workspace_start(repo_dir: str, path: str) -> tuple[str, str]:
     root = os.path.realpath(repo_dir)
     normalized_path = _normalize_workspace_path(path) if path else ""
@@ -189,7 +322,7 @@ async def list_workspace_files(
     max_depth: int | None = None,
     include_hidden: bool = True,
     include_dirs: bool = False,
-    cursor: int = 0,
+    cursor: int | str = 0,
     *,
     owner: str | None = None,
     repo: str | None = None,
@@ -199,7 +332,10 @@ async def list_workspace_files(
 
     This endpoint is designed to work for very large repos:
     - Enforces `max_files` and `max_depth` (unlike earlier versions).
-    - Supports simple pagination via `cursor` (an integer offset).
+    - Supports pagination via `cursor`: pass back `next_cursor_token` to
+      resume right after the previous page's last path (`next_cursor`, an
+      integer offset, is still accepted). `cursor_stale` reports that HEAD or
+      the git index changed since the token was issued.
     """
 
     # Alias: some clients use max_results instead of max_files.
@@ -218,6 +354,7 @@ async def list_workspace_files(
         repo_dir = await deps["clone_repo"](
             full_name, ref=effective_ref, preserve_changes=True
         )
+        await _widen_sparse_checkout(repo_dir, [path])
 
         root = os.path.realpath(repo_dir)
         normalized_path, start = _resolve_workspace_start(repo_dir, path)
@@ -233,7 +370,7 @@ async def list_workspace_files(
                     "path": normalized_path if path else "",
                     "files": [],
                     "truncated": False,
-                    "cursor": int(cursor),
+                    "cursor": cursor,
                     "next_cursor": None,
                     "max_files": max_files,
                     "max_depth": max_depth,
@@ -273,12 +410,23 @@ async def list_workspace_files(
         if not isinstance(max_depth, int) or max_depth < 0:
             raise ValueError("max_depth must be an int >= 0")
 
-        # Cursor is a simple offset in the ordered result stream.
-        if not isinstance(cursor, int) or cursor < 0:
-            raise ValueError("cursor must be an int >= 0")
-        cursor = int(cursor)
+        # Cursor is an offset in the ordered result stream, or a token that
+        # resumes right after the last path of the previous page.
+        cursor_args = {
+            "full_name": full_name,
+            "ref": effective_ref,
+            "path": normalized_path if path else "",
+            "max_depth": max_depth,
+            "include_hidden": bool(include_hidden),
+            "include_dirs": bool(include_dirs),
+        }
+        offset, resume, fingerprint = _start_cursor(
+            cursor, "list_workspace_files", cursor_args, root
+        )
+        skip = 0 if resume is not None else offset
 
         out: list[str] = []
+        out_is_dir: list[bool] = []
         skipped = 0
         yielded = 0
         next_cursor: int | None = None
@@ -302,20 +450,26 @@ async def list_workspace_files(
 
             dirnames.sort()
             filenames.sort()
+            listed_dirs = list(dirnames)
+            if resume is not None:
+                resume.prune(os.path.relpath(cur_dir, root), dirnames)
 
             if include_dirs:
-                for d in dirnames:
+                for d in listed_dirs:
                     rp = os.path.relpath(os.path.join(cur_dir, d), root)
                     if not include_hidden and os.path.basename(rp).startswith("."):
                         continue
-                    if skipped < cursor:
+                    if resume is not None and resume.done(rp, is_dir=True):
+                        continue
+                    if skipped < skip:
                         skipped += 1
                         continue
                     if yielded >= max_files:
                         truncated = True
-                        next_cursor = cursor + yielded
+                        next_cursor = offset + yielded
                         break
                     out.append(rp)
+                    out_is_dir.append(True)
                     yielded += 1
                 if truncated:
                     break
@@ -324,26 +478,42 @@ async def list_workspace_files(
                 if not include_hidden and f.startswith("."):
                     continue
                 rp = os.path.relpath(os.path.join(cur_dir, f), root)
-                if skipped < cursor:
+                if resume is not None and resume.done(rp):
+                    continue
+                if skipped < skip:
                     skipped += 1
                     continue
                 if yielded >= max_files:
                     truncated = True
-                    next_cursor = cursor + yielded
+                    next_cursor = offset + yielded
                     break
                 out.append(rp)
+                out_is_dir.append(False)
                 yielded += 1
             if truncated:
                 break
 
+        next_cursor_token = None
+        if truncated and out:
+            next_cursor_token = encode_cursor(
+                "list_workspace_files",
+                cursor_args,
+                path=out[-1],
+                offset=offset + yielded,
+                fingerprint=fingerprint,
+                is_dir=out_is_dir[-1],
+            )
+
         return {
             "full_name": full_name,
             "ref": effective_ref,
             "path": normalized_path if path else "",
             "files": out,
             "truncated": bool(truncated),
-            "cursor": int(cursor),
+            "cursor": offset,
             "next_cursor": next_cursor,
+            "next_cursor_token": next_cursor_token,
+            "cursor_stale": bool(resume and resume.fingerprint != fingerprint),
             "max_files": max_files,
             "max_depth": max_depth,
         }
@@ -532,7 +702,7 @@ async def search_workspace(
     regex: bool | None = None,
     max_file_bytes: int | None = None,
     include_hidden: bool = True,
-    cursor: int = 0,
+    cursor: int | str = 0,
     *,
     owner: str | None = None,
     repo: str | None = None,
@@ -545,8 +715,11 @@ async def search_workspace(
     Behavior for `query`:
     - When regex=true, `query` is treated as a Python regular expression.
     - Otherwise `query` is treated as a literal substring match.
-    - max_results is enforced as an output limit and supports offset pagination
-      via `cursor` (cursor is the offset in the global match stream).
+    - max_results is enforced as an output limit. To page, pass the returned
+      `next_cursor_token` as `cursor`: the walk resumes after the last
+      file/line returned, without re-matching earlier files. An integer
+      `cursor` (offset in the global match stream, as in `next_cursor`) is
+      still accepted.
     - max_file_bytes is enforced as a per-file safety limit.
     """
 
@@ -564,12 +737,15 @@ async def search_workspace(
         repo_dir = await deps["clone_repo"](
             full_name, ref=effective_ref, preserve_changes=True
         )
+        await _widen_sparse_checkout(repo_dir, [path])
 
         if max_results is None:
             max_results = 200
         if not isinstance(max_results, int) or max_results < 1:
             max_results = 200
-        if not isinstance(cursor, int) or cursor < 0:
+        if not isinstance(cursor, (int, str)) or (
+            isinstance(cursor, int) and cursor < 0
+        ):
             cursor = 0
 
         root = os.path.realpath(repo_dir)
@@ -590,7 +766,7 @@ async def search_workspace(
                     "used_regex": bool(regex),
                     "results": [],
                     "truncated": False,
-                    "cursor": int(cursor),
+                    "cursor": cursor,
                     "next_cursor": None,
                     "files_scanned": 0,
                     "files_skipped": 0,
@@ -608,7 +784,7 @@ async def search_workspace(
                 "used_regex": False,
                 "results": [],
                 "truncated": False,
-                "cursor": int(cursor),
+                "cursor": cursor,
                 "next_cursor": None,
                 "files_scanned": 0,
                 "files_skipped": 0,
@@ -628,7 +804,7 @@ async def search_workspace(
                 "used_regex": False,
                 "results": [],
                 "truncated": False,
-                "cursor": int(cursor),
+                "cursor": cursor,
                 "next_cursor": None,
                 "files_scanned": 0,
                 "files_skipped": 1,
@@ -664,93 +840,175 @@ async def search_workspace(
             except Exception:
                 return False
 
-        results: list[dict[str, Any]] = []
-        files_scanned = 0
-        files_skipped = 0
-        matches_seen = 0
-        truncated = False
-        next_cursor: int | None = None
-        walk_iter = (
-            [(os.path.dirname(start), [], [os.path.basename(start)])]
-            if single_file
-            else os.walk(start)
+        cursor_args = {
+            "full_name": full_name,
+            "ref": effective_ref,
+            "path": normalized_path if path else "",
+            "query": query,
+            "regex": used_regex,
+            "include_hidden": bool(include_hidden),
+            "max_file_bytes": max_file_bytes,
+        }
+        offset, resume, fingerprint = _start_cursor(
+            cursor, "search_workspace", cursor_args, root
         )
-        for cur_dir, dirnames, filenames in walk_iter:
-            dirnames[:] = [d for d in dirnames if d != ".git"]
-            if not include_hidden:
-                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
-
-            # Keep results deterministic (important for cursor pagination).
-            dirnames.sort()
-            filenames.sort()
-
-            for fname in filenames:
-                if not include_hidden and fname.startswith("."):
-                    continue
+        skip = 0 if resume is not None else offset
+
+        def _walk() -> tuple[list[dict[str, Any]], int, int, bool, Any]:
+            # Walk, index and match off the event loop, in one blocking call.
+            # The trigram index skips files that cannot contain the query.
+            index = SEARCH_INDEXES.open(repo_dir)
+            indexed = (
+                index.query(query, regex=used_regex) if index is not None else None
+            )
+            seen: set[str] = set()
+
+            results: list[dict[str, Any]] = []
+            files_scanned = 0
+            files_skipped = 0
+            matches_seen = 0
+            truncated = False
+            walk_iter = (
+                [(os.path.dirname(start), [], [os.path.basename(start)])]
+                if single_file
+                else os.walk(start)
+            )
+            for cur_dir, dirnames, filenames in walk_iter:
+                dirnames[:] = [d for d in dirnames if d != ".git"]
+                if not include_hidden:
+                    dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+
+                # Keep results deterministic (important for cursor pagination).
+                dirnames.sort()
+                filenames.sort()
+                rel_dir = os.path.relpath(cur_dir, root)
+                if resume is not None:
+                    resume.prune(rel_dir, dirnames)
+
+                for fname in filenames:
+                    if not include_hidden and fname.startswith("."):
+                        continue
 
-                abs_path = os.path.join(cur_dir, fname)
-                try:
-                    st = os.stat(abs_path)
-                except OSError:
-                    files_skipped += 1
-                    continue
+                    rel_path = fname if rel_dir == "." else os.path.join(rel_dir, fname)
+                    resume_line = 0
+                    if resume is not None:
+                        if resume.before(rel_path):
+                            continue
+                        if rel_path.replace("\\", "/") == resume.path:
+                            resume_line = resume.line
 
-                if max_file_bytes is not None and max_file_bytes > 0:
+                    abs_path = os.path.join(cur_dir, fname)
                     try:
-                        if st.st_size > max_file_bytes:
-                            files_skipped += 1
-                            continue
-                    except Exception:
+                        st = os.stat(abs_path)
+                    except OSError:
                         files_skipped += 1
                         continue
+                    seen.add(rel_path)
 
-                # Skip probable binaries.
-                try:
-                    with open(abs_path, "rb") as bf:
-                        sample = bf.read(2048)
-                        if b"\x00" in sample:
+                    if max_file_bytes is not None and max_file_bytes > 0:
+                        try:
+                            if st.st_size > max_file_bytes:
+                                files_skipped += 1
+                                continue
+                        except Exception:
                             files_skipped += 1
                             continue
-                except OSError:
-                    files_skipped += 1
-                    continue
 
-                files_scanned += 1
-                rel_path = os.path.relpath(abs_path, root)
+                    if indexed is not None:
+                        if indexed.known_binary(rel_path, st):
+                            files_skipped += 1
+                            continue
+                        if indexed.check(rel_path, st) is False:
+                            continue
 
-                try:
-                    with open(abs_path, encoding="utf-8", errors="ignore") as tf:
-                        for i, line in enumerate(tf, start=1):
-                            if not _match_line(line):
+                    # Skip probable binaries.
+                    try:
+                        with open(abs_path, "rb") as bf:
+                            sample = bf.read(2048)
+                            if b"\x00" in sample:
+                                if indexed is not None:
+                                    indexed.mark_binary(rel_path, st)
+                                files_skipped += 1
                                 continue
+                            data = None
+                            if indexed is not None and indexed.needs(rel_path, st):
+                                data = sample + bf.read()
+                    except OSError:
+                        files_skipped += 1
+                        continue
 
-                            # Offset pagination across the global match stream.
-                            if matches_seen < cursor:
-                                matches_seen += 1
-                                continue
-                            matches_seen += 1
+                    files_scanned += 1
+                    if data is not None:
+                        indexed.add(rel_path, st, data)
 
-                            results.append(
-                                {
-                                    "file": rel_path,
-                                    "line": i,
-                                    "text": line.rstrip("\n"),
-                                }
+                    try:
+                        with (
+                            open(abs_path, encoding="utf-8", errors="ignore")
+                            if data is None
+                            else io.StringIO(
+                                data.decode("utf-8", errors="ignore"), newline=None
                             )
+                        ) as tf:
+                            for i, line in enumerate(tf, start=1):
+                                if i <= resume_line or not _match_line(line):
+                                    continue
+
+                                # Offset pagination across the global match stream.
+                                if matches_seen < skip:
+                                    matches_seen += 1
+                                    continue
+                                matches_seen += 1
 
-                            if len(results) >= max_results:
-                                truncated = True
-                                next_cursor = cursor + len(results)
-                                break
-                except OSError:
-                    files_skipped += 1
-                    continue
+                                results.append(
+                                    {
+                                        "file": rel_path,
+                                        "line": i,
+                                        "text": line.rstrip("\n"),
+                                    }
+                                )
+
+                                if len(results) >= max_results:
+                                    truncated = True
+                                    break
+                    except OSError:
+                        files_skipped += 1
+                        continue
+
+                    if truncated:
+                        break
 
                 if truncated:
                     break
 
-            if truncated:
-                break
+            index_info = None
+            if indexed is not None:
+                if (
+                    not (truncated or single_file or start_rel or resume)
+                    and include_hidden
+                ):
+                    indexed.index.retain(seen)
+                index_info = indexed.finish()
+            return results, files_scanned, files_skipped, truncated, index_info
+
+        (
+            results,
+            files_scanned,
+            files_skipped,
+            truncated,
+            index_info,
+        ) = await run_blocking(_walk)
+        next_cursor = offset + len(results) if truncated else None
+
+        next_cursor_token = None
+        if truncated:
+            next_cursor_token = encode_cursor(
+                "search_workspace",
+                cursor_args,
+                path=results[-1]["file"],
+                line=results[-1]["line"],
+                offset=offset + len(results),
+                fingerprint=fingerprint,
+            )
 
         # Return after scanning the full walk.
         return {
@@ -762,12 +1020,15 @@ async def search_workspace(
             "used_regex": used_regex,
             "results": results,
             "truncated": bool(truncated),
-            "cursor": int(cursor),
+            "cursor": offset,
             "next_cursor": next_cursor,
+            "next_cursor_token": next_cursor_token,
+            "cursor_stale": bool(resume and resume.fingerprint != fingerprint),
             "files_scanned": files_scanned,
             "files_skipped": files_skipped,
             "max_results": max_results,
             "max_file_bytes": max_file_bytes,
+            "index": index_info,
         }
     except Exception as exc:
         return _structured_tool_error(exc, context="search_workspace")
@@ -791,9 +1052,10 @@ async def scan_workspace_tree(
     include_dirs: bool = False,
     max_entries: int = 2000,
     max_depth: int = 25,
-    cursor: int = 0,
+    cursor: int | str = 0,
     include_hash: bool = True,
     hash_max_bytes: int = 200_000,
+    git_blob_sha: bool = False,
     include_line_count: bool = True,
     line_count_max_bytes: int = 200_000,
     include_head: bool = False,
@@ -803,7 +1065,17 @@ async def scan_workspace_tree(
     repo: str | None = None,
     branch: str | None = None,
 ) -> dict[str, Any]:
-    """Scan the workspace tree and return bounded metadata for files."""
+    """Scan the workspace tree and return bounded metadata for files.
+
+    Binary flags, hashes and line counts are cached per file and only
+    recomputed for files whose size, mtime or inode changed; the reads that
+    remain run in parallel on the blocking pool. With `git_blob_sha=true`,
+    tracked files unchanged from the git index report the index's
+    `git_blob_sha` instead of being read for `sha256`.
+
+    Page with `cursor`: pass back `next_cursor_token` to resume after the last
+    entry returned (the integer `next_cursor` offset is still accepted).
+    """
 
     try:
         deps = _tw()._workspace_deps()
@@ -833,8 +1105,6 @@ async def scan_workspace_tree(
             raise ValueError("max_entries must be an int >= 1")
         if not isinstance(max_depth, int) or max_depth < 0:
             raise ValueError("max_depth must be an int >= 0")
-        if not isinstance(cursor, int) or cursor < 0:
-            raise ValueError("cursor must be an int >= 0")
         if not isinstance(hash_max_bytes, int) or hash_max_bytes < 1:
             raise ValueError("hash_max_bytes must be an int >= 1")
         if not isinstance(line_count_max_bytes, int) or line_count_max_bytes < 1:
@@ -855,109 +1125,199 @@ async def scan_workspace_tree(
                 return 0
             return rel.count(os.sep) + 1
 
-        results: list[dict[str, Any]] = []
-        skipped = 0
-        yielded = 0
-        truncated = False
-        next_cursor: int | None = None
+        cursor_args = {
+            "full_name": full_name,
+            "ref": effective_ref,
+            "path": normalized_path if path else "",
+            "max_depth": max_depth,
+            "include_hidden": bool(include_hidden),
+            "include_dirs": bool(include_dirs),
+        }
+        offset, resume, fingerprint = _start_cursor(
+            cursor, "scan_workspace_tree", cursor_args, root
+        )
+        skip = 0 if resume is not None else offset
+
+        manifest = await run_blocking(SCAN_MANIFESTS.open, root)
+        blob_shas: dict[str, str] = {}
+        if git_blob_sha and include_hash:
+            blob_shas = await run_blocking(_git_unchanged_blob_shas, root)
+
+        def _walk() -> tuple[list, list, set[str], bool, int, bool]:
+            # The walk stats every file; keep it off the event loop.
+            results: list[dict[str, Any]] = []
+            scanned: list[tuple[dict[str, Any], str, dict[Any, Any], int | None]] = []
+            seen: set[str] = set()
+            depth_pruned = False
+            skipped = 0
+            yielded = 0
+            truncated = False
 
-        for cur_dir, dirnames, filenames in os.walk(start):
-            if _depth_for_dir(cur_dir) >= max_depth:
-                dirnames[:] = []
-            dirnames[:] = [d for d in dirnames if d != ".git"]
-            if not include_hidden:
-                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
-            dirnames.sort()
-            filenames.sort()
+            for cur_dir, dirnames, filenames in os.walk(start):
+                if _depth_for_dir(cur_dir) >= max_depth:
+                    depth_pruned = depth_pruned or bool(dirnames)
+                    dirnames[:] = []
+                dirnames[:] = [d for d in dirnames if d != ".git"]
+                if not include_hidden:
+                    dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                dirnames.sort()
+                filenames.sort()
+                listed_dirs = list(dirnames)
+                if resume is not None:
+                    resume.prune(os.path.relpath(cur_dir, root), dirnames)
+
+                if include_dirs:
+                    for d in listed_dirs:
+                        rp = os.path.relpath(os.path.join(cur_dir, d), root).replace(
+                            "\\", "/"
+                        )
+                        if not include_hidden and os.path.basename(rp).startswith("."):
+                            continue
+                        if resume is not None and resume.done(rp, is_dir=True):
+                            continue
+                        if skipped < skip:
+                            skipped += 1
+                            continue
+                        if yielded >= max_entries:
+                            truncated = True
+                            break
+                        abs_p = os.path.join(root, rp)
+                        try:
+                            st = os.stat(abs_p)
+                            results.append(
+                                {
+                                    "path": rp,
+                                    "type": "dir",
+                                    "size_bytes": int(st.st_size),
+                                }
+                            )
+                        except Exception:
+                            results.append(
+                                {"path": rp, "type": "dir", "size_bytes": None}
+                            )
+                        yielded += 1
+                    if truncated:
+                        break
 
-            if include_dirs:
-                for d in dirnames:
-                    rp = os.path.relpath(os.path.join(cur_dir, d), root).replace(
+                for fname in filenames:
+                    if not include_hidden and fname.startswith("."):
+                        continue
+                    rp = os.path.relpath(os.path.join(cur_dir, fname), root).replace(
                         "\\", "/"
                     )
-                    if not include_hidden and os.path.basename(rp).startswith("."):
+                    seen.add(rp)
+                    if resume is not None and resume.done(rp):
                         continue
-                    if skipped < cursor:
+                    if skipped < skip:
                         skipped += 1
                         continue
                     if yielded >= max_entries:
                         truncated = True
-                        next_cursor = cursor + yielded
                         break
                     abs_p = os.path.join(root, rp)
                     try:
                         st = os.stat(abs_p)
+                    except OSError:
                         results.append(
-                            {"path": rp, "type": "dir", "size_bytes": int(st.st_size)}
+                            {"path": rp, "type": "file", "error": "stat_failed"}
                         )
-                    except Exception:
-                        results.append({"path": rp, "type": "dir", "size_bytes": None})
+                        yielded += 1
+                        continue
+                    entry: dict[str, Any] = {
+                        "path": rp,
+                        "type": "file",
+                        "size_bytes": int(st.st_size),
+                    }
+                    values = manifest.values(rp, st) if manifest is not None else {}
+                    sha_bytes = None
+                    if include_hash and rp not in blob_shas:
+                        sha_bytes = int(hash_max_bytes)
+                    scanned.append((entry, abs_p, values, sha_bytes))
+                    results.append(entry)
                     yielded += 1
                 if truncated:
                     break
+            return results, scanned, seen, depth_pruned, yielded, truncated
 
-            for fname in filenames:
-                if not include_hidden and fname.startswith("."):
-                    continue
-                rp = os.path.relpath(os.path.join(cur_dir, fname), root).replace(
-                    "\\", "/"
-                )
-                if skipped < cursor:
-                    skipped += 1
-                    continue
-                if yielded >= max_entries:
-                    truncated = True
-                    next_cursor = cursor + yielded
-                    break
-                abs_p = os.path.join(root, rp)
-                try:
-                    st = os.stat(abs_p)
-                except OSError:
-                    results.append({"path": rp, "type": "file", "error": "stat_failed"})
-                    yielded += 1
-                    continue
-                is_bin = _is_probably_binary(abs_p)
-                entry: dict[str, Any] = {
-                    "path": rp,
-                    "type": "file",
-                    "size_bytes": int(st.st_size),
-                    "is_binary": bool(is_bin),
+        results, scanned, seen, depth_pruned, yielded, truncated = await run_blocking(
+            _walk
+        )
+        next_cursor = offset + yielded if truncated else None
+
+        # Read only what the manifest lacks (heads are never cached).
+        line_bytes = int(line_count_max_bytes) if include_line_count else None
+        head_limits = (
+            (int(head_max_lines), int(head_max_chars)) if include_head else None
+        )
+        todo = [
+            (i, abs_p, values, sha_bytes)
+            for i, (_, abs_p, values, sha_bytes) in enumerate(scanned)
+            if head_limits is not None
+            or "is_binary" not in values
+            or (sha_bytes is not None and ("sha256", sha_bytes) not in values)
+            or (
+                line_bytes is not None
+                and not values["is_binary"]
+                and ("line_count", line_bytes) not in values
+            )
+        ]
+        heads = await _run_scan_batches(
+            [item[1:] for item in todo],
+            line_count_max_bytes=line_bytes,
+            head_limits=head_limits,
+        )
+        head_for = {item[0]: head for item, head in zip(todo, heads, strict=True)}
+
+        for i, (entry, _, values, sha_bytes) in enumerate(scanned):
+            is_bin = bool(values["is_binary"])
+            entry["is_binary"] = is_bin
+            if sha_bytes is not None:
+                sha, sha_trunc = values[("sha256", sha_bytes)]
+                entry["sha256"] = sha
+                entry["sha256_truncated"] = bool(sha_trunc)
+            elif include_hash:
+                entry["git_blob_sha"] = blob_shas[entry["path"]]
+            if line_bytes is not None and not is_bin:
+                lc, lc_trunc = values[("line_count", line_bytes)]
+                entry["line_count"] = lc
+                entry["line_count_truncated"] = bool(lc_trunc)
+            head = head_for.get(i)
+            if head is not None:
+                entry["head"] = {
+                    "lines": head[0],
+                    "truncated": bool(head[1]),
+                    "max_lines": int(head_max_lines),
+                    "max_chars": int(head_max_chars),
                 }
-                if include_hash:
-                    sha, sha_trunc = _sha256_limited(
-                        abs_p, max_bytes=int(hash_max_bytes)
-                    )
-                    entry["sha256"] = sha
-                    entry["sha256_truncated"] = bool(sha_trunc)
-                if include_line_count and (not is_bin):
-                    lc, lc_trunc = _count_lines_limited(
-                        abs_p, max_bytes=int(line_count_max_bytes)
-                    )
-                    entry["line_count"] = lc
-                    entry["line_count_truncated"] = bool(lc_trunc)
-                if include_head and (not is_bin):
-                    head, head_trunc = _read_first_lines(
-                        abs_p,
-                        max_lines=int(head_max_lines),
-                        max_chars=int(head_max_chars),
-                    )
-                    entry["head"] = {
-                        "lines": head,
-                        "truncated": bool(head_trunc),
-                        "max_lines": int(head_max_lines),
-                        "max_chars": int(head_max_chars),
-                    }
-                results.append(entry)
-                yielded += 1
-            if truncated:
-                break
+
+        if (
+            manifest is not None
+            and start == root
+            and include_hidden
+            and not (truncated or depth_pruned or resume or offset)
+        ):
+            await run_blocking(manifest.retain, seen)
+
+        next_cursor_token = None
+        if truncated and results:
+            last = results[-1]
+            next_cursor_token = encode_cursor(
+                "scan_workspace_tree",
+                cursor_args,
+                path=last["path"],
+                offset=offset + yielded,
+                fingerprint=fingerprint,
+                is_dir=last["type"] == "dir",
+            )
 
         return {
             "full_name": full_name,
             "ref": effective_ref,
             "path": normalized_path if path else "",
-            "cursor": int(cursor),
+            "cursor": offset,
             "next_cursor": next_cursor,
+            "next_cursor_token": next_cursor_token,
+            "cursor_stale": bool(resume and resume.fingerprint != fingerprint),
             "max_entries": int(max_entries),
             "max_depth": int(max_depth),
             "include_hidden": bool(include_hidden),
@@ -969,6 +1329,14 @@ async def scan_workspace_tree(
             "include_head": bool(include_head),
             "head_max_lines": int(head_max_lines),
             "head_max_chars": int(head_max_chars),
+            "git_blob_sha": bool(git_blob_sha),
+            "metadata": {
+                "cached": len(scanned) - len(todo),
+                "computed": len(todo),
+                "git_blob_shas": sum(
+                    1 for entry in scanned if entry[3] is None and include_hash
+                ),
+            },
             "results": results,
             "truncated": bool(truncated),
         }
@@ -15,13 +15,17 @@ These tools:
 from __future__ import annotations
 
 import fnmatch
+import io
 import json
 import os
 import re
 import shutil
+import stat
 import subprocess  # nosec B404
 from typing import Any
 
+from github_mcp.blocking import run_blocking
+from github_mcp.search_index import SEARCH_INDEXES
 from github_mcp.server import _structured_tool_error, mcp_tool
 
 from ._shared import _tw
@@ -313,6 +317,9 @@ def _python_search(
             regex = False
     needle = query if case_sensitive else query.lower()
 
+    index = SEARCH_INDEXES.open(repo_dir)
+    indexed = index.query(query, regex=regex) if index is not None else None
+
     matches: list[dict[str, Any]] = []
     truncated = False
 
@@ -328,20 +335,34 @@ def _python_search(
     ):
         try:
             abs_path = _workspace_safe_join(repo_dir, rel_path)
-            if os.path.isdir(abs_path):
+            st = os.stat(abs_path)
+            if stat.S_ISDIR(st.st_mode):
+                continue
+            if max_file_bytes is not None and st.st_size > max_file_bytes:
                 continue
-            if (
-                max_file_bytes is not None
-                and os.path.getsize(abs_path) > max_file_bytes
+            if indexed is not None and (
+                indexed.known_binary(rel_path, st)
+                or indexed.check(rel_path, st) is False
             ):
                 continue
             if _is_probably_binary(abs_path):
+                if indexed is not None:
+                    indexed.mark_binary(rel_path, st)
                 continue
+            data = None
+            if indexed is not None and indexed.needs(rel_path, st):
+                with open(abs_path, "rb") as bf:
+                    data = bf.read()
+                indexed.add(rel_path, st, data)
         except Exception:  # nosec B112
             continue
 
         try:
-            with open(abs_path, encoding="utf-8", errors="replace") as f:
+            with (
+                open(abs_path, encoding="utf-8", errors="replace")
+                if data is None
+                else io.StringIO(data.decode("utf-8", errors="replace"), newline=None)
+            ) as f:
                 for line_no, raw in enumerate(f, start=1):
                     line = raw.rstrip("\n")
                     if pattern is not None:
@@ -366,13 +387,164 @@ def _python_search(
                     )
                     if len(matches) >= max_results:
                         truncated = True
+                        if indexed is not None:
+                            indexed.finish()
                         return matches, truncated
         except Exception:  # nosec B112
             continue
 
+    if indexed is not None:
+        indexed.finish()
+    return matches, truncated
+
+
+def _rg_list_files(
+    cmd: list[str],
+    base_abs: str,
+    base_rel: str,
+    *,
+    globs: list[str],
+    exclude_globs: list[str],
+    include_paths: list[str],
+    exclude_paths: list[str],
+    max_results: int,
+) -> tuple[list[str], bool]:
+    files: list[str] = []
+    truncated = False
+    proc = subprocess.run(  # nosec B603
+        cmd, cwd=base_abs, capture_output=True, text=True, timeout=30
+    )
+    if proc.returncode not in (0, 1):
+        raise RuntimeError((proc.stderr or proc.stdout or "rg failed").strip())
+    for line in (proc.stdout or "").splitlines():
+        if not line:
+            continue
+        # rg emits paths relative to cwd; normalize to repo root.
+        rel = os.path.normpath(os.path.join(base_rel, line)).replace("\\", "/")
+        if not _passes_filters(
+            rel,
+            include_globs=globs,
+            exclude_globs=exclude_globs,
+            include_paths=include_paths,
+            exclude_paths=exclude_paths,
+        ):
+            continue
+        files.append(rel)
+        if len(files) >= max_results:
+            truncated = True
+            break
+    return files, truncated
+
+
+def _rg_search_matches(
+    cmd: list[str],
+    base_abs: str,
+    base_rel: str,
+    *,
+    globs: list[str],
+    exclude_globs: list[str],
+    include_paths: list[str],
+    exclude_paths: list[str],
+    max_results: int,
+) -> tuple[list[dict[str, Any]], bool]:
+    matches: list[dict[str, Any]] = []
+    truncated = False
+    proc = subprocess.Popen(  # nosec B603
+        cmd,
+        cwd=base_abs,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert proc.stdout is not None  # nosec B101
+    try:
+        for raw in proc.stdout:
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                evt = json.loads(raw)
+            except Exception:  # nosec B112
+                continue
+            if evt.get("type") != "match":
+                continue
+            data = evt.get("data") or {}
+            rel = data.get("path", {}).get("text")
+            if not isinstance(rel, str) or not rel:
+                continue
+            # Normalize to repo-root relative path.
+            rel_norm = os.path.normpath(os.path.join(base_rel, rel)).replace("\\", "/")
+            if not _passes_filters(
+                rel_norm,
+                include_globs=globs,
+                exclude_globs=exclude_globs,
+                include_paths=include_paths,
+                exclude_paths=exclude_paths,
+            ):
+                continue
+            line_no = int(data.get("line_number") or 0)
+            sub = data.get("submatches") or []
+            col = 1
+            if sub and isinstance(sub, list) and isinstance(sub[0], dict):
+                try:
+                    col = int(sub[0].get("start", 0)) + 1
+                except Exception:
+                    col = 1
+            text_line = (data.get("lines", {}) or {}).get("text")
+            if not isinstance(text_line, str):
+                text_line = ""
+            text_line = text_line.rstrip("\n")
+            matches.append(
+                {
+                    "path": rel_norm,
+                    "line": int(line_no),
+                    "column": int(col),
+                    "text": text_line,
+                }
+            )
+            if len(matches) >= max_results:
+                truncated = True
+                break
+    finally:
+        try:
+            if truncated and proc.poll() is None:
+                proc.kill()
+        except Exception:  # nosec B110
+            pass
+        _safe_communicate(proc, timeout=5)
+
+    # rg returns 1 when no matches.
+    if proc.returncode not in (0, 1, None):
+        stderr = ""
+        try:
+            stderr = proc.stderr.read() if proc.stderr else ""
+        except Exception:
+            stderr = ""
+        raise RuntimeError((stderr or "rg failed").strip())
     return matches, truncated
 
 
+def _attach_excerpts(
+    repo_dir: str, matches: list[dict[str, Any]], context_lines: int
+) -> None:
+    for m in matches:
+        try:
+            rel_path = m.get("path")
+            line_no = int(m.get("line") or 1)
+            abs_path = _workspace_safe_join(repo_dir, str(rel_path))
+            start = max(1, line_no - int(context_lines))
+            excerpt = _read_lines_excerpt(
+                abs_path,
+                start_line=int(start),
+                max_lines=int(context_lines) * 2 + 1,
+                max_chars=2000000,
+            )
+            m["excerpt"] = excerpt
+        except Exception:  # nosec B110
+            # Best-effort; omit excerpt if anything fails.
+            pass
+
+
 def _parse_max_file_bytes(value: int | str | None) -> int | None:
     if value is None:
         return None
@@ -457,32 +629,20 @@ async def rg_list_workspace_files(
                 base_abs = repo_dir
             else:
                 base_abs = _workspace_safe_join(repo_dir, base_rel_effective or ".")
-            proc = subprocess.run(  # nosec B603
-                cmd, cwd=base_abs, capture_output=True, text=True, timeout=30
+            files, truncated = await run_blocking(
+                _rg_list_files,
+                cmd,
+                base_abs,
+                base_rel_effective,
+                globs=globs,
+                exclude_globs=excl_globs,
+                include_paths=incl_paths,
+                exclude_paths=excl_paths,
+                max_results=int(max_results),
             )
-            if proc.returncode not in (0, 1):
-                raise RuntimeError((proc.stderr or proc.stdout or "rg failed").strip())
-            for line in (proc.stdout or "").splitlines():
-                if not line:
-                    continue
-                # rg emits paths relative to cwd; normalize to repo root.
-                rel = os.path.normpath(os.path.join(base_rel_effective, line)).replace(
-                    "\\", "/"
-                )
-                if not _passes_filters(
-                    rel,
-                    include_globs=globs,
-                    exclude_globs=excl_globs,
-                    include_paths=incl_paths,
-                    exclude_paths=excl_paths,
-                ):
-                    continue
-                files.append(rel)
-                if len(files) >= max_results:
-                    truncated = True
-                    break
         else:
-            files = _python_walk_files(
+            files = await run_blocking(
+                _python_walk_files,
                 repo_dir,
                 base_rel_effective,
                 include_hidden=bool(include_hidden),
@@ -636,86 +796,24 @@ async def rg_search_workspace(
                             continue
                         cmd.append(joined)
 
-                proc = subprocess.Popen(  # nosec B603
+                matches, truncated = await run_blocking(
+                    _rg_search_matches,
                     cmd,
-                    cwd=base_abs,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
+                    base_abs,
+                    base_rel_effective,
+                    globs=globs,
+                    exclude_globs=excl_globs,
+                    include_paths=incl_paths,
+                    exclude_paths=excl_paths,
+                    max_results=int(max_results),
                 )
-                assert proc.stdout is not None  # nosec B101
-                try:
-                    for raw in proc.stdout:
-                        raw = raw.strip()
-                        if not raw:
-                            continue
-                        try:
-                            evt = json.loads(raw)
-                        except Exception:  # nosec B112
-                            continue
-                        if evt.get("type") != "match":
-                            continue
-                        data = evt.get("data") or {}
-                        rel = data.get("path", {}).get("text")
-                        if not isinstance(rel, str) or not rel:
-                            continue
-                        # Normalize to repo-root relative path.
-                        rel_norm = os.path.normpath(
-                            os.path.join(base_rel_effective, rel)
-                        ).replace("\\", "/")
-                        if not _passes_filters(
-                            rel_norm,
-                            include_globs=globs,
-                            exclude_globs=excl_globs,
-                            include_paths=incl_paths,
-                            exclude_paths=excl_paths,
-                        ):
-                            continue
-                        line_no = int(data.get("line_number") or 0)
-                        sub = data.get("submatches") or []
-                        col = 1
-                        if sub and isinstance(sub, list) and isinstance(sub[0], dict):
-                            try:
-                                col = int(sub[0].get("start", 0)) + 1
-                            except Exception:
-                                col = 1
-                        text_line = (data.get("lines", {}) or {}).get("text")
-                        if not isinstance(text_line, str):
-                            text_line = ""
-                        text_line = text_line.rstrip("\n")
-                        matches.append(
-                            {
-                                "path": rel_norm,
-                                "line": int(line_no),
-                                "column": int(col),
-                                "text": text_line,
-                            }
-                        )
-                        if len(matches) >= max_results:
-                            truncated = True
-                            break
-                finally:
-                    try:
-                        if truncated and proc.poll() is None:
-                            proc.kill()
-                    except Exception:  # nosec B110
-                        pass
-                    _safe_communicate(proc, timeout=5)
-
-                # rg returns 1 when no matches.
-                if proc.returncode not in (0, 1, None):
-                    stderr = ""
-                    try:
-                        stderr = proc.stderr.read() if proc.stderr else ""
-                    except Exception:
-                        stderr = ""
-                    raise RuntimeError((stderr or "rg failed").strip())
 
             except Exception:
                 # If rg is present but fails to execute (PATH issues, permission,
                 # incompatible binary, etc.), fall back to Python so the tool
                 # never hard-fails or wedges on a stuck subprocess.
-                matches, truncated = _python_search(
+                matches, truncated = await run_blocking(
+                    _python_search,
                     repo_dir,
                     base_rel_effective,
                     query.strip(),
@@ -732,7 +830,8 @@ async def rg_search_workspace(
                 engine = "python"
 
         else:
-            matches, truncated = _python_search(
+            matches, truncated = await run_blocking(
+                _python_search,
                 repo_dir,
                 base_rel_effective,
                 query.strip(),
@@ -748,22 +847,7 @@ async def rg_search_workspace(
             )
 
         if context_lines > 0 and matches:
-            for m in matches:
-                try:
-                    rel_path = m.get("path")
-                    line_no = int(m.get("line") or 1)
-                    abs_path = _workspace_safe_join(repo_dir, str(rel_path))
-                    start = max(1, line_no - int(context_lines))
-                    excerpt = _read_lines_excerpt(
-                        abs_path,
-                        start_line=int(start),
-                        max_lines=int(context_lines) * 2 + 1,
-                        max_chars=2000000,
-                    )
-                    m["excerpt"] = excerpt
-                except Exception:  # nosec B110
-                    # Best-effort; omit excerpt if anything fails.
-                    pass
+            await run_blocking(_attach_excerpts, repo_dir, matches, context_lines)
 
         return {
             "full_name": full_name,
@@ -0,0 +1,137 @@
+"""Speculative edits and test runs in disposable scratch workspaces."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from github_mcp import config
+from github_mcp.output_capture import bounded_output
+from github_mcp.output_stream import live_output
+from github_mcp.server import _structured_tool_error, mcp_tool
+from github_mcp.utils import _get_main_module, _normalize_timeout_seconds
+from github_mcp.workspace import _clone_repo
+from github_mcp.workspace_scratch import (
+    prepare_scratch_virtualenv,
+    scratch_workspace,
+)
+
+from ._shared import _tw
+from .commands import (
+    _augment_env_for_pytest,
+    _compact_command_payload,
+    _looks_like_pytest_command,
+    _normalize_command_payload,
+    _resolve_workdir,
+    _terminal_command_write_action,
+)
+
+
+@mcp_tool(
+    write_action=True,
+    write_action_resolver=_terminal_command_write_action,
+    open_world_hint=True,
+    ui={
+        "group": "workspace",
+        "icon": "🧪",
+        "label": "Run In Scratch Workspace",
+        "danger": "high",
+    },
+)
+async def run_in_scratch_workspace(
+    full_name: str,
+    ref: str = "main",
+    command: str = "pytest",
+    command_lines: list[str] | None = None,
+    patch: str | None = None,
+    strategy: str = "auto",
+    include_changes: bool = True,
+    timeout_seconds: float = 0,
+    workdir: str | None = None,
+    use_temp_venv: bool = False,
+) -> dict[str, Any]:
+    """Run a command against a throwaway copy of the repo mirror.
+
+    The copy starts from the mirror's current state (including uncommitted
+    changes when ``include_changes=true``), optionally has ``patch`` applied,
+    runs ``command`` (or ``command_lines`` as a small suite), and is deleted
+    afterwards. The mirror itself is never modified, so several speculative
+    edits can be evaluated in parallel.
+
+    ``strategy`` is ``auto`` (copy-on-write copy when the filesystem supports
+    it, otherwise ``git worktree``), ``reflink`` or ``worktree``. With
+    ``use_temp_venv=true`` the copy gets its own virtualenv layered over the
+    mirror's ``.venv-mcp``: installed packages are reused, while anything
+    the command installs stays in the copy.
+    """
+
+    timeout_seconds = _normalize_timeout_seconds(
+        timeout_seconds, config.ADAPTIV_MCP_DEFAULT_TIMEOUT_SECONDS
+    )
+    requested_command, command_lines_out = _normalize_command_payload(
+        command, command_lines
+    )
+    try:
+        deps = _tw()._workspace_deps()
+        effective_ref = _tw()._effective_ref_for_repo(full_name, ref)
+        # Not deps["clone_repo"]: that would hold the mirror for the whole run.
+        clone_repo = getattr(_get_main_module(), "_clone_repo", _clone_repo)
+        repo_dir = await clone_repo(full_name, ref=effective_ref, preserve_changes=True)
+        base_env: dict[str, str] | None = None
+        if use_temp_venv:
+            base_env = await deps["prepare_temp_virtualenv"](repo_dir)
+
+        async with scratch_workspace(
+            repo_dir, strategy=strategy, include_changes=include_changes
+        ) as scratch:
+            scratch_dir = scratch["scratch_dir"]
+            if patch:
+                await deps["apply_patch_to_repo"](scratch_dir, patch)
+            env = base_env
+            if base_env is not None:
+                env = await prepare_scratch_virtualenv(scratch_dir, base_env)
+            if _looks_like_pytest_command(requested_command, command_lines_out):
+                env = _augment_env_for_pytest(env)
+            cwd = _resolve_workdir(scratch_dir, workdir)
+            async with live_output():
+                with bounded_output():
+                    result = await deps["run_shell"](
+                        requested_command,
+                        cwd=cwd,
+                        timeout_seconds=timeout_seconds,
+                        env=env,
+                    )
+
+        exit_code = int(result.get("exit_code", 0) or 0)
+        timed_out = bool(result.get("timed_out", False))
+        ok = exit_code == 0 and not timed_out
+        out: dict[str, Any] = {
+            "status": "ok" if ok else "failed",
+            "ok": ok,
+            **(
+                {
+                    "error": "Command timed out"
+                    if timed_out
+                    else f"Command exited with code {exit_code}",
+                    "error_detail": {"exit_code": exit_code, "timed_out": timed_out},
+                }
+                if not ok
+                else {}
+            ),
+            "ref": effective_ref,
+            "scratch": {
+                "strategy": scratch["strategy"],
+                "include_changes": scratch["include_changes"],
+                "setup_seconds": scratch["setup_seconds"],
+            },
+            "patch_applied": bool(patch),
+            "command_input": requested_command,
+            "command_lines": command_lines_out,
+            "command": requested_command,
+            "result": result,
+        }
+        return _compact_command_payload(out, command_lines_out=command_lines_out)
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        return _structured_tool_error(exc, context="run_in_scratch_workspace")
@@ -8,7 +8,8 @@ This module provides three public tools:
 Design goals:
 - Single canonical repo selector: full_name ("owner/repo") + ref.
 - No legacy alias inputs.
-- No output truncation.
+- Bounded output: the head and tail of each stream, with the full output
+  available through read_command_output.
 - Stable, minimal, structured outputs.
 """
 
@@ -20,11 +21,14 @@ import uuid
 from typing import Any
 
 from github_mcp import config
+from github_mcp.output_capture import bounded_output
 from github_mcp.server import mcp_tool
 from github_mcp.utils import _normalize_timeout_seconds
 
 from ._shared import _tw
 
+_STEP_MARKER_PREFIX = "__MCP_STEP_"
+
 
 def _step_status_from_exit_code(
     *, exit_code: int | None, allow_missing_command: bool
@@ -199,6 +203,15 @@ def _slim_terminal_command_payload(payload: Any) -> dict[str, Any]:
         "stderr_stats": {"chars": err_chars, "lines": err_lines},
         "stdout": stdout,
         "stderr": stderr,
+        **(
+            {
+                "output_truncated": True,
+                "output_handle": res.get("output_handle"),
+            }
+            if isinstance(res, dict)
+            and (res.get("stdout_truncated") or res.get("stderr_truncated"))
+            else {}
+        ),
     }
 
 
@@ -453,15 +466,17 @@ async def run_lint_suite(
         )
 
         runner_command = _build_quality_suite_runner_command(steps=runner_steps)
-        raw = await _tw().terminal_command(
-            full_name=full_name,
-            ref=ref,
-            command=runner_command,
-            timeout_seconds=timeout_seconds_i,
-            workdir=workdir,
-            use_temp_venv=use_temp_venv,
-            installing_dependencies=installing_dependencies,
-        )
+        # Step markers survive truncation of the combined output.
+        with bounded_output(keep_line_prefixes=(_STEP_MARKER_PREFIX,)):
+            raw = await _tw().terminal_command(
+                full_name=full_name,
+                ref=ref,
+                command=runner_command,
+                timeout_seconds=timeout_seconds_i,
+                workdir=workdir,
+                use_temp_venv=use_temp_venv,
+                installing_dependencies=installing_dependencies,
+            )
 
         slim = _slim_terminal_command_payload(raw)
         parsed = _parse_marked_steps(str(slim.get("stdout") or ""))
@@ -836,15 +851,17 @@ async def run_quality_suite(
         ]
 
         runner_command = _build_quality_suite_runner_command(steps=runner_steps)
-        raw = await _tw().terminal_command(
-            full_name=full_name,
-            ref=ref,
-            command=runner_command,
-            timeout_seconds=timeout_seconds_i,
-            workdir=workdir,
-            use_temp_venv=use_temp_venv,
-            installing_dependencies=installing_dependencies,
-        )
+        # Step markers survive truncation of the combined output.
+        with bounded_output(keep_line_prefixes=(_STEP_MARKER_PREFIX,)):
+            raw = await _tw().terminal_command(
+                full_name=full_name,
+                ref=ref,
+                command=runner_command,
+                timeout_seconds=timeout_seconds_i,
+                workdir=workdir,
+                use_temp_venv=use_temp_venv,
+                installing_dependencies=installing_dependencies,
+            )
 
         slim = _slim_terminal_command_payload(raw)
         parsed = _parse_marked_steps(str(slim.get("stdout") or ""))
@@ -65,6 +65,7 @@ from github_mcp.http_clients import (
     _external_client_instance,  # noqa: F401
     _get_concurrency_semaphore,  # noqa: F401
     _get_github_token,  # noqa: F401
+    _get_outbound_limiter,  # noqa: F401
     _github_client_instance,  # noqa: F401
 )
 from github_mcp.http_routes.healthz import register_healthz_route
@@ -587,7 +588,9 @@ class _RequestContextMiddleware:
             async def receive_replay():
                 nonlocal replayed
                 if replayed:
-                    return {"type": "http.request", "body": b"", "more_body": False}
+                    # Body already delivered; further receives wait for the
+                    # client to disconnect (streaming responses listen for it).
+                    return await receive()
                 replayed = True
                 return {"type": "http.request", "body": body, "more_body": False}
 
@@ -988,6 +991,51 @@ if app is not None:
     app.add_middleware(_SuppressClientDisconnectMiddleware)
 
 
+def _install_background_tasks(app_instance: Any) -> None:
+    """Start background work (mirror pre-warming, loop-lag probe) with the app.
+
+    Startup is not delayed: pre-warm clones run as a task that is cancelled on
+    shutdown if still in flight. Nothing is installed when neither is enabled.
+    """
+
+    import asyncio
+    from contextlib import asynccontextmanager
+
+    from github_mcp.blocking import LOOP_LAG_MONITOR
+    from github_mcp.config import WORKSPACE_WARM_SHELL
+    from github_mcp.workspace_pool import prewarm_targets, prewarm_workspaces
+    from github_mcp.workspace_shell import WARM_SHELLS
+
+    router = getattr(app_instance, "router", None)
+    inner = getattr(router, "lifespan_context", None)
+    prewarm = bool(prewarm_targets())
+    monitor = LOOP_LAG_MONITOR.interval_seconds > 0
+    warm_shells = bool(WORKSPACE_WARM_SHELL)
+    if inner is None or not (prewarm or monitor or warm_shells):
+        return
+
+    @asynccontextmanager
+    async def _lifespan(app_arg):
+        task = asyncio.create_task(prewarm_workspaces()) if prewarm else None
+        if monitor:
+            LOOP_LAG_MONITOR.start()
+        try:
+            async with inner(app_arg) as state:
+                yield state
+        finally:
+            if task is not None and not task.done():
+                task.cancel()
+            LOOP_LAG_MONITOR.stop()
+            if warm_shells:
+                await WARM_SHELLS.close_all()
+
+    router.lifespan_context = _lifespan
+
+
+if app is not None:
+    _install_background_tasks(app)
+
+
 async def _handle_value_error(request, exc):
     """Normalize validation errors to a 400 response.
 
@@ -1777,6 +1825,37 @@ async def get_rate_limit() -> dict[str, Any]:
     return await _impl()
 
 
+@mcp_tool(
+    write_action=False,
+    description=(
+        "Report outbound GitHub HTTP counters, including the conditional-request "
+        "(ETag) response cache hit/miss/304 totals. clear_cache=true drops cached "
+        "responses after the snapshot."
+    ),
+    tags=["github", "cache", "diagnostics"],
+)
+async def get_outbound_http_stats(clear_cache: bool = False) -> dict[str, Any]:
+    """Return outbound GitHub HTTP cache and traffic counters."""
+    from github_mcp.main_tools.http_stats import get_outbound_http_stats as _impl
+
+    return await _impl(clear_cache=clear_cache)
+
+
+@mcp_tool(
+    write_action=False,
+    description=(
+        "Report blocking-executor usage and event-loop lag: how often and how "
+        "long the server's event loop was stalled by synchronous work."
+    ),
+    tags=["diagnostics"],
+)
+async def get_event_loop_stats() -> dict[str, Any]:
+    """Return blocking-executor and event-loop lag counters."""
+    from github_mcp.main_tools.loop_stats import get_event_loop_stats as _impl
+
+    return await _impl()
+
+
 @mcp_tool(write_action=False)
 async def get_user_login() -> dict[str, Any]:
     """Return the authenticated GitHub user for the configured token."""
@@ -2134,7 +2213,7 @@ async def get_file_contents(
     # Keep the local cache warm for subsequent reads.
     from github_mcp.main_tools.content_cache import _cache_file_result as _cache_impl
 
-    _cache_impl(full_name=full_name, path=path, ref=resolved_ref, decoded=decoded)
+    await _cache_impl(full_name=full_name, path=path, ref=resolved_ref, decoded=decoded)
     return decoded
 
 
@@ -2171,11 +2250,12 @@ async def fetch_files(
     full_name: str,
     paths: list[str],
     ref: str = "main",
+    backend: Literal["auto", "graphql", "rest"] | None = None,
 ) -> dict[str, Any]:
     """Fetch multiple files in a single request and cache them."""
     from github_mcp.main_tools.content_cache import fetch_files as _impl
 
-    return await _impl(full_name=full_name, paths=paths, ref=ref)
+    return await _impl(full_name=full_name, paths=paths, ref=ref, backend=backend)
 
 
 @mcp_tool(
@@ -2228,8 +2308,9 @@ async def list_repository_tree(
     max_entries: int = 1000,
     include_blobs: bool = True,
     include_trees: bool = True,
+    cursor: str | None = None,
 ) -> dict[str, Any]:
-    """List files and directories for a repository ref."""
+    """List files and directories for a repository ref (paged via next_cursor)."""
     from github_mcp.main_tools.content_cache import list_repository_tree as _impl
 
     return await _impl(
@@ -2240,6 +2321,7 @@ async def list_repository_tree(
         max_entries=max_entries,
         include_blobs=include_blobs,
         include_trees=include_trees,
+        cursor=cursor,
     )
 
 
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any
+
+import pytest
+
+from github_mcp import blocking
+from github_mcp.blocking import BlockingExecutor, LoopLagMonitor
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_off_loop_thread_and_records_stats() -> None:
+    executor = BlockingExecutor(max_workers=2)
+    loop_thread = threading.get_ident()
+
+    thread_id = await executor.run(threading.get_ident)
+
+    assert thread_id != loop_thread
+    stats = executor.stats()
+    assert stats["submitted"] == 1
+    assert stats["inline"] == 0
+    assert stats["in_flight"] == 0
+    assert stats["max_in_flight"] == 1
+
+
+@pytest.mark.asyncio
+async def test_executor_bounds_concurrency_and_counts_failures() -> None:
+    executor = BlockingExecutor(max_workers=2)
+    gate = threading.Event()
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+    started = threading.Semaphore(0)
+
+    def _wait() -> str:
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        started.release()
+        gate.wait(timeout=5)
+        with lock:
+            running[0] -= 1
+        return "done"
+
+    def _boom() -> None:
+        raise RuntimeError("boom")
+
+    waiters = [asyncio.ensure_future(executor.run(_wait)) for _ in range(3)]
+    failing = asyncio.ensure_future(executor.run(_boom))
+    await asyncio.sleep(0)
+    # Both workers are parked on the gate; the rest of the calls are queued.
+    for _ in range(2):
+        assert await asyncio.to_thread(started.acquire, timeout=5)
+    assert executor.stats()["in_flight"] == 4
+    assert peak[0] == 2
+    gate.set()
+
+    assert await asyncio.gather(*waiters) == ["done"] * 3
+    with pytest.raises(RuntimeError):
+        await failing
+    assert peak[0] == 2
+    stats = executor.stats()
+    assert stats["failed"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["max_queue_seconds"] > 0
+
+
+def test_executor_runs_inline_without_asyncio_loop() -> None:
+    executor = BlockingExecutor(max_workers=1)
+    coro = executor.run(lambda x: x * 2, 21)
+    with pytest.raises(StopIteration) as exc_info:
+        coro.send(None)
+    assert exc_info.value.value == 42
+    assert executor.stats()["inline"] == 1
+
+
+def test_lag_monitor_counts_only_stalls() -> None:
+    monitor = LoopLagMonitor(interval_seconds=0.5, stall_seconds=0.1)
+    for lag in (0.001, 0.25, -0.002, 0.5):
+        monitor.record(lag)
+
+    stats = monitor.stats()
+    assert stats["running"] is False
+    assert stats["samples"] == 4
+    assert stats["stalls"] == 2
+    assert stats["blocked_seconds_total"] == pytest.approx(0.75)
+    assert stats["max_lag_seconds"] == pytest.approx(0.5)
+    assert stats["recent_stalls_seconds"] == [0.25, 0.5]
+
+
+@pytest.mark.asyncio
+async def test_lag_monitor_detects_blocking_call() -> None:
+    import time
+
+    monitor = LoopLagMonitor(interval_seconds=0.01, stall_seconds=0.05)
+    assert monitor.start() is monitor.start()
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)  # Block the loop on purpose.
+    await asyncio.sleep(0.03)
+    monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["stalls"] >= 1
+    assert stats["max_lag_seconds"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_git_excerpt_tool_reads_on_executor(monkeypatch) -> None:
+    from github_mcp.workspace_tools import fs
+
+    class _TW:
+        def _effective_ref_for_repo(self, _full_name: str, ref: str) -> str:
+            return ref
+
+        def _workspace_deps(self) -> dict[str, Any]:
+            async def clone_repo(*_args: Any, **_kwargs: Any) -> str:
+                return "/tmp/fake-repo"
+
+            return {"clone_repo": clone_repo}
+
+    threads: list[int] = []
+
+    def _fake_git_show(*_args: Any, **_kwargs: Any):
+        threads.append(threading.get_ident())
+        return True, [{"line": 1, "text": "a"}], False, None
+
+    executor = BlockingExecutor(max_workers=1)
+    monkeypatch.setattr(blocking, "BLOCKING_EXECUTOR", executor)
+    monkeypatch.setattr(fs, "_tw", lambda: _TW())
+    monkeypatch.setattr(fs, "_git_show_lines_excerpt_limited", _fake_git_show)
+
+    res = await fs.read_git_file_excerpt(
+        full_name="o/r", ref="main", path="README.md", git_ref="HEAD"
+    )
+
+    assert res["exists"] is True
+    assert threads and threads[0] != threading.get_ident()
+    assert executor.stats()["submitted"] == 1
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import pytest
+
+import github_mcp.disk_cache as dc
+import github_mcp.file_cache as fc
+
+
+def test_disk_cache_roundtrip_survives_new_instance(tmp_path) -> None:
+    cache = dc.DiskBlobCache(str(tmp_path), max_bytes=0)
+    sha = fc.git_blob_sha(b"hello\n")
+    assert cache.put("o/r|main|a.txt", blob_sha=sha, data=b"hello\n", meta={"x": 1})
+
+    reopened = dc.DiskBlobCache(str(tmp_path), max_bytes=0)
+    found = reopened.get("o/r|main|a.txt")
+    assert found is not None
+    meta, body = found
+    assert meta["x"] == 1
+    assert meta["blob_sha"] == sha
+    assert isinstance(body, memoryview)
+    assert bytes(body) == b"hello\n"
+    assert reopened.get("o/r|main|missing") is None
+    assert reopened.stats()["hits"] == 1
+    assert reopened.stats()["misses"] == 1
+
+
+def test_disk_cache_shares_blobs_and_handles_empty_files(tmp_path) -> None:
+    cache = dc.DiskBlobCache(str(tmp_path), max_bytes=0)
+    sha = fc.git_blob_sha(b"")
+    cache.put("k1", blob_sha=sha, data=b"", meta={})
+    cache.put("k2", blob_sha=sha, data=b"", meta={})
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["blobs"] == 1
+    assert bytes(cache.get_blob(sha)) == b""
+
+
+def test_disk_cache_evicts_least_recently_used_blobs(tmp_path) -> None:
+    cache = dc.DiskBlobCache(str(tmp_path), max_bytes=8)
+    cache.put("a", blob_sha="a" * 40, data=b"aaaa", meta={})
+    cache.put("b", blob_sha="b" * 40, data=b"bbbb", meta={})
+    cache.put("c", blob_sha="c" * 40, data=b"cccc", meta={})
+
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+    # Oversized bodies are never admitted.
+    assert cache.put("big", blob_sha="d" * 40, data=b"x" * 9, meta={}) is False
+
+
+def test_disk_cache_drops_pointer_when_blob_file_vanishes(tmp_path) -> None:
+    cache = dc.DiskBlobCache(str(tmp_path), max_bytes=0)
+    cache.put("k", blob_sha="e" * 40, data=b"body", meta={})
+    (tmp_path / "blobs" / "ee" / ("e" * 40)).unlink()
+
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_file_cache_promotes_disk_hits_into_memory(
+    monkeypatch: pytest.MonkeyPatch, tmp_path
+) -> None:
+    disk = dc.DiskBlobCache(str(tmp_path), max_bytes=0)
+    monkeypatch.setattr(fc, "get_disk_cache", lambda: disk)
+    monkeypatch.setattr(fc, "FILE_CACHE", fc.FileCache(max_entries=10, max_bytes=0))
+
+    fc.cache_payload(
+        full_name="o/r",
+        ref="sha-1",
+        path="a.txt",
+        decoded={
+            "decoded_bytes": b"hello\n",
+            "text": "hello\n",
+            "json": {"sha": "ce01", "content": "aGVsbG8K", "path": "a.txt"},
+        },
+    )
+
+    # Simulate a restart: the in-memory tier is empty, the disk tier is not.
+    memory = fc.FileCache(max_entries=10, max_bytes=0)
+    monkeypatch.setattr(fc, "FILE_CACHE", memory)
+
+    entry = fc.get_cached("o/r", "sha-1", "a.txt")
+    assert entry is not None
+    assert entry["cache_tier"] == "disk"
+    assert entry["text"] == "hello\n"
+    assert entry["decoded_bytes"] == b"hello\n"
+    assert entry["json"] == {"sha": "ce01", "path": "a.txt"}
+    assert memory.get("o/r|sha-1|a.txt") is entry
+
+    reused = fc.cache_blob_reference(
+        full_name="o/r", ref="sha-2", path="a.txt", blob_sha=entry["blob_sha"]
+    )
+    assert reused is not None
+    assert fc.cache_stats()["disk"]["entries"] == 2
+
+
+def test_file_cache_serves_oversized_disk_hits_from_the_map(
+    monkeypatch: pytest.MonkeyPatch, tmp_path
+) -> None:
+    disk = dc.DiskBlobCache(str(tmp_path), max_bytes=0)
+    monkeypatch.setattr(fc, "get_disk_cache", lambda: disk)
+    body = b"line\n" * 100
+    fc.cache_payload(
+        full_name="o/r",
+        ref="sha-1",
+        path="big.txt",
+        decoded={"decoded_bytes": body, "text": body.decode(), "json": {}},
+    )
+
+    memory = fc.FileCache(max_entries=10, max_bytes=100)
+    monkeypatch.setattr(fc, "FILE_CACHE", memory)
+
+    entry = fc.get_cached("o/r", "sha-1", "big.txt")
+    assert entry is not None
+    assert isinstance(entry["decoded_bytes"], memoryview)
+    assert entry["decoded_bytes"] == body
+    # Map-backed bodies are not copied onto the heap to decode them.
+    assert entry["text"] is None
+    assert memory.get("o/r|sha-1|big.txt") is None
+
+    reused = fc.cache_blob_reference(
+        full_name="o/r", ref="sha-2", path="big.txt", blob_sha=entry["blob_sha"]
+    )
+    assert reused is not None
+    assert memory.stats()["entries"] == 0
+
+    public = fc.serializable_entry(entry)
+    assert public["decoded_bytes"] is None
+    assert public["text"] == body.decode()
+
+
+@pytest.mark.asyncio
+async def test_async_helpers_run_disk_io_on_the_blocking_executor(
+    monkeypatch: pytest.MonkeyPatch, tmp_path
+) -> None:
+    disk = dc.DiskBlobCache(str(tmp_path), max_bytes=0)
+    monkeypatch.setattr(fc, "get_disk_cache", lambda: disk)
+    monkeypatch.setattr(fc, "FILE_CACHE", fc.FileCache(max_entries=10, max_bytes=0))
+
+    offloaded: list[str] = []
+
+    async def fake_run_blocking(fn, /, *args, **kwargs):
+        offloaded.append(fn.__name__)
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(fc, "run_blocking", fake_run_blocking)
+
+    await fc.cache_payload_async(
+        full_name="o/r",
+        ref="sha-1",
+        path="a.txt",
+        decoded={"decoded_bytes": b"hello\n", "text": "hello\n", "json": {}},
+    )
+    memory = fc.FileCache(max_entries=10, max_bytes=0)
+    monkeypatch.setattr(fc, "FILE_CACHE", memory)
+
+    hits = await fc.bulk_get_cached_async("o/r", "sha-1", ["a.txt", "missing"])
+    assert list(hits) == ["a.txt"]
+    assert hits["a.txt"]["text"] == "hello\n"
+    assert memory.get("o/r|sha-1|a.txt") is hits["a.txt"]
+
+    stats = await fc.cache_stats_async()
+    assert stats["disk"]["entries"] == 1
+    assert offloaded == ["_persist_entry", "_read_disk_entries", "_disk_stats"]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import sys
 import time
 
 import pytest
@@ -103,3 +104,179 @@ def test_bulk_get_cached_maps_back_to_paths(monkeypatch: pytest.MonkeyPatch) ->
     assert set(hits) == {"a.txt", "b.txt"}
     assert hits["a.txt"]["decoded_bytes"] == b"a"
     assert hits["b.txt"]["decoded_bytes"] == b"b"
+
+
+def test_git_blob_sha_matches_git() -> None:
+    # `printf 'hello\n' | git hash-object --stdin`
+    assert fc.git_blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_identical_content_is_stored_once_across_refs(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache = fc.FileCache(max_entries=10, max_bytes=10_000)
+    monkeypatch.setattr(fc, "FILE_CACHE", cache)
+
+    first = fc.cache_payload(
+        full_name="o/r",
+        ref="sha-1",
+        path="a.txt",
+        decoded={"decoded_bytes": b"same", "text": "same"},
+    )
+    second = fc.cache_payload(
+        full_name="o/r",
+        ref="sha-2",
+        path="a.txt",
+        decoded={"decoded_bytes": bytes(b"same"), "text": "same"},
+    )
+
+    assert second["decoded_bytes"] is first["decoded_bytes"]
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["blobs"] == 1
+    assert stats["unique_bytes"] == 4
+    # Retained memory counts the shared bytes and text once.
+    assert stats["bytes"] == sys.getsizeof(b"same") + sys.getsizeof("same")
+    assert stats["logical_bytes"] == 8
+    assert stats["bytes_saved"] == 4
+    assert stats["dedupe_ratio"] == 2.0
+
+
+def test_blob_is_released_when_last_pointer_is_evicted() -> None:
+    cache = fc.FileCache(max_entries=2, max_bytes=0)
+    body = {"decoded_bytes": b"x", "size_bytes": 1, "blob_sha": "b1"}
+    cache.put("a", dict(body))
+    cache.put("b", dict(body))
+    assert cache.stats()["blobs"] == 1
+
+    cache.put("c", {"size_bytes": 1})
+    assert cache.get_blob("b1") is not None
+
+    cache.put("d", {"size_bytes": 1})
+    assert cache.get_blob("b1") is None
+    assert cache.stats()["bytes"] == 2
+
+
+def test_cache_blob_reference_reuses_stored_body(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cache = fc.FileCache(max_entries=10, max_bytes=10_000)
+    monkeypatch.setattr(fc, "FILE_CACHE", cache)
+
+    stored = fc.cache_payload(
+        full_name="o/r",
+        ref="sha-1",
+        path="a.txt",
+        decoded={"decoded_bytes": b"hello\n", "text": "hello\n"},
+    )
+    assert (
+        fc.cache_blob_reference(
+            full_name="o/r", ref="sha-2", path="a.txt", blob_sha="missing"
+        )
+        is None
+    )
+
+    reused = fc.cache_blob_reference(
+        full_name="o/r",
+        ref="sha-2",
+        path="a.txt",
+        blob_sha=stored["blob_sha"],
+        extra={"resolved_ref": "sha-2"},
+    )
+
+    assert reused is not None
+    assert reused["text"] == "hello\n"
+    assert reused["resolved_ref"] == "sha-2"
+    assert fc.get_cached("o/r", "sha-2", "a.txt") is reused
+    assert cache.stats()["blobs"] == 1
+
+
+def test_retained_bytes_counts_every_representation() -> None:
+    cache = fc.FileCache(max_entries=0, max_bytes=0)
+    content = "aGVsbG8K"
+    cache.put(
+        "a",
+        {
+            "decoded_bytes": b"hello\n",
+            "text": "hello\n",
+            "content": content,
+            "json": {"content": content},
+            "size_bytes": 6,
+        },
+    )
+
+    assert cache.stats()["bytes"] == (
+        sys.getsizeof(b"hello\n") + sys.getsizeof("hello\n") + sys.getsizeof(content)
+    )
+
+
+def test_compact_cache_keeps_bytes_and_derives_text_on_read() -> None:
+    cache = fc.FileCache(max_entries=0, max_bytes=0, compact=True)
+    cache.put(
+        "a",
+        {
+            "decoded_bytes": b"hello\n",
+            "text": "hello\n",
+            "content": "aGVsbG8K\n",
+            "encoding": "base64",
+            "json": {"sha": "x", "content": "aGVsbG8K\n"},
+            "size_bytes": 6,
+        },
+    )
+    cache.put("bin", {"decoded_bytes": b"\xff\xfe", "size_bytes": 2})
+
+    assert cache.stats()["bytes"] == sys.getsizeof(b"hello\n") + sys.getsizeof(
+        b"\xff\xfe"
+    )
+    entry = cache.get("a")
+    assert entry["text"] == "hello\n"
+    assert entry["content"] == "aGVsbG8K"
+    assert entry["json"] == {"sha": "x"}
+    assert cache.get("bin")["text"] is None
+
+
+def test_admission_rejects_large_one_off_entries() -> None:
+    big = b"x" * 1000
+    cost = sys.getsizeof(big)
+    cache = fc.FileCache(max_entries=0, max_bytes=2 * cost, admission_min_bytes=500)
+    cache.put("hot-1", {"decoded_bytes": big, "size_bytes": 1000})
+    cache.put("hot-2", {"decoded_bytes": b"y" * 1000, "size_bytes": 1000})
+    for _ in range(3):
+        cache.get("hot-1")
+        cache.get("hot-2")
+
+    assert (
+        cache.put("cold", {"decoded_bytes": b"z" * 1000, "size_bytes": 1000}) is False
+    )
+    assert cache.get("hot-1") is not None
+    assert cache.stats()["admission_rejections"] == 1
+
+    # Entries larger than the whole budget are never admitted.
+    assert cache.put("huge", {"decoded_bytes": big * 3, "size_bytes": 3000}) is False
+
+    # A repeatedly requested candidate eventually wins over the LRU victim.
+    for _ in range(6):
+        cache.get("cold")
+    assert cache.put("cold", {"decoded_bytes": b"z" * 1000, "size_bytes": 1000})
+    assert cache.get("cold") is not None
+
+
+def test_small_entries_bypass_admission_filter() -> None:
+    cache = fc.FileCache(max_entries=1, max_bytes=0, admission_min_bytes=500)
+    cache.put("a", {"size_bytes": 1})
+    cache.get("a")
+    assert cache.put("b", {"size_bytes": 1}) is True
+    assert cache.get("a") is None
+
+
+def test_frequency_sketch_counts_and_ages() -> None:
+    sketch = fc.FrequencySketch(64)
+    for _ in range(4):
+        sketch.increment("k")
+    assert sketch.estimate("k") >= 4
+    assert sketch.estimate("other") <= sketch.estimate("k")
+
+    # Reaching the sample size halves every counter.
+    while sketch.estimate("k") == 4:
+        sketch.increment("noise")
+    assert sketch.estimate("k") == 2
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from github_mcp import config, line_index
+from github_mcp.line_index import LineIndex, LineIndexCache
+from github_mcp.workspace_tools import fs as workspace_fs
+
+
+@pytest.fixture
+def indexes(monkeypatch):
+    cache = LineIndexCache(1024 * 1024)
+    monkeypatch.setattr(line_index, "LINE_INDEXES", cache)
+    monkeypatch.setattr(config, "WORKSPACE_LINE_INDEX", True)
+    monkeypatch.setattr(config, "WORKSPACE_LINE_INDEX_MIN_BYTES", 0)
+    return cache
+
+
+def _reads(path: str, start_line: int) -> tuple[dict, dict]:
+    excerpt = workspace_fs._read_lines_excerpt(
+        path, start_line=start_line, max_lines=3, max_chars=1000
+    )
+    sections = workspace_fs._read_lines_sections(
+        path,
+        start_line=start_line,
+        max_sections=2,
+        max_lines_per_section=2,
+        max_chars_per_section=1000,
+        overlap_lines=1,
+    )
+    return excerpt, sections
+
+
+def test_indexed_reads_match_linear_reads(indexes, tmp_path, monkeypatch) -> None:
+    path = tmp_path / "mixed.txt"
+    path.write_bytes("one\r\ntwo\rthree\n\nfünf\r\n\r\nlast".encode())
+
+    assert list(LineIndex.build(str(path)).starts) == [0, 5, 9, 15, 16, 23, 25]
+
+    for start in range(1, 10):
+        indexed = _reads(str(path), start)
+        monkeypatch.setattr(config, "WORKSPACE_LINE_INDEX", False)
+        linear = _reads(str(path), start)
+        monkeypatch.setattr(config, "WORKSPACE_LINE_INDEX", True)
+        assert indexed == linear, start
+
+    stats = indexes.stats()
+    assert stats["builds"] == 1 and stats["hits"] == 2 * 8 - 1
+
+
+def test_index_follows_edits_and_byte_budget(indexes, tmp_path) -> None:
+    path = tmp_path / "log.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 101)))
+
+    excerpt, _ = _reads(str(path), 90)
+    assert [x["text"] for x in excerpt["lines"]] == ["line 90", "line 91", "line 92"]
+
+    path.write_text("".join(f"new {i}\n" for i in range(1, 101)))
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    excerpt, _ = _reads(str(path), 99)
+    assert [x["text"] for x in excerpt["lines"]] == ["new 99", "new 100"]
+    assert indexes.stats()["builds"] == 2
+
+    # Indexes over the byte budget are used once but not kept.
+    small = LineIndexCache(8 * 10)
+    assert small.get(str(path), path.stat()) is not None
+    assert small.stats()["files"] == 0
@@ -2,6 +2,15 @@ from __future__ import annotations
 
 import pytest
 
+from github_mcp.tree_cache import clear_tree_cache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_tree_cache():
+    clear_tree_cache()
+    yield
+    clear_tree_cache()
+
 
 @pytest.mark.asyncio
 async def test_cache_files_uses_existing_cache_when_refresh_false(monkeypatch):
@@ -28,10 +37,14 @@ async def test_cache_files_uses_existing_cache_when_refresh_false(monkeypatch):
         },
     }
 
-    monkeypatch.setattr(
-        content_cache, "bulk_get_cached", lambda *_args, **_kwargs: cached_existing
-    )
-    monkeypatch.setattr(content_cache, "cache_stats", lambda: {"entries": 1})
+    async def _fake_bulk_get_cached(*_args, **_kwargs):
+        return cached_existing
+
+    async def _fake_cache_stats():
+        return {"entries": 1}
+
+    monkeypatch.setattr(content_cache, "bulk_get_cached_async", _fake_bulk_get_cached)
+    monkeypatch.setattr(content_cache, "cache_stats_async", _fake_cache_stats)
 
     decode_calls: list[str] = []
 
@@ -43,11 +56,13 @@ async def test_cache_files_uses_existing_cache_when_refresh_false(monkeypatch):
 
     cache_payload_calls: list[str] = []
 
-    def _fake_cache_payload(*, full_name: str, ref: str, path: str, decoded: dict):
+    async def _fake_cache_payload(
+        *, full_name: str, ref: str, path: str, decoded: dict
+    ):
         cache_payload_calls.append(path)
         return {"full_name": full_name, "ref": ref, "path": path, "decoded": decoded}
 
-    monkeypatch.setattr(content_cache, "cache_payload", _fake_cache_payload)
+    monkeypatch.setattr(content_cache, "cache_payload_async", _fake_cache_payload)
 
     out = await content_cache.cache_files(
         "o/r", ["a.txt", "b.txt"], ref="main", refresh=False
@@ -182,3 +197,312 @@ async def test_list_repository_tree_returns_empty_when_types_excluded(monkeypatc
     assert out["entries"] == []
     assert out["entry_count"] == 0
     assert "Both blobs and trees were excluded" in out["message"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_files_serves_unchanged_blobs_without_refetch(monkeypatch):
+    from github_mcp import file_cache
+    from github_mcp.main_tools import content_cache
+
+    cache = file_cache.FileCache(max_entries=10, max_bytes=10_000)
+    monkeypatch.setattr(file_cache, "FILE_CACHE", cache)
+    monkeypatch.setattr(
+        content_cache, "_normalize_repo_path_for_repo", lambda _full, p: p
+    )
+    monkeypatch.setattr(content_cache, "_effective_ref_for_repo", lambda _f, r: r)
+
+    stored = file_cache.cache_payload(
+        full_name="o/r",
+        ref="old-sha",
+        path="a.txt",
+        decoded={"decoded_bytes": b"unchanged", "text": "unchanged"},
+    )
+
+    async def _fake_resolve(_full_name: str, _ref: str | None):
+        return {
+            "requested_ref": "main",
+            "resolved_ref": "new-sha",
+            "tree_sha": "tree-2",
+        }
+
+    monkeypatch.setattr(content_cache, "_resolve_ref_snapshot", _fake_resolve)
+
+    async def _fake_github_request(method: str, path: str, params=None):
+        assert path.endswith("/git/trees/tree-2")
+        return {
+            "json": {
+                "tree": [
+                    {"path": "a.txt", "type": "blob", "sha": stored["blob_sha"]},
+                    {"path": "b.txt", "type": "blob", "sha": "changed"},
+                ]
+            }
+        }
+
+    monkeypatch.setattr(content_cache, "_github_request", _fake_github_request)
+
+    decode_calls: list[str] = []
+
+    async def _fake_decode(_full: str, p: str, _ref: str | None):
+        decode_calls.append(p)
+        return {"decoded_bytes": b"fresh", "text": "fresh"}
+
+    monkeypatch.setattr(content_cache, "_decode", _fake_decode)
+
+    out = await content_cache.fetch_files("o/r", ["a.txt", "b.txt"], ref="main")
+
+    assert decode_calls == ["b.txt"]
+    assert out["files"]["a.txt"]["text"] == "unchanged"
+    assert out["files"]["a.txt"]["resolved_ref"] == "new-sha"
+    assert out["dedupe"] == {
+        "files": 2,
+        "served_from_blob_cache": 1,
+        "bytes_saved": len(b"unchanged"),
+    }
+    assert out["cache"]["dedupe_ratio"] == 1.5
+
+
+@pytest.mark.asyncio
+async def test_list_repository_tree_caches_by_tree_sha_and_pages(monkeypatch):
+    from github_mcp.main_tools import content_cache
+
+    async def _fake_resolve(_full_name: str, _ref: str | None):
+        return {
+            "requested_ref": "main",
+            "resolved_ref": "sha-1",
+            "tree_sha": "tree-sha",
+        }
+
+    monkeypatch.setattr(content_cache, "_resolve_ref_snapshot", _fake_resolve)
+    monkeypatch.setattr(
+        content_cache, "_normalize_repo_path_for_repo", lambda _full, p: p
+    )
+
+    calls: list[str] = []
+
+    async def _fake_github_request(method: str, path: str, params=None):
+        calls.append(path)
+        return {
+            "json": {
+                "sha": "tree-sha",
+                "truncated": True,
+                "tree": [
+                    {"path": f"src/f{i}.py", "type": "blob", "sha": str(i)}
+                    for i in range(5)
+                ]
+                + [{"path": "src", "type": "tree", "sha": "t"}],
+            }
+        }
+
+    monkeypatch.setattr(content_cache, "_github_request", _fake_github_request)
+
+    first = await content_cache.list_repository_tree(
+        "o/r", ref="main", path_prefix="src/", max_entries=2, include_trees=False
+    )
+    assert [e["path"] for e in first["entries"]] == ["src/f0.py", "src/f1.py"]
+    assert first["total_entries"] == 5
+    assert first["truncated"] is True
+    assert "truncated" in first["message"]
+
+    second = await content_cache.list_repository_tree(
+        "o/r",
+        ref="main",
+        path_prefix="src/",
+        max_entries=2,
+        include_trees=False,
+        cursor=first["next_cursor"],
+    )
+    assert [e["path"] for e in second["entries"]] == ["src/f2.py", "src/f3.py"]
+
+    last = await content_cache.list_repository_tree(
+        "o/r",
+        ref="main",
+        path_prefix="src/",
+        max_entries=2,
+        include_trees=False,
+        cursor=second["next_cursor"],
+    )
+    assert [e["path"] for e in last["entries"]] == ["src/f4.py"]
+    assert last["next_cursor"] is None
+
+    # Trees are immutable by SHA, so only the first call hits GitHub.
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_files_graphql_backend_batches_and_falls_back(monkeypatch):
+    from github_mcp import file_cache
+    from github_mcp.main_tools import content_cache
+
+    monkeypatch.setattr(
+        file_cache, "FILE_CACHE", file_cache.FileCache(max_entries=10, max_bytes=0)
+    )
+    monkeypatch.setattr(
+        content_cache, "_normalize_repo_path_for_repo", lambda _full, p: p
+    )
+
+    async def _fake_resolve(_full_name: str, _ref: str | None):
+        return {"requested_ref": "main", "resolved_ref": "sha-1", "tree_sha": None}
+
+    monkeypatch.setattr(content_cache, "_resolve_ref_snapshot", _fake_resolve)
+
+    graphql_calls: list[dict] = []
+
+    async def _fake_github_request(method: str, path: str, json_body=None, **_kw):
+        assert path == "/graphql"
+        graphql_calls.append(json_body["variables"])
+        return {
+            "json": {
+                "data": {
+                    "repository": {
+                        "f0": {
+                            "oid": file_cache.git_blob_sha(b"a"),
+                            "isBinary": False,
+                            "isTruncated": False,
+                            "text": "a",
+                        },
+                        "f1": {"isBinary": True, "text": None},
+                        "f2": {
+                            "oid": file_cache.git_blob_sha(b"c"),
+                            "isBinary": False,
+                            "isTruncated": False,
+                            "text": "c",
+                        },
+                    }
+                }
+            }
+        }
+
+    monkeypatch.setattr(content_cache, "_github_request", _fake_github_request)
+
+    rest_calls: list[str] = []
+
+    async def _fake_decode(_full: str, p: str, _ref: str | None):
+        rest_calls.append(p)
+        return {"decoded_bytes": b"\x89PNG", "text": None}
+
+    monkeypatch.setattr(content_cache, "_decode", _fake_decode)
+
+    out = await content_cache.fetch_files(
+        "o/r", ["a.txt", "b.png", "c.txt"], ref="main", backend="auto"
+    )
+
+    assert len(graphql_calls) == 1
+    assert rest_calls == ["b.png"]
+    assert out["files"]["a.txt"]["text"] == "a"
+    assert out["files"]["a.txt"]["resolved_ref"] == "sha-1"
+    assert out["files"]["b.png"]["decoded_bytes"] == b"\x89PNG"
+    assert out["transport"] == {
+        "backend": "graphql",
+        "graphql_requests": 1,
+        "graphql_files": 2,
+        "rest_files": 1,
+    }
+    assert file_cache.get_cached("o/r", "sha-1", "c.txt")["text"] == "c"
+
+
+@pytest.mark.asyncio
+async def test_fetch_files_graphql_chunks_by_tree_sizes_on_a_cold_cache(monkeypatch):
+    from github_mcp import file_cache
+    from github_mcp.main_tools import content_cache
+
+    commit = "c" * 40
+    mib = 1024 * 1024
+    monkeypatch.setattr(
+        file_cache, "FILE_CACHE", file_cache.FileCache(max_entries=10, max_bytes=0)
+    )
+    monkeypatch.setattr(file_cache, "get_disk_cache", lambda: None)
+    monkeypatch.setattr(
+        content_cache, "_normalize_repo_path_for_repo", lambda _full, p: p
+    )
+
+    async def _fake_resolve(_full_name: str, _ref: str | None):
+        return {"requested_ref": "main", "resolved_ref": commit, "tree_sha": None}
+
+    monkeypatch.setattr(content_cache, "_resolve_ref_snapshot", _fake_resolve)
+
+    graphql_batches: list[list[str]] = []
+
+    async def _fake_github_request(method: str, path: str, json_body=None, **_kw):
+        if path.endswith(f"/git/trees/{commit}"):
+            sizes = {"a.txt": 3 * mib, "b.txt": 3 * mib, "c.txt": 1}
+            return {
+                "json": {
+                    "tree": [
+                        {"path": p, "type": "blob", "sha": f"s-{p}", "size": size}
+                        for p, size in sizes.items()
+                    ]
+                }
+            }
+        assert path == "/graphql"
+        expressions = [
+            v for k, v in json_body["variables"].items() if k.startswith("e")
+        ]
+        graphql_batches.append([e.split(":", 1)[1] for e in expressions])
+        return {
+            "json": {
+                "data": {
+                    "repository": {
+                        f"f{i}": {
+                            "oid": file_cache.git_blob_sha(b"x"),
+                            "isBinary": False,
+                            "isTruncated": False,
+                            "text": "x",
+                        }
+                        for i in range(len(expressions))
+                    }
+                }
+            }
+        }
+
+    monkeypatch.setattr(content_cache, "_github_request", _fake_github_request)
+
+    out = await content_cache.fetch_files(
+        "o/r", ["a.txt", "b.txt", "c.txt"], ref="main", backend="auto"
+    )
+
+    assert graphql_batches == [["a.txt"], ["b.txt", "c.txt"]]
+    payload = out["files"]["c.txt"]["json"]
+    assert payload["name"] == "c.txt"
+    assert payload["encoding"] == "base64"
+    assert payload["content"] == "eA==\n"
+    assert payload["url"].endswith(f"/repos/o/r/contents/c.txt?ref={commit}")
+    assert payload["html_url"] == f"https://github.com/o/r/blob/{commit}/c.txt"
+    assert payload["download_url"].endswith(f"/o/r/{commit}/c.txt")
+    assert set(payload["_links"]) == {"self", "git", "html"}
+
+
+@pytest.mark.asyncio
+async def test_get_file_contents_leaves_a_cache_entry(monkeypatch, tmp_path):
+    import main
+    from github_mcp import disk_cache, file_cache
+    from github_mcp.main_tools import content_cache
+
+    disk = disk_cache.DiskBlobCache(str(tmp_path), max_bytes=0)
+    memory = file_cache.FileCache(max_entries=10, max_bytes=0)
+    monkeypatch.setattr(file_cache, "get_disk_cache", lambda: disk)
+    monkeypatch.setattr(file_cache, "FILE_CACHE", memory)
+    monkeypatch.setattr(
+        content_cache, "_normalize_repo_path_for_repo", lambda _full, p: p
+    )
+    monkeypatch.setattr(content_cache, "_effective_ref_for_repo", lambda _f, r: r)
+
+    async def _fake_resolve(_full_name: str, _ref: str | None):
+        return {"requested_ref": "main", "resolved_ref": "sha-1", "tree_sha": None}
+
+    async def _fake_decode(_full: str, p: str, _ref: str | None):
+        return {
+            "decoded_bytes": b"hello\n",
+            "text": "hello\n",
+            "json": {"sha": "ce01", "content": "aGVsbG8K", "path": p},
+        }
+
+    monkeypatch.setattr(content_cache, "_resolve_ref_snapshot", _fake_resolve)
+    monkeypatch.setattr(main, "_decode_github_content", _fake_decode)
+
+    out = await main.get_file_contents("o/r", "a.txt", ref="main")
+
+    assert out["resolved_ref"] == "sha-1"
+    entry = memory.get(file_cache.cache_key("o/r", "sha-1", "a.txt"))
+    assert entry is not None
+    assert entry["text"] == "hello\n"
+    assert disk.stats()["entries"] == 1
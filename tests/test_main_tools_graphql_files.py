@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import pytest
+
+from github_mcp.file_cache import git_blob_sha
+from github_mcp.main_tools import graphql_files
+
+
+def _blob(text: str):
+    return {
+        "oid": git_blob_sha(text.encode("utf-8")),
+        "byteSize": len(text.encode("utf-8")),
+        "isBinary": False,
+        "isTruncated": False,
+        "text": text,
+    }
+
+
+def test_chunk_paths_splits_by_count_and_bytes() -> None:
+    chunks, oversized = graphql_files.chunk_paths(
+        ["a", "b", "c", "d", "big"],
+        {"a": 40, "b": 40, "c": 40, "big": 500},
+        max_files=3,
+        max_bytes=100,
+    )
+    assert chunks == [["a", "b"], ["c", "d"]]
+    assert oversized == ["big"]
+
+
+@pytest.mark.anyio
+async def test_fetch_blobs_graphql_batches_and_reports_fallbacks() -> None:
+    requests: list[dict] = []
+
+    async def _request(method, path, json_body=None):
+        assert (method, path) == ("POST", "/graphql")
+        requests.append(json_body)
+        variables = json_body["variables"]
+        assert variables["owner"] == "o" and variables["name"] == "r"
+        assert variables["e0"].startswith("sha-1:")
+        return {
+            "json": {
+                "data": {
+                    "repository": {
+                        "f0": _blob("hello\n"),
+                        "f1": {**_blob(""), "isBinary": True, "text": None},
+                        "f2": None,
+                        # Replacement characters do not hash back to the oid.
+                        "f3": {**_blob("x"), "text": "�"},
+                    }
+                }
+            }
+        }
+
+    decoded, rest_paths, stats = await graphql_files.fetch_blobs_graphql(
+        "o/r",
+        "sha-1",
+        ["a.txt", "img.png", "missing", "latin1.txt"],
+        request=_request,
+    )
+
+    assert len(requests) == 1
+    assert decoded["a.txt"]["text"] == "hello\n"
+    assert decoded["a.txt"]["decoded_bytes"] == b"hello\n"
+    assert decoded["a.txt"]["sha"] == git_blob_sha(b"hello\n")
+    assert rest_paths == ["img.png", "missing", "latin1.txt"]
+    assert stats == {"requests": 1, "files": 1, "fallback": 3}
+
+
+@pytest.mark.anyio
+async def test_fetch_blobs_graphql_falls_back_when_request_fails() -> None:
+    async def _request(*_args, **_kwargs):
+        raise RuntimeError("boom")
+
+    decoded, rest_paths, _ = await graphql_files.fetch_blobs_graphql(
+        "o/r", "main", ["a", "b"], request=_request
+    )
+    assert decoded == {}
+    assert rest_paths == ["a", "b"]
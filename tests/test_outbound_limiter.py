@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from github_mcp import config, outbound_limiter
+from github_mcp.mcp_server.context import REQUEST_SESSION_ID
+from github_mcp.rate_budget import PRIORITY_BACKGROUND, request_priority
+
+
+async def _worker(
+    limiter, session: str, label: str, order: list[str], *, background=False
+):
+    REQUEST_SESSION_ID.set(session)
+    if background:
+        with request_priority(PRIORITY_BACKGROUND):
+            await limiter.acquire()
+    else:
+        await limiter.acquire()
+    order.append(label)
+    limiter.release()
+
+
+@pytest.mark.asyncio
+async def test_uncontended_acquire_does_not_queue() -> None:
+    limiter = outbound_limiter.FairLimiter(2)
+    async with limiter:
+        async with limiter:
+            assert limiter.stats()["in_use"] == 2
+    stats = limiter.stats()
+    assert stats["in_use"] == 0
+    assert stats["acquired"] == 2
+    assert stats["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_round_robin_across_sessions() -> None:
+    limiter = outbound_limiter.FairLimiter(1)
+    order: list[str] = []
+    await limiter.acquire()
+
+    tasks = [
+        asyncio.create_task(_worker(limiter, "a", f"a{i}", order, background=True))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(_worker(limiter, "b", "b0", order)))
+    await asyncio.sleep(0)
+    assert limiter.stats()["queue_depth"] == 4
+    assert limiter.stats()["queued_sessions"] == 2
+
+    limiter.release()
+    await asyncio.gather(*tasks)
+
+    # Session "a" is background (one grant per turn), so "b" is not stuck
+    # behind a's whole backlog.
+    assert order == ["a0", "b0", "a1", "a2"]
+    stats = limiter.stats()
+    assert stats["in_use"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["max_queue_depth"] == 4
+    assert stats["acquired"] == 5
+
+
+@pytest.mark.asyncio
+async def test_session_weights_hold_across_rotations() -> None:
+    limiter = outbound_limiter.FairLimiter(1)
+    order: list[str] = []
+    await limiter.acquire()
+
+    tasks = [
+        asyncio.create_task(_worker(limiter, "a", f"a{i}", order, background=True))
+        for i in range(6)
+    ]
+    await asyncio.sleep(0)
+    tasks += [
+        asyncio.create_task(_worker(limiter, "b", f"b{i}", order)) for i in range(9)
+    ]
+    await asyncio.sleep(0)
+
+    limiter.release()
+    await asyncio.gather(*tasks)
+
+    # Background "a" gets one grant on every turn, not just its first.
+    assert order == [
+        "a0",
+        *("b0", "b1", "b2", "b3"),
+        "a1",
+        *("b4", "b5", "b6", "b7"),
+        "a2",
+        "b8",
+        *("a3", "a4", "a5"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue() -> None:
+    limiter = outbound_limiter.FairLimiter(1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.stats()["queue_depth"] == 1
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.stats()["queue_depth"] == 0
+
+    limiter.release()
+    assert limiter.stats()["in_use"] == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_time_is_recorded() -> None:
+    limiter = outbound_limiter.FairLimiter(1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.02)
+    limiter.release()
+    await waiter
+    limiter.release()
+
+    stats = limiter.stats()
+    assert stats["queued"] == 1
+    assert stats["max_wait_seconds"] > 0
+    assert stats["wait_seconds_total"] >= stats["max_wait_seconds"]
+
+
+@pytest.mark.asyncio
+async def test_pools_are_keyed_by_host_and_class(monkeypatch) -> None:
+    monkeypatch.setattr(config, "MAX_CONCURRENCY", 7)
+    monkeypatch.setattr(config, "OUTBOUND_DOWNLOAD_CONCURRENCY", 2)
+    monkeypatch.setattr(config, "OUTBOUND_EXTERNAL_CONCURRENCY", 3)
+
+    api = outbound_limiter.get_limiter("api.github.com")
+    assert outbound_limiter.get_limiter("API.github.com") is api
+    download = outbound_limiter.get_limiter(
+        "api.github.com", outbound_limiter.REQUEST_CLASS_DOWNLOAD
+    )
+    external = outbound_limiter.get_url_limiter("https://example.com/a?b=1")
+
+    assert len({id(api), id(download), id(external)}) == 3
+    assert (api.capacity, download.capacity, external.capacity) == (7, 2, 3)
+
+    stats = outbound_limiter.outbound_limiter_stats()
+    assert {
+        "api.github.com/api",
+        "api.github.com/download",
+        "example.com/external",
+    } <= set(stats)
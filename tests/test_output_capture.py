@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+from github_mcp import output_capture, workspace
+from github_mcp.output_capture import StreamCapture, bounded_output
+from github_mcp.workspace_tools import commands
+
+
+@pytest.fixture
+def base_dir(tmp_path, monkeypatch):
+    class _Main:
+        WORKSPACE_BASE_DIR = str(tmp_path)
+
+    monkeypatch.setattr(output_capture, "_get_main_module", lambda: _Main)
+    monkeypatch.setattr(output_capture, "_last_sweep", {})
+    return tmp_path
+
+
+def test_unbounded_capture_keeps_everything() -> None:
+    capture = StreamCapture()
+    for _ in range(100):
+        capture.feed(b"0123456789\n")
+    capture.close()
+
+    assert capture.truncated is False
+    assert capture.total_bytes == 1100
+    assert capture.lines == 100
+    assert capture.text() == "0123456789\n" * 100
+
+
+def test_bounded_capture_keeps_head_and_tail() -> None:
+    capture = StreamCapture(head_bytes=8, tail_bytes=6)
+    for i in range(50):
+        capture.feed(f"line{i:02d}\n".encode())
+    capture.feed(b"end")
+    capture.close()
+
+    assert capture.truncated is True
+    assert capture.total_bytes == 50 * 7 + 3
+    assert capture.lines == 51
+    text = capture.text()
+    assert text.startswith("line00\nl")
+    assert text.endswith("\n49\nend")
+    assert f"[{50 * 7 + 3 - 14} bytes elided]" in text
+
+
+def test_marker_lines_survive_elision_across_chunks() -> None:
+    capture = StreamCapture(
+        head_bytes=4, tail_bytes=4, keep_line_prefixes=(b"__MCP_STEP_",)
+    )
+    stream = b"noise\n" * 20 + b"__MCP_STEP_END__lint::0\n" + b"noise\n" * 20
+    for i in range(0, len(stream), 5):
+        capture.feed(stream[i : i + 5])
+    capture.close()
+
+    assert "\n__MCP_STEP_END__lint::0\n" in capture.text()
+
+
+@pytest.mark.asyncio
+async def test_run_shell_bounds_and_spills_output(base_dir) -> None:
+    cmd = f"{sys.executable} -c \"print('x' * 99999); print('done')\""
+    with bounded_output(head_bytes=100, tail_bytes=100, spill=True):
+        result = await workspace._run_shell(cmd, cwd=str(base_dir))
+
+    assert result["exit_code"] == 0
+    assert result["stdout_truncated"] is True
+    assert result["stdout_bytes"] == 100000 + 5
+    assert result["stdout_lines"] == 2
+    assert len(result["stdout"]) < 300
+    assert result["stdout"].endswith("x\ndone\n")
+
+    handle = result["output_handle"]
+    stdout_path = output_capture.spill_path(handle, "stdout")
+    assert os.path.getsize(stdout_path) == 100005
+    # Streams that fit in memory are not kept on disk.
+    assert not os.path.exists(output_capture.spill_path(handle, "stderr"))
+
+    page = await commands.read_command_output(handle, start_line=2)
+    assert page["exists"] is True
+    assert [ln["text"] for ln in page["excerpt"]["lines"]] == ["done"]
+
+
+@pytest.mark.asyncio
+async def test_spill_files_stop_at_the_byte_cap(base_dir) -> None:
+    cmd = f"{sys.executable} -c \"print('x' * 99999); print('done')\""
+    with bounded_output(
+        head_bytes=100, tail_bytes=100, spill=True, spill_max_bytes=1000
+    ):
+        result = await workspace._run_shell(cmd, cwd=str(base_dir))
+
+    assert result["stdout_bytes"] == 100005
+    assert result["stdout"].endswith("x\ndone\n")
+    assert result["stdout_spill_truncated"] is True
+    assert result["stderr_spill_truncated"] is False
+    handle = result["output_handle"]
+    assert os.path.getsize(output_capture.spill_path(handle, "stdout")) == 1000
+
+
+@pytest.mark.asyncio
+async def test_spill_writes_are_batched_on_the_executor(base_dir, monkeypatch) -> None:
+    offloaded: list[str] = []
+
+    async def fake_run_blocking(fn, /, *args, **kwargs):
+        offloaded.append(getattr(fn, "__name__", repr(fn)))
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(output_capture, "run_blocking", fake_run_blocking)
+    monkeypatch.setattr(output_capture, "_SPILL_BATCH_BYTES", 100)
+    with bounded_output(head_bytes=10, tail_bytes=10, spill=True):
+        stdout, stderr, handle = await output_capture.new_captures()
+    path = output_capture.spill_path(handle, "stdout")
+
+    stdout.feed(b"x" * 60)
+    await stdout.flush()
+    # feed() only buffers; nothing is written until a batch builds up.
+    assert os.path.getsize(path) == 0
+    stdout.feed(b"y" * 60)
+    await stdout.flush()
+    stdout.feed(b"z" * 5)
+    fields = await output_capture.capture_fields(stdout, stderr, handle)
+
+    assert fields["output_handle"] == handle
+    with open(path, "rb") as fh:
+        assert fh.read() == b"x" * 60 + b"y" * 60 + b"z" * 5
+    assert offloaded == ["_open_spill_files", "write", "_finish_spill", "_finish_spill"]
+
+
+def test_stale_spill_sweep_is_rate_limited(base_dir) -> None:
+    root = output_capture.outputs_dir()
+    os.makedirs(root)
+    stale = os.path.join(root, "old.stdout")
+
+    def _plant() -> None:
+        with open(stale, "wb"):
+            pass
+        os.utime(stale, (0, 0))
+
+    _plant()
+    for fh in output_capture._open_spill_files(root, "a" * 32).values():
+        fh.close()
+    assert not os.path.exists(stale)
+
+    _plant()
+    for fh in output_capture._open_spill_files(root, "b" * 32).values():
+        fh.close()
+    assert os.path.exists(stale)
+
+
+@pytest.mark.asyncio
+async def test_run_shell_is_unbounded_outside_policy(base_dir) -> None:
+    cmd = f"{sys.executable} -c \"print('x' * 600000)\""
+    result = await workspace._run_shell(cmd, cwd=str(base_dir))
+
+    assert result["stdout_truncated"] is False
+    assert len(result["stdout"]) == 600001
+    assert "output_handle" not in result
+    assert not os.path.exists(output_capture.outputs_dir())
+
+
+@pytest.mark.anyio
+async def test_read_command_output_rejects_bad_handles(base_dir) -> None:
+    bad = await commands.read_command_output("../../etc/passwd")
+    assert bad.get("exists") is not True and "handle" in str(bad)
+
+    missing = await commands.read_command_output("0" * 32, stream="stderr")
+    assert missing["exists"] is False
+
+
+def test_nested_policies_inherit_and_accumulate() -> None:
+    with bounded_output(head_bytes=10, keep_line_prefixes=("A",)):
+        with bounded_output(tail_bytes=5, keep_line_prefixes=("B",)) as inner:
+            assert inner.head_bytes == 10
+            assert inner.tail_bytes == 5
+            assert inner.keep_line_prefixes == (b"A", b"B")
+    assert output_capture.current_output_policy() is None
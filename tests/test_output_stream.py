@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from starlette.testclient import TestClient
+
+from github_mcp import output_stream, workspace
+from github_mcp.output_stream import OutputStream, live_output, stream_output_to
+
+
+async def _collect(stream: OutputStream) -> list[dict[str, Any]]:
+    return [event async for event in stream.events()]
+
+
+@pytest.mark.asyncio
+async def test_events_coalesce_and_normalize_split_crlf() -> None:
+    stream = OutputStream(max_pending_chunks=8, heartbeat_seconds=0)
+    await stream.send("stdout", b"one\r")
+    await stream.send("stdout", b"\ntwo \xe2\x9c")
+    await stream.send("stdout", b"\x93\n")
+    await stream.send("stderr", b"warn\n")
+    stream.close()
+
+    events = await _collect(stream)
+    assert [(e["stream"], e["text"]) for e in events] == [
+        ("stdout", "one\ntwo ✓\n"),
+        ("stderr", "warn\n"),
+    ]
+    assert [e["seq"] for e in events] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_send_blocks_when_reader_is_behind() -> None:
+    stream = OutputStream(max_pending_chunks=1, heartbeat_seconds=0)
+    await stream.send("stdout", b"a")
+    blocked = asyncio.ensure_future(stream.send("stdout", b"b"))
+    await asyncio.sleep(0.02)
+    assert not blocked.done()
+
+    events = stream.events()
+    first = await events.__anext__()
+    await asyncio.wait_for(blocked, timeout=1)
+    stream.close()
+    rest = [event async for event in events]
+
+    assert first["text"] + "".join(e["text"] for e in rest) == "ab"
+    assert stream.stats()["backpressure_seconds"] > 0
+
+
+@pytest.mark.asyncio
+async def test_idle_stream_emits_heartbeats() -> None:
+    stream = OutputStream(heartbeat_seconds=0.01)
+    events = stream.events()
+    beat = await asyncio.wait_for(events.__anext__(), timeout=1)
+    assert beat["type"] == "heartbeat"
+    stream.close()
+    assert [event async for event in events] == []
+
+
+@pytest.mark.asyncio
+async def test_run_shell_forwards_output_while_running(tmp_path) -> None:
+    stream = OutputStream(heartbeat_seconds=0)
+    cmd = f"{sys.executable} -c \"import sys; print('out'); print('err', file=sys.stderr)\""
+
+    async def run() -> dict[str, Any]:
+        try:
+            async with stream_output_to(stream):
+                return await workspace._run_shell(cmd, cwd=str(tmp_path))
+        finally:
+            stream.close()
+
+    result, events = await asyncio.gather(run(), _collect(stream))
+
+    assert result["stdout"] == "out\n"
+    streamed = {"stdout": "", "stderr": ""}
+    for event in events:
+        streamed[event["stream"]] += event["text"]
+    assert streamed == {"stdout": "out\n", "stderr": "err\n"}
+
+
+@pytest.mark.asyncio
+async def test_live_output_sends_mcp_progress_notifications(tmp_path) -> None:
+    from mcp.server.lowlevel.server import request_ctx
+
+    sent: list[dict[str, Any]] = []
+
+    class _Session:
+        async def send_progress_notification(self, token, progress, **kwargs):
+            sent.append({"token": token, "progress": progress, **kwargs})
+
+    ctx = SimpleNamespace(
+        meta=SimpleNamespace(progressToken="tok"), session=_Session(), request_id=7
+    )
+    reset = request_ctx.set(ctx)
+    try:
+        async with live_output() as stream:
+            assert stream is not None
+            await workspace._run_shell("echo hello", cwd=str(tmp_path))
+    finally:
+        request_ctx.reset(reset)
+
+    assert sent == [
+        {
+            "token": "tok",
+            "progress": 1.0,
+            "message": "hello\n",
+            "related_request_id": "7",
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_progress_increases_across_heartbeats() -> None:
+    sent: list[float] = []
+
+    class _Session:
+        async def send_progress_notification(self, token, progress, **kwargs):
+            sent.append(progress)
+
+    stream = OutputStream(heartbeat_seconds=0.01)
+    forwarder = asyncio.create_task(
+        output_stream._forward_progress(stream, (_Session(), "tok", None))
+    )
+    await stream.send("stdout", b"a\n")
+    while len(sent) < 3:
+        await asyncio.sleep(0.01)
+    await stream.send("stdout", b"b\n")
+    stream.close()
+    await asyncio.wait_for(forwarder, timeout=1)
+
+    assert len(sent) >= 4
+    assert all(later > earlier for earlier, later in zip(sent, sent[1:]))
+
+
+@pytest.mark.anyio
+async def test_live_output_is_noop_without_progress_token() -> None:
+    async with live_output() as stream:
+        assert stream is None
+
+
+def test_invoke_endpoint_streams_ndjson(monkeypatch, tmp_path) -> None:
+    import github_mcp.http_routes.tool_registry as tool_registry
+    import main
+
+    class Tool:
+        name = "echo_tool"
+        write_action = False
+
+    async def func(**_kwargs: Any) -> dict[str, Any]:
+        res = await workspace._run_shell("echo streamed", cwd=str(tmp_path))
+        return {"ok": True, "exit_code": res["exit_code"]}
+
+    monkeypatch.setattr(
+        tool_registry, "_find_registered_tool", lambda _name: (Tool(), func)
+    )
+
+    client = TestClient(main.app)
+    resp = client.post("/tools/echo_tool?stream=true", json={"args": {}})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in resp.text.splitlines() if line]
+    assert events[0] == {
+        "type": "output",
+        "seq": 1,
+        "stream": "stdout",
+        "text": "streamed\n",
+    }
+    assert events[-1]["type"] == "result"
+    assert events[-1]["status_code"] == 200
+    assert events[-1]["result"] == {"ok": True, "exit_code": 0}
+
+
+def test_streamed_result_applies_hosted_client_status_shaping(monkeypatch) -> None:
+    from github_mcp.http_routes import tool_registry
+    import main
+
+    class Tool:
+        name = "failing_tool"
+        write_action = False
+
+    async def func(**_kwargs: Any) -> dict[str, Any]:
+        raise ValueError("bad input")
+
+    monkeypatch.setattr(
+        tool_registry, "_find_registered_tool", lambda _name: (Tool(), func)
+    )
+    client = TestClient(main.app)
+
+    def result(headers: dict[str, str]) -> dict[str, Any]:
+        resp = client.post(
+            "/tools/failing_tool?stream=true", json={"args": {}}, headers=headers
+        )
+        assert resp.status_code == 200
+        return [json.loads(line) for line in resp.text.splitlines() if line][-1]
+
+    plain = result({})
+    hosted = result({"x-openai-conversation-id": "conv"})
+
+    assert plain["status_code"] >= 400
+    assert hosted["status_code"] == 200
+    assert hosted["headers"]["X-Tool-Original-Status"] == str(plain["status_code"])
+    assert hosted["result"] == plain["result"]
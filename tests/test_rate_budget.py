@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import pytest
+
+from github_mcp import rate_budget
+
+
+def _budget() -> rate_budget.RateBudget:
+    return rate_budget.RateBudget(
+        pace_below_fraction=0.2,
+        interactive_reserve_fraction=0.1,
+        max_wait_seconds=30,
+    )
+
+
+def _headers(remaining: int, *, limit: int = 5000, reset_in: float = 100):
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(1000 + reset_in),
+    }
+
+
+@pytest.fixture(autouse=True)
+def _frozen_time(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(rate_budget.time, "time", lambda: 1000.0)
+
+
+def test_no_pacing_with_healthy_budget() -> None:
+    budget = _budget()
+    assert budget.delay_for("/repos/o/r") == 0.0
+
+    budget.record("/repos/o/r", _headers(4000))
+    assert budget.delay_for("/repos/o/r") == 0.0
+
+
+def test_low_budget_spreads_requests_over_window() -> None:
+    budget = _budget()
+    budget.record("/repos/o/r", _headers(100))
+
+    first = budget.delay_for("/repos/o/r")
+    second = budget.delay_for("/repos/o/r")
+    third = budget.delay_for("/repos/o/r")
+
+    assert first == 0.0
+    assert second == pytest.approx(1.0)
+    assert third == pytest.approx(1.0 + 100 / 99)
+    stats = budget.stats()["buckets"]["core"]
+    assert stats["paced_requests"] == 2
+    assert stats["remaining"] == 97
+
+
+def test_buckets_are_tracked_per_resource() -> None:
+    budget = _budget()
+    budget.record(
+        "/search/code", {**_headers(1, limit=30), "X-RateLimit-Resource": "search"}
+    )
+
+    assert budget.delay_for("/repos/o/r") == 0.0
+    budget.delay_for("/search/issues")
+    assert budget.delay_for("/search/issues") == pytest.approx(30)
+
+
+def test_code_search_is_paced_against_its_own_bucket() -> None:
+    budget = _budget()
+    budget.record(
+        "/search/code?q=x",
+        {**_headers(1, limit=10), "X-RateLimit-Resource": "code_search"},
+    )
+
+    assert rate_budget.bucket_for_path("/search/code?q=y") == "code_search"
+    assert budget.delay_for("/search/issues") == 0.0
+    budget.delay_for("/search/code")
+    assert budget.delay_for("/search/code") == pytest.approx(30)
+
+
+def test_background_work_paces_earlier_and_keeps_the_reserve() -> None:
+    budget = _budget()
+    budget.record("/repos/o/r", _headers(1500))
+
+    assert budget.delay_for("/repos/o/r", rate_budget.PRIORITY_INTERACTIVE) == 0.0
+    budget.delay_for("/repos/o/r", rate_budget.PRIORITY_BACKGROUND)
+    assert budget.delay_for(
+        "/repos/o/r", rate_budget.PRIORITY_BACKGROUND
+    ) == pytest.approx(100 / 1000)
+
+    budget.record("/repos/o/r", _headers(400))
+    # Inside the interactive reserve background callers wait for the reset
+    # (capped), while interactive calls are only lightly paced.
+    with rate_budget.request_priority(rate_budget.PRIORITY_BACKGROUND):
+        budget._buckets["core"]["next_slot"] = 0.0
+        budget.delay_for("/repos/o/r")
+        assert budget.delay_for("/repos/o/r") == pytest.approx(30)
+
+
+def test_expired_window_is_not_paced() -> None:
+    budget = _budget()
+    budget.record("/repos/o/r", _headers(0, reset_in=-1))
+    assert budget.delay_for("/repos/o/r") == 0.0
+
+
+def test_new_window_drops_stale_pacing_slots() -> None:
+    budget = _budget()
+    budget.record("/repos/o/r", _headers(1, reset_in=100))
+    budget.delay_for("/repos/o/r")
+    assert budget.delay_for("/repos/o/r") == pytest.approx(30)
+
+    # Same window again: the queued slots still apply.
+    budget.record("/repos/o/r", _headers(1, reset_in=100))
+    assert budget.delay_for("/repos/o/r") > 0
+
+    # GitHub reports a fresh (already low) window.
+    budget.record("/repos/o/r", _headers(100, reset_in=1000))
+    assert budget.delay_for("/repos/o/r") == 0.0
+    assert budget.delay_for("/repos/o/r") == pytest.approx(10.0)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import pytest
+
+from github_mcp import ref_cache
+from github_mcp.main_tools import content_cache
+
+SHA = "a" * 40
+
+
+@pytest.fixture(autouse=True)
+def _fresh_ref_cache(monkeypatch: pytest.MonkeyPatch) -> ref_cache.RefCache:
+    cache = ref_cache.RefCache(ttl_seconds=60)
+    monkeypatch.setattr(content_cache, "REF_CACHE", cache)
+    monkeypatch.setattr(ref_cache, "REF_CACHE", cache)
+    monkeypatch.setattr(content_cache, "_effective_ref_for_repo", lambda _f, r: r)
+    return cache
+
+
+def test_is_commit_sha_and_repo_from_path() -> None:
+    assert ref_cache.is_commit_sha(SHA)
+    assert ref_cache.is_commit_sha("b" * 64)
+    assert not ref_cache.is_commit_sha("main")
+    assert not ref_cache.is_commit_sha("a" * 39)
+    assert ref_cache.repo_from_api_path("/repos/o/r/contents/x") == "o/r"
+    assert ref_cache.repo_from_api_path("/graphql") is None
+
+
+def test_ref_cache_expires_and_invalidates(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(ref_cache.time, "monotonic", lambda: now[0])
+    cache = ref_cache.RefCache(ttl_seconds=5)
+    cache.put("O/R", "main", SHA)
+    cache.put("o/r", "dev", SHA)
+
+    assert cache.get("o/r", "main") == SHA
+    now[0] += 6
+    assert cache.get("o/r", "main") is None
+
+    cache.put("o/r", "main", SHA)
+    cache.invalidate("o/r")
+    assert cache.get("o/r", "main") is None
+    assert cache.get("o/r", "dev") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_ref_cache_prunes_write_times_outside_window(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    now = [100.0]
+    monkeypatch.setattr(ref_cache.time, "monotonic", lambda: now[0])
+    cache = ref_cache.RefCache(ttl_seconds=5, write_window_seconds=30)
+    cache.invalidate("o/a")
+    now[0] += 10
+    cache.invalidate("o/b")
+    assert cache.written_since("o/a", 99.0)
+    assert cache.stats()["written_repos"] == 2
+
+    now[0] += 25
+    cache.invalidate("o/c")
+    assert cache.stats()["written_repos"] == 2
+    assert not cache.written_since("o/a", 99.0)
+    assert cache.written_since("o/b", 105.0)
+
+
+@pytest.mark.anyio
+async def test_resolve_ref_snapshot_uses_sha_media_type_and_caches(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[dict] = []
+
+    async def _fake_github_request(method, path, **kwargs):
+        calls.append({"path": path, **kwargs})
+        return {"status_code": 200, "headers": {}, "text": f"{SHA}\n"}
+
+    monkeypatch.setattr(content_cache, "_github_request", _fake_github_request)
+
+    first = await content_cache._resolve_ref_snapshot("o/r", "main")
+    second = await content_cache._resolve_ref_snapshot("o/r", "main")
+
+    assert first["resolved_ref"] == SHA
+    assert second == first
+    assert len(calls) == 1
+    assert calls[0]["headers"] == {"Accept": "application/vnd.github.sha"}
+    assert calls[0]["expect_json"] is False
+
+    ref_cache.invalidate_ref_cache("o/r")
+    await content_cache._resolve_ref_snapshot("o/r", "main")
+    assert len(calls) == 2
+
+
+@pytest.mark.anyio
+async def test_resolve_ref_snapshot_passes_commit_shas_through(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def _boom(*_args, **_kwargs):
+        raise AssertionError("no request expected")
+
+    monkeypatch.setattr(content_cache, "_github_request", _boom)
+
+    snapshot = await content_cache._resolve_ref_snapshot("o/r", SHA)
+    assert snapshot == {"requested_ref": SHA, "resolved_ref": SHA, "tree_sha": None}
+
+
+@pytest.mark.anyio
+async def test_resolve_ref_snapshot_falls_back_on_errors(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def _fail(*_args, **_kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(content_cache, "_github_request", _fail)
+
+    snapshot = await content_cache._resolve_ref_snapshot("o/r", "main")
+    assert snapshot["resolved_ref"] == "main"
+    assert ref_cache.REF_CACHE.get("o/r", "main") is None
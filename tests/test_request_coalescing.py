@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from github_mcp import http_clients
+
+
+class DummyResponse:
+    def __init__(self, status_code: int, body: Any) -> None:
+        self.status_code = status_code
+        self.headers: dict[str, str] = {}
+        self.text = ""
+        self.body = body
+        self.is_error = status_code >= 400
+
+
+class GatedClient:
+    """Client whose responses are released manually to hold requests in flight."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str]] = []
+        self.release = asyncio.Event()
+        self.cancelled = False
+
+    async def request(self, method: str, path: str, **kwargs: Any) -> DummyResponse:
+        self.calls.append((method, path))
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return DummyResponse(200, {"path": path})
+
+
+@pytest.fixture(autouse=True)
+def _simple_bodies(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(http_clients, "GITHUB_REQUEST_COALESCING_ENABLED", True)
+    monkeypatch.setattr(http_clients, "response_cache_enabled", lambda: False)
+    monkeypatch.setattr(
+        http_clients, "_extract_response_body", lambda resp: getattr(resp, "body", None)
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_gets_share_one_upstream_call() -> None:
+    client = GatedClient()
+
+    def factory() -> GatedClient:
+        return client
+
+    waiters = [
+        asyncio.ensure_future(
+            http_clients._github_request("GET", "/repos/o/r", client_factory=factory)
+        )
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    client.release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert client.calls == [("GET", "/repos/o/r")]
+    assert all(r["json"] == {"path": "/repos/o/r"} for r in results)
+    # Each waiter receives its own copy.
+    results[0]["json"]["path"] = "mutated"
+    assert results[1]["json"] == {"path": "/repos/o/r"}
+
+
+@pytest.mark.asyncio
+async def test_distinct_requests_are_not_coalesced() -> None:
+    client = GatedClient()
+
+    def factory() -> GatedClient:
+        return client
+
+    waiters = [
+        asyncio.ensure_future(
+            http_clients._github_request("GET", "/repos/o/a", client_factory=factory)
+        ),
+        asyncio.ensure_future(
+            http_clients._github_request(
+                "GET", "/repos/o/a", params={"page": 2}, client_factory=factory
+            )
+        ),
+    ]
+    await asyncio.sleep(0)
+    client.release.set()
+    await asyncio.gather(*waiters)
+
+    assert len(client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call() -> None:
+    client = GatedClient()
+
+    def factory() -> GatedClient:
+        return client
+
+    first = asyncio.ensure_future(
+        http_clients._github_request("GET", "/repos/o/r", client_factory=factory)
+    )
+    second = asyncio.ensure_future(
+        http_clients._github_request("GET", "/repos/o/r", client_factory=factory)
+    )
+    await asyncio.sleep(0)
+
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    client.release.set()
+    result = await second
+
+    assert result["json"] == {"path": "/repos/o/r"}
+    assert client.cancelled is False
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_call_is_cancelled_when_every_waiter_leaves() -> None:
+    client = GatedClient()
+
+    def factory() -> GatedClient:
+        return client
+
+    only = asyncio.ensure_future(
+        http_clients._github_request("GET", "/repos/o/r", client_factory=factory)
+    )
+    await asyncio.sleep(0)
+    only.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await only
+    await asyncio.sleep(0)
+
+    assert client.cancelled is True
+    assert http_clients._get_inflight_requests() == {}
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+import github_mcp.response_cache as rc
+from github_mcp import http_clients
+
+
+class DummyResponse:
+    def __init__(
+        self,
+        status_code: int,
+        *,
+        headers: dict[str, str] | None = None,
+        text: str = "",
+        body: Any = None,
+    ) -> None:
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+        self.body = body
+        self.is_error = status_code >= 400
+
+
+class RecordingClient:
+    def __init__(self, responses: list[DummyResponse]) -> None:
+        self._responses = list(responses)
+        self.sent_headers: list[dict[str, str] | None] = []
+
+    async def request(self, method: str, path: str, **kwargs: Any) -> DummyResponse:
+        self.sent_headers.append(kwargs.get("headers"))
+        return self._responses.pop(0)
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> rc.ResponseCache:
+    cache = rc.ResponseCache(max_entries=10, max_bytes=10_000)
+    monkeypatch.setattr(http_clients, "RESPONSE_CACHE", cache)
+    monkeypatch.setattr(http_clients, "response_cache_enabled", lambda: True)
+    monkeypatch.setattr(
+        http_clients, "_extract_response_body", lambda resp: getattr(resp, "body", None)
+    )
+    return cache
+
+
+def test_response_cache_key_ignores_auth_and_conditional_headers() -> None:
+    base = rc.response_cache_key(
+        "get", "/repos/o/r", params={"b": 1, "a": 2}, headers=None, token="t"
+    )
+    same = rc.response_cache_key(
+        "GET",
+        "/repos/o/r",
+        params={"a": 2, "b": 1},
+        headers={"If-None-Match": '"x"', "Authorization": "Bearer t"},
+        token="t",
+    )
+    other_token = rc.response_cache_key(
+        "GET", "/repos/o/r", params={"a": 2, "b": 1}, headers=None, token="u"
+    )
+    other_accept = rc.response_cache_key(
+        "GET",
+        "/repos/o/r",
+        params={"a": 2, "b": 1},
+        headers={"Accept": "application/vnd.github.raw"},
+        token="t",
+    )
+
+    assert base == same
+    assert base != other_token
+    assert base != other_accept
+    assert "Bearer" not in base
+
+
+def test_response_cache_requires_validator_and_evicts_lru() -> None:
+    cache = rc.ResponseCache(max_entries=2, max_bytes=0)
+    assert not cache.store("a", payload={}, response_headers={}, size_bytes=1)
+
+    cache.store("a", payload={"n": 1}, response_headers={"ETag": "1"}, size_bytes=1)
+    cache.store("b", payload={"n": 2}, response_headers={"ETag": "2"}, size_bytes=1)
+    assert cache.conditional_headers("a") == {"If-None-Match": "1"}
+    cache.store("c", payload={"n": 3}, response_headers={"ETag": "3"}, size_bytes=1)
+
+    assert cache.conditional_headers("b") == {}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_response_cache_byte_cap_rejects_oversized_entries() -> None:
+    cache = rc.ResponseCache(max_entries=0, max_bytes=5)
+    assert not cache.store(
+        "big", payload={}, response_headers={"ETag": "x"}, size_bytes=6
+    )
+    cache.store("a", payload={}, response_headers={"ETag": "a"}, size_bytes=4)
+    cache.store("b", payload={}, response_headers={"ETag": "b"}, size_bytes=4)
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] == 4
+
+
+@pytest.mark.anyio
+async def test_github_request_serves_cached_body_on_304(
+    cache: rc.ResponseCache,
+) -> None:
+    client = RecordingClient(
+        [
+            DummyResponse(
+                200,
+                headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024"},
+                text='{"name": "r"}',
+                body={"name": "r"},
+            ),
+            DummyResponse(304, headers={"ETag": '"v1"'}),
+        ]
+    )
+
+    first = await http_clients._github_request(
+        "GET", "/repos/o/r", client_factory=lambda: client
+    )
+    first["json"]["name"] = "mutated"
+    second = await http_clients._github_request(
+        "GET", "/repos/o/r", client_factory=lambda: client
+    )
+
+    assert second["json"] == {"name": "r"}
+    assert second["status_code"] == 200
+    assert client.sent_headers[0] is None
+    assert client.sent_headers[1] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024",
+    }
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["not_modified"] == 1
+
+
+@pytest.mark.anyio
+async def test_github_request_skips_cache_for_writes_and_caller_validators(
+    cache: rc.ResponseCache,
+) -> None:
+    client = RecordingClient(
+        [
+            DummyResponse(201, headers={"ETag": '"w"'}, body={"ok": True}),
+            DummyResponse(200, headers={"ETag": '"v"'}, body={"ok": True}),
+        ]
+    )
+
+    await http_clients._github_request(
+        "POST", "/repos/o/r/issues", json_body={}, client_factory=lambda: client
+    )
+    await http_clients._github_request(
+        "GET",
+        "/repos/o/r",
+        headers={"If-None-Match": '"mine"'},
+        client_factory=lambda: client,
+    )
+
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["misses"] == 0
+
+
+@pytest.mark.anyio
+async def test_github_request_refetches_when_304_entry_was_evicted(
+    cache: rc.ResponseCache,
+) -> None:
+    client = RecordingClient(
+        [
+            DummyResponse(200, headers={"ETag": '"v1"'}, body={"name": "r"}),
+            DummyResponse(304, headers={"ETag": '"v1"'}),
+            DummyResponse(200, headers={"ETag": '"v1"'}, body={"name": "r"}),
+        ]
+    )
+    real_headers = cache.conditional_headers
+
+    def headers_then_evict(key: str) -> dict[str, str]:
+        validators = real_headers(key)
+        cache.clear()
+        return validators
+
+    await http_clients._github_request(
+        "GET", "/repos/o/r", client_factory=lambda: client
+    )
+    cache.conditional_headers = headers_then_evict  # type: ignore[method-assign]
+    second = await http_clients._github_request(
+        "GET", "/repos/o/r", client_factory=lambda: client
+    )
+
+    assert second["status_code"] == 200
+    assert second["json"] == {"name": "r"}
+    assert client.sent_headers[1] == {"If-None-Match": '"v1"'}
+    assert client.sent_headers[2] is None
+    stats = cache.stats()
+    assert stats["hits"] == 0
+    assert stats["not_modified"] == 0
+    assert stats["entries"] == 1
+
+
+@pytest.mark.anyio
+async def test_github_request_does_not_store_non_2xx_responses(
+    cache: rc.ResponseCache,
+) -> None:
+    client = RecordingClient([DummyResponse(304, headers={"ETag": '"v1"'})])
+
+    result = await http_clients._github_request(
+        "GET", "/repos/o/r", client_factory=lambda: client
+    )
+
+    assert result["status_code"] == 304
+    assert cache.stats()["entries"] == 0
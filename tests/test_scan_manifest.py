@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from github_mcp import config
+from github_mcp.scan_manifest import ScanManifestCache
+from github_mcp.workspace_tools import listing as workspace_listing
+
+
+class DummyWorkspaceTools:
+    def __init__(self, repo_dir: str) -> None:
+        self.repo_dir = repo_dir
+
+    def _workspace_deps(self):
+        async def clone_repo(full_name, ref, preserve_changes):
+            return self.repo_dir
+
+        return {"clone_repo": clone_repo}
+
+    def _resolve_full_name(self, full_name, owner=None, repo=None):
+        return full_name or "octo/example"
+
+    def _resolve_ref(self, ref, branch=None):
+        return branch or ref
+
+    def _effective_ref_for_repo(self, full_name, ref):
+        return ref
+
+
+def _git(repo, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    repo_dir = tmp_path / "repo"
+    (repo_dir / "pkg").mkdir(parents=True)
+    for i in range(40):
+        (repo_dir / "pkg" / f"m{i:02d}.py").write_text(f"x = {i}\n" * (i + 1))
+    (repo_dir / "blob.bin").write_bytes(b"\x00\x01" * 10)
+
+    manifests = ScanManifestCache(4)
+    monkeypatch.setattr(config, "WORKSPACE_SCAN_MANIFEST", True)
+    monkeypatch.setattr(workspace_listing, "SCAN_MANIFESTS", manifests)
+    monkeypatch.setattr(workspace_listing, "_SCAN_BATCH_MIN_FILES", 4)
+    monkeypatch.setattr(
+        workspace_listing, "_tw", lambda: DummyWorkspaceTools(str(repo_dir))
+    )
+    return repo_dir, manifests
+
+
+def _scan(**kwargs):
+    result = asyncio.run(workspace_listing.scan_workspace_tree(**kwargs))
+    assert result.get("error") is None, result
+    return result
+
+
+def test_repeat_scan_reuses_manifest_and_rereads_changed_files(repo) -> None:
+    repo_dir, manifests = repo
+
+    first = _scan()
+    assert first["metadata"] == {"cached": 0, "computed": 41, "git_blob_shas": 0}
+    by_path = {e["path"]: e for e in first["results"]}
+    assert by_path["pkg/m02.py"]["line_count"] == 3
+    assert by_path["blob.bin"]["is_binary"] is True
+    assert "line_count" not in by_path["blob.bin"]
+
+    second = _scan()
+    assert second["metadata"]["computed"] == 0
+    assert second["results"] == first["results"]
+
+    changed = repo_dir / "pkg" / "m05.py"
+    changed.write_text("y = 1\n")
+    st = changed.stat()
+    os.utime(changed, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    (repo_dir / "pkg" / "m06.py").unlink()
+
+    third = _scan(hash_max_bytes=4)
+    # A new hash limit is computed once for every file; line counts are reused
+    # except for the edited file.
+    assert third["metadata"]["computed"] == 40
+    entry = next(e for e in third["results"] if e["path"] == "pkg/m05.py")
+    assert entry["line_count"] == 1 and entry["sha256_truncated"] is True
+    assert manifests.stats()["manifests"][0]["files"] == 40
+
+    heads = _scan(include_head=True, head_max_lines=1)
+    entry = next(e for e in heads["results"] if e["path"] == "pkg/m05.py")
+    assert entry["head"]["lines"] == [{"line": 1, "text": "y = 1"}]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git required")
+def test_git_blob_sha_for_unchanged_tracked_files(repo) -> None:
+    repo_dir, _ = repo
+    _git(repo_dir, "init", "-q", "-b", "main")
+    _git(repo_dir, "add", "pkg")
+    _git(repo_dir, "commit", "-q", "-m", "init")
+    (repo_dir / "pkg" / "m01.py").write_text("edited\n")
+
+    result = _scan(git_blob_sha=True, path="pkg")
+
+    by_path = {e["path"]: e for e in result["results"]}
+    expected = _git(repo_dir, "rev-parse", "HEAD:pkg/m00.py").strip()
+    assert by_path["pkg/m00.py"]["git_blob_sha"] == expected
+    assert "sha256" not in by_path["pkg/m00.py"]
+    assert "git_blob_sha" not in by_path["pkg/m01.py"]
+    assert by_path["pkg/m01.py"]["sha256"]
+    assert result["metadata"]["git_blob_shas"] == 39
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+from github_mcp import config
+from github_mcp.search_index import SearchIndexCache, query_trigrams
+from github_mcp.workspace_tools import listing as workspace_listing
+from github_mcp.workspace_tools import rg as workspace_rg
+
+
+class DummyWorkspaceTools:
+    def __init__(self, repo_dir: str) -> None:
+        self.repo_dir = repo_dir
+
+    def _workspace_deps(self):
+        async def clone_repo(full_name, ref, preserve_changes):
+            return self.repo_dir
+
+        return {"clone_repo": clone_repo}
+
+    def _resolve_full_name(self, full_name, owner=None, repo=None):
+        return full_name or "octo/example"
+
+    def _resolve_ref(self, ref, branch=None):
+        return branch or ref
+
+    def _effective_ref_for_repo(self, full_name, ref):
+        return ref
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    repo_dir = tmp_path / "repo"
+    (repo_dir / ".git").mkdir(parents=True)
+    for i in range(20):
+        (repo_dir / f"mod{i:02d}.py").write_text(f"def helper_{i}():\n    return {i}\n")
+    (repo_dir / "target.py").write_text("x = 1\nNEEDLE_value = compute()\n")
+
+    indexes = SearchIndexCache(4)
+    monkeypatch.setattr(config, "WORKSPACE_SEARCH_INDEX", True)
+    monkeypatch.setattr(workspace_listing, "SEARCH_INDEXES", indexes)
+    monkeypatch.setattr(workspace_rg, "SEARCH_INDEXES", indexes)
+    monkeypatch.setattr(
+        workspace_listing, "_tw", lambda: DummyWorkspaceTools(str(repo_dir))
+    )
+    return repo_dir, indexes
+
+
+def _search(**kwargs):
+    return asyncio.run(workspace_listing.search_workspace(**kwargs))
+
+
+def test_query_trigrams_for_literals_and_regexes() -> None:
+    assert query_trigrams("AbCd", regex=False) == {b"abc", b"bcd"}
+    assert query_trigrams("ab", regex=False) == frozenset()
+    # Only literal runs every match needs: not the optional or alternated parts.
+    assert query_trigrams(r"foo\d+bar(baz)?", regex=True) == {b"foo", b"bar"}
+    assert query_trigrams(r"(abc|xyz)", regex=True) == frozenset()
+    assert query_trigrams(r"^(?:qux)+\b", regex=True) == {b"qux"}
+    # Non-ASCII text never yields trigrams that could miss a case-folded match.
+    assert query_trigrams("café", regex=False) == {b"caf"}
+
+
+def test_repeat_search_prunes_files_and_matches_unindexed(repo) -> None:
+    repo_dir, indexes = repo
+
+    first = _search(query="needle_VALUE")
+    assert [r["file"] for r in first["results"]] == ["target.py"]
+    assert first["index"]["files"] == first["index"]["indexed"] == 21
+    assert first["index"]["pruned"] == 0
+    assert os.path.isfile(repo_dir / ".git" / "mcp-search-index")
+
+    second = _search(query="needle_value")
+    assert [r["file"] for r in second["results"]] == ["target.py"]
+    assert second["index"]["pruned"] == 20
+    assert second["index"]["indexed"] == 0
+    assert second["files_scanned"] == 1
+
+    regex = _search(query=r"NEEDLE_\w+ = compute", regex=True)
+    assert [r["line"] for r in regex["results"]] == [2]
+    assert regex["index"]["pruned"] == 20
+
+    stats = indexes.stats()["indexes"][0]
+    assert stats["files"] == 21 and stats["queries"] == 3
+
+
+def test_edited_and_new_files_are_searched_directly(repo) -> None:
+    repo_dir, _ = repo
+    _search(query="needle_value")
+
+    edited = repo_dir / "mod03.py"
+    edited.write_text("# NEEDLE_VALUE moved here\n")
+    st = edited.stat()
+    os.utime(edited, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    (repo_dir / "pkg").mkdir()
+    (repo_dir / "pkg" / "new.py").write_text("needle_value = 2\n")
+    (repo_dir / "mod05.py").unlink()
+
+    result = _search(query="needle_value")
+    assert sorted(r["file"] for r in result["results"]) == [
+        "mod03.py",
+        "pkg/new.py",
+        "target.py",
+    ]
+    assert result["index"]["files"] == 21
+
+    # A fresh process loads the saved index from disk.
+    reloaded = SearchIndexCache(1).open(str(repo_dir))
+    assert reloaded is not None and len(reloaded.files) == 21
+
+
+def test_python_rg_fallback_uses_index(repo) -> None:
+    repo_dir, indexes = repo
+
+    def _run():
+        return workspace_rg._python_search(
+            str(repo_dir),
+            "",
+            "needle_value",
+            regex=False,
+            case_sensitive=False,
+            include_hidden=False,
+            globs=[],
+            exclude_globs=[],
+            include_paths=[],
+            exclude_paths=[],
+            max_results=10,
+            max_file_bytes=None,
+        )
+
+    first, _ = _run()
+    second, _ = _run()
+    assert [m["path"] for m in first] == [m["path"] for m in second] == ["target.py"]
+    assert indexes.stats()["indexes"][0]["pruned"] == 20
+
+
+def test_index_can_be_disabled(repo, monkeypatch) -> None:
+    monkeypatch.setattr(config, "WORKSPACE_SEARCH_INDEX", False)
+
+    result = _search(query="needle_value")
+    assert [r["file"] for r in result["results"]] == ["target.py"]
+    assert result["index"] is None
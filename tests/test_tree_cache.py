@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from github_mcp.tree_cache import TreeCache, TreeIndex
+
+ENTRIES = [
+    {"path": "b.txt", "type": "blob", "sha": "1"},
+    {"path": "a", "type": "tree", "sha": "2"},
+    {"path": "a/x.py", "type": "blob", "sha": "3"},
+    {"path": "a/y", "type": "tree", "sha": "4"},
+    {"path": "a/y/z.py", "type": "blob", "sha": "5"},
+    {"path": "ab.txt", "type": "blob", "sha": "6"},
+    {"path": "ignored", "type": "commit", "sha": "7"},
+    "not-a-dict",
+]
+
+
+def _paths(entries):
+    return [e["path"] for e in entries]
+
+
+def test_tree_index_prefix_and_type_selection() -> None:
+    index = TreeIndex(ENTRIES)
+
+    assert len(index) == 6
+    entries, cursor = index.select(prefix="a/")
+    assert _paths(entries) == ["a/x.py", "a/y", "a/y/z.py"]
+    assert cursor is None
+
+    blobs, _ = index.select(prefix="a", types=["blob"])
+    assert _paths(blobs) == ["a/x.py", "a/y/z.py", "ab.txt"]
+    assert index.count(prefix="a", types=["tree"]) == 2
+    assert index.select(types=[]) == ([], None)
+
+
+def test_tree_index_pages_with_cursor() -> None:
+    index = TreeIndex(ENTRIES)
+    page, cursor = index.select(limit=4)
+    assert _paths(page) == ["a", "a/x.py", "a/y", "a/y/z.py"]
+    page, cursor = index.select(limit=4, start_after=cursor)
+    assert _paths(page) == ["ab.txt", "b.txt"]
+    assert cursor is None
+
+
+def test_tree_index_blob_shas_use_normalized_paths() -> None:
+    index = TreeIndex(ENTRIES, normalize_path=str.upper)
+    assert index.blob_shas()["A/X.PY"] == "3"
+
+
+def test_tree_cache_evicts_by_total_entries() -> None:
+    cache = TreeCache(max_entries=8)
+    cache.put("one", TreeIndex(ENTRIES))
+    cache.put("two", TreeIndex(ENTRIES[:2]))
+    assert cache.get("one") is not None
+
+    cache.put("three", TreeIndex(ENTRIES[:1]))
+    assert cache.get("two") is None
+    assert cache.stats()["entries"] == 7
+
+    # A single tree over the cap is not cached at all.
+    cache.put(
+        "big",
+        TreeIndex(ENTRIES + [{"path": f"p{i}", "type": "blob"} for i in range(8)]),
+    )
+    assert cache.get("big") is None
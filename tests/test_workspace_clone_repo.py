@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import shutil
+import subprocess
 from dataclasses import dataclass
 from typing import Any, Callable
 
@@ -236,3 +238,192 @@ async def test_clone_repo_preserve_changes_wrong_branch_clean_checkout_fallback(
     assert git_calls[0] == "git fetch origin --prune"
     assert git_calls[1].startswith("git checkout ")
     assert git_calls[2].startswith("git checkout -B")
+
+
+def _shared_store_env(tmp_path, monkeypatch, git_calls: list[_Call], handler):
+    monkeypatch.setattr(workspace.config, "WORKSPACE_SHARED_OBJECTS", True)
+    monkeypatch.setattr(
+        "github_mcp.utils._effective_ref_for_repo",
+        lambda _full_name, ref: ref,
+        raising=False,
+    )
+
+    async def fake_ensure_repo_remote(*_args, **_kwargs) -> None:
+        return None
+
+    monkeypatch.setattr(workspace, "_ensure_repo_remote", fake_ensure_repo_remote)
+
+    async def fake_run_git_with_retry(
+        _run_shell: Callable[..., Any],
+        cmd: str,
+        *,
+        cwd: str | None,
+        timeout_seconds: int,
+        env: dict[str, str] | None = None,
+    ) -> dict[str, Any]:
+        git_calls.append(_Call(cmd=cmd, env=env))
+        return handler(cmd, cwd)
+
+    monkeypatch.setattr(workspace, "_run_git_with_retry", fake_run_git_with_retry)
+
+    class _Main:
+        WORKSPACE_BASE_DIR = str(tmp_path)
+
+    monkeypatch.setattr(workspace, "_get_main_module", lambda: _Main)
+
+
+@pytest.mark.anyio
+async def test_clone_repo_creates_shared_store_and_borrows_objects(
+    tmp_path, monkeypatch
+):
+    from github_mcp.workspace_locks import WORKSPACE_LOCKS
+
+    git_calls: list[_Call] = []
+    ok = {"exit_code": 0, "stdout": "", "stderr": ""}
+    store_dir = tmp_path / "octo-org__octo-repo" / ".objects.git"
+    pinned: list[bool] = []
+
+    def handler(cmd: str, cwd: str | None) -> dict[str, Any]:
+        if cmd.startswith("git clone --shared"):
+            # The pool must not be able to delete the store mid-clone.
+            active = WORKSPACE_LOCKS.stats()["active"].get(str(store_dir), {})
+            pinned.append(active.get("readers", 0) > 0)
+            target = cmd.rsplit(" ", 1)[1]
+            (tmp_path / target).joinpath(".git").mkdir(parents=True)
+        return ok
+
+    _shared_store_env(tmp_path, monkeypatch, git_calls, handler)
+
+    result_dir = await workspace._clone_repo("octo-org/octo-repo", ref="feature/x")
+
+    assert pinned == [True]
+    assert result_dir == str(tmp_path / "octo-org__octo-repo" / "feature" / "x")
+    assert store_dir.is_dir()
+    cmds = [c.cmd for c in git_calls]
+    assert cmds[0].startswith(
+        "git clone --bare https://github.com/octo-org/octo-repo.git"
+    )
+    assert "git config gc.pruneExpire never" in cmds
+    assert cmds[-1].startswith(f"git clone --shared --branch feature/x {store_dir} ")
+    assert not any(c.startswith("git clone --branch") for c in cmds)
+
+
+@pytest.mark.anyio
+async def test_clone_repo_refreshes_mirror_from_shared_store(tmp_path, monkeypatch):
+    store_dir = tmp_path / "octo-org__octo-repo" / ".objects.git"
+    store_dir.mkdir(parents=True)
+    repo_dir = tmp_path / "octo-org__octo-repo" / "main"
+    (repo_dir / ".git").mkdir(parents=True)
+
+    git_calls: list[_Call] = []
+    cwds: list[str | None] = []
+
+    def handler(cmd: str, cwd: str | None) -> dict[str, Any]:
+        cwds.append(cwd)
+        return {"exit_code": 0, "stdout": "", "stderr": ""}
+
+    _shared_store_env(tmp_path, monkeypatch, git_calls, handler)
+
+    await workspace._clone_repo("octo-org/octo-repo", ref="main")
+
+    cmds = [c.cmd for c in git_calls]
+    # One network fetch into the store, then a local fetch for the mirror.
+    assert cmds[0] == "git fetch origin --prune"
+    assert cwds[0] == str(store_dir)
+    assert cmds[1] == (
+        f"git fetch --prune {store_dir} '+refs/heads/*:refs/remotes/origin/*'"
+    )
+    assert cwds[1] == str(repo_dir)
+    assert cmds[2:] == [
+        "git checkout -B main origin/main",
+        "git reset --hard origin/main",
+        "git clean -fdx --exclude .venv-mcp",
+    ]
+
+
+@pytest.mark.anyio
+async def test_clone_repo_falls_back_to_network_fetch_without_store(
+    tmp_path, monkeypatch
+):
+    repo_dir = tmp_path / "octo-org__octo-repo" / "main"
+    (repo_dir / ".git").mkdir(parents=True)
+    git_calls: list[_Call] = []
+
+    _shared_store_env(
+        tmp_path,
+        monkeypatch,
+        git_calls,
+        lambda _cmd, _cwd: {"exit_code": 0, "stdout": "", "stderr": ""},
+    )
+
+    await workspace._clone_repo("octo-org/octo-repo", ref="main")
+
+    assert git_calls[0].cmd == "git fetch origin --prune"
+    assert not (tmp_path / "octo-org__octo-repo" / ".objects.git").exists()
+
+
+def test_clone_strategy_flags(monkeypatch):
+    monkeypatch.setattr(workspace.config, "WORKSPACE_CLONE_FILTER", "")
+    monkeypatch.setattr(workspace.config, "WORKSPACE_CLONE_DEPTH", 0)
+    monkeypatch.setattr(workspace.config, "WORKSPACE_SPARSE_PATHS", ())
+    assert workspace._clone_strategy_flags() == ""
+
+    monkeypatch.setattr(workspace.config, "WORKSPACE_CLONE_FILTER", "blob:none")
+    monkeypatch.setattr(workspace.config, "WORKSPACE_CLONE_DEPTH", 5)
+    monkeypatch.setattr(workspace.config, "WORKSPACE_SPARSE_PATHS", ("src",))
+    assert workspace._clone_strategy_flags() == (
+        "--filter=blob:none --depth 5 --sparse "
+    )
+
+
+@pytest.mark.anyio
+async def test_partial_clone_skips_shared_store_and_sets_cone(tmp_path, monkeypatch):
+    monkeypatch.setattr(workspace.config, "WORKSPACE_CLONE_FILTER", "blob:none")
+    monkeypatch.setattr(workspace.config, "WORKSPACE_SPARSE_PATHS", ("src", "docs"))
+    git_calls: list[_Call] = []
+
+    def handler(cmd: str, cwd: str | None) -> dict[str, Any]:
+        return {"exit_code": 0, "stdout": "", "stderr": ""}
+
+    _shared_store_env(tmp_path, monkeypatch, git_calls, handler)
+
+    await workspace._clone_repo("octo-org/octo-repo", ref="main")
+
+    cmds = [c.cmd for c in git_calls]
+    assert cmds[0].startswith(
+        "git clone --filter=blob:none --sparse --branch main "
+        "https://github.com/octo-org/octo-repo.git "
+    )
+    assert cmds[1] == "git sparse-checkout set --cone src docs"
+    assert not (tmp_path / "octo-org__octo-repo" / ".objects.git").exists()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+async def test_widen_sparse_checkout_adds_missing_paths(tmp_path, monkeypatch):
+    upstream = tmp_path / "upstream"
+    for rel, text in {"a/x/f.txt": "1", "b/g.txt": "2", "c/h.txt": "3"}.items():
+        (upstream / rel).parent.mkdir(parents=True, exist_ok=True)
+        (upstream / rel).write_text(text)
+    mirror = tmp_path / "mirror"
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    for cmd in (
+        [*git, "init", "-q", "-b", "main", str(upstream)],
+        [*git, "-C", str(upstream), "add", "."],
+        [*git, "-C", str(upstream), "commit", "-qm", "init"],
+        ["git", "clone", "-q", "--sparse", str(upstream), str(mirror)],
+        ["git", "-C", str(mirror), "sparse-checkout", "set", "--cone", "a"],
+    ):
+        subprocess.run(cmd, check=True)
+
+    monkeypatch.setattr(workspace, "_get_main_module", lambda: None)
+    assert not (mirror / "b").exists()
+
+    added = await workspace._widen_sparse_checkout(
+        str(mirror), ["a/x/f.txt", "b/g.txt", "c", "missing/file.txt"]
+    )
+
+    assert added == ["b", "c"]
+    assert (mirror / "b" / "g.txt").read_text() == "2"
+    assert (mirror / "c" / "h.txt").is_file()
+    assert await workspace._widen_sparse_checkout(str(mirror), ["b/g.txt"]) == []
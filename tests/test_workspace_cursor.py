@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from github_mcp.workspace_cursor import decode_cursor, encode_cursor, walk_key
+from github_mcp.workspace_tools import listing as workspace_listing
+
+
+class DummyWorkspaceTools:
+    def __init__(self, repo_dir: str) -> None:
+        self.repo_dir = repo_dir
+
+    def _workspace_deps(self):
+        async def clone_repo(full_name, ref, preserve_changes):
+            return self.repo_dir
+
+        return {"clone_repo": clone_repo}
+
+    def _resolve_full_name(self, full_name, owner=None, repo=None):
+        return full_name or "octo/example"
+
+    def _resolve_ref(self, ref, branch=None):
+        return branch or ref
+
+    def _effective_ref_for_repo(self, full_name, ref):
+        return ref
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    repo_dir = tmp_path / "repo"
+    (repo_dir / ".git").mkdir(parents=True)
+    (repo_dir / ".git" / "HEAD").write_text("a" * 40 + "\n")
+    for rel in ("z.txt", "a/b/deep.txt", "a/one.txt", "a/two.txt", "b/x.txt"):
+        (repo_dir / rel).parent.mkdir(parents=True, exist_ok=True)
+        (repo_dir / rel).write_text("hit\nmiss\nhit\n")
+    monkeypatch.setattr(
+        workspace_listing, "_tw", lambda: DummyWorkspaceTools(str(repo_dir))
+    )
+    return repo_dir
+
+
+def _pages(tool, **kwargs):
+    pages = []
+    cursor = 0
+    while True:
+        page = asyncio.run(tool(cursor=cursor, **kwargs))
+        assert page.get("error") is None, page
+        pages.append(page)
+        if page["next_cursor_token"] is None:
+            return pages
+        cursor = page["next_cursor_token"]
+
+
+def test_walk_key_matches_walk_order() -> None:
+    emitted = ["z.txt", "a/b", "a/one.txt", "a/b/deep.txt", "b/x.txt"]
+    keys = [walk_key(p, is_dir=p == "a/b") for p in emitted]
+    assert keys == sorted(keys)
+
+
+def test_list_tokens_resume_after_last_path(repo) -> None:
+    tool = workspace_listing.list_workspace_files
+    full = asyncio.run(tool(include_dirs=True))["files"]
+    pages = _pages(tool, include_dirs=True, max_files=2)
+
+    assert [p for page in pages for p in page["files"]] == full
+    assert [page["next_cursor"] for page in pages] == [2, 4, 6, None]
+
+    # Files added before the cursor do not shift the next page.
+    first = asyncio.run(tool(max_files=2))
+    (repo / "0-new.txt").write_text("")
+    second = asyncio.run(tool(max_files=2, cursor=first["next_cursor_token"]))
+    assert first["files"] == ["z.txt", "a/one.txt"]
+    assert second["files"] == ["a/two.txt", "a/b/deep.txt"]
+    assert second["cursor_stale"] is False
+
+    (repo / ".git" / "HEAD").write_text("b" * 40 + "\n")
+    third = asyncio.run(tool(max_files=2, cursor=second["next_cursor_token"]))
+    assert third["files"] == ["b/x.txt"]
+    assert third["cursor_stale"] is True
+
+
+def test_search_tokens_resume_mid_file(repo) -> None:
+    tool = workspace_listing.search_workspace
+    pages = _pages(tool, query="hit", max_results=3)
+
+    hits = [(r["file"], r["line"]) for page in pages for r in page["results"]]
+    assert hits == [
+        (f, line)
+        for f in ("z.txt", "a/one.txt", "a/two.txt", "a/b/deep.txt", "b/x.txt")
+        for line in (1, 3)
+    ]
+    assert pages[1]["cursor"] == 3
+
+    mismatched = asyncio.run(
+        tool(query="miss", max_results=3, cursor=pages[0]["next_cursor_token"])
+    )
+    assert "different tool call" in mismatched["error"]
+
+
+def test_scan_tokens_page_through_tree(repo) -> None:
+    tool = workspace_listing.scan_workspace_tree
+    pages = _pages(tool, max_entries=2, include_hash=False)
+
+    paths = [e["path"] for page in pages for e in page["results"]]
+    assert paths == ["z.txt", "a/one.txt", "a/two.txt", "a/b/deep.txt", "b/x.txt"]
+
+
+def test_decode_rejects_garbage() -> None:
+    token = encode_cursor("t", {"a": 1}, path="x", offset=1, fingerprint="f")
+    assert decode_cursor(token, "t", {"a": 1}).path == "x"
+    for bad in ("nope", "wc1.!!!", "wc1.WzFd"):
+        with pytest.raises(ValueError):
+            decode_cursor(bad, "t", {"a": 1})
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from github_mcp import workspace, workspace_freshness
+from github_mcp.ref_cache import invalidate_ref_cache
+
+SHA_A = "a" * 40
+SHA_B = "b" * 40
+
+
+@pytest.fixture(autouse=True)
+def _clear_freshness():
+    workspace_freshness.clear_workspace_freshness()
+    yield
+    workspace_freshness.clear_workspace_freshness()
+
+
+@pytest.fixture
+def mirror(tmp_path, monkeypatch):
+    """A fake mirror on ``main`` plus recorders for git commands."""
+
+    repo_dir = tmp_path / "octo-org__octo-repo" / "main"
+    (repo_dir / ".git" / "refs" / "remotes" / "origin").mkdir(parents=True)
+    (repo_dir / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    (repo_dir / ".git" / "refs" / "remotes" / "origin" / "main").write_text(SHA_A)
+
+    state: dict[str, Any] = {"git": [], "shell": [], "remote_sha": SHA_A}
+    monkeypatch.setattr(workspace.config, "WORKSPACE_SHARED_OBJECTS", False)
+    monkeypatch.setattr(
+        "github_mcp.utils._effective_ref_for_repo",
+        lambda _full_name, ref: ref,
+        raising=False,
+    )
+
+    async def fake_ensure_repo_remote(*_args, **_kwargs) -> None:
+        return None
+
+    async def fake_run_git_with_retry(_run_shell, cmd: str, **_kwargs):
+        state["git"].append(cmd)
+        return {"exit_code": 0, "stdout": "", "stderr": ""}
+
+    async def fake_run_shell(cmd: str, **_kwargs) -> dict[str, Any]:
+        state["shell"].append(cmd)
+        if cmd.startswith("git ls-remote"):
+            return {
+                "exit_code": 0,
+                "stdout": f"{state['remote_sha']}\trefs/heads/main\n",
+            }
+        if cmd == "git branch --show-current":
+            return {"exit_code": 0, "stdout": "main\n"}
+        raise AssertionError(f"Unexpected shell command: {cmd}")
+
+    class _Main:
+        WORKSPACE_BASE_DIR = str(tmp_path)
+        _run_shell = staticmethod(fake_run_shell)
+
+    monkeypatch.setattr(workspace, "_ensure_repo_remote", fake_ensure_repo_remote)
+    monkeypatch.setattr(workspace, "_run_git_with_retry", fake_run_git_with_retry)
+    monkeypatch.setattr(workspace, "_get_main_module", lambda: _Main)
+    return state
+
+
+async def _clone() -> str:
+    return await workspace._clone_repo(
+        "octo-org/octo-repo", ref="main", preserve_changes=True
+    )
+
+
+@pytest.mark.anyio
+async def test_fresh_mirror_skips_all_git_commands(mirror) -> None:
+    await _clone()
+    assert mirror["git"] == ["git fetch origin --prune"]
+
+    mirror["git"].clear()
+    mirror["shell"].clear()
+    await _clone()
+
+    assert mirror["git"] == []
+    assert mirror["shell"] == []
+    stats = workspace_freshness.workspace_freshness_stats()
+    assert stats["fetches"] == 1
+    assert stats["skipped_fresh"] == 1
+
+
+@pytest.mark.anyio
+async def test_stale_mirror_checks_remote_before_fetching(mirror, monkeypatch) -> None:
+    monkeypatch.setattr(workspace_freshness.WORKSPACE_FRESHNESS, "stale_seconds", 0)
+    await _clone()
+
+    mirror["git"].clear()
+    await _clone()
+    assert mirror["git"] == []
+    assert any(cmd.startswith("git ls-remote origin") for cmd in mirror["shell"])
+    assert workspace_freshness.workspace_freshness_stats()["skipped_unchanged"] == 1
+
+    mirror["remote_sha"] = SHA_B
+    await _clone()
+    assert mirror["git"] == ["git fetch origin --prune"]
+
+
+@pytest.mark.anyio
+async def test_repository_write_ends_the_freshness_window(mirror) -> None:
+    await _clone()
+    invalidate_ref_cache("octo-org/octo-repo")
+    mirror["remote_sha"] = SHA_B
+
+    mirror["git"].clear()
+    await _clone()
+
+    assert mirror["git"] == ["git fetch origin --prune"]
+
+
+@pytest.mark.asyncio
+async def test_run_coalesced_shares_one_run() -> None:
+    calls = 0
+    release = asyncio.Event()
+
+    async def start() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "done"
+
+    tasks = [
+        asyncio.create_task(workspace_freshness.run_coalesced("k", start))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["done", "done", "done"]
+    assert calls == 1
+    assert workspace_freshness.workspace_freshness_stats()["coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_run_coalesced_waiters_retry_after_leader_failure() -> None:
+    attempts = 0
+    release = asyncio.Event()
+
+    async def start() -> int:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            await release.wait()
+            raise RuntimeError("boom")
+        return attempts
+
+    leader = asyncio.create_task(workspace_freshness.run_coalesced("k", start))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(workspace_freshness.run_coalesced("k", start))
+    await asyncio.sleep(0)
+    release.set()
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await leader
+    assert await follower == 2
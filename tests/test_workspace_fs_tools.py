@@ -242,6 +242,104 @@ def test_get_workspace_files_contents_glob_truncation_flag(tmp_path, monkeypatch
     assert len([p for p in returned_paths if p.endswith(".txt")]) <= 2
 
 
+def test_get_workspace_files_contents_enforces_budgets(tmp_path, monkeypatch):
+    repo_dir = tmp_path / "repo"
+    (repo_dir / "src").mkdir(parents=True)
+    (repo_dir / "src" / "a.py").write_text("ab\ncd\nef\n", encoding="utf-8")
+    (repo_dir / "src" / "b.py").write_text("x" * 1_000_000, encoding="utf-8")
+    (repo_dir / "src" / "c.py").write_text("0123456789", encoding="utf-8")
+    for i in range(5):
+        (repo_dir / "src" / f"d{i}.py").write_text("tail", encoding="utf-8")
+
+    dummy = DummyWorkspaceTools(str(repo_dir))
+    monkeypatch.setattr(fs, "_tw", lambda: dummy)
+    monkeypatch.setattr(fs, "parallel_width", lambda: 2)
+
+    out = asyncio.run(
+        fs.get_workspace_files_contents(
+            "octo/example",
+            paths=["src/a.py", "src/b.py", "src/c.py", "src/d*.py"],
+            max_chars_per_file=5,
+            max_total_chars=13,
+        )
+    )
+
+    texts = {f["path"]: f["text"] for f in out["files"]}
+    assert texts == {"src/a.py": "ab\ncd", "src/b.py": "xxxxx", "src/c.py": "012"}
+    assert out["summary"]["cut"] == [
+        {
+            "path": "src/a.py",
+            "reason": "max_chars_per_file",
+            "at_char": 5,
+            "at_line": 2,
+        },
+        {
+            "path": "src/b.py",
+            "reason": "max_chars_per_file",
+            "at_char": 5,
+            "at_line": 1,
+        },
+        {"path": "src/c.py", "reason": "max_total_chars", "at_char": 3, "at_line": 1},
+    ]
+    # The 1 MB file is never loaded past its budget.
+    assert out["summary"]["bytes_read"] < 100
+    assert out["summary"]["budget_exhausted"] is True
+    assert sorted(out["unread_paths"]) == [f"src/d{i}.py" for i in range(5)]
+
+
+def test_get_workspace_files_contents_total_budget_never_overreads(
+    tmp_path, monkeypatch
+):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    for name in ("a", "b", "c", "d"):
+        (repo_dir / f"{name}.txt").write_text(name * 100_000, encoding="utf-8")
+
+    dummy = DummyWorkspaceTools(str(repo_dir))
+    monkeypatch.setattr(fs, "_tw", lambda: dummy)
+    monkeypatch.setattr(fs, "parallel_width", lambda: 4)
+    opened: list[tuple[str, int]] = []
+    real_read = fs._workspace_read_text_budgeted
+
+    def recording_read(repo_dir, path, *, max_chars):
+        opened.append((path, max_chars))
+        return real_read(repo_dir, path, max_chars=max_chars)
+
+    monkeypatch.setattr(fs, "_workspace_read_text_budgeted", recording_read)
+
+    out = asyncio.run(
+        fs.get_workspace_files_contents(
+            "octo/example",
+            paths=["a.txt", "b.txt", "c.txt", "d.txt"],
+            max_chars_per_file=0,
+            max_total_chars=10,
+        )
+    )
+
+    assert [(f["path"], f["text"]) for f in out["files"]] == [("a.txt", "a" * 10)]
+    assert out["unread_paths"] == ["b.txt", "c.txt", "d.txt"]
+    # Only the first file is opened, and only up to the total budget.
+    assert opened == [("a.txt", 10)]
+
+
+def test_budgeted_read_decodes_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(fs, "_BATCH_READ_CHUNK_BYTES", 3)
+    (tmp_path / "u.txt").write_bytes("héllo ✓ wörld".encode() + b"\xff!")
+
+    full = fs._workspace_read_text_budgeted(str(tmp_path), "u.txt", max_chars=0)
+    assert full["text"] == "héllo ✓ wörld�!"
+    assert full["had_decoding_errors"] is True
+    assert full["truncated"] is False
+
+    cut = fs._workspace_read_text_budgeted(str(tmp_path), "u.txt", max_chars=7)
+    assert cut["text"] == "héllo ✓"
+    assert cut["truncated"] is True
+    assert cut["had_decoding_errors"] is False
+
+    exact = fs._workspace_read_text_budgeted(str(tmp_path), "u.txt", max_chars=15)
+    assert exact["text"] == full["text"] and exact["truncated"] is False
+
+
 def test_read_workspace_file_excerpt_missing_dir_binary_and_text(tmp_path, monkeypatch):
     repo_dir = tmp_path / "repo"
     repo_dir.mkdir()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+from github_mcp import workspace_locks
+from github_mcp.workspace_locks import (
+    WORKSPACE_LOCKS,
+    WorkspaceLockManager,
+    lock_workspace_for_tool,
+    tool_lock_scope,
+)
+
+
+def _key(path: str) -> str:
+    return os.path.abspath(path)
+
+
+@pytest.fixture(autouse=True)
+def _clear_locks(monkeypatch):
+    # Locks are off by default; the shared manager is exercised with them on.
+    monkeypatch.setattr(WORKSPACE_LOCKS, "enabled", True)
+    workspace_locks.clear_workspace_locks()
+    yield
+    workspace_locks.clear_workspace_locks()
+
+
+async def _record(manager, path, label, order, *, write, release):
+    async with manager.hold(path, write=write):
+        order.append(f"{label}+")
+        await release.wait()
+        order.append(f"{label}-")
+
+
+@pytest.mark.anyio
+async def test_uncontended_holds_are_reentrant() -> None:
+    manager = WorkspaceLockManager()
+    async with manager.hold("/w/repo", write=True):
+        async with manager.hold("/w/repo", write=False):
+            async with manager.hold("/w/repo/", write=True):
+                pass
+    stats = manager.stats()
+    assert stats["acquired_write"] == 1
+    assert stats["reentrant"] == 2
+    assert stats["contended"] == 0
+    assert stats["active"] == {}
+
+
+@pytest.mark.asyncio
+async def test_readers_share_and_writers_serialize() -> None:
+    manager = WorkspaceLockManager()
+    order: list[str] = []
+    release = asyncio.Event()
+
+    tasks = [
+        asyncio.create_task(
+            _record(manager, "/w", "r1", order, write=False, release=release)
+        ),
+        asyncio.create_task(
+            _record(manager, "/w", "r2", order, write=False, release=release)
+        ),
+    ]
+    await asyncio.sleep(0)
+    tasks.append(
+        asyncio.create_task(
+            _record(manager, "/w", "w", order, write=True, release=release)
+        )
+    )
+    await asyncio.sleep(0)
+    # A reader arriving behind a queued writer waits its turn.
+    tasks.append(
+        asyncio.create_task(
+            _record(manager, "/w", "r3", order, write=False, release=release)
+        )
+    )
+    await asyncio.sleep(0)
+    assert order == ["r1+", "r2+"]
+    assert manager.stats()["active"][_key("/w")]["queue_depth"] == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ["r1+", "r2+", "r1-", "r2-", "w+", "w-", "r3+", "r3-"]
+    stats = manager.stats()
+    assert stats["contended"] == 2
+    assert stats["max_queue_depth"] == 2
+    assert stats["active"] == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_writer_unblocks_queued_readers() -> None:
+    manager = WorkspaceLockManager()
+    await manager.acquire(_key("/w"), write=False)
+    writer = asyncio.create_task(manager.acquire(_key("/w"), write=True))
+    await asyncio.sleep(0)
+    reader = asyncio.create_task(manager.acquire(_key("/w"), write=False))
+    await asyncio.sleep(0)
+    assert not reader.done()
+
+    writer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await writer
+    await reader
+    assert manager.stats()["active"][_key("/w")]["readers"] == 2
+
+
+@pytest.mark.asyncio
+async def test_upgrade_drops_shared_hold_while_waiting() -> None:
+    manager = WorkspaceLockManager()
+    order: list[str] = []
+
+    async def upgrader(label: str) -> None:
+        async with manager.hold("/w", write=False):
+            await asyncio.sleep(0)
+            async with manager.hold("/w", write=True):
+                order.append(label)
+                await asyncio.sleep(0)
+
+    await asyncio.wait_for(asyncio.gather(upgrader("a"), upgrader("b")), timeout=1)
+
+    assert sorted(order) == ["a", "b"]
+    assert manager.stats()["upgrades"] == 2
+    assert manager.stats()["active"] == {}
+
+
+@pytest.mark.anyio
+async def test_tool_scope_holds_mirror_until_exit() -> None:
+    async with tool_lock_scope(write=True):
+        await lock_workspace_for_tool("/w/repo")
+        await lock_workspace_for_tool("/w/repo")
+        assert WORKSPACE_LOCKS.stats()["active"][_key("/w/repo")]["writer"] is True
+    stats = WORKSPACE_LOCKS.stats()
+    assert stats["active"] == {}
+    assert stats["acquired_write"] == 1
+
+    # Outside a tool call there is nothing to attach the lock to.
+    await lock_workspace_for_tool("/w/repo")
+    assert WORKSPACE_LOCKS.stats()["acquired_write"] == 1
+
+
+@pytest.mark.asyncio
+async def test_readers_waiting_on_coalesced_refresh_do_not_deadlock(
+    tmp_path, monkeypatch
+) -> None:
+    from github_mcp import workspace
+
+    mirror = tmp_path / "mirror"
+    (mirror / ".git").mkdir(parents=True)
+    refreshes: list[dict] = []
+
+    async def fake_sync(full_name, ref, workspace_dir, *, preserve_changes):
+        refreshes.append(WORKSPACE_LOCKS.stats()["active"][_key(workspace_dir)])
+        await asyncio.sleep(0.01)
+        return workspace_dir
+
+    monkeypatch.setattr(workspace, "_workspace_path", lambda *_: str(mirror))
+    monkeypatch.setattr(workspace, "_sync_repo_mirror", fake_sync)
+
+    async def reader() -> str:
+        async with tool_lock_scope(write=False):
+            await lock_workspace_for_tool(str(mirror))
+            await asyncio.sleep(0)
+            # Both readers find the mirror stale and re-clone it.
+            return await workspace._clone_repo("octo/example", "main")
+
+    results = await asyncio.wait_for(asyncio.gather(reader(), reader()), timeout=5)
+
+    assert results == [str(mirror), str(mirror)]
+    assert refreshes == [{"readers": 0, "writer": True, "queue_depth": 0}]
+    assert WORKSPACE_LOCKS.stats()["active"] == {}
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Any
+
+import pytest
+
+from github_mcp import config, workspace_pool
+from github_mcp.workspace_pool import WorkspacePool
+
+
+def _make_mirror(base, repo_key: str, ref: str, size: int) -> str:
+    mirror_dir = base / repo_key / ref
+    (mirror_dir / ".git").mkdir(parents=True)
+    (mirror_dir / "blob.bin").write_bytes(b"x" * size)
+    return str(mirror_dir)
+
+
+@pytest.fixture
+def pool_env(tmp_path, monkeypatch):
+    """A base dir plus a fake ``git status`` reporting per-mirror state."""
+
+    status: dict[str, str] = {}
+
+    async def fake_run_shell(cmd: str, cwd: str | None = None, **_kwargs):
+        assert cmd == "git status --porcelain --branch"
+        return {"exit_code": 0, "stdout": status.get(cwd, "## main...origin/main\n")}
+
+    class _Main:
+        WORKSPACE_BASE_DIR = str(tmp_path)
+        _run_shell = staticmethod(fake_run_shell)
+
+    monkeypatch.setattr(workspace_pool, "_get_main_module", lambda: _Main)
+    return tmp_path, status
+
+
+def test_discover_mirrors_skips_shared_stores(tmp_path) -> None:
+    _make_mirror(tmp_path, "o__r", "main", 10)
+    _make_mirror(tmp_path, "o__r", "feature/x", 10)
+    (tmp_path / "o__r" / ".objects.git" / "objects").mkdir(parents=True)
+    (tmp_path / ".trash").mkdir()
+
+    found = workspace_pool.discover_mirrors(str(tmp_path))
+
+    assert sorted(m["ref"] for m in found) == ["feature/x", "main"]
+    assert {m["repo_key"] for m in found} == {"o__r"}
+
+
+@pytest.mark.asyncio
+async def test_enforce_budget_evicts_lru_clean_mirrors(pool_env) -> None:
+    base, status = pool_env
+    oldest = _make_mirror(base, "o__a", "main", 64 * 1024)
+    dirty = _make_mirror(base, "o__b", "main", 64 * 1024)
+    newest = _make_mirror(base, "o__c", "main", 64 * 1024)
+    status[dirty] = "## main...origin/main\n M README.md\n"
+
+    pool = WorkspacePool(1, min_idle_seconds=0)
+    now = time.time()
+    for offset, path in ((300, oldest), (200, dirty), (100, newest)):
+        pool.note_access(path, "o/x", "main", hit=True)
+        pool._mirrors[path]["last_access"] = now - offset
+
+    summary = await pool.enforce_budget(protect=newest)
+
+    assert summary["evicted"] == [oldest]
+    assert summary["kept_dirty"] == [dirty]
+    assert not os.path.exists(oldest)
+    assert os.path.isdir(dirty) and os.path.isdir(newest)
+    assert pool.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_enforce_budget_removes_store_with_last_mirror(pool_env) -> None:
+    base, _status = pool_env
+    mirror = _make_mirror(base, "o__r", "main", 4096)
+    store = base / "o__r" / ".objects.git"
+    store.mkdir()
+    (store / "pack").write_bytes(b"x" * 4096)
+
+    pool = WorkspacePool(1, min_idle_seconds=0)
+    summary = await pool.enforce_budget()
+
+    assert summary["evicted"] == [mirror]
+    assert not store.exists()
+    assert summary["total_bytes_after"] == 0
+
+
+@pytest.mark.asyncio
+async def test_enforce_budget_keeps_store_pinned_by_a_refresh(
+    pool_env, monkeypatch
+) -> None:
+    from github_mcp.workspace_locks import WORKSPACE_LOCKS
+
+    base, _status = pool_env
+    mirror = _make_mirror(base, "o__r", "main", 4096)
+    store = base / "o__r" / ".objects.git"
+    store.mkdir()
+    (store / "pack").write_bytes(b"x" * 4096)
+    monkeypatch.setattr(WORKSPACE_LOCKS, "enabled", False)
+    pool = WorkspacePool(1, min_idle_seconds=0)
+
+    # A clone of another ref is borrowing objects from the store.
+    async with WORKSPACE_LOCKS.hold(str(store), write=False, pin=True):
+        summary = await pool.enforce_budget()
+
+    assert summary["evicted"] == [mirror]
+    assert store.is_dir()
+    assert pool.stats()["skipped_busy"] == 1
+
+    # Once released, the orphaned store goes on the next pass.
+    summary = await pool.enforce_budget()
+    assert not store.exists()
+    assert summary["total_bytes_after"] == 0
+
+
+@pytest.mark.asyncio
+async def test_enforce_budget_keeps_recent_and_unpushed_mirrors(pool_env) -> None:
+    base, status = pool_env
+    recent = _make_mirror(base, "o__a", "main", 4096)
+    ahead = _make_mirror(base, "o__b", "main", 4096)
+    no_upstream = _make_mirror(base, "o__c", "topic", 4096)
+    detached = _make_mirror(base, "o__d", "main", 4096)
+    status[ahead] = "## main...origin/main [ahead 2]\n"
+    status[no_upstream] = "## topic\n"
+    status[detached] = "## HEAD (no branch)\n"
+
+    pool = WorkspacePool(1, min_idle_seconds=3600)
+    pool.note_access(recent, "o/a", "main", hit=False)
+    for path in (ahead, no_upstream, detached):
+        pool.note_access(path, "o/x", "main", hit=True)
+        pool._mirrors[path]["last_access"] = time.time() - 7200
+
+    summary = await pool.enforce_budget()
+
+    assert summary["evicted"] == []
+    assert sorted(summary["kept_dirty"]) == sorted([ahead, no_upstream, detached])
+    assert all(os.path.isdir(p) for p in (recent, ahead, no_upstream, detached))
+
+
+@pytest.mark.asyncio
+async def test_enforce_budget_skips_mirrors_pinned_by_a_tool(
+    pool_env, monkeypatch
+) -> None:
+    from github_mcp.workspace_locks import (
+        WORKSPACE_LOCKS,
+        lock_workspace_for_tool,
+        tool_lock_scope,
+    )
+
+    base, _status = pool_env
+    busy = _make_mirror(base, "o__a", "main", 4096)
+    idle = _make_mirror(base, "o__b", "main", 4096)
+    # Pins apply even with the optional mirror locks turned off.
+    monkeypatch.setattr(WORKSPACE_LOCKS, "enabled", False)
+    pool = WorkspacePool(1, min_idle_seconds=60)
+    monkeypatch.setattr(workspace_pool, "WORKSPACE_POOL", pool)
+    for path in (busy, idle):
+        pool.note_access(path, "o/x", "main", hit=True)
+        pool._mirrors[path]["last_access"] = time.time() - 7200
+
+    async with tool_lock_scope(write=False):
+        await lock_workspace_for_tool(busy)
+        assert time.time() - pool.last_access(busy) < 60
+        # Pretend the command has been running past the idle window.
+        pool._mirrors[busy]["last_access"] = time.time() - 7200
+        summary = await pool.enforce_budget()
+
+    assert summary["evicted"] == [idle]
+    assert summary["skipped_busy"] == [busy]
+    assert os.path.isdir(busy) and not os.path.exists(idle)
+    # Leaving the tool scope counts as a fresh use.
+    assert time.time() - pool.last_access(busy) < 60
+
+
+def test_stats_report_hit_rate_and_disk_pressure(tmp_path) -> None:
+    mirror = _make_mirror(tmp_path, "o__r", "main", 4096)
+    pool = WorkspacePool(8 * 4096, min_idle_seconds=0)
+    pool.note_access(mirror, "o/r", "main", hit=False)
+    pool.note_access(mirror, "o/r", "main", hit=True)
+    pool.note_access(mirror, "o/r", "main", hit=True)
+    pool.measure(str(tmp_path))
+
+    stats = pool.stats()
+    assert stats["hit_rate"] == round(2 / 3, 3)
+    assert stats["tracked_mirrors"] == 1
+    assert 0 < stats["disk_pressure"] < 1
+
+
+def test_prewarm_targets_parse_config(monkeypatch) -> None:
+    monkeypatch.setattr(config, "WORKSPACE_PREWARM_CONTROLLER", False)
+    monkeypatch.setattr(
+        config, "WORKSPACE_PREWARM", ("octo/one@dev", "octo/two", "octo/one@dev")
+    )
+
+    assert workspace_pool.prewarm_targets() == [("octo/one", "dev"), ("octo/two", None)]
+
+
+@pytest.mark.anyio
+async def test_prewarm_workspaces_clones_each_target(monkeypatch) -> None:
+    calls: list[tuple[str, Any, bool]] = []
+
+    async def fake_clone_repo(full_name, ref=None, preserve_changes=False):
+        calls.append((full_name, ref, preserve_changes))
+        if full_name == "octo/broken":
+            raise RuntimeError("no access")
+        return f"/tmp/{full_name}"
+
+    class _Main:
+        _clone_repo = staticmethod(fake_clone_repo)
+
+    monkeypatch.setattr(workspace_pool, "_get_main_module", lambda: _Main)
+    monkeypatch.setattr(workspace_pool.WORKSPACE_POOL, "prewarmed", 0)
+
+    results = await workspace_pool.prewarm_workspaces(
+        [("octo/one", "main"), ("octo/broken", None)]
+    )
+
+    assert calls == [("octo/one", "main", True), ("octo/broken", None, True)]
+    assert results[0]["repo_dir"] == "/tmp/octo/one"
+    assert results[1]["error"] == "no access"
+    assert workspace_pool.WORKSPACE_POOL.prewarmed == 1
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+from typing import Any
+
+import pytest
+
+from github_mcp import workspace_scratch
+from github_mcp.workspace import _run_shell
+from github_mcp.workspace_tools import scratch as scratch_tools
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git required")
+
+
+def _git(repo, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.fixture
+def mirror(tmp_path, monkeypatch):
+    """A git repo with one commit, a modified file and an untracked file."""
+
+    repo = tmp_path / "o__r" / "main"
+    repo.mkdir(parents=True)
+    _git(repo, "init", "-q", "-b", "main")
+    (repo / "app.txt").write_text("v1\n")
+    _git(repo, "add", "app.txt")
+    _git(repo, "commit", "-q", "-m", "init")
+    (repo / "app.txt").write_text("v2\n")
+    (repo / "notes").mkdir()
+    (repo / "notes" / "new.txt").write_text("draft\n")
+    (repo / ".venv-mcp").mkdir()
+
+    async def fake_clone_repo(full_name, ref=None, preserve_changes=False):
+        return str(repo)
+
+    class _Main:
+        WORKSPACE_BASE_DIR = str(tmp_path)
+        _run_shell = staticmethod(_run_shell)
+        _clone_repo = staticmethod(fake_clone_repo)
+
+    monkeypatch.setattr(workspace_scratch, "_get_main_module", lambda: _Main)
+    monkeypatch.setattr(scratch_tools, "_get_main_module", lambda: _Main)
+    monkeypatch.setattr(
+        "github_mcp.utils._effective_ref_for_repo",
+        lambda _full_name, ref: ref,
+        raising=False,
+    )
+    monkeypatch.setattr(workspace_scratch, "_REFLINK_SUPPORT", {})
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_worktree_scratch_carries_local_changes(mirror) -> None:
+    async with workspace_scratch.scratch_workspace(
+        str(mirror), strategy="worktree"
+    ) as scratch:
+        scratch_dir = scratch["scratch_dir"]
+        assert scratch["strategy"] == "worktree"
+        assert open(os.path.join(scratch_dir, "app.txt")).read() == "v2\n"
+        assert open(os.path.join(scratch_dir, "notes", "new.txt")).read() == "draft\n"
+        assert not os.path.exists(os.path.join(scratch_dir, ".venv-mcp"))
+
+        with open(os.path.join(scratch_dir, "app.txt"), "w") as fh:
+            fh.write("speculative\n")
+
+    assert not os.path.exists(scratch_dir)
+    assert (mirror / "app.txt").read_text() == "v2\n"
+    assert _git(mirror, "worktree", "list").count("\n") == 1
+
+
+@pytest.mark.asyncio
+async def test_worktree_scratch_does_file_io_on_the_blocking_executor(
+    mirror, monkeypatch
+) -> None:
+    offloaded: list[str] = []
+
+    async def fake_run_blocking(fn, /, *args, **kwargs):
+        offloaded.append(getattr(fn, "__name__", repr(fn)))
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(workspace_scratch, "run_blocking", fake_run_blocking)
+
+    async with workspace_scratch.scratch_workspace(
+        str(mirror), strategy="worktree"
+    ) as scratch:
+        assert os.path.isfile(os.path.join(scratch["scratch_dir"], "notes", "new.txt"))
+
+    assert offloaded[0] == "_sweep_stale"
+    assert "_copy_untracked" in offloaded
+
+
+@pytest.mark.asyncio
+async def test_worktree_scratch_can_start_clean(mirror) -> None:
+    async with workspace_scratch.scratch_workspace(
+        str(mirror), strategy="worktree", include_changes=False
+    ) as scratch:
+        scratch_dir = scratch["scratch_dir"]
+        assert open(os.path.join(scratch_dir, "app.txt")).read() == "v1\n"
+        assert not os.path.exists(os.path.join(scratch_dir, "notes"))
+
+
+@pytest.mark.asyncio
+async def test_auto_strategy_falls_back_without_reflink(mirror, monkeypatch) -> None:
+    root = workspace_scratch.scratch_root()
+    monkeypatch.setitem(workspace_scratch._REFLINK_SUPPORT, root, False)
+
+    scratch = await workspace_scratch.create_scratch_workspace(str(mirror))
+    try:
+        assert scratch["strategy"] == "worktree"
+    finally:
+        await workspace_scratch.discard_scratch_workspace(scratch)
+
+
+@pytest.mark.asyncio
+async def test_reflink_copy_skips_virtualenv(mirror, monkeypatch) -> None:
+    commands: list[str] = []
+
+    async def fake_checked(cmd: str, *, cwd: str, what: str) -> dict[str, Any]:
+        commands.append(cmd)
+        return {"exit_code": 0, "stdout": ""}
+
+    monkeypatch.setattr(workspace_scratch, "_checked", fake_checked)
+    dest = os.path.join(str(mirror.parent), "copy")
+    await workspace_scratch._copy_reflink(str(mirror), dest)
+
+    assert len(commands) == 1
+    assert commands[0].startswith("cp -a --reflink=always -- ")
+    assert "app.txt" in commands[0] and ".git" in commands[0]
+    assert ".venv-mcp" not in commands[0]
+
+
+@pytest.mark.asyncio
+async def test_run_in_scratch_workspace_applies_patch_off_mirror(mirror) -> None:
+    patch = (
+        "diff --git a/app.txt b/app.txt\n"
+        "--- a/app.txt\n"
+        "+++ b/app.txt\n"
+        "@@ -1 +1 @@\n"
+        "-v2\n"
+        "+v3\n"
+    )
+
+    result = await scratch_tools.run_in_scratch_workspace(
+        "o/r", ref="main", command="cat app.txt", patch=patch, strategy="worktree"
+    )
+
+    assert result["ok"] is True
+    assert result["patch_applied"] is True
+    assert result["result"]["stdout"] == "v3\n"
+    assert (mirror / "app.txt").read_text() == "v2\n"
+    assert not os.listdir(workspace_scratch.scratch_root())
+
+
+@pytest.mark.asyncio
+async def test_run_in_scratch_workspace_rejects_unknown_strategy(mirror) -> None:
+    result = await scratch_tools.run_in_scratch_workspace(
+        "o/r", ref="main", command="true", strategy="overlay"
+    )
+
+    assert result.get("ok") is not True
+    assert "strategy" in str(result)
+
+
+@pytest.mark.asyncio
+async def test_scratch_virtualenv_layers_over_mirror_venv(mirror, tmp_path) -> None:
+    import sys
+
+    base = mirror / ".venv-mcp"
+    shutil.rmtree(base)
+    subprocess.run(
+        [sys.executable, "-m", "venv", "--without-pip", str(base)], check=True
+    )
+    base_python = base / "bin" / "python"
+    # Installed the way an editable install is: through a .pth file.
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "marker_pkg.py").write_text("VALUE = 'from-mirror'\n")
+    (next(base.glob("lib/python*/site-packages")) / "marker.pth").write_text(f"{src}\n")
+    script = base / "bin" / "show-marker"
+    script.write_text(
+        f"#!{base_python}\nimport sys, marker_pkg\nprint(marker_pkg.VALUE, sys.prefix)\n"
+    )
+    script.chmod(0o755)
+    before = sorted(str(p) for p in base.rglob("*"))
+
+    scratch_dir = tmp_path / "scratch"
+    scratch_dir.mkdir()
+    env = await workspace_scratch.prepare_scratch_virtualenv(
+        str(scratch_dir), {"VIRTUAL_ENV": str(base), "PATH": ""}
+    )
+
+    venv_dir = str(scratch_dir / ".venv-mcp")
+    assert env["VIRTUAL_ENV"] == venv_dir
+    result = await _run_shell(
+        "show-marker", cwd=str(scratch_dir), timeout_seconds=60, env=env
+    )
+    assert result["exit_code"] == 0, result
+    assert result["stdout"].split() == ["from-mirror", venv_dir]
+    assert sorted(str(p) for p in base.rglob("*")) == before
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from github_mcp import config, workspace
+from github_mcp.workspace_shell import WARM_SHELLS, WarmShellPool
+
+
+@pytest.fixture
+def warm(monkeypatch):
+    monkeypatch.setattr(config, "WORKSPACE_WARM_SHELL", True)
+    monkeypatch.setenv("SHELL", "/bin/sh")
+    monkeypatch.setattr(WARM_SHELLS, "started", 0)
+    monkeypatch.setattr(WARM_SHELLS, "reused", 0)
+    monkeypatch.setattr(WARM_SHELLS, "fallbacks", 0)
+    monkeypatch.setattr(WARM_SHELLS, "killed", 0)
+    yield WARM_SHELLS
+    for shell in WARM_SHELLS._shells.values():
+        shell.kill()
+    WARM_SHELLS._shells.clear()
+
+
+@pytest.mark.asyncio
+async def test_warm_shell_is_reused_and_isolates_commands(warm, tmp_path) -> None:
+    (tmp_path / "sub").mkdir()
+
+    first = await workspace._run_shell(
+        "cd sub && export LEAK=1 && echo $$; pwd; echo err >&2", cwd=str(tmp_path)
+    )
+    second = await workspace._run_shell(
+        'echo $$; pwd; echo "leak=${LEAK:-}"; exit 3', cwd=str(tmp_path)
+    )
+
+    assert first["exit_code"] == 0 and first["timed_out"] is False
+    assert first["stderr"] == "err\n"
+    pid1, cwd1 = first["stdout"].splitlines()
+    pid2, cwd2, leak = second["stdout"].splitlines()
+    assert second["exit_code"] == 3
+    # Same shell process, but cd/export/exit stay inside each command.
+    assert pid1 == pid2
+    assert cwd1.endswith("/sub") and not cwd2.endswith("/sub")
+    assert leak == "leak="
+    assert warm.stats()["started"] == 1
+    assert warm.stats()["reused"] == 1
+    await warm.close_all()
+
+
+@pytest.mark.asyncio
+async def test_warm_shell_keys_on_env(warm, tmp_path) -> None:
+    a = await workspace._run_shell("echo $X", cwd=str(tmp_path), env={"X": "a"})
+    b = await workspace._run_shell("echo $X", cwd=str(tmp_path), env={"X": "b"})
+
+    assert (a["stdout"], b["stdout"]) == ("a\n", "b\n")
+    assert warm.stats()["started"] == 2
+    await warm.close_all()
+
+
+@pytest.mark.asyncio
+async def test_warm_shell_timeout_kills_shell(warm, tmp_path) -> None:
+    result = await workspace._run_shell(
+        "echo before; sleep 30", cwd=str(tmp_path), timeout_seconds=1
+    )
+
+    assert result["timed_out"] is True
+    assert result["stdout"] == "before\n"
+    assert warm.stats()["shells"] == []
+    assert warm.stats()["killed"] == 1
+
+    again = await workspace._run_shell("echo ok", cwd=str(tmp_path))
+    assert again["stdout"] == "ok\n"
+    await warm.close_all()
+
+
+@pytest.mark.asyncio
+async def test_busy_warm_shell_falls_back_to_cold_spawn(warm, tmp_path) -> None:
+    slow = asyncio.ensure_future(
+        workspace._run_shell("sleep 0.5; echo slow", cwd=str(tmp_path))
+    )
+    await asyncio.sleep(0.2)
+    fast = await workspace._run_shell("echo fast", cwd=str(tmp_path))
+
+    assert fast["stdout"] == "fast\n"
+    assert (await slow)["stdout"] == "slow\n"
+    assert warm.stats()["fallbacks"] == 1
+    await warm.close_all()
+
+
+@pytest.mark.asyncio
+async def test_pool_evicts_least_recently_used(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("SHELL", "/bin/sh")
+    pool = WarmShellPool(max_shells=1, idle_seconds=0)
+
+    async def _ignore(name: str, chunk: bytes) -> None:
+        return None
+
+    try:
+        for key in ("a", "b"):
+            await pool.run(
+                "true",
+                key=(key,),
+                cwd=str(tmp_path),
+                build_env=dict,
+                timeout_seconds=5,
+                on_output=_ignore,
+            )
+        assert [s["cwd"] for s in pool.stats()["shells"]] == ["b"]
+    finally:
+        await pool.close_all()
@@ -64,6 +64,42 @@ async def test_prepare_virtualenv_creates_marker_and_is_reused(monkeypatch, tmp_
     assert calls == calls_after_first
 
 
+@pytest.mark.asyncio
+async def test_prepare_virtualenv_serializes_without_workspace_locks(
+    monkeypatch, tmp_path
+):
+    import asyncio
+
+    import github_mcp.workspace as workspace
+    from github_mcp.workspace_locks import WORKSPACE_LOCKS
+
+    # The venv lock must hold even with the optional mirror locks disabled.
+    monkeypatch.setattr(WORKSPACE_LOCKS, "enabled", False)
+
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+
+    creates: list[str] = []
+
+    async def fake_run_shell(cmd: str, *, cwd=None, timeout_seconds=0, env=None):
+        if " -m venv" in cmd:
+            creates.append(cmd)
+            await asyncio.sleep(0.01)
+            venv_root = shlex.split(cmd)[-1]
+            _touch(os.path.join(venv_root, "bin", "python"))
+            _touch(os.path.join(venv_root, "Scripts", "python.exe"))
+        return {"exit_code": 0, "stdout": "", "stderr": "", "timed_out": False}
+
+    dummy_main = SimpleNamespace(_run_shell=fake_run_shell)
+    monkeypatch.setattr(workspace, "_get_main_module", lambda: dummy_main)
+
+    await asyncio.gather(
+        *(workspace._prepare_temp_virtualenv(str(repo_dir)) for _ in range(3))
+    )
+
+    assert len(creates) == 1
+
+
 @pytest.mark.anyio
 async def test_stop_virtualenv_removes_directory(monkeypatch, tmp_path):
     import github_mcp.workspace as workspace